@@ -185,3 +185,37 @@ CORS_EXPOSE_HEADERS = [
 ]
 
 CORS_PREFLIGHT_MAX_AGE = 86400
+
+OCR_BACKEND = os.getenv('OCR_BACKEND', 'paddle')
+OCR_POOL_SIZE = int(os.getenv('OCR_POOL_SIZE', '2'))
+OCR_POOL_PRELOAD = str(os.getenv('OCR_POOL_PRELOAD', '0')).lower() in {'1', 'true', 'yes', 'on'}
+OCR_POOL_ACQUIRE_TIMEOUT = float(os.getenv('OCR_POOL_ACQUIRE_TIMEOUT', '30'))
+OCR_CACHE_ENABLED = str(os.getenv('OCR_CACHE_ENABLED', '1')).lower() in {'1', 'true', 'yes', 'on'}
+OCR_CACHE_MAX_ENTRIES = int(os.getenv('OCR_CACHE_MAX_ENTRIES', '5000'))
+OCR_CACHE_MAX_BYTES = int(os.getenv('OCR_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+OCR_UPLOAD_DIR = os.getenv('OCR_UPLOAD_DIR', str(BASE_DIR / 'media' / 'ocr_uploads'))
+OCR_WORKER_THREADS = int(os.getenv('OCR_WORKER_THREADS', str(OCR_POOL_SIZE)))
+OCR_WORKER_POLL_INTERVAL = float(os.getenv('OCR_WORKER_POLL_INTERVAL', '1.0'))
+OCR_JOB_MAX_ATTEMPTS = int(os.getenv('OCR_JOB_MAX_ATTEMPTS', '2'))
+OCR_JOB_STALE_AFTER = int(os.getenv('OCR_JOB_STALE_AFTER', '600'))
+OCR_BATCH_PROCESSES = int(os.getenv('OCR_BATCH_PROCESSES', '2'))
+OCR_BATCH_MAX_IMAGES = int(os.getenv('OCR_BATCH_MAX_IMAGES', '50'))
+OCR_BATCH_MAX_IMAGE_BYTES = int(os.getenv('OCR_BATCH_MAX_IMAGE_BYTES', str(10 * 1024 * 1024)))
+OCR_BATCH_MAX_TOTAL_BYTES = int(os.getenv('OCR_BATCH_MAX_TOTAL_BYTES', str(100 * 1024 * 1024)))
+OCR_LAYOUT_CACHE_TIMEOUT = int(os.getenv('OCR_LAYOUT_CACHE_TIMEOUT', '86400'))
+OCR_PREPROCESS_ENABLED = str(os.getenv('OCR_PREPROCESS_ENABLED', '1')).lower() in {'1', 'true', 'yes', 'on'}
+OCR_PREPROCESS_MAX_SIDE = int(os.getenv('OCR_PREPROCESS_MAX_SIDE', '1600'))
+OCR_PREPROCESS_TARGET_DPI = int(os.getenv('OCR_PREPROCESS_TARGET_DPI', '300'))
+OCR_PREPROCESS_BINARIZE = str(os.getenv('OCR_PREPROCESS_BINARIZE', '1')).lower() in {'1', 'true', 'yes', 'on'}
+OCR_PREPROCESS_DESKEW = str(os.getenv('OCR_PREPROCESS_DESKEW', '1')).lower() in {'1', 'true', 'yes', 'on'}
+
+ANALYTICS_ROLLUP_ENABLED = str(os.getenv('ANALYTICS_ROLLUP_ENABLED', '1')).lower() in {'1', 'true', 'yes', 'on'}
+ALERT_EVALUATION_DEBOUNCE = float(os.getenv('ALERT_EVALUATION_DEBOUNCE', '10'))
+ALERT_EVALUATION_MAX_DELAY = float(os.getenv('ALERT_EVALUATION_MAX_DELAY', '60'))
+
+EVENT_SETTLEMENT_CHUNK_SIZE = int(os.getenv('EVENT_SETTLEMENT_CHUNK_SIZE', '500'))
+EVENT_SETTLEMENT_POLL_INTERVAL = float(os.getenv('EVENT_SETTLEMENT_POLL_INTERVAL', '2.0'))
+EVENT_SETTLEMENT_MAX_ATTEMPTS = int(os.getenv('EVENT_SETTLEMENT_MAX_ATTEMPTS', '3'))
+EVENT_SETTLEMENT_STALE_AFTER = int(os.getenv('EVENT_SETTLEMENT_STALE_AFTER', '600'))
+
+ANALYTICS_QUERY_CACHE_TIMEOUT = int(os.getenv('ANALYTICS_QUERY_CACHE_TIMEOUT', '3600'))
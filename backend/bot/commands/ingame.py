@@ -5,6 +5,7 @@ from asgiref.sync import sync_to_async
 
 from users.models import TelegramUser
 from coupons.models.coupon import Coupon
+from coupons.services.payout_service import annotate_payouts
 from bot.helpers.language import detect_lang, get_msg, TELEGRAM_LANG_CACHE
 
 logger = logging.getLogger(__name__)
@@ -24,10 +25,10 @@ async def ingame(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
     try:
         coupons = await sync_to_async(
-            lambda: list(Coupon.objects.filter(
+            lambda: list(annotate_payouts(Coupon.objects.filter(
                 user_id=user_id, 
                 status=Coupon.CouponStatus.IN_PROGRESS
-            ).prefetch_related('bets').order_by('-created_at'))
+            )).prefetch_related('bets__bet_type').order_by('-created_at'))
         )()
 
         if not coupons:
@@ -36,7 +37,7 @@ async def ingame(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             return
 
         for coupon in coupons:
-            bets = await sync_to_async(lambda c=coupon: list(c.bets.all()))()
+            bets = list(coupon.bets.all())
             
             kurs = f"{coupon.multiplier:.2f}"
             stawka = f"{coupon.bet_stake:.2f} PLN"
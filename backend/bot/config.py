@@ -5,6 +5,26 @@ load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 FANCY_BALANCE = str(os.getenv('TELEGRAM_FANCY_BALANCE', '1')).lower() in {'1', 'true', 'yes', 'on'}
+# Bot API endpoint override, e.g. a local fake server (python -m bot.fake_bot_api)
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL') or None
+
+# Notification dispatcher: Telegram allows ~30 messages/s per bot and ~1/s per chat
+TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', '25'))
+TELEGRAM_PER_CHAT_INTERVAL = float(os.getenv('TELEGRAM_PER_CHAT_INTERVAL', '1.0'))
+TELEGRAM_MAX_CONCURRENT_CHATS = int(os.getenv('TELEGRAM_MAX_CONCURRENT_CHATS', '20'))
+TELEGRAM_SEND_RETRIES = int(os.getenv('TELEGRAM_SEND_RETRIES', '2'))
+TELEGRAM_SEND_BACKOFF = float(os.getenv('TELEGRAM_SEND_BACKOFF', '0.5'))
+# Alert events: per job run, and across runs before an event is given up
+ALERT_DISPATCH_BATCH = int(os.getenv('ALERT_DISPATCH_BATCH', '500'))
+ALERT_SEND_MAX_ATTEMPTS = int(os.getenv('ALERT_SEND_MAX_ATTEMPTS', '5'))
+ALERT_SEND_RETRY_DELAY = int(os.getenv('ALERT_SEND_RETRY_DELAY', '30'))
+# Push delivery: NOTIFY from the analytics_alert_event trigger (migration 0017) wakes the sender;
+# the table is then only swept every ALERT_SWEEP_INTERVAL seconds (5 s polling when push is off)
+ALERT_EVENTS_CHANNEL = 'alert_events'
+ALERT_PUSH_ENABLED = str(os.getenv('ALERT_PUSH_ENABLED', '1')).lower() in {'1', 'true', 'yes', 'on'}
+ALERT_SWEEP_INTERVAL = int(os.getenv('ALERT_SWEEP_INTERVAL', '300'))
+ALERT_POLL_INTERVAL = 5
+ALERT_LISTEN_RECONNECT_DELAY = float(os.getenv('ALERT_LISTEN_RECONNECT_DELAY', '5'))
 
 DEFAULT_LANG = 'pl'
 SUPPORTED_LANGS = {'pl', 'en'}
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Telegram Bot API for tests and load runs.
+
+Answers ``getMe`` and ``sendMessage`` for any token, records every message
+and can be told to fail the next sends to a chat (429 flood control,
+403 blocked bot, 5xx). Point the bot at it with
+``TELEGRAM_API_BASE_URL=http://127.0.0.1:8081/bot``.
+
+    python -m bot.fake_bot_api --port 8081
+"""
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+ERROR_DESCRIPTIONS = {
+    400: 'Bad Request: chat not found',
+    403: 'Forbidden: bot was blocked by the user',
+    429: 'Too Many Requests: retry after {retry_after}',
+    500: 'Internal Server Error',
+}
+
+
+class FakeBotAPI:
+    """Threaded fake Bot API server; ``base_url`` goes to ``Bot(base_url=...)``."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.messages: List[Dict[str, Any]] = []
+        self.failures: Dict[int, Deque[Tuple[int, int]]] = defaultdict(deque)
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def fail(self, chat_id: int, status: int, times: int = 1, retry_after: int = 1) -> None:
+        """Answer the next ``times`` sends to ``chat_id`` with ``status``."""
+        with self.lock:
+            self.failures[int(chat_id)].extend([(status, retry_after)] * times)
+
+    def sent_to(self, chat_id: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [message for message in self.messages if message['chat_id'] == int(chat_id)]
+
+    def start(self) -> 'FakeBotAPI':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakeBotAPI':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle(self, method: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'BetBetter', 'username': 'fake_betbetter_bot',
+            }}
+        if method != 'sendMessage':
+            return 404, {'ok': False, 'error_code': 404, 'description': 'Not Found: method not found'}
+
+        chat_id = int(params.get('chat_id', 0))
+        with self.lock:
+            if self.failures[chat_id]:
+                status, retry_after = self.failures[chat_id].popleft()
+                body = {
+                    'ok': False,
+                    'error_code': status,
+                    'description': ERROR_DESCRIPTIONS.get(status, 'Error').format(retry_after=retry_after),
+                }
+                if status == 429:
+                    body['parameters'] = {'retry_after': retry_after}
+                return status, body
+
+            message = {
+                'message_id': len(self.messages) + 1,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': params.get('text', ''),
+            }
+            self.messages.append({'chat_id': chat_id, 'text': message['text'], 'at': time.monotonic()})
+        return 200, {'ok': True, 'result': message}
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length).decode('utf-8') if length else ''
+                if self.headers.get('Content-Type', '').startswith('application/json'):
+                    params = json.loads(raw or '{}')
+                else:
+                    params = dict(parse_qsl(raw))
+                status, body = api.handle(self.path.rsplit('/', 1)[-1], params)
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Fake Telegram Bot API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    args = parser.parse_args()
+
+    api = FakeBotAPI(args.host, args.port)
+    print(f"Fake Bot API on {api.base_url} (Ctrl+C to stop)")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{len(api.messages)} messages received")
+        api.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
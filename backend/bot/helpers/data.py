@@ -1,10 +1,11 @@
 from decimal import Decimal
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum
 from django.utils.timezone import now
 
 from users.models import TelegramUser, UserSettings
 from finances.models import BookmakerAccountModel, Transaction
-from coupons.models.coupon import Coupon
+from coupon_analytics.services.aggregate_engine import CouponAggregate
+from coupon_analytics.services.rollup_service import get_rollup_summary_by
 
 
 def collect_balance_data_full(telegram_id: int):
@@ -24,19 +25,12 @@ def collect_balance_data_full(telegram_id: int):
         .select_related('bookmaker', 'currency')
     )
 
+    per_account = get_rollup_summary_by(user_id, 'bookmaker_account')
+
     stats: list[dict] = []
     for account in accounts:
-        agg = Coupon.objects.filter(
-            user_id=user_id,
-            bookmaker_account=account,
-            status__in=[Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST]
-        ).aggregate(
-            net_pl=Sum('balance'),
-            cnt=Count('id'),
-            won_cnt=Count('id', filter=Q(status=Coupon.CouponStatus.WON)),
-            lost_cnt=Count('id', filter=Q(status=Coupon.CouponStatus.LOST)),
-        )
-        net_pl = agg.get('net_pl') or Decimal('0.00')
+        agg = per_account.get(account.id) or CouponAggregate()
+        net_pl = agg.settled_balance
 
         try:
             bookmaker_name = account.bookmaker.name if account.bookmaker else 'Unknown'
@@ -50,8 +44,8 @@ def collect_balance_data_full(telegram_id: int):
             'currency': currency_code,
             'current_balance': str(account.balance),
             'net_pl': str(net_pl),
-            'won_cnt': agg.get('won_cnt') or 0,
-            'lost_cnt': agg.get('lost_cnt') or 0,
+            'won_cnt': agg.won_count,
+            'lost_cnt': agg.lost_count,
         })
 
     stats.sort(key=lambda x: (-(float(x['net_pl'] or 0)), x['bookmaker']))
@@ -14,14 +14,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from bot.config import TELEGRAM_BOT_TOKEN
+from bot.config import (
+    ALERT_POLL_INTERVAL,
+    ALERT_PUSH_ENABLED,
+    ALERT_SWEEP_INTERVAL,
+    TELEGRAM_API_BASE_URL,
+    TELEGRAM_BOT_TOKEN,
+)
 from bot.commands.auth import start, login
 from bot.commands.balance import balance
 from bot.commands.budget import budget
 from bot.commands.utils import help_command, refresh
 from bot.commands.ingame import ingame
-from bot.notifications.alerts import send_pending_alert_events
+from bot.notifications.alerts import evaluate_dirty_alerts, send_pending_alert_events
 from bot.notifications.budget_monitor import check_budget_exceeded
+from bot.notifications.listener import start_alert_listener, stop_alert_listener
 from bot.notifications.reports import send_pending_reports
 
 
@@ -29,7 +36,12 @@ def main() -> None:
     if not TELEGRAM_BOT_TOKEN:
         raise ValueError("TELEGRAM_BOT_TOKEN is not set in environment variables!")
     
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    builder = Application.builder().token(TELEGRAM_BOT_TOKEN)
+    if TELEGRAM_API_BASE_URL:
+        builder = builder.base_url(TELEGRAM_API_BASE_URL)
+    if ALERT_PUSH_ENABLED:
+        builder = builder.post_init(start_alert_listener).post_shutdown(stop_alert_listener)
+    application = builder.build()
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("login", login))
@@ -39,11 +51,14 @@ def main() -> None:
     application.add_handler(CommandHandler("refresh", refresh))
     application.add_handler(CommandHandler("ingame", ingame))
 
-    application.job_queue.run_repeating(send_pending_alert_events, interval=5, first=2)
+    application.job_queue.run_repeating(evaluate_dirty_alerts, interval=5, first=1)
+    # With push delivery the table is only swept for reconciliation
+    alert_interval = ALERT_SWEEP_INTERVAL if ALERT_PUSH_ENABLED else ALERT_POLL_INTERVAL
+    application.job_queue.run_repeating(send_pending_alert_events, interval=alert_interval, first=2)
     application.job_queue.run_repeating(check_budget_exceeded, interval=3600, first=10)
     application.job_queue.run_repeating(send_pending_reports, interval=60, first=3)
 
-    logger.info("Bot started with JobQueue alert events, budget monitoring, and reports tasks...")
+    logger.info("Bot started with JobQueue alert evaluation, alert events, budget monitoring, and reports tasks...")
 
     application.run_polling()
 
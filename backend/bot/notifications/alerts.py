@@ -1,12 +1,16 @@
+import asyncio
 import logging
+from datetime import timedelta
 from telegram.ext import ContextTypes
 from asgiref.sync import sync_to_async
+from django.db.models import Q
 from django.utils import timezone
 
-from users.models import TelegramUser
 from coupon_analytics.models import AlertEvent
+from coupon_analytics.services.alert_evaluator import evaluate_dirty_alert_users
 from bot.helpers.language import TELEGRAM_LANG_CACHE, get_msg, DEFAULT_LANG
-from bot.config import BOX_WIDTH
+from bot.config import ALERT_DISPATCH_BATCH, ALERT_SEND_MAX_ATTEMPTS, ALERT_SEND_RETRY_DELAY, BOX_WIDTH
+from bot.notifications.dispatcher import DispatchResult, OutgoingMessage, get_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -54,35 +58,101 @@ def format_alert_event(ev: AlertEvent, lang: str | None = None) -> str:
     return _build_box(lines, title=title)
 
 
-async def send_pending_alert_events(context: ContextTypes.DEFAULT_TYPE) -> None:
+async def evaluate_dirty_alerts(context: ContextTypes.DEFAULT_TYPE) -> None:
     """
-    Wysyłaj pending alert events I raporty do Telegrama.
+    Przelicz reguły alertów użytkowników oznaczonych po rozliczeniu kuponów (raz na użytkownika).
     """
     try:
-        # 1. Wysyłaj Alert Events
-        pending_events = await sync_to_async(
-            lambda: list(AlertEvent.objects.filter(sent_at__isnull=True).select_related('user', 'rule'))
-        )()
-        
-        if pending_events:
-            logger.info(f"[ALERTS] Found {len(pending_events)} pending alert events")
-
-            for ev in pending_events:
-                try:
-                    tg_profile = await sync_to_async(TelegramUser.objects.get)(user=ev.user)
-                except TelegramUser.DoesNotExist:
-                    continue
-
-                lang = TELEGRAM_LANG_CACHE.get(tg_profile.telegram_id, DEFAULT_LANG)
-                base_msg = format_alert_event(ev, lang)
-                await context.bot.send_message(chat_id=tg_profile.telegram_id, text=base_msg)
-                ev.sent_at = timezone.now()
-                await sync_to_async(ev.save)(update_fields=['sent_at'])
-                logger.info(f"[ALERTS] Sent AlertEvent {ev.id} to user {ev.user.id}")
-
-        # 2. Wysyłaj Raporty (z bot.notifications.reports)
-        from bot.notifications.reports import send_pending_reports
-        await send_pending_reports(context)
-
+        await sync_to_async(evaluate_dirty_alert_users)()
     except Exception as e:
-        logger.error(f"Error in send_pending_alert_events: {e}", exc_info=True)
+        logger.error(f"Error in evaluate_dirty_alerts: {e}", exc_info=True)
+
+
+def _pending_alert_events() -> list[AlertEvent]:
+    """Unsent events of users with a Telegram profile, recipients joined in the same query."""
+    now = timezone.now()
+    return list(
+        AlertEvent.objects.filter(
+            sent_at__isnull=True,
+            send_attempts__lt=ALERT_SEND_MAX_ATTEMPTS,
+            user__telegram_profile__isnull=False,
+        )
+        .filter(Q(next_send_at__isnull=True) | Q(next_send_at__lte=now))
+        .select_related('user__telegram_profile', 'rule')
+        .order_by('triggered_at')[:ALERT_DISPATCH_BATCH]
+    )
+
+
+def _record_alert_delivery(events: list[AlertEvent], result: DispatchResult) -> None:
+    """One UPDATE for the delivered events, one bulk update for the failed ones."""
+    now = timezone.now()
+    if result.sent:
+        AlertEvent.objects.filter(id__in=result.sent).update(sent_at=now)
+
+    by_id = {ev.id: ev for ev in events}
+    failed = []
+    for event_id in result.retry:
+        ev = by_id[event_id]
+        ev.send_attempts += 1
+        ev.next_send_at = now + timedelta(seconds=ALERT_SEND_RETRY_DELAY * 2 ** (ev.send_attempts - 1))
+        failed.append(ev)
+    for event_id in result.failed:
+        ev = by_id[event_id]
+        ev.send_attempts = ALERT_SEND_MAX_ATTEMPTS
+        ev.next_send_at = None
+        failed.append(ev)
+    if failed:
+        AlertEvent.objects.bulk_update(failed, ['send_attempts', 'next_send_at'])
+
+
+_send_lock = asyncio.Lock()
+_send_requested = False
+
+
+async def send_pending_alert_events(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Wysyłaj pending alert events do Telegrama (współbieżnie, w limitach Bot API).
+
+    Wywoływane przez NOTIFY, ponowienia i okresowy sweep; wywołania w trakcie
+    wysyłki nie startują drugiej, tylko zlecają jeszcze jeden przebieg.
+    """
+    global _send_requested
+    _send_requested = True
+    if _send_lock.locked():
+        return
+    async with _send_lock:
+        while _send_requested:
+            _send_requested = False
+            try:
+                if await _send_pending_batch(context) >= ALERT_DISPATCH_BATCH:
+                    _send_requested = True
+            except Exception as e:
+                logger.error(f"Error in send_pending_alert_events: {e}", exc_info=True)
+
+
+async def _send_pending_batch(context: ContextTypes.DEFAULT_TYPE) -> int:
+    pending_events = await sync_to_async(_pending_alert_events)()
+    if not pending_events:
+        return 0
+    logger.info(f"[ALERTS] Found {len(pending_events)} pending alert events")
+
+    messages = []
+    for ev in pending_events:
+        chat_id = ev.user.telegram_profile.telegram_id
+        lang = TELEGRAM_LANG_CACHE.get(chat_id, DEFAULT_LANG)
+        messages.append(OutgoingMessage(key=ev.id, chat_id=chat_id, text=format_alert_event(ev, lang)))
+
+    result = await get_dispatcher(context).dispatch(messages)
+    await sync_to_async(_record_alert_delivery)(pending_events, result)
+    logger.info(
+        f"[ALERTS] Sent {len(result.sent)} alert events, "
+        f"{len(result.retry)} to retry, {len(result.failed)} undeliverable"
+    )
+
+    job_queue = getattr(context, 'job_queue', None)
+    if result.retry and job_queue is not None:
+        retry_ids = set(result.retry)
+        first_retry = min(ev.next_send_at for ev in pending_events if ev.id in retry_ids)
+        delay = max(1.0, (first_retry - timezone.now()).total_seconds())
+        job_queue.run_once(send_pending_alert_events, when=delay, name='alert_events_retry')
+    return len(pending_events)
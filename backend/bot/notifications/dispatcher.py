@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import warnings
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from telegram.error import BadRequest, Forbidden, InvalidToken, NetworkError, RetryAfter, TelegramError
+
+from bot.config import (
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_MAX_CONCURRENT_CHATS,
+    TELEGRAM_PER_CHAT_INTERVAL,
+    TELEGRAM_SEND_BACKOFF,
+    TELEGRAM_SEND_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest wait inside one dispatch; anything longer is left to the next job run
+MAX_IN_RUN_DELAY = 10.0
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                self._refill(loop.time())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket so nobody sends for ``seconds`` (flood control)."""
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+@dataclass
+class OutgoingMessage:
+    key: Hashable
+    chat_id: int
+    text: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class DispatchResult:
+    sent: List[Hashable] = field(default_factory=list)
+    # Transient failures (network, flood control) worth another try later
+    retry: List[Hashable] = field(default_factory=list)
+    # Permanent failures: bot blocked, chat gone, bad request (the rest of a blocked chat too)
+    failed: List[Hashable] = field(default_factory=list)
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    # PTB 22.2+ warns that the int form is deprecated; accept either form
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        delay = error.retry_after
+    return delay.total_seconds() if isinstance(delay, timedelta) else float(delay)
+
+
+class NotificationDispatcher:
+    """Sends notification batches under Telegram's flood limits.
+
+    Chats are served concurrently (at most ``max_concurrent_chats`` at a time),
+    messages to one chat go out in order. Every send takes a token from the
+    global bucket (~30 messages/s per bot) and from its chat's bucket
+    (~1 message/s per chat). ``RetryAfter`` pauses the whole bot for the time
+    Telegram asks for; network errors are retried with exponential backoff.
+    The buckets live as long as the dispatcher, so one instance should serve
+    every job run of the bot.
+    """
+
+    def __init__(
+        self,
+        bot,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        per_chat_interval: float = TELEGRAM_PER_CHAT_INTERVAL,
+        retries: int = TELEGRAM_SEND_RETRIES,
+        backoff: float = TELEGRAM_SEND_BACKOFF,
+        max_concurrent_chats: int = TELEGRAM_MAX_CONCURRENT_CHATS,
+    ):
+        self.bot = bot
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = 1.0 / per_chat_interval if per_chat_interval > 0 else float('inf')
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrent_chats = max(1, max_concurrent_chats)
+
+    def _chat_bucket(self, chat_id: int) -> Optional[TokenBucket]:
+        if self.per_chat_rate == float('inf'):
+            return None
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=1)
+        return bucket
+
+    async def _send_one(self, message: OutgoingMessage, bucket: Optional[TokenBucket]) -> str:
+        attempt = 0
+        while True:
+            if bucket is not None:
+                await bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=message.chat_id, text=message.text, **message.options)
+                return 'sent'
+            except RetryAfter as e:
+                delay = _retry_after_seconds(e)
+                logger.warning(f"[DISPATCH] Flood control, pausing {delay:.1f}s (chat {message.chat_id})")
+                self.global_bucket.pause(delay)
+                if delay > MAX_IN_RUN_DELAY:
+                    return 'retry'
+            except Forbidden as e:
+                logger.warning(f"[DISPATCH] Chat {message.chat_id} unreachable: {e}")
+                return 'blocked'
+            except (BadRequest, InvalidToken) as e:
+                logger.warning(f"[DISPATCH] Dropping message {message.key} to chat {message.chat_id}: {e}")
+                return 'failed'
+            except (NetworkError, TelegramError, OSError) as e:
+                attempt += 1
+                if attempt > self.retries:
+                    logger.warning(f"[DISPATCH] Giving up on message {message.key} for now: {e}")
+                    return 'retry'
+                await asyncio.sleep(min(self.backoff * 2 ** (attempt - 1), MAX_IN_RUN_DELAY))
+
+    async def _send_chat(self, messages: List[OutgoingMessage], result: DispatchResult, limit: asyncio.Semaphore) -> None:
+        async with limit:
+            bucket = self._chat_bucket(messages[0].chat_id)
+            for index, message in enumerate(messages):
+                try:
+                    outcome = await self._send_one(message, bucket)
+                except Exception as e:
+                    logger.error(f"[DISPATCH] Unexpected error for message {message.key}: {e}", exc_info=True)
+                    outcome = 'retry'
+                if outcome == 'blocked':
+                    # The bot was blocked or kicked: the rest would fail the same way
+                    result.failed.extend(rest.key for rest in messages[index:])
+                    return
+                getattr(result, outcome).append(message.key)
+
+    async def dispatch(self, messages: Iterable[OutgoingMessage]) -> DispatchResult:
+        by_chat: Dict[int, List[OutgoingMessage]] = defaultdict(list)
+        for message in messages:
+            by_chat[message.chat_id].append(message)
+
+        result = DispatchResult()
+        if by_chat:
+            limit = asyncio.Semaphore(self.max_concurrent_chats)
+            await asyncio.gather(*(self._send_chat(chat, result, limit) for chat in by_chat.values()))
+        return result
+
+
+def get_dispatcher(context) -> NotificationDispatcher:
+    """The application's dispatcher, so every job shares its rate limits."""
+    dispatcher = context.bot_data.get('notification_dispatcher')
+    if dispatcher is None:
+        dispatcher = context.bot_data['notification_dispatcher'] = NotificationDispatcher(context.bot)
+    return dispatcher
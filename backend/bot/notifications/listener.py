@@ -0,0 +1,129 @@
+"""
+LISTEN/NOTIFY push channel: nowe AlertEventy wysyłane od razu, bez odpytywania tabeli.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from bot.config import ALERT_EVENTS_CHANNEL, ALERT_LISTEN_RECONNECT_DELAY
+
+logger = logging.getLogger(__name__)
+
+
+def _connect(channel: str):
+    """A dedicated autocommit connection subscribed to ``channel`` (outside Django's pool)."""
+    wrapper = connections['default']
+    conn = wrapper.get_new_connection(wrapper.get_connection_params())
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f'LISTEN "{channel}"')
+    return conn
+
+
+class AlertEventListener:
+    """Wakes the alert sender when PostgreSQL announces new AlertEvent rows.
+
+    A trigger on ``analytics_alert_event`` sends one NOTIFY per INSERT
+    statement; the connection's socket is watched by the bot's event loop,
+    so every notification burst becomes a single ``on_notify`` call. A lost
+    connection is reopened after ``ALERT_LISTEN_RECONNECT_DELAY`` seconds, and
+    every (re)connect also calls ``on_notify`` to pick up what was inserted
+    while nobody was listening. The slow reconciliation sweep stays as a
+    safety net.
+    """
+
+    def __init__(self, on_notify: Callable[[], None], channel: str = ALERT_EVENTS_CHANNEL,
+                 reconnect_delay: float = ALERT_LISTEN_RECONNECT_DELAY):
+        self.on_notify = on_notify
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.conn = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.notifications = 0
+        self._reconnect: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    @property
+    def connected(self) -> bool:
+        return self.conn is not None
+
+    async def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self._stopped = False
+        if not await self._open():
+            self._schedule_reconnect()
+
+    async def _open(self) -> bool:
+        try:
+            self.conn = await sync_to_async(_connect, thread_sensitive=False)(self.channel)
+        except Exception as e:
+            logger.warning(f"[ALERT_LISTEN] Cannot LISTEN on '{self.channel}': {e}")
+            return False
+        self.loop.add_reader(self.conn.fileno(), self._on_readable)
+        logger.info(f"[ALERT_LISTEN] Listening on '{self.channel}'")
+        self.on_notify()
+        return True
+
+    def _on_readable(self) -> None:
+        try:
+            self.conn.poll()
+        except Exception as e:
+            logger.warning(f"[ALERT_LISTEN] Connection lost: {e}")
+            self._close()
+            self._schedule_reconnect()
+            return
+        if self.conn.notifies:
+            self.notifications += len(self.conn.notifies)
+            self.conn.notifies.clear()
+            self.on_notify()
+
+    def _schedule_reconnect(self) -> None:
+        if self._stopped or (self._reconnect is not None and not self._reconnect.done()):
+            return
+
+        async def reconnect():
+            while not self._stopped and self.conn is None:
+                await asyncio.sleep(self.reconnect_delay)
+                if not self._stopped:
+                    await self._open()
+
+        self._reconnect = self.loop.create_task(reconnect())
+
+    def _close(self) -> None:
+        if self.conn is None:
+            return
+        try:
+            self.loop.remove_reader(self.conn.fileno())
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        self._close()
+
+
+async def start_alert_listener(application) -> None:
+    """``post_init`` hook: every notification queues one immediate send job."""
+    from bot.notifications.alerts import send_pending_alert_events
+
+    listener = AlertEventListener(
+        lambda: application.job_queue.run_once(send_pending_alert_events, when=0, name='alert_events_push')
+    )
+    application.bot_data['alert_listener'] = listener
+    await listener.start()
+
+
+async def stop_alert_listener(application) -> None:
+    listener = application.bot_data.pop('alert_listener', None)
+    if listener is not None:
+        await listener.stop()
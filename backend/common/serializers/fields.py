@@ -19,21 +19,20 @@ class UserAwareDateTimeField(serializers.DateTimeField):
         parent = getattr(self, "parent", None)
         context = getattr(parent, "context", {}) if parent else {}
         request = context.get("request") if isinstance(context, dict) else None
-        user = getattr(request, "user", None)
-        if not user or not getattr(user, "is_authenticated", False):
+        if request is None:
             return None
 
         try:
-            from users.models import UserSettings  # type: ignore
+            from users.services.settings_cache import get_request_user_settings  # type: ignore
         except Exception:
             return None
 
         try:
-            settings = UserSettings.objects.select_related(None).only(
-                "id", "user_id", "datetime_format", "date_format"
-            ).get(user=user)
+            settings = get_request_user_settings(request)
         except Exception:
             return None
+        if settings is None:
+            return None
 
         fmt = getattr(settings, "datetime_format", None) or getattr(settings, "date_format", None)
         return fmt or self.fallback_format
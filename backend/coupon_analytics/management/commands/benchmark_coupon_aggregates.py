@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Avg, Q, Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from coupons.models import Coupon
+from coupons.services.team_filter import TeamFilterService
+from coupons.views.coupon_filter_view import CouponStatsMixin
+from coupon_analytics.services.analytics_service import AnalyticsService
+from coupon_analytics.services.report_service import get_coupon_stats_for_period
+
+
+def _legacy_summary(qs):
+    """Per-metric count()/aggregate() calls, as the summary used to be computed."""
+    finished_filter = Q(status='won') | Q(status='lost') | Q(status='canceled')
+    result_filter = Q(status='won') | Q(status='lost')
+    return {
+        'total': qs.count(),
+        'finished': qs.filter(finished_filter).count(),
+        'in_progress': qs.filter(status='in_progress').count(),
+        'won': qs.filter(status='won').count(),
+        'lost': qs.filter(status='lost').count(),
+        'canceled': qs.filter(status='canceled').count(),
+        'stake': qs.filter(result_filter).aggregate(v=Sum('bet_stake'))['v'] or Decimal('0.00'),
+        'profit': qs.filter(result_filter).aggregate(v=Sum('balance'))['v'] or Decimal('0.00'),
+        'avg': qs.aggregate(avg_stake=Avg('bet_stake'), avg_multiplier=Avg('multiplier')),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compares query counts and timings of the legacy per-metric summary against the single-pass aggregate engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, required=True, help='User whose coupons are summarised')
+        parser.add_argument('--repeat', type=int, default=20, help='Iterations per measurement (default: 20)')
+        parser.add_argument('--team', type=str, default='', help='Team name for the team statistics case')
+
+    def _measure(self, fn, repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        queries = len(ctx.captured_queries)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        avg_ms = (time.perf_counter() - started) * 1000.0 / repeat
+        return queries, avg_ms
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(id=options['user_id']).first()
+        if user is None:
+            self.stderr.write(self.style.ERROR(f"User with id={options['user_id']} does not exist"))
+            return
+
+        repeat = max(1, options['repeat'])
+        qs = Coupon.objects.filter(user=user)
+        today = timezone.localdate()
+        service = AnalyticsService()
+
+        cases = [
+            ('summary (legacy)', lambda: _legacy_summary(qs)),
+            ('summary (engine)', lambda: service._summary_from_queryset(qs)),
+            ('report period stats', lambda: get_coupon_stats_for_period(user, today - timedelta(days=30), today)),
+            ('coupon filter stats', lambda: CouponStatsMixin.calculate_coupon_stats(qs, use_decimal=True)),
+        ]
+        if options['team']:
+            cases.append(('team statistics', lambda: TeamFilterService.get_team_statistics(user, options['team'])))
+
+        self.stdout.write(f"{qs.count()} coupon(s), {repeat} iteration(s) per case")
+        self.stdout.write(f"{'case':<24}{'queries':>8}{'avg ms':>10}")
+        for label, fn in cases:
+            queries, avg_ms = self._measure(fn, repeat)
+            self.stdout.write(f"{label:<24}{queries:>8}{avg_ms:>10.2f}")
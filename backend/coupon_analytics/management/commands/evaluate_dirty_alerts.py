@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from coupon_analytics.services.alert_evaluator import evaluate_dirty_alert_users
+
+
+class Command(BaseCommand):
+    help = "Evaluates alert rules once for every user marked dirty by coupon settlement (the bot runs this every few seconds)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100, help='Max users evaluated in this pass (default: 100)')
+
+    def handle(self, *args, **options):
+        count = evaluate_dirty_alert_users(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Evaluated alert rules for {count} user(s)"))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from coupon_analytics.services.filter_spec import (
+    orphaned_auto_generated_queries,
+    purge_auto_generated_queries,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes AnalyticsQuery rows created implicitly by filter requests "
+        "that no alert rule or report uses. Saved filters are never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=1, help='Only purge queries older than this (default: 1)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Queries deleted per statement (default: 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the queries that would be purged')
+
+    def handle(self, *args, **options):
+        older_than = timedelta(days=max(0, options['older_than_days']))
+        if options['dry_run']:
+            count = orphaned_auto_generated_queries(older_than).count()
+            self.stdout.write(f"{count} auto-generated query(ies) would be purged")
+            return
+        count = purge_auto_generated_queries(older_than, batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"Purged {count} auto-generated query(ies)"))
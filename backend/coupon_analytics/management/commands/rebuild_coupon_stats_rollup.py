@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from coupon_analytics.services.rollup_service import (
+    rebuild_coupon_stats_rollup,
+    verify_coupon_stats_rollup,
+)
+from coupon_analytics.services.streak_service import rebuild_user_streaks, verify_user_streaks
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-user coupon statistics rollup, daily P/L rows and streak state from the coupons table, or verifies them with --verify."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Limit to the given user (repeatable). Defaults to all users.',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only compare stored rollup rows with a fresh aggregate; exits non-zero on drift.',
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+
+        if options['verify']:
+            mismatches = verify_coupon_stats_rollup(user_ids)
+            for mismatch in mismatches:
+                if len(mismatch['bucket']) == 2:
+                    user_id, day = mismatch['bucket']
+                    label = f"user={user_id} day={day}"
+                else:
+                    user_id, account_id, strategy_id = mismatch['bucket']
+                    label = f"user={user_id} account={account_id} strategy={strategy_id}"
+                self.stdout.write(
+                    f"{label}: "
+                    + ", ".join(
+                        f"{field} stored={values['stored']} expected={values['expected']}"
+                        for field, values in mismatch['diff'].items()
+                    )
+                )
+            streak_mismatches = verify_user_streaks(user_ids)
+            for mismatch in streak_mismatches:
+                self.stdout.write(
+                    f"user={mismatch['user_id']} streak: "
+                    + ", ".join(
+                        f"{field} stored={values['stored']} expected={values['expected']}"
+                        for field, values in mismatch['diff'].items()
+                    )
+                )
+            if mismatches or streak_mismatches:
+                raise CommandError(
+                    f"{len(mismatches)} rollup bucket(s) and {len(streak_mismatches)} streak state(s) out of sync; "
+                    "run without --verify to rebuild"
+                )
+            self.stdout.write(self.style.SUCCESS("Rollup is in sync with coupons"))
+            return
+
+        created = rebuild_coupon_stats_rollup(user_ids)
+        streaks = rebuild_user_streaks(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} rollup bucket(s) and {streaks} streak state(s)"))
@@ -0,0 +1,72 @@
+# Generated by Django 5.0 on 2026-10-17 15:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rollup(apps, schema_editor):
+    Coupon = apps.get_model('coupons', 'Coupon')
+    CouponStatsRollup = apps.get_model('coupon_analytics', 'CouponStatsRollup')
+    settled = Q(status__in=['won', 'lost'])
+    rows = Coupon.objects.order_by().values('user_id', 'bookmaker_account_id', 'strategy_id').annotate(
+        coupons_count=Count('id'),
+        in_progress_count=Count('id', filter=Q(status='in_progress')),
+        won_count=Count('id', filter=Q(status='won')),
+        lost_count=Count('id', filter=Q(status='lost')),
+        canceled_count=Count('id', filter=Q(status='canceled')),
+        total_stake=Sum('bet_stake'),
+        settled_stake=Sum('bet_stake', filter=settled),
+        total_balance=Sum('balance'),
+        settled_balance=Sum('balance', filter=settled),
+        won_balance=Sum('balance', filter=Q(status='won')),
+        multiplier_sum=Sum('multiplier'),
+    )
+    CouponStatsRollup.objects.bulk_create(
+        [
+            CouponStatsRollup(**{key: (value if value is not None or key.endswith('_id') else 0) for key, value in row.items()})
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0010_alter_analyticsquery_table_and_more'),
+        ('coupons', '0014_ocr_job'),
+        ('finances', '0003_alter_bookmakeraccountmodel_table'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('coupons_count', models.IntegerField(default=0)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('won_count', models.IntegerField(default=0)),
+                ('lost_count', models.IntegerField(default=0)),
+                ('canceled_count', models.IntegerField(default=0)),
+                ('total_stake', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('settled_stake', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('settled_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('won_balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('multiplier_sum', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bookmaker_account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='coupon_stats_rollups', to='finances.bookmakeraccountmodel')),
+                ('strategy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='coupon_stats_rollups', to='coupon_analytics.userstrategy')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_stats_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'analytics_coupon_stats_rollup',
+                'constraints': [models.UniqueConstraint(fields=('user', 'bookmaker_account', 'strategy'), name='uniq_coupon_stats_rollup_bucket', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
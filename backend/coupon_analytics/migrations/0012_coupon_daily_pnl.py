@@ -0,0 +1,56 @@
+# Generated by Django 5.0 on 2026-10-17 16:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_pnl(apps, schema_editor):
+    Coupon = apps.get_model('coupons', 'Coupon')
+    CouponDailyPnL = apps.get_model('coupon_analytics', 'CouponDailyPnL')
+    rows = (
+        Coupon.objects.filter(status__in=['won', 'lost'])
+        .order_by()
+        .annotate(day=TruncDate('created_at'))
+        .values('user_id', 'day')
+        .annotate(profit=Sum('balance'), settled_count=Count('id'))
+    )
+    CouponDailyPnL.objects.bulk_create(
+        [
+            CouponDailyPnL(user_id=row['user_id'], day=row['day'], profit=row['profit'] or 0, settled_count=row['settled_count'])
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0011_coupon_stats_rollup'),
+        ('coupons', '0014_ocr_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponDailyPnL',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('profit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('settled_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_daily_pnl', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'analytics_coupon_daily_pnl',
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='uniq_coupon_daily_pnl_user_day')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_pnl, migrations.RunPython.noop),
+    ]
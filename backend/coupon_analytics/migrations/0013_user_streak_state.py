@@ -0,0 +1,60 @@
+# Generated by Django 5.0 on 2026-10-17 17:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_streaks(apps, schema_editor):
+    Coupon = apps.get_model('coupons', 'Coupon')
+    UserStreakState = apps.get_model('coupon_analytics', 'UserStreakState')
+    rows = (
+        Coupon.objects.filter(status__in=['won', 'lost'])
+        .order_by('user_id', 'created_at', 'id')
+        .values_list('user_id', 'status', 'created_at', 'id')
+    )
+    states = {}
+    for user_id, status, created_at, coupon_id in rows.iterator(chunk_size=2000):
+        state = states.get(user_id)
+        if state is None:
+            state = states[user_id] = UserStreakState(user_id=user_id)
+        if status == 'lost':
+            state.current_loss_streak += 1
+            state.current_win_streak = 0
+            state.longest_loss_streak = max(state.longest_loss_streak, state.current_loss_streak)
+        else:
+            state.current_win_streak += 1
+            state.current_loss_streak = 0
+            state.longest_win_streak = max(state.longest_win_streak, state.current_win_streak)
+        state.last_created_at, state.last_coupon_id = created_at, coupon_id
+    UserStreakState.objects.bulk_create(states.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0012_coupon_daily_pnl'),
+        ('coupons', '0014_ocr_job'),
+        ('users', '0012_add_budget_exceeded_notified_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStreakState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='streak_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('current_loss_streak', models.IntegerField(default=0)),
+                ('current_win_streak', models.IntegerField(default=0)),
+                ('longest_loss_streak', models.IntegerField(default=0)),
+                ('longest_win_streak', models.IntegerField(default=0)),
+                ('last_created_at', models.DateTimeField(blank=True, null=True)),
+                ('last_coupon_id', models.BigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'analytics_user_streak_state',
+            },
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-17 18:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0013_user_streak_state'),
+        ('users', '0012_add_budget_exceeded_notified_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertDirtyUser',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='alert_dirty_marker', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('dirty_since', models.DateTimeField(default=django.utils.timezone.now)),
+                ('marked_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'analytics_alert_dirty_user',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-17 22:41
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def mark_auto_generated(apps, schema_editor):
+    # Nazwy nadawane przez build_universal_filter_query przy każdym wywołaniu filtra
+    AnalyticsQuery = apps.get_model('coupon_analytics', 'AnalyticsQuery')
+    AnalyticsQuery.objects.filter(
+        Q(name='Universal Filter') | Q(name__startswith='Filter: ')
+    ).update(auto_generated=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0014_alert_dirty_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticsquery',
+            name='auto_generated',
+            field=models.BooleanField(default=False, help_text='Created implicitly by a filter request rather than saved by the user'),
+        ),
+        migrations.RunPython(mark_auto_generated, migrations.RunPython.noop),
+    ]
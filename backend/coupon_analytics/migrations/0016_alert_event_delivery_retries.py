@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0015_analytics_query_auto_generated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertevent',
+            name='next_send_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alertevent',
+            name='send_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
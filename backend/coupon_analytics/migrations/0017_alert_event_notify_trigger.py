@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-17 13:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon_analytics', '0016_alert_event_delivery_retries'),
+    ]
+
+    operations = [
+        # One NOTIFY per INSERT statement (bulk_create included), delivered on commit
+        # to the bot's LISTEN connection (bot/notifications/listener.py)
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION analytics_alert_event_notify() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('alert_events', '');
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER analytics_alert_event_notify
+                AFTER INSERT ON analytics_alert_event
+                FOR EACH STATEMENT EXECUTE FUNCTION analytics_alert_event_notify();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS analytics_alert_event_notify ON analytics_alert_event;
+                DROP FUNCTION IF EXISTS analytics_alert_event_notify();
+            """,
+        ),
+    ]
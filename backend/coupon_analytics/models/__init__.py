@@ -9,6 +9,10 @@ from .alerts import AlertRule
 from .reports import Report
 from .alert_event import AlertEvent
 from .user_strategy import UserStrategy
+from .stats_rollup import CouponStatsRollup
+from .daily_pnl import CouponDailyPnL
+from .streak_state import UserStreakState
+from .alert_dirty_user import AlertDirtyUser
 
 __all__ = [
     "AnalyticsQuery",
@@ -18,4 +22,8 @@ __all__ = [
     "Report",
     "AlertEvent",
     "UserStrategy",
+    "CouponStatsRollup",
+    "CouponDailyPnL",
+    "UserStreakState",
+    "AlertDirtyUser",
 ]
@@ -0,0 +1,28 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class AlertDirtyUser(models.Model):
+    """Marks a user whose alert rules need re-evaluation after coupon settlement.
+
+    One row per user regardless of how many coupons settled; the evaluator
+    picks it up once ``marked_at`` has been quiet for the debounce window (or
+    ``dirty_since`` exceeds the max delay) and deletes it in the transaction
+    that evaluated the rules, so a crashed evaluation is retried.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="alert_dirty_marker",
+    )
+    dirty_since = models.DateTimeField(default=timezone.now)
+    marked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = "analytics_alert_dirty_user"
+
+    def __str__(self) -> str:
+        return f"AlertDirtyUser(user={self.user_id}, marked_at={self.marked_at})"
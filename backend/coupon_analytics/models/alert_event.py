@@ -26,6 +26,8 @@ class AlertEvent(models.Model):
     triggered_at = models.DateTimeField(default=timezone.now)
     sent_at = models.DateTimeField(null=True, blank=True)
     message_rendered = models.TextField(blank=True, null=True)
+    send_attempts = models.PositiveSmallIntegerField(default=0)
+    next_send_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "analytics_alert_event"
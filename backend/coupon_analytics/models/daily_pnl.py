@@ -0,0 +1,31 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class CouponDailyPnL(models.Model):
+    """Settled coupon profit per user and day (by coupon ``created_at``).
+
+    Maintained together with CouponStatsRollup; balance trends are range scans
+    with running sums over these rows.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="coupon_daily_pnl",
+    )
+    day = models.DateField()
+    profit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    settled_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "analytics_coupon_daily_pnl"
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "day"], name="uniq_coupon_daily_pnl_user_day")
+        ]
+
+    def __str__(self) -> str:
+        return f"CouponDailyPnL(user={self.user_id}, day={self.day}, profit={self.profit})"
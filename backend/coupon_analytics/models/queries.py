@@ -57,6 +57,10 @@ class AnalyticsQuery(models.Model):
         blank=True,
         help_text="Metrics to calculate, e.g. ['total_stake', 'total_return']"
     )
+    auto_generated = models.BooleanField(
+        default=False,
+        help_text="Created implicitly by a filter request rather than saved by the user",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
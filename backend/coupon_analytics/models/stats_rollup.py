@@ -0,0 +1,60 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class CouponStatsRollup(models.Model):
+    """Running coupon totals per (user, bookmaker account, strategy) bucket.
+
+    Maintained by CouponService on every coupon mutation; rebuild or verify
+    with ``manage.py rebuild_coupon_stats_rollup``.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="coupon_stats_rollups",
+    )
+    bookmaker_account = models.ForeignKey(
+        'finances.BookmakerAccountModel',
+        on_delete=models.CASCADE,
+        related_name="coupon_stats_rollups",
+        null=True,
+        blank=True,
+    )
+    strategy = models.ForeignKey(
+        'coupon_analytics.UserStrategy',
+        on_delete=models.CASCADE,
+        related_name="coupon_stats_rollups",
+        null=True,
+        blank=True,
+    )
+
+    coupons_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+    won_count = models.IntegerField(default=0)
+    lost_count = models.IntegerField(default=0)
+    canceled_count = models.IntegerField(default=0)
+    total_stake = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    settled_stake = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    settled_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    won_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    multiplier_sum = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "analytics_coupon_stats_rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "bookmaker_account", "strategy"],
+                name="uniq_coupon_stats_rollup_bucket",
+                nulls_distinct=False,
+            )
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"CouponStatsRollup(user={self.user_id}, account={self.bookmaker_account_id}, "
+            f"strategy={self.strategy_id}, coupons={self.coupons_count})"
+        )
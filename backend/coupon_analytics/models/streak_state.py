@@ -0,0 +1,37 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class UserStreakState(models.Model):
+    """Current and longest win/loss streaks over the user's settled coupons.
+
+    Streaks follow coupon ``created_at`` order; canceled and in-progress
+    coupons neither extend nor break a streak. ``last_created_at`` /
+    ``last_coupon_id`` identify the newest settled coupon, so a settlement
+    that lands after it is applied in place and anything else (backdated
+    coupon, re-settlement, delete) recomputes from history.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="streak_state",
+    )
+    current_loss_streak = models.IntegerField(default=0)
+    current_win_streak = models.IntegerField(default=0)
+    longest_loss_streak = models.IntegerField(default=0)
+    longest_win_streak = models.IntegerField(default=0)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    last_coupon_id = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "analytics_user_streak_state"
+
+    def __str__(self) -> str:
+        return (
+            f"UserStreakState(user={self.user_id}, loss={self.current_loss_streak}, "
+            f"win={self.current_win_streak})"
+        )
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Mapping, Optional
+
+from django.db.models import Avg, Count, Q, Sum
+
+from coupons.models import Coupon
+
+WON = Q(status=Coupon.CouponStatus.WON)
+LOST = Q(status=Coupon.CouponStatus.LOST)
+CANCELED = Q(status=Coupon.CouponStatus.CANCELED)
+IN_PROGRESS = Q(status=Coupon.CouponStatus.IN_PROGRESS)
+SETTLED = WON | LOST
+FINISHED = WON | LOST | CANCELED
+
+# Every metric the summaries need, as conditional aggregates over one scan.
+COUPON_AGGREGATES = {
+    'total_count': Count('id'),
+    'finished_count': Count('id', filter=FINISHED),
+    'in_progress_count': Count('id', filter=IN_PROGRESS),
+    'won_count': Count('id', filter=WON),
+    'lost_count': Count('id', filter=LOST),
+    'canceled_count': Count('id', filter=CANCELED),
+    'total_stake': Sum('bet_stake'),
+    'settled_stake': Sum('bet_stake', filter=SETTLED),
+    'total_balance': Sum('balance'),
+    'settled_balance': Sum('balance', filter=SETTLED),
+    'won_balance': Sum('balance', filter=WON),
+    'avg_stake': Avg('bet_stake'),
+    'avg_multiplier': Avg('multiplier'),
+}
+
+_ZERO = Decimal('0.00')
+
+
+@dataclass
+class CouponAggregate:
+    total_count: int = 0
+    finished_count: int = 0
+    in_progress_count: int = 0
+    won_count: int = 0
+    lost_count: int = 0
+    canceled_count: int = 0
+    total_stake: Decimal = _ZERO
+    settled_stake: Decimal = _ZERO
+    total_balance: Decimal = _ZERO
+    settled_balance: Decimal = _ZERO
+    won_balance: Decimal = _ZERO
+    avg_stake: Optional[Decimal] = None
+    avg_multiplier: Optional[Decimal] = None
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any], prefix: str = '') -> "CouponAggregate":
+        if prefix:
+            row = {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix)}
+
+        def dec(key: str) -> Decimal:
+            value = row.get(key)
+            return Decimal(value) if value is not None else _ZERO
+
+        def avg(key: str) -> Optional[Decimal]:
+            value = row.get(key)
+            return Decimal(value) if value is not None else None
+
+        return cls(
+            total_count=row.get('total_count') or 0,
+            finished_count=row.get('finished_count') or 0,
+            in_progress_count=row.get('in_progress_count') or 0,
+            won_count=row.get('won_count') or 0,
+            lost_count=row.get('lost_count') or 0,
+            canceled_count=row.get('canceled_count') or 0,
+            total_stake=dec('total_stake'),
+            settled_stake=dec('settled_stake'),
+            total_balance=dec('total_balance'),
+            settled_balance=dec('settled_balance'),
+            won_balance=dec('won_balance'),
+            avg_stake=avg('avg_stake'),
+            avg_multiplier=avg('avg_multiplier'),
+        )
+
+
+def scoped_aggregates(prefix: str, condition: Optional[Q] = None) -> Dict[str, Any]:
+    """COUPON_AGGREGATES restricted to rows matching ``condition``, with keys
+    prefixed, so several scopes can be computed in one ``aggregate()`` call
+    and read back with ``CouponAggregate.from_row(row, prefix)``."""
+    scoped = {}
+    for name, aggregate in COUPON_AGGREGATES.items():
+        aggregate = aggregate.copy()
+        if condition is not None:
+            aggregate.filter = condition & aggregate.filter if aggregate.filter is not None else condition
+        scoped[f'{prefix}{name}'] = aggregate
+    return scoped
+
+
+def aggregate_coupons(qs) -> CouponAggregate:
+    """All coupon summary metrics for ``qs`` in a single SQL round trip.
+
+    Querysets using ``distinct()`` (e.g. joined through bets) are aggregated
+    over a subquery by Django, so coupons are not double counted.
+    """
+    return CouponAggregate.from_row(qs.aggregate(**COUPON_AGGREGATES))
+
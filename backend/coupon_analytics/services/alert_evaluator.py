@@ -0,0 +1,95 @@
+import logging
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from coupon_analytics.models import AlertDirtyUser
+
+from .alert_service import AlertEvaluationReport, evaluate_alert_rules_for_user
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class AlertEvaluator:
+    """Coalesces settlement-triggered alert evaluation per user.
+
+    Settlements only upsert an AlertDirtyUser row; ``run_once`` evaluates each
+    marked user a single time after ALERT_EVALUATION_DEBOUNCE seconds without
+    new marks, or at the latest ALERT_EVALUATION_MAX_DELAY seconds after the
+    first one.
+    """
+
+    def __init__(self, debounce: Optional[float] = None, max_delay: Optional[float] = None):
+        self.debounce = debounce if debounce is not None else getattr(settings, 'ALERT_EVALUATION_DEBOUNCE', 10)
+        self.max_delay = max_delay if max_delay is not None else getattr(settings, 'ALERT_EVALUATION_MAX_DELAY', 60)
+
+    def mark(self, user) -> None:
+        if self.debounce <= 0:
+            evaluate_alert_rules_for_user(user)
+            return
+        now = timezone.now()
+        AlertDirtyUser.objects.bulk_create(
+            [AlertDirtyUser(user_id=user.pk, dirty_since=now, marked_at=now)],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['marked_at'],
+        )
+
+    def due(self, limit: int = 100) -> List[int]:
+        now = timezone.now()
+        due = Q(marked_at__lte=now - timedelta(seconds=self.debounce)) | Q(
+            dirty_since__lte=now - timedelta(seconds=self.max_delay)
+        )
+        return list(
+            AlertDirtyUser.objects.filter(due)
+            .order_by('dirty_since')
+            .values_list('user_id', flat=True)[:limit]
+        )
+
+    def evaluate(self, user) -> Optional[AlertEvaluationReport]:
+        """Evaluate one marked user and delete the marker in the same transaction.
+
+        The marker stays locked (other workers skip it) until the evaluation
+        commits, so a process killed mid-evaluation leaves it for the next run.
+        Returns None when another worker has the user or evaluation failed.
+        """
+        try:
+            with transaction.atomic():
+                marker = AlertDirtyUser.objects.select_for_update(skip_locked=True).filter(user_id=user.pk).first()
+                if marker is None:
+                    return None
+                report = evaluate_alert_rules_for_user(user)
+                marker.delete()
+            return report
+        except Exception as e:
+            logger.error(f"[ALERT_EVAL] Evaluation failed for user {user.id}: {e}", exc_info=True)
+            # Kept for a retry after the debounce, not on every run
+            now = timezone.now()
+            AlertDirtyUser.objects.filter(user_id=user.pk).update(dirty_since=now, marked_at=now)
+            return None
+
+    def run_once(self, limit: int = 100) -> int:
+        evaluated = queries = 0
+        for user in User.objects.filter(id__in=self.due(limit)):
+            report = self.evaluate(user)
+            if report is not None:
+                evaluated += 1
+                queries += report.queries
+        if evaluated:
+            logger.info(f"[ALERT_EVAL] Evaluated alert rules for {evaluated} user(s) in {queries} queries")
+        return evaluated
+
+
+def mark_user_alerts_dirty(user) -> None:
+    AlertEvaluator().mark(user)
+
+
+def evaluate_dirty_alert_users(limit: int = 100) -> int:
+    return AlertEvaluator().run_once(limit)
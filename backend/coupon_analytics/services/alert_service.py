@@ -1,13 +1,17 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime, time, timedelta
+from django.db import connection
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
 from coupon_analytics.services.analytics_service import get_coupon_analytics_summary
+from coupon_analytics.services.streak_service import get_current_loss_streak
 from coupon_analytics.models import AlertRule, AlertEvent
-from coupons.models.coupon import Coupon
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 _COMPARATORS = {
@@ -28,29 +32,25 @@ def _dec_or_none(val) -> Decimal | None:
         return None
 
 
-def _compute_metric_value(rule: AlertRule, *, user: User, start: datetime, end: datetime) -> Decimal | None:
+# Metryki liczone z jednego podsumowania okna (ROI, yield, zrealizowany zysk)
+_SUMMARY_METRICS = {'yield', 'roi', 'loss'}
+
+
+def _compute_metric_value(
+    rule: AlertRule, *, user: User, start: datetime, end: datetime, summary: dict | None = None
+) -> Decimal | None:
     metric = (rule.metric or '').lower()
 
-    if metric in {'yield', 'roi'}:
+    if metric in _SUMMARY_METRICS and summary is None:
         summary = get_coupon_analytics_summary(user, date_from=start, date_to=end)
+
+    if metric in {'yield', 'roi'}:
         key = 'yield' if metric == 'yield' else 'roi'
         return _dec_or_none(summary.get(key))
 
     if metric == 'loss':
-        agg = Coupon.objects.filter(
-            user=user,
-            created_at__gte=start,
-            created_at__lte=end,
-            status__in=[Coupon.CouponStatus.LOST, Coupon.CouponStatus.WON]
-        ).aggregate(total_balance=Sum('balance'))
-
-        total_balance = agg['total_balance']
-        if total_balance is None:
-            return Decimal('0.00')
-
-        try:
-            d = Decimal(str(total_balance))
-        except Exception:
+        d = _dec_or_none(summary.get('realized_profit'))
+        if d is None:
             return None
 
         if d < 0:
@@ -59,16 +59,7 @@ def _compute_metric_value(rule: AlertRule, *, user: User, start: datetime, end:
             return Decimal('0.00')
 
     if metric == 'streak_loss':
-        qs = Coupon.objects.filter(user=user).order_by('-created_at').values_list('status', flat=True)
-        streak = 0
-        for st in qs:
-            if st == Coupon.CouponStatus.CANCELED:
-                continue
-            if st == Coupon.CouponStatus.LOST:
-                streak += 1
-                continue
-            break
-        return Decimal(streak)
+        return Decimal(get_current_loss_streak(user))
 
     return None
 
@@ -99,54 +90,124 @@ def _get_calendar_period(now: datetime, window_days: int) -> tuple[datetime, dat
     return start_dt, end_dt
 
 
-def evaluate_alert_rules_for_user(user: User) -> None:
-    now = timezone.now()
-    rules = AlertRule.objects.filter(user=user, is_active=True).exclude(metric='streak_loss')
-    for rule in rules:
-        window_days = rule.window_days or 30
-        start_dt, end_dt = _get_calendar_period(now, window_days)
+@dataclass
+class AlertEvaluationReport:
+    rules: int = 0
+    windows: int = 0
+    created: int = 0
+    deleted: int = 0
+    queries: int = 0
 
-        metric = (rule.metric or '').lower()
 
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _metric_family(metric: str) -> str:
+    return 'summary' if metric in _SUMMARY_METRICS else metric
+
+
+def _plan_rules(rules, now: datetime) -> dict:
+    """Group rules by (metric family, window) so each distinct window is computed once."""
+    plan: dict = defaultdict(list)
+    for rule in rules:
+        metric = (rule.metric or '').lower()
         if metric == 'streak_loss':
             continue
+        start_dt, end_dt = _get_calendar_period(now, rule.window_days or 30)
+        plan[(_metric_family(metric), start_dt, end_dt)].append(rule)
+    return plan
 
-        value = _compute_metric_value(rule, user=user, start=start_dt, end=end_dt)
-        comp = _COMPARATORS.get(rule.comparator)
 
-        if comp is None or value is None:
-            continue
-        threshold = _dec_or_none(rule.threshold_value)
-
-        condition_met = comp(value, threshold)
-        existing_alert = AlertEvent.objects.filter(rule=rule, window_start=start_dt, window_end=end_dt).first()
-
-        if condition_met:
-            if existing_alert:
-                if metric == 'loss':
-                    existing_alert.delete()
-                else:
-                    if Decimal(str(existing_alert.metric_value or 0)) != value:
-                        existing_alert.delete()
-                    else:
+def evaluate_alert_rules_for_user(user: User) -> AlertEvaluationReport:
+    report = AlertEvaluationReport()
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        _evaluate_planned(user, report)
+    report.queries = counter.count
+    logger.debug(
+        f"[ALERT_EVAL] User {user.pk}: {report.rules} rule(s), {report.windows} window(s), "
+        f"+{report.created}/-{report.deleted} event(s), {report.queries} queries"
+    )
+    return report
+
+
+def _evaluate_planned(user: User, report: AlertEvaluationReport) -> None:
+    now = timezone.now()
+    rules = AlertRule.objects.filter(user=user, is_active=True).exclude(metric='streak_loss')
+    plan = _plan_rules(rules, now)
+    if not plan:
+        return
+
+    # Lists: duplicates of one (rule, window) must all be replaced, not only the last one seen
+    existing = defaultdict(list)
+    for ev in AlertEvent.objects.filter(
+        rule_id__in=[rule.id for group in plan.values() for rule in group],
+        window_start__in={start for _, start, _ in plan},
+        window_end__in={end for _, _, end in plan},
+    ):
+        existing[(ev.rule_id, ev.window_start, ev.window_end)].append(ev)
+
+    to_delete = []
+    to_create = []
+    for (family, start_dt, end_dt), group in plan.items():
+        summary = None
+        if family == 'summary':
+            summary = get_coupon_analytics_summary(user, date_from=start_dt, date_to=end_dt)
+        report.windows += 1
+
+        for rule in group:
+            report.rules += 1
+            metric = (rule.metric or '').lower()
+            value = _compute_metric_value(rule, user=user, start=start_dt, end=end_dt, summary=summary)
+            comp = _COMPARATORS.get(rule.comparator)
+
+            if comp is None or value is None:
+                continue
+            threshold = _dec_or_none(rule.threshold_value)
+
+            condition_met = comp(value, threshold)
+            existing_alerts = existing.get((rule.id, start_dt, end_dt), [])
+
+            if condition_met:
+                if metric != 'loss':
+                    kept = next(
+                        (ev for ev in existing_alerts if Decimal(str(ev.metric_value or 0)) == value), None
+                    )
+                    if kept is not None:
+                        to_delete.extend(ev.pk for ev in existing_alerts if ev is not kept)
                         continue
+                to_delete.extend(ev.pk for ev in existing_alerts)
+
+                rendered = _render_message(rule, metric_value=value, start=start_dt, end=end_dt)
+                to_create.append(AlertEvent(
+                    rule=rule,
+                    user=user,
+                    metric=rule.metric,
+                    comparator=rule.comparator,
+                    threshold_value=rule.threshold_value,
+                    metric_value=value,
+                    window_start=start_dt,
+                    window_end=end_dt,
+                    message_rendered=rendered,
+                    sent_at=None,
+                ))
+            else:
+                to_delete.extend(ev.pk for ev in existing_alerts)
+
+    if to_delete:
+        AlertEvent.objects.filter(pk__in=to_delete).delete()
+        report.deleted = len(to_delete)
+    if to_create:
+        AlertEvent.objects.bulk_create(to_create)
+        report.created = len(to_create)
 
-            rendered = _render_message(rule, metric_value=value, start=start_dt, end=end_dt)
-            AlertEvent.objects.create(
-                rule=rule,
-                user=user,
-                metric=rule.metric,
-                comparator=rule.comparator,
-                threshold_value=rule.threshold_value,
-                metric_value=value,
-                window_start=start_dt,
-                window_end=end_dt,
-                message_rendered=rendered,
-                sent_at=None,
-            )
-        else:
-            if existing_alert:
-                existing_alert.delete()
 
 def notify_yield_alerts_on_coupon_settle(user: User) -> None:
-    evaluate_alert_rules_for_user(user)
+    from coupon_analytics.services.alert_evaluator import mark_user_alerts_dirty
+    mark_user_alerts_dirty(user)
@@ -1,10 +1,12 @@
 from dataclasses import dataclass, asdict
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional, Dict, Any
-from django.db.models import Sum, Q, Avg
+from django.conf import settings
 
 from coupons.models import Coupon
 
+from .aggregate_engine import CouponAggregate, aggregate_coupons
+
 
 @dataclass
 class CouponAnalyticsResult:
@@ -51,48 +53,39 @@ def _percent(numerator: Decimal, denominator: Decimal) -> Optional[Decimal]:
 class AnalyticsService:
 
     def _summary_from_queryset(self, qs) -> CouponAnalyticsResult:
-        total_coupons = qs.count()
-        finished_filter = Q(status=Coupon.CouponStatus.WON) | Q(status=Coupon.CouponStatus.LOST) | Q(status=Coupon.CouponStatus.CANCELED)
-        result_filter = Q(status=Coupon.CouponStatus.WON) | Q(status=Coupon.CouponStatus.LOST)
-
-        finished_coupons = qs.filter(finished_filter).count()
-        in_progress_coupons = qs.filter(status=Coupon.CouponStatus.IN_PROGRESS).count()
-        won_coupons = qs.filter(status=Coupon.CouponStatus.WON).count()
-        lost_coupons = qs.filter(status=Coupon.CouponStatus.LOST).count()
-        canceled_coupons = qs.filter(status=Coupon.CouponStatus.CANCELED).count()
-
-        stake_agg = qs.filter(result_filter).aggregate(total_stake=Sum('bet_stake'))
-        total_stake = stake_agg['total_stake'] or Decimal('0.00')
+        return self._summary_from_aggregate(aggregate_coupons(qs))
 
-        profit_agg = qs.filter(result_filter).aggregate(realized_profit=Sum('balance'))
-        realized_profit = profit_agg['realized_profit'] or Decimal('0.00')
-
-        avg_agg = qs.aggregate(
-            avg_stake=Avg('bet_stake'),
-            avg_multiplier=Avg('multiplier'),
-        )
+    def _summary_from_aggregate(self, agg: CouponAggregate) -> CouponAnalyticsResult:
+        total_stake = agg.settled_stake
+        realized_profit = agg.settled_balance
+        won_coupons = agg.won_count
+        lost_coupons = agg.lost_count
 
         roi = (realized_profit / total_stake) if total_stake else None
         yield_percent = (roi * Decimal('100')) if roi is not None else None
         win_rate = (Decimal(won_coupons) / Decimal(won_coupons + lost_coupons)).quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP) if (won_coupons + lost_coupons) > 0 else None
 
         return CouponAnalyticsResult(
-            total_coupons=total_coupons,
-            finished_coupons=finished_coupons,
-            in_progress_coupons=in_progress_coupons,
+            total_coupons=agg.total_count,
+            finished_coupons=agg.finished_count,
+            in_progress_coupons=agg.in_progress_count,
             won_coupons=won_coupons,
             lost_coupons=lost_coupons,
-            canceled_coupons=canceled_coupons,
-            total_stake=Decimal(total_stake),
-            realized_profit=Decimal(realized_profit),
-            roi=roi if roi is not None else None,
-            yield_=yield_percent if yield_percent is not None else None,
-            win_rate=win_rate if win_rate is not None else None,
-            avg_stake=Decimal(avg_agg['avg_stake']) if avg_agg['avg_stake'] is not None else None,
-            avg_multiplier=Decimal(avg_agg['avg_multiplier']) if avg_agg['avg_multiplier'] is not None else None,
+            canceled_coupons=agg.canceled_count,
+            total_stake=total_stake,
+            realized_profit=realized_profit,
+            roi=roi,
+            yield_=yield_percent,
+            win_rate=win_rate,
+            avg_stake=agg.avg_stake,
+            avg_multiplier=agg.avg_multiplier,
         )
 
     def coupon_summary(self, *, user, date_from=None, date_to=None) -> CouponAnalyticsResult:
+        if date_from is None and date_to is None and getattr(settings, 'ANALYTICS_ROLLUP_ENABLED', True):
+            from .rollup_service import get_rollup_summary
+            return self._summary_from_aggregate(get_rollup_summary(user))
+
         qs = Coupon.objects.filter(user=user)
         if date_from:
             qs = qs.filter(created_at__gte=date_from)
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from coupon_analytics.models.queries import (
+    AnalyticsQuery,
+    AnalyticsQueryCondition,
+    AnalyticsQueryGroup,
+)
+from coupon_analytics.services.query_compiler import (
+    apply_compiled,
+    combine_nodes,
+    compiled_form,
+    condition_node,
+)
+
+
+@dataclass
+class FilterCondition:
+    field: str
+    operator: str = "equals"
+    value: Any = None
+    negate: bool = False
+
+
+@dataclass
+class FilterGroup:
+    operator: str = "AND"
+    conditions: List[FilterCondition] = field(default_factory=list)
+    subgroups: List["FilterGroup"] = field(default_factory=list)
+
+    def add(self, field: str, operator: str = "equals", value: Any = None, negate: bool = False) -> "FilterGroup":
+        self.conditions.append(FilterCondition(field=field, operator=operator, value=value, negate=negate))
+        return self
+
+    def to_node(self) -> Optional[Dict[str, Any]]:
+        parts = [condition_node(c.field, c.operator, c.value, c.negate) for c in self.conditions]
+        parts.extend(subgroup.to_node() for subgroup in self.subgroups)
+        return combine_nodes(self.operator.upper(), parts)
+
+
+@dataclass
+class FilterSpec:
+    """In-memory counterpart of ``AnalyticsQuery``.
+
+    Filter and preview requests run a spec directly; rows are only written
+    when the user saves the filter (``save()``).
+    """
+
+    user_id: int
+    name: str = "Unnamed Filter"
+    start_date: Optional[Union[date, str]] = None
+    end_date: Optional[Union[date, str]] = None
+    bookmaker_id: Optional[int] = None
+    statuses: List[str] = field(default_factory=list)
+    coupon_type: Optional[str] = None
+    sort_by: List[str] = field(default_factory=list)
+    groups: List[FilterGroup] = field(default_factory=list)
+
+    def compile(self) -> Dict[str, Any]:
+        return compiled_form(combine_nodes("AND", [group.to_node() for group in self.groups]), self)
+
+    def apply(self) -> QuerySet:
+        return apply_compiled(self.compile())
+
+    @transaction.atomic
+    def save(self) -> AnalyticsQuery:
+        """Persist the spec as an AnalyticsQuery: one INSERT for the query, one
+        per tree level for groups and one for all conditions."""
+        query = AnalyticsQuery.objects.create(
+            user_id=self.user_id,
+            name=self.name,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            bookmaker_id=self.bookmaker_id,
+            statuses=list(self.statuses),
+            coupon_type=self.coupon_type,
+            sort_by=list(self.sort_by),
+        )
+
+        conditions: List[AnalyticsQueryCondition] = []
+        level = [(None, order, group) for order, group in enumerate(self.groups)]
+        while level:
+            rows = AnalyticsQueryGroup.objects.bulk_create([
+                AnalyticsQueryGroup(analytics_query=query, operator=group.operator.upper(), parent=parent, order=order)
+                for parent, order, group in level
+            ])
+            next_level = []
+            for row, (_, _, group) in zip(rows, level):
+                conditions.extend(
+                    AnalyticsQueryCondition(
+                        group=row, field=c.field, operator=c.operator, value=c.value, negate=c.negate, order=order,
+                    )
+                    for order, c in enumerate(group.conditions)
+                )
+                next_level.extend((row, order, subgroup) for order, subgroup in enumerate(group.subgroups))
+            level = next_level
+
+        if conditions:
+            AnalyticsQueryCondition.objects.bulk_create(conditions)
+        return query
+
+
+def orphaned_auto_generated_queries(older_than: timedelta = timedelta(days=1)) -> QuerySet:
+    """Auto-generated queries that no alert rule or report points at."""
+    return AnalyticsQuery.objects.filter(
+        auto_generated=True,
+        created_at__lt=timezone.now() - older_than,
+        alert_rules__isnull=True,
+        reports__isnull=True,
+    )
+
+
+def purge_auto_generated_queries(older_than: timedelta = timedelta(days=1), batch_size: int = 1000) -> int:
+    """Delete orphaned auto-generated queries (with their groups and
+    conditions) in batches; returns the number of queries removed."""
+    purged = 0
+    while True:
+        ids = list(orphaned_auto_generated_queries(older_than).order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return purged
+        AnalyticsQuery.objects.filter(id__in=ids).delete()
+        purged += len(ids)
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from django.db.models import Sum
+
+from coupon_analytics.models import CouponDailyPnL, CouponStatsRollup
+
+PERIODS = ('day', 'week', 'month', 'quarter', 'year')
+
+_QUANT = Decimal('0.01')
+
+
+class PnLSeriesError(ValueError):
+    pass
+
+
+def period_start(day: date, period: str) -> date:
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    if period == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    if period == 'year':
+        return day.replace(month=1, day=1)
+    raise PnLSeriesError(f"Unknown period '{period}', expected one of: {', '.join(PERIODS)}")
+
+
+def next_period(start: date, period: str) -> date:
+    if period == 'day':
+        return start + timedelta(days=1)
+    if period == 'week':
+        return start + timedelta(days=7)
+    months = {'month': 1, 'quarter': 3, 'year': 12}.get(period)
+    if months is None:
+        raise PnLSeriesError(f"Unknown period '{period}', expected one of: {', '.join(PERIODS)}")
+    month_index = start.year * 12 + start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class PnLSeriesService:
+    """Balance trends from the per-day P/L rows.
+
+    The opening balance is the user's settled total (from the stats rollup)
+    minus everything from the start of the range on, so only the days inside
+    and after the range are read.
+    """
+
+    def series(self, *, user, date_from: date, date_to: date, period: str = 'day') -> List[Dict[str, Any]]:
+        start = period_start(date_from, period)
+        if date_to < start:
+            return []
+
+        settled_total = CouponStatsRollup.objects.filter(user=user).aggregate(
+            total=Sum('settled_balance')
+        )['total'] or Decimal('0.00')
+
+        profit_by_period: Dict[date, Decimal] = defaultdict(lambda: Decimal('0.00'))
+        count_by_period: Dict[date, int] = defaultdict(int)
+        since_start = Decimal('0.00')
+        rows = CouponDailyPnL.objects.filter(user=user, day__gte=start).values_list('day', 'profit', 'settled_count')
+        for day, profit, settled_count in rows:
+            key = period_start(day, period)
+            profit_by_period[key] += profit
+            count_by_period[key] += settled_count
+            since_start += profit
+
+        running_balance = Decimal(settled_total) - since_start
+        points: List[Dict[str, Any]] = []
+        current = start
+        while current <= date_to:
+            profit = profit_by_period.get(current, Decimal('0.00'))
+            running_balance = (running_balance + profit).quantize(_QUANT)
+            points.append({
+                'date': current.isoformat(),
+                'balance': running_balance,
+                'profit': profit,
+                'coupon_count': count_by_period.get(current, 0),
+            })
+            current = next_period(current, period)
+        return points
+
+
+_service = PnLSeriesService()
+
+
+def get_pnl_series(user, *, date_from: date, date_to: date, period: str = 'day') -> List[Dict[str, Any]]:
+    return _service.series(user=user, date_from=date_from, date_to=date_to, period=period)
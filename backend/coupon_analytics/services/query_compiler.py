@@ -0,0 +1,193 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
+
+from coupons.models import Coupon
+from coupon_analytics.models.queries import (
+    AnalyticsQuery,
+    AnalyticsQueryCondition,
+    AnalyticsQueryGroup,
+)
+
+# Podbić przy zmianie formatu skompilowanego predykatu (unieważnia cache)
+COMPILER_VERSION = 1
+
+OPERATOR_LOOKUP = {
+    "equals": "exact",
+    "not_equals": "exact",
+    "contains": "icontains",
+    "not_contains": "icontains",
+    "gt": "gt",
+    "gte": "gte",
+    "lt": "lt",
+    "lte": "lte",
+    "in": "in",
+    "not_in": "in",
+}
+NEGATED_OPERATORS = {"not_equals", "not_contains", "not_in"}
+
+COUPON_TYPE_MAPPING = {
+    "1": "home_win",
+    "2": "away_win",
+    "x": "draw",
+    "1x": ["home_win", "draw"],
+    "x2": ["draw", "away_win"],
+}
+
+
+def normalize_coupon_type(value: Any) -> Any:
+    if isinstance(value, list):
+        normalized_values = []
+        for item in value:
+            mapped = COUPON_TYPE_MAPPING.get(str(item), item)
+            if isinstance(mapped, list):
+                normalized_values.extend(mapped)
+            else:
+                normalized_values.append(mapped)
+        return list(set(normalized_values))
+    return COUPON_TYPE_MAPPING.get(str(value), value)
+
+
+def condition_node(field: str, operator: str, value: Any, negate: bool = False) -> Dict[str, Any]:
+    """Leaf of the compiled predicate: one lookup, optionally negated."""
+    field = field.replace(".", "__")
+    lookup = OPERATOR_LOOKUP.get(operator, "exact")
+    values = value if isinstance(value, list) else [value]
+
+    if "coupon_type" in field:
+        values = [normalize_coupon_type(v) for v in values]
+        values = [item for v in values for item in (v if isinstance(v, list) else [v])]
+
+    return {
+        "field": field,
+        "lookup": lookup,
+        "value": values if lookup == "in" else (values[0] if values else None),
+        "negate": (operator in NEGATED_OPERATORS) != bool(negate),
+    }
+
+
+def combine_nodes(operator: str, children: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    children = [child for child in children if child is not None]
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return {operator.lower(): children}
+
+
+def to_q(node: Optional[Dict[str, Any]]) -> Q:
+    if node is None:
+        return Q()
+    for operator in ("and", "or"):
+        if operator in node:
+            combined = Q()
+            for child in node[operator]:
+                combined = (combined & to_q(child)) if operator == "and" else (combined | to_q(child))
+            return combined
+    query_object = Q(**{f"{node['field']}__{node['lookup']}": node["value"]})
+    return ~query_object if node["negate"] else query_object
+
+
+def _iso(value) -> Optional[str]:
+    if not value:
+        return None
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def compile_analytics_query(query: AnalyticsQuery) -> Dict[str, Any]:
+    """Compile a saved query (groups + conditions) into a JSON-serialisable
+    predicate. The whole tree is read in two queries."""
+    groups = list(
+        AnalyticsQueryGroup.objects.filter(analytics_query=query)
+        .order_by("order", "id")
+        .values("id", "parent_id", "operator")
+    )
+    conditions_by_group: Dict[int, List[AnalyticsQueryCondition]] = defaultdict(list)
+    for condition in AnalyticsQueryCondition.objects.filter(group__analytics_query=query).order_by("order", "id"):
+        conditions_by_group[condition.group_id].append(condition)
+
+    children_by_parent: Dict[Optional[int], List[Dict[str, Any]]] = defaultdict(list)
+    for group in groups:
+        children_by_parent[group["parent_id"]].append(group)
+
+    def group_node(group: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        parts = [
+            condition_node(c.field, c.operator, c.value, c.negate)
+            for c in conditions_by_group.get(group["id"], [])
+        ]
+        parts.extend(group_node(subgroup) for subgroup in children_by_parent.get(group["id"], []))
+        return combine_nodes(group["operator"].upper(), parts)
+
+    return compiled_form(
+        combine_nodes("AND", [group_node(root) for root in children_by_parent.get(None, [])]),
+        query,
+    )
+
+
+def compiled_form(where: Optional[Dict[str, Any]], source) -> Dict[str, Any]:
+    """Wrap a predicate with the top-level filters of ``source`` (a saved
+    ``AnalyticsQuery`` or an in-memory ``FilterSpec``)."""
+    coupon_type = normalize_coupon_type(source.coupon_type) if source.coupon_type else None
+    return {
+        "version": COMPILER_VERSION,
+        "where": where,
+        "filters": {
+            "user_id": source.user_id,
+            "start_date": _iso(source.start_date),
+            "end_date": _iso(source.end_date),
+            "bookmaker_id": source.bookmaker_id,
+            "statuses": list(source.statuses or []),
+            "coupon_types": coupon_type if isinstance(coupon_type, list) else ([coupon_type] if coupon_type else []),
+        },
+        "sort_by": list(source.sort_by or []),
+    }
+
+
+def _cache_key(query: AnalyticsQuery) -> str:
+    stamp = query.updated_at.isoformat() if query.updated_at else "none"
+    return f"analytics_query:compiled:v{COMPILER_VERSION}:{query.pk}:{stamp}"
+
+
+def get_compiled_query(query: AnalyticsQuery) -> Dict[str, Any]:
+    """Compiled form of a saved query, cached by ``updated_at``.
+
+    Groups and conditions are written together with their query; code that
+    changes them afterwards must save the query so ``updated_at`` moves on.
+    """
+    if query.pk is None:
+        return compile_analytics_query(query)
+    key = _cache_key(query)
+    compiled = cache.get(key)
+    if compiled is None:
+        compiled = compile_analytics_query(query)
+        cache.set(key, compiled, getattr(settings, 'ANALYTICS_QUERY_CACHE_TIMEOUT', 3600))
+    return compiled
+
+
+def apply_compiled(compiled: Dict[str, Any]) -> QuerySet:
+    """Coupons matching a compiled predicate."""
+    filters = compiled["filters"]
+    queryset = Coupon.objects.filter(to_q(compiled["where"])).distinct()
+
+    if filters.get("user_id") is not None:
+        queryset = queryset.filter(user_id=filters["user_id"])
+    if filters.get("start_date"):
+        queryset = queryset.filter(created_at__date__gte=filters["start_date"])
+    if filters.get("end_date"):
+        queryset = queryset.filter(created_at__date__lte=filters["end_date"])
+    if filters.get("bookmaker_id"):
+        queryset = queryset.filter(bookmaker_account__bookmaker_id=filters["bookmaker_id"])
+    if filters.get("statuses"):
+        queryset = queryset.filter(status__in=filters["statuses"])
+    coupon_types = filters.get("coupon_types") or []
+    if len(coupon_types) == 1:
+        queryset = queryset.filter(coupon_type=coupon_types[0])
+    elif coupon_types:
+        queryset = queryset.filter(coupon_type__in=coupon_types)
+
+    if compiled.get("sort_by"):
+        queryset = queryset.order_by(*compiled["sort_by"])
+    return queryset
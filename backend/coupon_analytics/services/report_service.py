@@ -5,11 +5,11 @@ import logging
 import os
 import requests
 from datetime import datetime, timedelta
-from decimal import Decimal
 from django.conf import settings
 from django.utils import timezone
 from coupon_analytics.models import Report
 from coupons.models import Coupon
+from coupon_analytics.services.aggregate_engine import aggregate_coupons
 
 logger = logging.getLogger(__name__)
 
@@ -42,19 +42,14 @@ def get_coupon_stats_for_period(user, start_date, end_date, query=None):
         if 'coupon_type' in filters:
             coupons = coupons.filter(coupon_type=filters['coupon_type'])
 
-    total_coupons = coupons.count()
-    won_coupons = coupons.filter(status='won').count()
-    lost_coupons = coupons.filter(status='lost').count()
-    in_progress = coupons.filter(status='in_progress').count()
+    agg = aggregate_coupons(coupons)
+    total_coupons = agg.total_count
+    won_coupons = agg.won_count
+    lost_coupons = agg.lost_count
+    in_progress = agg.in_progress_count
 
-    total_stake = sum(
-        c.bet_stake for c in coupons if c.bet_stake
-    ) or Decimal('0')
-
-    total_payout = sum(
-        c.balance for c in coupons
-        if c.balance is not None and c.status == 'won'
-    ) or Decimal('0')
+    total_stake = agg.total_stake
+    total_payout = agg.won_balance
 
     profit = total_payout - total_stake
 
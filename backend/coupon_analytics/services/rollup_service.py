@@ -0,0 +1,364 @@
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from coupons.models import Coupon
+from coupon_analytics.models import CouponDailyPnL, CouponStatsRollup
+
+from .aggregate_engine import CouponAggregate
+from .streak_service import apply_streak_changes
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ('coupons_count', 'in_progress_count', 'won_count', 'lost_count', 'canceled_count')
+AMOUNT_FIELDS = ('total_stake', 'settled_stake', 'total_balance', 'settled_balance', 'won_balance', 'multiplier_sum')
+ROLLUP_FIELDS = COUNTER_FIELDS + AMOUNT_FIELDS
+DAILY_FIELDS = ('profit', 'settled_count')
+
+_STATUS_COUNTER = {
+    Coupon.CouponStatus.IN_PROGRESS: 'in_progress_count',
+    Coupon.CouponStatus.WON: 'won_count',
+    Coupon.CouponStatus.LOST: 'lost_count',
+    Coupon.CouponStatus.CANCELED: 'canceled_count',
+}
+_SETTLED = {Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST}
+
+Bucket = Tuple[int, Optional[int], Optional[int]]
+DayBucket = Tuple[int, date]
+Change = Tuple[Optional["CouponSnapshot"], Optional["CouponSnapshot"]]
+
+
+def _local_day(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    if isinstance(value, date):
+        return value
+    return None
+
+
+@dataclass(frozen=True)
+class CouponSnapshot:
+    """The fields of a coupon that feed the rollup, captured at one point in time."""
+    user_id: int
+    bookmaker_account_id: Optional[int]
+    strategy_id: Optional[int]
+    status: str
+    bet_stake: Decimal
+    balance: Decimal
+    multiplier: Decimal
+    day: Optional[date] = None
+    created_at: Optional[datetime] = None
+    coupon_id: Optional[int] = None
+
+    @classmethod
+    def of(cls, coupon: Coupon) -> "CouponSnapshot":
+        return cls(
+            user_id=coupon.user_id,
+            bookmaker_account_id=coupon.bookmaker_account_id,
+            strategy_id=coupon.strategy_id,
+            status=coupon.status,
+            bet_stake=Decimal(str(coupon.bet_stake or 0)),
+            balance=Decimal(str(coupon.balance or 0)),
+            multiplier=Decimal(str(coupon.multiplier or 0)),
+            day=_local_day(coupon.created_at),
+            created_at=coupon.created_at if isinstance(coupon.created_at, datetime) else None,
+            coupon_id=coupon.pk,
+        )
+
+    @property
+    def bucket(self) -> Bucket:
+        return self.user_id, self.bookmaker_account_id, self.strategy_id
+
+    def contribution(self) -> Dict[str, Decimal]:
+        settled = self.status in _SETTLED
+        values = {
+            'coupons_count': 1,
+            'total_stake': self.bet_stake,
+            'settled_stake': self.bet_stake if settled else Decimal('0'),
+            'total_balance': self.balance,
+            'settled_balance': self.balance if settled else Decimal('0'),
+            'won_balance': self.balance if self.status == Coupon.CouponStatus.WON else Decimal('0'),
+            'multiplier_sum': self.multiplier,
+        }
+        counter = _STATUS_COUNTER.get(self.status)
+        if counter:
+            values[counter] = 1
+        return values
+
+    def pnl_contribution(self) -> Dict[str, Decimal]:
+        if self.status not in _SETTLED or self.day is None:
+            return {}
+        return {'profit': self.balance, 'settled_count': 1}
+
+
+class RollupService:
+
+    @staticmethod
+    def _diff(changes: Iterable[Change], key=lambda s: s.bucket, contribution=CouponSnapshot.contribution) -> Dict:
+        deltas: Dict = {}
+        for before, after in changes:
+            for snapshot, sign in ((before, -1), (after, 1)):
+                if snapshot is None:
+                    continue
+                values = contribution(snapshot)
+                if not values:
+                    continue
+                bucket = deltas.setdefault(key(snapshot), {})
+                for field, value in values.items():
+                    bucket[field] = bucket.get(field, 0) + sign * value
+        return {
+            key: {f: v for f, v in delta.items() if v}
+            for key, delta in deltas.items()
+            if any(delta.values())
+        }
+
+    @classmethod
+    def _diff_daily(cls, changes: Iterable[Change]) -> Dict[DayBucket, Dict[str, Decimal]]:
+        return cls._diff(changes, key=lambda s: (s.user_id, s.day), contribution=CouponSnapshot.pnl_contribution)
+
+    @staticmethod
+    def _upsert(model, lookup: Dict, delta: Dict[str, Decimal]) -> None:
+        rows = model.objects.filter(**lookup)
+        update = {field: F(field) + value for field, value in delta.items()}
+        update['updated_at'] = timezone.now()
+        if rows.update(**update):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **delta)
+        except IntegrityError:
+            # Utworzony równolegle przez inną transakcję
+            rows.update(**update)
+
+    def _apply_bucket(self, bucket: Bucket, delta: Dict[str, Decimal]) -> None:
+        user_id, account_id, strategy_id = bucket
+        self._upsert(
+            CouponStatsRollup,
+            {'user_id': user_id, 'bookmaker_account_id': account_id, 'strategy_id': strategy_id},
+            delta,
+        )
+
+    def _apply_day(self, bucket: DayBucket, delta: Dict[str, Decimal]) -> None:
+        user_id, day = bucket
+        self._upsert(CouponDailyPnL, {'user_id': user_id, 'day': day}, delta)
+
+    def apply(self, changes: Iterable[Change]) -> None:
+        changes = list(changes)
+        for bucket, delta in sorted(self._diff(changes).items(), key=lambda item: tuple(v or 0 for v in item[0])):
+            self._apply_bucket(bucket, delta)
+        for bucket, delta in sorted(self._diff_daily(changes).items()):
+            self._apply_day(bucket, delta)
+        apply_streak_changes(changes)
+
+    @contextmanager
+    def track(self, coupon: Coupon):
+        """Apply the rollup delta between the coupon's state on entry and on exit."""
+        before = CouponSnapshot.of(coupon)
+        yield
+        if coupon.pk is None:
+            self.apply([(before, None)])
+        else:
+            self.apply([(before, CouponSnapshot.of(coupon))])
+
+    def summary(self, *, user, bookmaker_account_id: Optional[int] = None, strategy_id: Optional[int] = None) -> CouponAggregate:
+        qs = CouponStatsRollup.objects.filter(user=user)
+        if bookmaker_account_id is not None:
+            qs = qs.filter(bookmaker_account_id=bookmaker_account_id)
+        if strategy_id is not None:
+            qs = qs.filter(strategy_id=strategy_id)
+        row = qs.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+        return self._to_aggregate(row)
+
+    def summary_by(self, *, user, field: str) -> Dict[Optional[int], CouponAggregate]:
+        rows = (
+            CouponStatsRollup.objects.filter(user=user)
+            .order_by()
+            .values(field)
+            .annotate(**{f: Sum(f) for f in ROLLUP_FIELDS})
+        )
+        return {row[field]: self._to_aggregate(row) for row in rows}
+
+    @staticmethod
+    def _to_aggregate(row) -> CouponAggregate:
+        count = row.get('coupons_count') or 0
+        total_stake = Decimal(row.get('total_stake') or 0)
+        multiplier_sum = Decimal(row.get('multiplier_sum') or 0)
+        return CouponAggregate.from_row({
+            'total_count': count,
+            'finished_count': (row.get('won_count') or 0) + (row.get('lost_count') or 0) + (row.get('canceled_count') or 0),
+            'in_progress_count': row.get('in_progress_count'),
+            'won_count': row.get('won_count'),
+            'lost_count': row.get('lost_count'),
+            'canceled_count': row.get('canceled_count'),
+            'total_stake': total_stake,
+            'settled_stake': row.get('settled_stake'),
+            'total_balance': row.get('total_balance'),
+            'settled_balance': row.get('settled_balance'),
+            'won_balance': row.get('won_balance'),
+            'avg_stake': (total_stake / count) if count else None,
+            'avg_multiplier': (multiplier_sum / count) if count else None,
+        })
+
+    @staticmethod
+    def compute_from_coupons(user_ids: Optional[List[int]] = None) -> Dict[Bucket, Dict[str, Decimal]]:
+        qs = Coupon.objects.all()
+        if user_ids:
+            qs = qs.filter(user_id__in=user_ids)
+        settled = Q(status__in=list(_SETTLED))
+        rows = qs.order_by().values('user_id', 'bookmaker_account_id', 'strategy_id').annotate(
+            coupons_count=Count('id'),
+            in_progress_count=Count('id', filter=Q(status=Coupon.CouponStatus.IN_PROGRESS)),
+            won_count=Count('id', filter=Q(status=Coupon.CouponStatus.WON)),
+            lost_count=Count('id', filter=Q(status=Coupon.CouponStatus.LOST)),
+            canceled_count=Count('id', filter=Q(status=Coupon.CouponStatus.CANCELED)),
+            total_stake=Sum('bet_stake'),
+            settled_stake=Sum('bet_stake', filter=settled),
+            total_balance=Sum('balance'),
+            settled_balance=Sum('balance', filter=settled),
+            won_balance=Sum('balance', filter=Q(status=Coupon.CouponStatus.WON)),
+            multiplier_sum=Sum('multiplier'),
+        )
+        return {
+            (row['user_id'], row['bookmaker_account_id'], row['strategy_id']): {
+                field: row[field] or 0 for field in ROLLUP_FIELDS
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def stored(user_ids: Optional[List[int]] = None) -> Dict[Bucket, Dict[str, Decimal]]:
+        qs = CouponStatsRollup.objects.all()
+        if user_ids:
+            qs = qs.filter(user_id__in=user_ids)
+        return {
+            (row['user_id'], row['bookmaker_account_id'], row['strategy_id']): {
+                field: row[field] for field in ROLLUP_FIELDS
+            }
+            for row in qs.values('user_id', 'bookmaker_account_id', 'strategy_id', *ROLLUP_FIELDS)
+        }
+
+    @staticmethod
+    def compute_daily_from_coupons(user_ids: Optional[List[int]] = None) -> Dict[DayBucket, Dict[str, Decimal]]:
+        qs = Coupon.objects.filter(status__in=list(_SETTLED))
+        if user_ids:
+            qs = qs.filter(user_id__in=user_ids)
+        rows = (
+            qs.order_by()
+            .annotate(day=TruncDate('created_at'))
+            .values('user_id', 'day')
+            .annotate(profit=Sum('balance'), settled_count=Count('id'))
+        )
+        return {
+            (row['user_id'], row['day']): {'profit': row['profit'] or 0, 'settled_count': row['settled_count']}
+            for row in rows
+        }
+
+    @staticmethod
+    def stored_daily(user_ids: Optional[List[int]] = None) -> Dict[DayBucket, Dict[str, Decimal]]:
+        qs = CouponDailyPnL.objects.all()
+        if user_ids:
+            qs = qs.filter(user_id__in=user_ids)
+        return {
+            (row['user_id'], row['day']): {'profit': row['profit'], 'settled_count': row['settled_count']}
+            for row in qs.values('user_id', 'day', *DAILY_FIELDS)
+        }
+
+    @staticmethod
+    def _compare(expected: Dict, actual: Dict, fields: Tuple[str, ...]) -> List[Dict]:
+        mismatches = []
+        for bucket in set(expected) | set(actual):
+            exp = expected.get(bucket, {})
+            act = actual.get(bucket, {})
+            diff = {
+                field: {'expected': exp.get(field, 0), 'stored': act.get(field, 0)}
+                for field in fields
+                if Decimal(exp.get(field, 0)) != Decimal(act.get(field, 0))
+            }
+            if diff:
+                mismatches.append({'bucket': bucket, 'diff': diff})
+        return mismatches
+
+    def verify(self, user_ids: Optional[List[int]] = None) -> List[Dict]:
+        return (
+            self._compare(self.compute_from_coupons(user_ids), self.stored(user_ids), ROLLUP_FIELDS)
+            + self._compare(self.compute_daily_from_coupons(user_ids), self.stored_daily(user_ids), DAILY_FIELDS)
+        )
+
+    @transaction.atomic
+    def rebuild(self, user_ids: Optional[List[int]] = None) -> int:
+        existing = CouponStatsRollup.objects.all()
+        if user_ids:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        existing_daily = CouponDailyPnL.objects.all()
+        if user_ids:
+            existing_daily = existing_daily.filter(user_id__in=user_ids)
+        existing_daily.delete()
+        CouponDailyPnL.objects.bulk_create(
+            [
+                CouponDailyPnL(user_id=user_id, day=day, **values)
+                for (user_id, day), values in self.compute_daily_from_coupons(user_ids).items()
+            ],
+            batch_size=1000,
+        )
+        rows = [
+            CouponStatsRollup(
+                user_id=user_id,
+                bookmaker_account_id=account_id,
+                strategy_id=strategy_id,
+                **values,
+            )
+            for (user_id, account_id, strategy_id), values in self.compute_from_coupons(user_ids).items()
+        ]
+        CouponStatsRollup.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    @transaction.atomic
+    def detach_strategy(self, strategy) -> None:
+        """Fold a strategy's buckets into the no-strategy buckets before it is deleted
+        (coupons keep existing with strategy=NULL)."""
+        rows = list(CouponStatsRollup.objects.select_for_update().filter(strategy=strategy))
+        for row in rows:
+            delta = {field: getattr(row, field) for field in ROLLUP_FIELDS if getattr(row, field)}
+            if delta:
+                self._apply_bucket((row.user_id, row.bookmaker_account_id, None), delta)
+        CouponStatsRollup.objects.filter(pk__in=[row.pk for row in rows]).delete()
+
+
+_service = RollupService()
+
+
+def track_coupon_stats(coupon: Coupon):
+    return _service.track(coupon)
+
+
+def apply_coupon_stats_changes(changes) -> None:
+    _service.apply(changes)
+
+
+def get_rollup_summary(user, *, bookmaker_account_id: Optional[int] = None, strategy_id: Optional[int] = None) -> CouponAggregate:
+    return _service.summary(user=user, bookmaker_account_id=bookmaker_account_id, strategy_id=strategy_id)
+
+
+def get_rollup_summary_by(user, field: str) -> Dict[Optional[int], CouponAggregate]:
+    return _service.summary_by(user=user, field=field)
+
+
+def verify_coupon_stats_rollup(user_ids: Optional[List[int]] = None) -> List[Dict]:
+    return _service.verify(user_ids)
+
+
+def rebuild_coupon_stats_rollup(user_ids: Optional[List[int]] = None) -> int:
+    return _service.rebuild(user_ids)
+
+
+def detach_strategy_from_rollup(strategy) -> None:
+    _service.detach_strategy(strategy)
@@ -1,8 +1,8 @@
 from decimal import Decimal
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from coupons.models.coupon import Coupon
 from coupon_analytics.models import AlertRule, AlertEvent
+from coupon_analytics.services import streak_service
 import logging
 
 User = get_user_model()
@@ -10,16 +10,8 @@ logger = logging.getLogger(__name__)
 
 
 def get_current_loss_streak(user: User) -> int:
-    qs = Coupon.objects.filter(user=user).order_by('-created_at').values_list('status', flat=True)
-    streak = 0
-    for status in qs:
-        if status == Coupon.CouponStatus.CANCELED:
-            continue
-        if status == Coupon.CouponStatus.LOST:
-            streak += 1
-            continue
-        break
-    logger.debug(f"[STREAK] User {user.id}: calculated streak = {streak}")
+    streak = streak_service.get_current_loss_streak(user)
+    logger.debug(f"[STREAK] User {user.id}: current streak = {streak}")
     return streak
 
 
@@ -0,0 +1,197 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from coupons.models import Coupon
+from coupon_analytics.models import UserStreakState
+
+logger = logging.getLogger(__name__)
+
+_SETTLED = (Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST)
+STREAK_FIELDS = ('current_loss_streak', 'current_win_streak', 'longest_loss_streak', 'longest_win_streak')
+
+
+def _streaks_from_statuses(statuses: Iterable[str]) -> Dict[str, int]:
+    """Streak counters for settled statuses given oldest first."""
+    state = {
+        'current_loss_streak': 0,
+        'current_win_streak': 0,
+        'longest_loss_streak': 0,
+        'longest_win_streak': 0,
+    }
+    for status in statuses:
+        _push(state, status)
+    return state
+
+
+def _push(state, status: str) -> None:
+    if status == Coupon.CouponStatus.LOST:
+        state['current_loss_streak'] += 1
+        state['current_win_streak'] = 0
+        state['longest_loss_streak'] = max(state['longest_loss_streak'], state['current_loss_streak'])
+    elif status == Coupon.CouponStatus.WON:
+        state['current_win_streak'] += 1
+        state['current_loss_streak'] = 0
+        state['longest_win_streak'] = max(state['longest_win_streak'], state['current_win_streak'])
+
+
+class StreakService:
+
+    @staticmethod
+    def compute(user_id: int) -> Dict:
+        rows = (
+            Coupon.objects.filter(user_id=user_id, status__in=_SETTLED)
+            .order_by('created_at', 'id')
+            .values_list('status', 'created_at', 'id')
+        )
+        last_created_at = last_coupon_id = None
+        statuses: List[str] = []
+        for status, created_at, coupon_id in rows.iterator(chunk_size=2000):
+            statuses.append(status)
+            last_created_at, last_coupon_id = created_at, coupon_id
+        return {
+            **_streaks_from_statuses(statuses),
+            'last_created_at': last_created_at,
+            'last_coupon_id': last_coupon_id,
+        }
+
+    def recompute(self, user_id: int) -> UserStreakState:
+        state, _ = UserStreakState.objects.update_or_create(
+            user_id=user_id,
+            defaults={**self.compute(user_id), 'updated_at': timezone.now()},
+        )
+        logger.debug(f"[STREAK] User {user_id}: recomputed, loss streak = {state.current_loss_streak}")
+        return state
+
+    @staticmethod
+    def _is_newest(state: UserStreakState, snapshot) -> bool:
+        if state.last_created_at is None:
+            return state.last_coupon_id is None
+        return (snapshot.created_at, snapshot.coupon_id) > (state.last_created_at, state.last_coupon_id)
+
+    def _apply_user(self, user_id: int, changes: List) -> None:
+        state = UserStreakState.objects.select_for_update().filter(user_id=user_id).first()
+        if state is None:
+            self.recompute(user_id)
+            return
+
+        # Tylko świeżo rozliczone kupony nowsze od ostatniego rozliczonego da się dopisać w O(1)
+        appended = []
+        for before, after in changes:
+            if before is not None and before.status in _SETTLED:
+                self.recompute(user_id)
+                return
+            if after is None or after.status not in _SETTLED:
+                continue
+            appended.append(after)
+
+        if any(snapshot.created_at is None or snapshot.coupon_id is None for snapshot in appended):
+            self.recompute(user_id)
+            return
+        appended.sort(key=lambda s: (s.created_at, s.coupon_id))
+        counters = {
+            'current_loss_streak': state.current_loss_streak,
+            'current_win_streak': state.current_win_streak,
+            'longest_loss_streak': state.longest_loss_streak,
+            'longest_win_streak': state.longest_win_streak,
+        }
+        for snapshot in appended:
+            if not self._is_newest(state, snapshot):
+                self.recompute(user_id)
+                return
+            _push(counters, snapshot.status)
+            state.last_created_at, state.last_coupon_id = snapshot.created_at, snapshot.coupon_id
+
+        for field, value in counters.items():
+            setattr(state, field, value)
+        state.updated_at = timezone.now()
+        state.save()
+
+    def apply(self, changes: Iterable) -> None:
+        """Update streak state for (before, after) coupon snapshots of one transaction."""
+        by_user: Dict[int, List] = {}
+        for before, after in changes:
+            if not self._affects_streak(before, after):
+                continue
+            user_id = (after or before).user_id
+            by_user.setdefault(user_id, []).append((before, after))
+        for user_id in sorted(by_user):
+            self._apply_user(user_id, by_user[user_id])
+
+    @staticmethod
+    def _affects_streak(before, after) -> bool:
+        was_settled = before is not None and before.status in _SETTLED
+        is_settled = after is not None and after.status in _SETTLED
+        if not was_settled and not is_settled:
+            return False
+        if was_settled and is_settled:
+            return (before.status, before.created_at, before.user_id) != (after.status, after.created_at, after.user_id)
+        return True
+
+    @staticmethod
+    def get(user) -> Optional[UserStreakState]:
+        return UserStreakState.objects.filter(user=user).first()
+
+    def current_loss_streak(self, user) -> int:
+        value = UserStreakState.objects.filter(user=user).values_list('current_loss_streak', flat=True).first()
+        return value or 0
+
+    def verify(self, user_ids: Optional[List[int]] = None) -> List[Dict]:
+        if not user_ids:
+            user_ids = sorted(
+                set(Coupon.objects.filter(status__in=_SETTLED).order_by().values_list('user_id', flat=True).distinct())
+                | set(UserStreakState.objects.values_list('user_id', flat=True))
+            )
+        stored = {state.user_id: state for state in UserStreakState.objects.filter(user_id__in=user_ids)}
+        mismatches = []
+        for user_id in user_ids:
+            expected = self.compute(user_id)
+            state = stored.get(user_id)
+            diff = {
+                field: {'expected': value, 'stored': getattr(state, field, None)}
+                for field, value in expected.items()
+                if field in STREAK_FIELDS and getattr(state, field, 0) != value
+            }
+            if diff:
+                mismatches.append({'user_id': user_id, 'diff': diff})
+        return mismatches
+
+    @transaction.atomic
+    def rebuild(self, user_ids: Optional[List[int]] = None) -> int:
+        if not user_ids:
+            user_ids = list(
+                Coupon.objects.filter(status__in=_SETTLED).order_by().values_list('user_id', flat=True).distinct()
+            )
+            UserStreakState.objects.exclude(user_id__in=user_ids).delete()
+        for user_id in user_ids:
+            self.recompute(user_id)
+        return len(user_ids)
+
+
+_service = StreakService()
+
+
+def apply_streak_changes(changes) -> None:
+    _service.apply(changes)
+
+
+def recompute_user_streak(user_id: int) -> UserStreakState:
+    return _service.recompute(user_id)
+
+
+def get_user_streak_state(user) -> Optional[UserStreakState]:
+    return _service.get(user)
+
+
+def get_current_loss_streak(user) -> int:
+    return _service.current_loss_streak(user)
+
+
+def verify_user_streaks(user_ids: Optional[List[int]] = None) -> List[Dict]:
+    return _service.verify(user_ids)
+
+
+def rebuild_user_streaks(user_ids: Optional[List[int]] = None) -> int:
+    return _service.rebuild(user_ids)
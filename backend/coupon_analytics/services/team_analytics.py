@@ -0,0 +1,193 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional
+
+from django.db.models import (
+    Avg,
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from common.choices import CouponType
+from coupons.models import Bet, Coupon, Team
+from coupons.services.team_service import TeamService
+
+from .aggregate_engine import SETTLED, CouponAggregate, scoped_aggregates
+from .analytics_service import AnalyticsService
+
+POSITIONS = ('home', 'away', 'any')
+LEADERBOARD_ORDERING = {
+    'profit': '-profit',
+    'yield': '-yield_ratio',
+    'stake': '-stake',
+    'coupons': '-coupons',
+}
+
+_MONEY = DecimalField(max_digits=20, decimal_places=2)
+
+
+def _quantize(value: Optional[Decimal], quant: str = '0.01') -> Optional[str]:
+    if value is None:
+        return None
+    return str(Decimal(value).quantize(Decimal(quant), rounding=ROUND_HALF_UP))
+
+
+class TeamAnalyticsService:
+    """Per-team coupon statistics computed in SQL.
+
+    A coupon counts for a team once per position, however many of its bets
+    are on that team's matches; ``any`` counts it once overall.
+    """
+
+    def __init__(self):
+        self.teams = TeamService()
+        self.summary = AnalyticsService()
+
+    def _team_bets(self, team_ids, position: str):
+        return Bet.objects.filter(self.teams_q(team_ids, position))
+
+    @staticmethod
+    def teams_q(team_ids, position: str) -> Q:
+        home = Q(event__home_team_ref__in=team_ids)
+        away = Q(event__away_team_ref__in=team_ids)
+        return {'home': home, 'away': away}.get(position, home | away)
+
+    def position_aggregates(self, user, team_name: str, exact: bool = False) -> Dict[str, CouponAggregate]:
+        """Coupon aggregates for home, away and any position in one query."""
+        team_ids = self.teams.team_ids(team_name, exact=exact)
+        coupons = (
+            Coupon.objects.filter(user=user)
+            .annotate(
+                on_home=Exists(self._team_bets(team_ids, 'home').filter(coupon=OuterRef('pk'))),
+                on_away=Exists(self._team_bets(team_ids, 'away').filter(coupon=OuterRef('pk'))),
+            )
+            .filter(Q(on_home=True) | Q(on_away=True))
+        )
+        row = coupons.aggregate(
+            **scoped_aggregates('home__', Q(on_home=True)),
+            **scoped_aggregates('away__', Q(on_away=True)),
+            **scoped_aggregates('any__'),
+        )
+        return {position: CouponAggregate.from_row(row, prefix=f'{position}__') for position in POSITIONS}
+
+    def bet_type_split(self, user, team_name: str, position: str = 'any', exact: bool = False) -> List[Dict[str, Any]]:
+        """Bets on the team grouped by bet type in one query. Stake and profit
+        come from single (SOLO) coupons only, where they belong to one bet."""
+        team_ids = self.teams.team_ids(team_name, exact=exact)
+        single = Q(coupon__coupon_type=CouponType.SOLO, coupon__status__in=[
+            Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST,
+        ])
+        rows = (
+            self._team_bets(team_ids, position)
+            .filter(coupon__user=user)
+            .values('bet_type__code')
+            .annotate(
+                bets=Count('id'),
+                won=Count('id', filter=Q(result=Bet.BetResult.WIN)),
+                lost=Count('id', filter=Q(result=Bet.BetResult.LOST)),
+                canceled=Count('id', filter=Q(result=Bet.BetResult.CANCELED)),
+                coupons=Count('coupon', distinct=True),
+                avg_odds=Avg('odds'),
+                single_stake=Sum('coupon__bet_stake', filter=single),
+                single_profit=Sum('coupon__balance', filter=single),
+            )
+            .order_by('-bets', 'bet_type__code')
+        )
+        split = []
+        for row in rows:
+            decided = row['won'] + row['lost']
+            stake = row['single_stake'] or Decimal('0.00')
+            profit = row['single_profit'] or Decimal('0.00')
+            split.append({
+                'bet_type': row['bet_type__code'],
+                'bets': row['bets'],
+                'won': row['won'],
+                'lost': row['lost'],
+                'canceled': row['canceled'],
+                'coupons': row['coupons'],
+                'hit_rate': _quantize(Decimal(row['won']) / decided, '0.0001') if decided else None,
+                'avg_odds': _quantize(row['avg_odds']),
+                'single_stake': _quantize(stake),
+                'single_profit': _quantize(profit),
+                'single_yield': _quantize(profit / stake * 100) if stake else None,
+            })
+        return split
+
+    def team_statistics(self, user, team_name: str, exact: bool = False) -> Dict[str, Any]:
+        aggregates = self.position_aggregates(user, team_name, exact=exact)
+        return {
+            'team_name': team_name,
+            'positions': {
+                position: self.summary._summary_from_aggregate(agg).to_representation()
+                for position, agg in aggregates.items()
+            },
+            'bet_types': self.bet_type_split(user, team_name, exact=exact),
+        }
+
+    def leaderboard(self, user, limit: int = 10, order_by: str = 'profit', min_coupons: int = 1) -> List[Dict[str, Any]]:
+        """Top teams of the user's settled coupons, in one query: per-team sums
+        are correlated subqueries over the coupons with a bet on that team."""
+        def on_team(team):
+            return Q(event__home_team_ref=team) | Q(event__away_team_ref=team)
+
+        team_coupons = Coupon.objects.filter(user=user).filter(SETTLED).filter(
+            Exists(Bet.objects.filter(on_team(OuterRef(OuterRef('pk'))), coupon=OuterRef('pk')))
+        ).order_by().values('user')
+
+        def per_team(aggregate, output_field):
+            return Coalesce(
+                Subquery(team_coupons.annotate(value=aggregate).values('value')[:1], output_field=output_field),
+                Value(0, output_field=output_field),
+            )
+
+        teams = (
+            Team.objects.filter(
+                Exists(Bet.objects.filter(on_team(OuterRef('pk')), coupon__user=user))
+            )
+            .annotate(
+                coupons=per_team(Count('id'), IntegerField()),
+                won=per_team(Count('id', filter=Q(status=Coupon.CouponStatus.WON)), IntegerField()),
+                stake=per_team(Sum('bet_stake'), _MONEY),
+                profit=per_team(Sum('balance'), _MONEY),
+            )
+            .filter(coupons__gte=max(1, min_coupons))
+        )
+        if order_by == 'yield':
+            teams = teams.filter(stake__gt=0).annotate(
+                yield_ratio=ExpressionWrapper(F('profit') / F('stake'), output_field=DecimalField(max_digits=20, decimal_places=6))
+            )
+        teams = teams.order_by(LEADERBOARD_ORDERING.get(order_by, '-profit'), 'name')[:limit]
+
+        return [
+            {
+                'team_id': team.id,
+                'team_name': team.name,
+                'coupons': team.coupons,
+                'won': team.won,
+                'win_rate': _quantize(Decimal(team.won) / team.coupons, '0.0001') if team.coupons else None,
+                'total_stake': _quantize(team.stake),
+                'profit': _quantize(team.profit),
+                'yield': _quantize(team.profit / team.stake * 100) if team.stake else None,
+            }
+            for team in teams
+        ]
+
+
+_service = TeamAnalyticsService()
+
+
+def get_team_statistics(user, team_name: str, exact: bool = False) -> Dict[str, Any]:
+    return _service.team_statistics(user, team_name, exact=exact)
+
+
+def get_team_leaderboard(user, limit: int = 10, order_by: str = 'profit', min_coupons: int = 1) -> List[Dict[str, Any]]:
+    return _service.leaderboard(user, limit=limit, order_by=order_by, min_coupons=min_coupons)
@@ -2,9 +2,13 @@ from django.urls import path
 from .views import (
     CouponAnalyticsSummaryView,
     CouponAnalyticsQuerySummaryView,
+    CouponPnLSeriesView,
+    UserStreakView,
     SavedFiltersListView,
     SavedFilterDetailView,
     SavedFilterPreviewView,
+    TeamStatisticsView,
+    TeamLeaderboardView,
     AlertRuleListCreateView,
     AlertRuleDetailView,
     AlertRuleEvaluateView,
@@ -21,6 +25,10 @@ from .views import (
 
 urlpatterns = [
     path('coupons/summary/', CouponAnalyticsSummaryView.as_view(), name='coupon-analytics-summary'),
+    path('coupons/pnl-series/', CouponPnLSeriesView.as_view(), name='coupon-analytics-pnl-series'),
+    path('coupons/streaks/', UserStreakView.as_view(), name='coupon-analytics-streaks'),
+    path('teams/stats/', TeamStatisticsView.as_view(), name='team-statistics'),
+    path('teams/leaderboard/', TeamLeaderboardView.as_view(), name='team-leaderboard'),
     path('coupons/queries/<int:pk>/summary/', CouponAnalyticsQuerySummaryView.as_view(), name='coupon-analytics-query-summary'),
     path('filters/', SavedFiltersListView.as_view(), name='saved-filters-list'),
     path('filters/preview/', SavedFilterPreviewView.as_view(), name='saved-filter-preview'),
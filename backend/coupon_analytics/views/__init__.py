@@ -1,9 +1,13 @@
 from .analytics_views import (
     CouponAnalyticsSummaryView,
     CouponAnalyticsQuerySummaryView,
+    CouponPnLSeriesView,
+    UserStreakView,
     SavedFiltersListView,
     SavedFilterDetailView,
     SavedFilterPreviewView,
+    TeamStatisticsView,
+    TeamLeaderboardView,
 )
 from .alert_views import (
     AlertRuleListCreateView,
@@ -27,9 +31,13 @@ from .report_views import (
 __all__ = [
     'CouponAnalyticsSummaryView',
     'CouponAnalyticsQuerySummaryView',
+    'CouponPnLSeriesView',
+    'UserStreakView',
     'SavedFiltersListView',
     'SavedFilterDetailView',
     'SavedFilterPreviewView',
+    'TeamStatisticsView',
+    'TeamLeaderboardView',
     'AlertRuleListCreateView',
     'AlertRuleDetailView',
     'AlertRuleEvaluateView',
@@ -1,3 +1,4 @@
+from dataclasses import asdict
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -134,10 +135,10 @@ class AlertRuleEvaluateView(APIView):
         rule = AlertRule.objects.filter(pk=pk, user=request.user).first()
         if not rule:
             return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
-        evaluate_alert_rules_for_user(request.user)
+        report = evaluate_alert_rules_for_user(request.user)
         events = AlertEvent.objects.filter(rule=rule).order_by('-triggered_at')[:10]
         data = AlertEventSerializer(events, many=True).data
-        return Response({'evaluated': True, 'events': data}, status=status.HTTP_200_OK)
+        return Response({'evaluated': True, 'events': data, 'stats': asdict(report)}, status=status.HTTP_200_OK)
 
 
 class AlertEventListView(generics.ListAPIView):
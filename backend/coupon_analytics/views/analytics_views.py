@@ -1,12 +1,20 @@
 from django.utils.dateparse import parse_datetime, parse_date
 from django.utils import timezone as dj_tz
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from coupon_analytics.services.analytics_service import get_coupon_analytics_summary, get_coupon_analytics_summary_for_queryset
+from coupon_analytics.services.pnl_series import PERIODS as PNL_PERIODS, get_pnl_series
 from coupon_analytics.services.query_builder import AnalyticsQueryBuilder
+from coupon_analytics.services.filter_spec import FilterGroup, FilterSpec
+from coupon_analytics.services.streak_service import get_user_streak_state
+from coupon_analytics.services.team_analytics import (
+    LEADERBOARD_ORDERING as TEAM_LEADERBOARD_ORDERING,
+    get_team_leaderboard,
+    get_team_statistics,
+)
 from coupon_analytics.models.queries import AnalyticsQuery
 from coupons.serializers.coupon_filter_serializer import AnalyticsQuerySerializer
 
@@ -54,11 +62,9 @@ class SavedFiltersListView(APIView):
         serializer = AnalyticsQuerySerializer(queries, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    def _create_query_from_params(self, user, data):
-        from coupon_analytics.models.queries import AnalyticsQueryGroup, AnalyticsQueryCondition
-
-        query = AnalyticsQuery.objects.create(
-            user=user,
+    def _spec_from_params(self, user, data) -> FilterSpec:
+        spec = FilterSpec(
+            user_id=user.id,
             name=data.get('name', 'Unnamed Filter'),
             start_date=data.get('start_date'),
             end_date=data.get('end_date'),
@@ -68,14 +74,8 @@ class SavedFiltersListView(APIView):
         conditions = data.get('conditions') or []
 
         if params or conditions:
-            group = AnalyticsQueryGroup.objects.create(
-                analytics_query=query,
-                operator='AND',
-                parent=None,
-                order=0
-            )
-
-            order_idx = 0
+            group = FilterGroup(operator='AND')
+            spec.groups.append(group)
 
             if params:
                 team_name = params.get('team_name')
@@ -85,109 +85,37 @@ class SavedFiltersListView(APIView):
 
                 if team_name:
                     if position == 'home':
-                        AnalyticsQueryCondition.objects.create(
-                            group=group,
-                            field='bets__event__home_team',
-                            operator='contains',
-                            value=team_name,
-                            order=order_idx
-                        )
+                        group.add('bets__event__home_team', 'contains', team_name)
                     elif position == 'away':
-                        AnalyticsQueryCondition.objects.create(
-                            group=group,
-                            field='bets__event__away_team',
-                            operator='contains',
-                            value=team_name,
-                            order=order_idx
-                        )
+                        group.add('bets__event__away_team', 'contains', team_name)
                     else:
-                        AnalyticsQueryCondition.objects.create(
-                            group=group,
-                            field='bets__event__name',
-                            operator='contains',
-                            value=team_name,
-                            order=order_idx
-                        )
-                    order_idx += 1
+                        group.add('bets__event__name', 'contains', team_name)
 
                 if bet_type_code:
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='bets__bet_type__code',
-                        operator='equals',
-                        value=bet_type_code,
-                        order=order_idx
-                    )
-                    order_idx += 1
+                    group.add('bets__bet_type__code', 'equals', bet_type_code)
 
                 if filter_mode == 'won_coupons':
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='status',
-                        operator='equals',
-                        value='won',
-                        order=order_idx
-                    )
+                    group.add('status', 'equals', 'won')
                 elif filter_mode == 'won_bets':
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='bets__result',
-                        operator='equals',
-                        value='win',
-                        order=order_idx
-                    )
+                    group.add('bets__result', 'equals', 'win')
                 elif filter_mode == 'lost_bets':
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='bets__result',
-                        operator='equals',
-                        value='lost',
-                        order=order_idx
-                    )
+                    group.add('bets__result', 'equals', 'lost')
                 elif filter_mode == 'won_bets_lost_coupons':
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='bets__result',
-                        operator='equals',
-                        value='win',
-                        order=order_idx
-                    )
-                    order_idx += 1
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='status',
-                        operator='equals',
-                        value='lost',
-                        order=order_idx
-                    )
+                    group.add('bets__result', 'equals', 'win')
+                    group.add('status', 'equals', 'lost')
                 elif filter_mode == 'lost_bets_won_coupons':
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='bets__result',
-                        operator='equals',
-                        value='lost',
-                        order=order_idx
-                    )
-                    order_idx += 1
-                    AnalyticsQueryCondition.objects.create(
-                        group=group,
-                        field='status',
-                        operator='equals',
-                        value='won',
-                        order=order_idx
-                    )
-
-            for idx, cond in enumerate(conditions):
-                AnalyticsQueryCondition.objects.create(
-                    group=group,
-                    field=cond.get('field'),
-                    operator=cond.get('operator', 'equals'),
-                    value=cond.get('value'),
-                    negate=cond.get('negate', False),
-                    order=order_idx + idx
+                    group.add('bets__result', 'equals', 'lost')
+                    group.add('status', 'equals', 'won')
+
+            for cond in conditions:
+                group.add(
+                    cond.get('field'),
+                    cond.get('operator', 'equals'),
+                    cond.get('value'),
+                    cond.get('negate', False),
                 )
 
-        return query
+        return spec
 
     @swagger_auto_schema(
         operation_description="Zapisz nowy filtr na stałe.",
@@ -199,7 +127,7 @@ class SavedFiltersListView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        query = self._create_query_from_params(request.user, serializer.validated_data)
+        query = self._spec_from_params(request.user, serializer.validated_data).save()
         response_serializer = AnalyticsQuerySerializer(query)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -208,7 +136,7 @@ class SavedFilterPreviewView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Preview filtra - tworzy tymczasowe query, wykonuje filtrowanie, zwraca wyniki i usuwa query.",
+        operation_description="Preview filtra - wykonuje filtrowanie bez zapisywania query i zwraca wyniki.",
         request_body=SavedFilterInputSerializer,
         responses={200: 'Preview results with stats'}
     )
@@ -225,7 +153,7 @@ class SavedFilterPreviewView(APIView):
         params = data.get('params') or {}
 
         try:
-            query, coupons = UniversalCouponFilterService.apply_universal_filter(
+            _, coupons = UniversalCouponFilterService.apply_universal_filter(
                 user=request.user,
                 team_name=params.get('team_name'),
                 position=params.get('position', 'any'),
@@ -244,8 +172,6 @@ class SavedFilterPreviewView(APIView):
                 'filters': params,
             }
 
-            query.delete()
-
             return Response(response_data, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -333,3 +259,101 @@ class CouponAnalyticsQuerySummaryView(APIView):
         qs = builder.apply()
         summary = get_coupon_analytics_summary_for_queryset(qs)
         return Response(summary, status=status.HTTP_200_OK)
+
+
+class CouponPnLSeriesView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_POINTS = 1000
+
+    @swagger_auto_schema(
+        operation_description="Zwraca saldo narastająco i zysk per okres (day/week/month/quarter/year) z dziennych agregatów P/L.",
+        manual_parameters=[
+            openapi.Parameter('period', openapi.IN_QUERY, description='day | week | month | quarter | year (domyślnie day)', type=openapi.TYPE_STRING),
+            openapi.Parameter('date_from', openapi.IN_QUERY, description='Data od (YYYY-MM-DD, domyślnie 30 dni wstecz)', type=openapi.TYPE_STRING),
+            openapi.Parameter('date_to', openapi.IN_QUERY, description='Data do (YYYY-MM-DD, domyślnie dzisiaj)', type=openapi.TYPE_STRING),
+        ] if hasattr(openapi, 'Parameter') else None,
+        responses={200: 'P/L series', 400: 'Invalid parameters'}
+    )
+    def get(self, request):
+        period = request.query_params.get('period') or 'day'
+        if period not in PNL_PERIODS:
+            return Response({'error': f"period must be one of: {', '.join(PNL_PERIODS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        date_to_raw = request.query_params.get('date_to')
+        date_from_raw = request.query_params.get('date_from')
+        date_to = parse_date(date_to_raw) if date_to_raw else dj_tz.localdate()
+        date_from = parse_date(date_from_raw) if date_from_raw else date_to - timedelta(days=29)
+        if date_from is None or date_to is None:
+            return Response({'error': 'date_from and date_to must be YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({'error': 'date_from must not be after date_to.'}, status=status.HTTP_400_BAD_REQUEST)
+        if period == 'day' and (date_to - date_from).days >= self.MAX_POINTS:
+            return Response({'error': f'At most {self.MAX_POINTS} daily points per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        points = get_pnl_series(request.user, date_from=date_from, date_to=date_to, period=period)
+        return Response({'period': period, 'points': points}, status=status.HTTP_200_OK)
+
+
+class UserStreakView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Zwraca bieżącą i najdłuższą serię wygranych / przegranych kuponów gracza (anulowane i w trakcie są pomijane).",
+        responses={200: 'Streak state'}
+    )
+    def get(self, request):
+        state = get_user_streak_state(request.user)
+        return Response({
+            'current_loss_streak': state.current_loss_streak if state else 0,
+            'current_win_streak': state.current_win_streak if state else 0,
+            'longest_loss_streak': state.longest_loss_streak if state else 0,
+            'longest_win_streak': state.longest_win_streak if state else 0,
+            'last_settled_at': state.last_created_at if state else None,
+        }, status=status.HTTP_200_OK)
+
+
+class TeamStatisticsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Statystyki kuponów dla drużyny: podział gospodarz / gość / dowolnie oraz per typ zakładu.",
+        manual_parameters=[
+            openapi.Parameter('team_name', openapi.IN_QUERY, description='Nazwa drużyny (wymagana)', type=openapi.TYPE_STRING),
+            openapi.Parameter('exact', openapi.IN_QUERY, description='Dokładna nazwa zamiast fragmentu (domyślnie false)', type=openapi.TYPE_BOOLEAN),
+        ] if hasattr(openapi, 'Parameter') else None,
+        responses={200: 'Team statistics', 400: 'Invalid parameters'}
+    )
+    def get(self, request):
+        team_name = (request.query_params.get('team_name') or '').strip()
+        if not team_name:
+            return Response({'error': 'team_name is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        exact = request.query_params.get('exact', 'false').lower() in ('true', '1', 'yes')
+        return Response(get_team_statistics(request.user, team_name, exact=exact), status=status.HTTP_200_OK)
+
+
+class TeamLeaderboardView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_LIMIT = 100
+
+    @swagger_auto_schema(
+        operation_description="Ranking drużyn z rozliczonych kuponów gracza (profit, yield, stake lub liczba kuponów).",
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, description='Liczba drużyn (domyślnie 10, max 100)', type=openapi.TYPE_INTEGER),
+            openapi.Parameter('order_by', openapi.IN_QUERY, description='profit | yield | stake | coupons (domyślnie profit)', type=openapi.TYPE_STRING),
+            openapi.Parameter('min_coupons', openapi.IN_QUERY, description='Minimalna liczba kuponów (domyślnie 1)', type=openapi.TYPE_INTEGER),
+        ] if hasattr(openapi, 'Parameter') else None,
+        responses={200: 'Team leaderboard', 400: 'Invalid parameters'}
+    )
+    def get(self, request):
+        order_by = request.query_params.get('order_by') or 'profit'
+        if order_by not in TEAM_LEADERBOARD_ORDERING:
+            return Response({'error': f"order_by must be one of: {', '.join(TEAM_LEADERBOARD_ORDERING)}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 10))
+            min_coupons = int(request.query_params.get('min_coupons', 1))
+        except (TypeError, ValueError):
+            return Response({'error': 'limit and min_coupons must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.MAX_LIMIT))
+
+        teams = get_team_leaderboard(request.user, limit=limit, order_by=order_by, min_coupons=min_coupons)
+        return Response({'order_by': order_by, 'teams': teams}, status=status.HTTP_200_OK)
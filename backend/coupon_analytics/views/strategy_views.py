@@ -3,12 +3,16 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.db.models import Sum
-from decimal import Decimal
+from django.db import transaction
 
 from coupon_analytics.models import UserStrategy
 from coupon_analytics.serializers.user_strategy_serializer import UserStrategySerializer
-from coupons.models import Coupon
+from coupon_analytics.services.aggregate_engine import CouponAggregate
+from coupon_analytics.services.rollup_service import (
+    detach_strategy_from_rollup,
+    get_rollup_summary,
+    get_rollup_summary_by,
+)
 
 
 class UserStrategyListCreateView(generics.ListCreateAPIView):
@@ -115,6 +119,12 @@ class UserStrategyDetailView(generics.RetrieveUpdateDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Kupony zostają ze strategy=NULL, więc ich statystyki przechodzą do koszyka bez strategii
+        detach_strategy_from_rollup(instance)
+        instance.delete()
+
 
 class UserStrategySummaryView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -135,28 +145,11 @@ class UserStrategySummaryView(APIView):
             return Response({"error": "Strategy not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # Balans kuponów = suma balance (profit po odjęciu stawek)
-        won_agg = Coupon.objects.filter(
-            user=request.user,
-            strategy=strategy,
-            status=Coupon.CouponStatus.WON
-        ).aggregate(
-            profit=Sum('balance'),
-            count=Sum(1)
-        )
-
-        lost_agg = Coupon.objects.filter(
-            user=request.user,
-            strategy=strategy,
-            status=Coupon.CouponStatus.LOST
-        ).aggregate(
-            profit=Sum('balance'),
-            count=Sum(1)
-        )
-
-        won_profit = won_agg['profit'] or Decimal('0.00')
-        won_count = won_agg['count'] or 0
-        lost_profit = lost_agg['profit'] or Decimal('0.00')
-        lost_count = lost_agg['count'] or 0
+        agg = get_rollup_summary(request.user, strategy_id=strategy.id)
+        won_profit = agg.won_balance
+        won_count = agg.won_count
+        lost_profit = agg.settled_balance - agg.won_balance
+        lost_count = agg.lost_count
         total_profit = won_profit + lost_profit
 
         return Response({
@@ -186,31 +179,15 @@ class UserStrategiesSummaryView(APIView):
         try:
             strategies = UserStrategy.objects.filter(user=request.user).order_by('-created_at')
             results = []
+            per_strategy = get_rollup_summary_by(request.user, 'strategy')
 
             for strategy in strategies:
                 # Balans kuponów = suma balance (profit po odjęciu stawek)
-                won_agg = Coupon.objects.filter(
-                    user=request.user,
-                    strategy=strategy,
-                    status=Coupon.CouponStatus.WON
-                ).aggregate(
-                    profit=Sum('balance'),
-                    count=Sum(1)
-                )
-
-                lost_agg = Coupon.objects.filter(
-                    user=request.user,
-                    strategy=strategy,
-                    status=Coupon.CouponStatus.LOST
-                ).aggregate(
-                    profit=Sum('balance'),
-                    count=Sum(1)
-                )
-
-                won_profit = won_agg['profit'] or Decimal('0.00')
-                won_count = won_agg['count'] or 0
-                lost_profit = lost_agg['profit'] or Decimal('0.00')
-                lost_count = lost_agg['count'] or 0
+                agg = per_strategy.get(strategy.id) or CouponAggregate()
+                won_profit = agg.won_balance
+                won_count = agg.won_count
+                lost_profit = agg.settled_balance - agg.won_balance
+                lost_count = agg.lost_count
                 total_profit = won_profit + lost_profit
 
                 results.append({
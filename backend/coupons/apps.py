@@ -1,6 +1,18 @@
+import sys
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CouponsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'coupons'
+
+    def ready(self):
+        if not getattr(settings, 'OCR_POOL_PRELOAD', False):
+            return
+        if sys.argv and sys.argv[0].endswith('manage.py') and sys.argv[1:2] != ['runserver']:
+            return
+        from .services.ocr_pool import preload_ocr_pool
+        threading.Thread(target=preload_ocr_pool, name='ocr-pool-preload', daemon=True).start()
@@ -0,0 +1,117 @@
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from coupons.models import Bet, Coupon
+from coupons.services.coupon_service import CouponService
+from common.choices import CouponType
+from coupon_analytics.services.rollup_service import track_coupon_stats
+
+
+def _legacy_settle(service: CouponService, coupon: Coupon, data) -> Coupon:
+    """Per-bet get()/save(), odds fetch + count and five count() calls, as
+    settlement used to run."""
+    with track_coupon_stats(coupon):
+        for bet_data in data.get('bets', []):
+            bet = Bet.objects.get(id=bet_data['bet_id'], coupon=coupon)
+            bet.result = bet_data['result']
+            bet.save(update_fields=['result'])
+
+        total_odds = Decimal('1.00')
+        for bet in Bet.objects.filter(coupon=coupon).only('id', 'odds', 'result'):
+            total_odds *= service.bet_returned_odds(bet)
+        coupon.multiplier = service.quantize2_odds(total_odds)
+        bets_count = Bet.objects.filter(coupon=coupon).count()
+        coupon.coupon_type = CouponType.SOLO if bets_count <= 1 else CouponType.AKO
+        coupon.save(update_fields=['multiplier', 'coupon_type'])
+
+        all_bets = Bet.objects.filter(coupon=coupon)
+        total = all_bets.count()
+        lost = all_bets.filter(result=Bet.BetResult.LOST).count()
+        unresolved = all_bets.filter(result__isnull=True).count()
+        canceled = all_bets.filter(result=Bet.BetResult.CANCELED).count()
+        all_bets.filter(result=Bet.BetResult.WIN).count()
+        prev_status = coupon.status
+        if total == 0 or (not lost and not unresolved and canceled == total):
+            coupon.status, coupon.balance = Coupon.CouponStatus.CANCELED, Decimal('0.00')
+        elif lost:
+            coupon.status, coupon.balance = Coupon.CouponStatus.LOST, -coupon.bet_stake
+        elif not unresolved:
+            tax_mult = Decimal(str(coupon.bookmaker_account.bookmaker.tax_multiplier)) if coupon.bookmaker_account else Decimal('1.00')
+            gross = coupon.bet_stake * coupon.multiplier * tax_mult
+            if coupon.bookmaker_account and coupon.bookmaker_account.currency.code == 'PLN' and gross > Decimal('2280.00'):
+                gross *= Decimal('0.90')
+            coupon.status = Coupon.CouponStatus.WON
+            coupon.balance = (gross - coupon.bet_stake).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        coupon.save(update_fields=['status', 'balance'])
+        if coupon.bookmaker_account and coupon.status in ('won', 'lost') and prev_status not in ('won', 'lost'):
+            from finances.models import BookmakerAccountModel
+            BookmakerAccountModel.objects.filter(id=coupon.bookmaker_account.id).update(
+                balance=F('balance') + coupon.balance
+            )
+    return coupon
+
+
+def _current_settle(service: CouponService, coupon: Coupon, data) -> Coupon:
+    # Bez _notify_settled, tak jak w wersji legacy powyżej
+    with track_coupon_stats(coupon):
+        return service._settle_coupon(coupon, data)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares queries per settlement of the legacy per-bet settlement against the current one. "
+        "Every run is rolled back, coupons are left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, required=True, help='User whose in-progress coupons are settled')
+        parser.add_argument('--limit', type=int, default=10, help='Number of coupons to settle (default: 10)')
+        parser.add_argument('--result', default=Bet.BetResult.WIN, choices=[c for c, _ in Bet.BetResult.choices])
+
+    def _run(self, fn, coupon_id, data):
+        with transaction.atomic():
+            coupon = Coupon.objects.get(id=coupon_id)
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                fn(coupon, data)
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+            transaction.set_rollback(True)
+        return len(ctx.captured_queries), elapsed_ms
+
+    def handle(self, *args, **options):
+        service = CouponService()
+        coupon_ids = list(
+            Coupon.objects.filter(user_id=options['user_id'], status=Coupon.CouponStatus.IN_PROGRESS)
+            .order_by('-created_at')
+            .values_list('id', flat=True)[:max(1, options['limit'])]
+        )
+        if not coupon_ids:
+            self.stderr.write(self.style.ERROR("No in-progress coupons to settle for this user"))
+            return
+
+        cases = [
+            ('legacy', lambda coupon, data: _legacy_settle(service, coupon, data)),
+            ('current', lambda coupon, data: _current_settle(service, coupon, data)),
+        ]
+        totals = {label: [0, 0.0] for label, _ in cases}
+
+        self.stdout.write(f"{'coupon':>8}{'bets':>6}" + ''.join(f"{label + ' q':>12}" for label, _ in cases))
+        for coupon_id in coupon_ids:
+            bet_ids = list(Bet.objects.filter(coupon_id=coupon_id).values_list('id', flat=True))
+            data = {'bets': [{'bet_id': bet_id, 'result': options['result']} for bet_id in bet_ids]}
+            row = f"{coupon_id:>8}{len(bet_ids):>6}"
+            for label, fn in cases:
+                queries, elapsed_ms = self._run(fn, coupon_id, data)
+                totals[label][0] += queries
+                totals[label][1] += elapsed_ms
+                row += f"{queries:>12}"
+            self.stdout.write(row)
+
+        count = len(coupon_ids)
+        for label, (queries, elapsed_ms) in totals.items():
+            self.stdout.write(f"{label}: {queries / count:.1f} queries, {elapsed_ms / count:.2f} ms per settlement")
@@ -0,0 +1,77 @@
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from coupons.services.coupon_parser_v2 import CouponParser
+from coupons.services.image_preprocessing import preprocess_image
+from coupons.services.ocr_batch_service import IMAGE_EXTENSIONS
+from coupons.services.ocr_service import OCRService
+from coupons.services.parser_benchmark import field_accuracy
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs OCR on a directory of betslip images with and without preprocessing and compares "
+        "latency, confidence and (for images with a <name>.json expected parse) field accuracy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=str, required=True, help='Directory with betslip images')
+        parser.add_argument('--backend', type=str, default=None, help='OCR backend (default: OCR_BACKEND)')
+        parser.add_argument('--repeat', type=int, default=1, help='Inference runs per image and mode (default: 1)')
+
+    def handle(self, *args, **options):
+        directory = Path(options['images'])
+        images = sorted(path for path in directory.glob('*') if path.suffix.lower() in IMAGE_EXTENSIONS)
+        if not images:
+            raise CommandError(f"No images in {directory}")
+
+        backend = options['backend'] or getattr(settings, 'OCR_BACKEND', 'paddle')
+        repeat = max(1, options['repeat'])
+        engines = {
+            'raw': OCRService(backend=backend, preprocess=False),
+            'preprocessed': OCRService(backend=backend, preprocess=True),
+        }
+        totals = {mode: {'ms': 0.0, 'confidence': 0.0, 'matched': 0, 'fields': 0} for mode in engines}
+        preprocess_ms = 0.0
+
+        self.stdout.write(f"{'image':<32}{'prep ms':>9}" + ''.join(f"{mode + ' ms':>18}{'acc':>7}" for mode in engines))
+        for path in images:
+            data = path.read_bytes()
+            expected_path = path.with_suffix('.json')
+            expected = json.loads(expected_path.read_text(encoding='utf-8')) if expected_path.exists() else None
+
+            started = time.perf_counter()
+            preprocess_image(data)
+            elapsed = (time.perf_counter() - started) * 1000.0
+            preprocess_ms += elapsed
+            row = f"{path.name[:31]:<32}{elapsed:>9.1f}"
+
+            for mode, engine in engines.items():
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    ocr = engine.extract(data)
+                elapsed = (time.perf_counter() - started) * 1000.0 / repeat
+                totals[mode]['ms'] += elapsed
+                totals[mode]['confidence'] += ocr.get('average_confidence', 0.0)
+
+                accuracy = '-'
+                if expected is not None:
+                    matched, fields = field_accuracy(expected, CouponParser().parse(ocr.get('text', '')).to_dict())
+                    totals[mode]['matched'] += matched
+                    totals[mode]['fields'] += fields
+                    accuracy = f"{matched / fields:.0%}"
+                row += f"{elapsed:>18.1f}{accuracy:>7}"
+            self.stdout.write(row)
+
+        count = len(images)
+        self.stdout.write(f"preprocessing: {preprocess_ms / count:.1f} ms per image")
+        for mode, total in totals.items():
+            accuracy = f"{total['matched'] / total['fields']:.1%}" if total['fields'] else 'n/a'
+            self.stdout.write(
+                f"{mode}: {total['ms'] / count:.1f} ms per image, "
+                f"confidence {total['confidence'] / count:.3f}, field accuracy {accuracy}"
+            )
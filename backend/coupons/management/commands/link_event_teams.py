@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from coupons.models import Event
+from coupons.services.team_service import link_event_teams
+
+
+class Command(BaseCommand):
+    help = "Links events to canonical teams (creating teams/aliases for new names). By default only unlinked events."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Relink every event, e.g. after editing aliases')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Events per batch (default: 1000)')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        events = Event.objects.only('id', 'name', 'home_team', 'away_team', 'home_team_ref', 'away_team_ref')
+        if not options['all']:
+            events = events.filter(home_team_ref__isnull=True, away_team_ref__isnull=True).exclude(
+                Q(home_team__isnull=True) & Q(away_team__isnull=True) & Q(name='')
+            )
+
+        linked, last_id = 0, 0
+        while True:
+            batch = list(events.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            linked += link_event_teams(batch)
+            last_id = batch[-1].id
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} event(s)"))
@@ -0,0 +1,57 @@
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from coupons.services.event_result_service import (
+    process_next_event_settlement,
+    requeue_stale_event_settlements,
+)
+
+
+class Command(BaseCommand):
+    help = "Processes queued event settlement jobs (bets resolved from event results, in chunks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'EVENT_SETTLEMENT_POLL_INTERVAL', 2.0),
+            help='Seconds to sleep when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever.',
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = max(0.05, options['poll_interval'])
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        stop = threading.Event()
+
+        requeue_stale_event_settlements()
+        self.stdout.write(f"Event settlement worker {worker} started")
+
+        processed = 0
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                job = process_next_event_settlement(worker)
+                if job is not None:
+                    processed += 1
+                    self.stdout.write(
+                        f"job {job.pk} event={job.event_id} {job.status}: "
+                        f"{job.bets_resolved} bet(s), {job.coupons_settled} coupon(s)"
+                    )
+                    continue
+                if options['once']:
+                    break
+                stop.wait(poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Event settlement worker stopped: {processed} job(s)"))
@@ -0,0 +1,82 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from coupons.services.ocr_job_service import process_next_ocr_job, requeue_stale_ocr_jobs
+from coupons.services.ocr_pool import preload_ocr_pool
+
+
+class Command(BaseCommand):
+    help = "Processes queued OCR jobs from the ocr_jobs table using a local thread pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=getattr(settings, 'OCR_WORKER_THREADS', 2),
+            help='Number of worker threads (defaults to OCR_WORKER_THREADS).',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'OCR_WORKER_POLL_INTERVAL', 1.0),
+            help='Seconds to sleep when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever.',
+        )
+        parser.add_argument(
+            '--no-preload',
+            action='store_true',
+            help='Do not load OCR engines before accepting jobs.',
+        )
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+        poll_interval = max(0.05, options['poll_interval'])
+        once = options['once']
+        stop = threading.Event()
+        worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        if not options['no_preload']:
+            preload_ocr_pool()
+        requeue_stale_ocr_jobs()
+
+        self.stdout.write(f"OCR worker {worker_prefix} started with {threads} thread(s)")
+
+        def loop(idx: int) -> int:
+            worker = f"{worker_prefix}:{idx}"
+            processed = 0
+            try:
+                while not stop.is_set():
+                    close_old_connections()
+                    job = process_next_ocr_job(worker)
+                    if job is not None:
+                        processed += 1
+                        continue
+                    if once:
+                        break
+                    stop.wait(poll_interval)
+            finally:
+                connection.close()
+            return processed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ocr-worker') as executor:
+            futures = [executor.submit(loop, idx) for idx in range(threads)]
+            try:
+                processed = sum(f.result() for f in futures)
+            except KeyboardInterrupt:
+                stop.set()
+                processed = sum(f.result() for f in futures)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"OCR worker stopped: {processed} job(s) in {elapsed:.1f}s"))
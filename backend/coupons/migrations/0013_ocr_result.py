@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-17 10:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0012_alter_bet_table_alter_bettypedict_table_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image_hash', models.CharField(help_text='SHA-256 of the raw image bytes', max_length=64)),
+                ('backend', models.CharField(max_length=20)),
+                ('engine_version', models.CharField(default='unknown', max_length=50)),
+                ('rec_texts', models.JSONField(blank=True, default=list)),
+                ('rec_scores', models.JSONField(blank=True, default=list)),
+                ('average_confidence', models.FloatField(default=0.0)),
+                ('parsed', models.JSONField(blank=True, help_text='CouponParser output for the recognised text', null=True)),
+                ('parser_version', models.CharField(blank=True, default='', max_length=20)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_accessed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'OCR Result',
+                'verbose_name_plural': 'OCR Results',
+                'db_table': 'ocr_results',
+                'constraints': [models.UniqueConstraint(fields=('image_hash', 'backend', 'engine_version'), name='uniq_ocr_result_image_backend_version')],
+            },
+        ),
+    ]
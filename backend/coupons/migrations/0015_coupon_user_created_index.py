@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0014_ocr_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coupon',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='coupons_user_created_idx'),
+        ),
+    ]
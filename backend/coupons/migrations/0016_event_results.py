@@ -0,0 +1,66 @@
+# Generated by Django 5.0 on 2026-10-17 20:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0015_coupon_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='away_score',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Final score of the away team, used to settle bets on this event', null=True, verbose_name='Away score'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='home_score',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Final score of the home team, used to settle bets on this event', null=True, verbose_name='Home score'),
+        ),
+        migrations.CreateModel(
+            name='EventMarketResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.CharField(help_text="Selection as stored on bets (e.g., '1', 'X', 'Over 2.5'); matched case-insensitively", max_length=50, verbose_name='Line')),
+                ('result', models.CharField(choices=[('win', 'Win'), ('lost', 'Lost'), ('canceled', 'Canceled(settled @1.00)')], max_length=10, verbose_name='Result')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bet_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='market_results', to='coupons.bettypedict', verbose_name='Bet type')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='market_results', to='coupons.event', verbose_name='Event')),
+            ],
+            options={
+                'verbose_name': 'Event market result',
+                'verbose_name_plural': 'Event market results',
+                'db_table': 'event_market_results',
+                'constraints': [models.UniqueConstraint(fields=('event', 'bet_type', 'line'), name='uniq_event_market_result')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventSettlementJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('last_bet_id', models.BigIntegerField(default=0)),
+                ('bets_resolved', models.PositiveIntegerField(default=0)),
+                ('coupons_settled', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='settlement_jobs', to='coupons.event')),
+            ],
+            options={
+                'verbose_name': 'Event settlement job',
+                'verbose_name_plural': 'Event settlement jobs',
+                'db_table': 'event_settlement_jobs',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='event_settle_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0 on 2026-10-17 22:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0016_event_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Team name')),
+                ('normalized_name', models.CharField(help_text='Case-folded, accent-stripped name (see EventParserService.normalize_team_name)', max_length=200, unique=True, verbose_name='Normalized name')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Team',
+                'verbose_name_plural': 'Teams',
+                'db_table': 'teams',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='away_team_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='away_events', to='coupons.team', verbose_name='Away team (canonical)'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='home_team_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='home_events', to='coupons.team', verbose_name='Home team (canonical)'),
+        ),
+        migrations.CreateModel(
+            name='TeamAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=200, verbose_name='Alias')),
+                ('normalized_alias', models.CharField(max_length=200, unique=True, verbose_name='Normalized alias')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='coupons.team', verbose_name='Team')),
+            ],
+            options={
+                'verbose_name': 'Team alias',
+                'verbose_name_plural': 'Team aliases',
+                'db_table': 'team_aliases',
+            },
+        ),
+    ]
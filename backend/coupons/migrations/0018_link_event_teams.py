@@ -0,0 +1,92 @@
+# Generated by Django 5.0 on 2026-10-17 22:45
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+# Frozen copies of EventParserService.parse_teams / normalize_team_name as of this
+# migration, so history does not change with the service
+SEPARATORS = ['vs.', 'vs', 'v.', 'v', '-', '–']
+TRANSLITERATE = str.maketrans({'ł': 'l', 'Ł': 'L', 'ø': 'o', 'Ø': 'O', 'đ': 'd', 'Đ': 'D', 'ß': 'ss'})
+NON_WORD = re.compile(r'[\W_]+')
+
+
+def parse_teams(event_name):
+    event_name = event_name.strip()
+    for separator in SEPARATORS:
+        if separator.lower() in event_name.lower():
+            parts = event_name.split(separator)
+            if len(parts) == 2:
+                return parts[0].strip(), parts[1].strip()
+    return None, None
+
+
+def normalize(team_name):
+    if not team_name:
+        return ''
+    text = unicodedata.normalize('NFKD', team_name.translate(TRANSLITERATE))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return ' '.join(NON_WORD.sub(' ', text).split())
+
+
+def link_existing_events(apps, schema_editor):
+    Event = apps.get_model('coupons', 'Event')
+    Team = apps.get_model('coupons', 'Team')
+    TeamAlias = apps.get_model('coupons', 'TeamAlias')
+
+    # Eventy z bulk_create kuponów nie miały rozbitych nazw drużyn
+    unparsed = Event.objects.filter(home_team__isnull=True, away_team__isnull=True).only('id', 'name')
+    batch = []
+    for event in unparsed.iterator(chunk_size=2000):
+        event.home_team, event.away_team = parse_teams(event.name or '')
+        if event.home_team or event.away_team:
+            batch.append(event)
+        if len(batch) >= 2000:
+            Event.objects.bulk_update(batch, ['home_team', 'away_team'])
+            batch = []
+    if batch:
+        Event.objects.bulk_update(batch, ['home_team', 'away_team'])
+
+    names = {}
+    for home, away in Event.objects.values_list('home_team', 'away_team').distinct().iterator():
+        for name in (home, away):
+            key = normalize(name)[:200]
+            if key:
+                names.setdefault(key, name.strip()[:200])
+    if not names:
+        return
+
+    # Teams that already exist (re-run after a rollback) are reused
+    team_ids = dict(Team.objects.filter(normalized_name__in=names).values_list('normalized_name', 'id'))
+    teams = Team.objects.bulk_create(
+        [Team(name=name, normalized_name=key) for key, name in names.items() if key not in team_ids],
+        batch_size=1000,
+    )
+    TeamAlias.objects.bulk_create(
+        [TeamAlias(team=team, alias=team.name, normalized_alias=team.normalized_name) for team in teams],
+        batch_size=1000,
+    )
+    team_ids.update((team.normalized_name, team.id) for team in teams)
+
+    batch = []
+    for event in Event.objects.only('id', 'home_team', 'away_team').iterator(chunk_size=2000):
+        event.home_team_ref_id = team_ids.get(normalize(event.home_team)[:200])
+        event.away_team_ref_id = team_ids.get(normalize(event.away_team)[:200])
+        batch.append(event)
+        if len(batch) >= 2000:
+            Event.objects.bulk_update(batch, ['home_team_ref', 'away_team_ref'])
+            batch = []
+    if batch:
+        Event.objects.bulk_update(batch, ['home_team_ref', 'away_team_ref'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0017_teams'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_existing_events, migrations.RunPython.noop),
+    ]
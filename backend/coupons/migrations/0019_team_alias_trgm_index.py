@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-17 22:47
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0018_link_event_teams'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='teamalias',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('normalized_alias', name='gin_trgm_ops'), name='team_alias_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0019_team_alias_trgm_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrresult',
+            name='raw_text',
+            field=models.TextField(blank=True, default='', help_text='Text exactly as the engine returned it (Tesseract items are words, not lines)'),
+        ),
+    ]
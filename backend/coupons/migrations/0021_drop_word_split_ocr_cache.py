@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-17 14:00
+
+from django.db import migrations
+
+
+def drop_entries_without_text(apps, schema_editor):
+    # Entries cached before raw_text existed can only rebuild the text from the
+    # recognised items, which for Tesseract are single words; let them be re-run
+    OCRResult = apps.get_model('coupons', 'OCRResult')
+    OCRResult.objects.filter(raw_text='').exclude(backend='paddle').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0020_ocr_result_raw_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_entries_without_text, migrations.RunPython.noop),
+    ]
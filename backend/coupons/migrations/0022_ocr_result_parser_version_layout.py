@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0021_drop_word_split_ocr_cache'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ocrresult',
+            name='parser_version',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-17 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupons', '0022_ocr_result_parser_version_layout'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ocrjob',
+            name='bookmaker_account',
+            field=models.IntegerField(blank=True, help_text='Account of the submitting user; picks the parse layout (none: detected from the text)', null=True),
+        ),
+    ]
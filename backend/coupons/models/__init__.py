@@ -4,7 +4,12 @@ from .discipline import Discipline
 from .bet_type_dict import BetTypeDict
 from .bet import Bet
 from .currency import Currency
+from .team import Team, TeamAlias
 from .event import Event
+from .ocr_result import OCRResult
+from .ocr_job import OCRJob
+from .event_market_result import EventMarketResult
+from .event_settlement_job import EventSettlementJob
 
 __all__ = [
     "Bookmaker",
@@ -13,5 +18,11 @@ __all__ = [
     "BetTypeDict",
     "Bet",
     "Currency",
+    "Team",
+    "TeamAlias",
     "Event",
+    "OCRResult",
+    "OCRJob",
+    "EventMarketResult",
+    "EventSettlementJob",
 ]
\ No newline at end of file
@@ -2,7 +2,6 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from common.choices import CouponType
-from decimal import Decimal, ROUND_HALF_UP
 
 
 class Coupon(models.Model):
@@ -67,6 +66,9 @@ class Coupon(models.Model):
 
     class Meta:
         db_table = 'coupons'
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='coupons_user_created_idx'),
+        ]
 
     def __str__(self):
         label = self.get_coupon_type_display()
@@ -79,18 +81,8 @@ class Coupon(models.Model):
 
     @property
     def potential_payout(self) -> float:
-        try:
-            tax_mult = Decimal(str(self.bookmaker_account.bookmaker.tax_multiplier))
-            currency_code = getattr(self.bookmaker_account.currency, 'code', None)
-        except Exception:
-            tax_mult = Decimal('1.00')
-            currency_code = None
-
-        bet_stake = Decimal(str(self.bet_stake))
-        multiplier = Decimal(str(self.multiplier))
-        gross = bet_stake * multiplier * tax_mult
-
-        if currency_code == 'PLN' and gross > Decimal('2280.00'):
-            gross = gross * (Decimal('1.00') - Decimal('0.10'))
-
-        return float(gross.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+        annotated = self.__dict__.get('net_payout')
+        if annotated is not None:
+            return float(annotated)
+        from coupons.services.payout_service import payout_for_coupon
+        return float(payout_for_coupon(self).rounded)
@@ -3,6 +3,7 @@ from django.utils.text import slugify
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from .discipline import Discipline
+from .team import Team
 
 class Event(models.Model):
     class EventStatus(models.TextChoices):
@@ -33,6 +34,22 @@ class Event(models.Model):
         blank=True,
         null=True,
     )
+    home_team_ref = models.ForeignKey(
+        Team,
+        on_delete=models.SET_NULL,
+        related_name="home_events",
+        verbose_name=_("Home team (canonical)"),
+        blank=True,
+        null=True,
+    )
+    away_team_ref = models.ForeignKey(
+        Team,
+        on_delete=models.SET_NULL,
+        related_name="away_events",
+        verbose_name=_("Away team (canonical)"),
+        blank=True,
+        null=True,
+    )
     discipline = models.ForeignKey(
         Discipline,
         on_delete=models.CASCADE,
@@ -43,6 +60,18 @@ class Event(models.Model):
         verbose_name=_("Start time"),
         help_text=_("Scheduled start time of the event"),
     )
+    home_score = models.PositiveSmallIntegerField(
+        verbose_name=_("Home score"),
+        help_text=_("Final score of the home team, used to settle bets on this event"),
+        blank=True,
+        null=True,
+    )
+    away_score = models.PositiveSmallIntegerField(
+        verbose_name=_("Away score"),
+        help_text=_("Final score of the away team, used to settle bets on this event"),
+        blank=True,
+        null=True,
+    )
 
     class Meta:
         db_table = 'events'
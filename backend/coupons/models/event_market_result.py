@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .bet import Bet
+from .bet_type_dict import BetTypeDict
+from .event import Event
+
+
+class EventMarketResult(models.Model):
+    """Outcome of one selection (bet type + line) on an event.
+
+    Takes precedence over outcomes derived from the event's final score.
+    """
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='market_results',
+        verbose_name=_("Event"),
+    )
+    bet_type = models.ForeignKey(
+        BetTypeDict,
+        on_delete=models.CASCADE,
+        related_name='market_results',
+        verbose_name=_("Bet type"),
+    )
+    line = models.CharField(
+        max_length=50,
+        verbose_name=_("Line"),
+        help_text=_("Selection as stored on bets (e.g., '1', 'X', 'Over 2.5'); matched case-insensitively"),
+    )
+    result = models.CharField(
+        max_length=10,
+        choices=Bet.BetResult.choices,
+        verbose_name=_("Result"),
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'event_market_results'
+        verbose_name = _("Event market result")
+        verbose_name_plural = _("Event market results")
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'bet_type', 'line'], name='uniq_event_market_result'),
+        ]
+
+    def __str__(self):
+        return f"EventMarketResult<{self.event_id}> • {self.bet_type_id} {self.line} • {self.result}"
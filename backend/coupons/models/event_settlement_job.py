@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils import timezone
+
+from .event import Event
+
+
+class EventSettlementJob(models.Model):
+    """Resolves the bets of one event in chunks of bet ids.
+
+    ``last_bet_id`` is the cursor: each chunk commits on its own, so a worker
+    that dies mid-way resumes after the last finished chunk.
+    """
+
+    class JobStatus(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='settlement_jobs',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=JobStatus.choices,
+        default=JobStatus.QUEUED,
+        db_index=True,
+    )
+    last_bet_id = models.BigIntegerField(default=0)
+    bets_resolved = models.PositiveIntegerField(default=0)
+    coupons_settled = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'event_settlement_jobs'
+        verbose_name = "Event settlement job"
+        verbose_name_plural = "Event settlement jobs"
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='event_settle_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"EventSettlementJob<{self.pk}> • event {self.event_id} • {self.status}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.JobStatus.DONE, self.JobStatus.FAILED)
@@ -0,0 +1,59 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class OCRJob(models.Model):
+    class JobStatus(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='ocr_jobs',
+        null=True,
+        blank=True,
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=JobStatus.choices,
+        default=JobStatus.QUEUED,
+        db_index=True,
+    )
+    image_name = models.CharField(max_length=255)
+    image_path = models.CharField(
+        max_length=500,
+        help_text="Absolute path of the image the worker should read"
+    )
+    parse = models.BooleanField(default=True)
+    bookmaker_account = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Account of the submitting user; picks the parse layout (none: detected from the text)"
+    )
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ocr_jobs'
+        verbose_name = "OCR Job"
+        verbose_name_plural = "OCR Jobs"
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='ocr_job_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"OCRJob<{self.pk}> • {self.image_name} • {self.status}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.JobStatus.DONE, self.JobStatus.FAILED)
@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OCRResult(models.Model):
+    image_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 of the raw image bytes"
+    )
+    backend = models.CharField(max_length=20)
+    engine_version = models.CharField(max_length=50, default='unknown')
+    rec_texts = models.JSONField(default=list, blank=True)
+    rec_scores = models.JSONField(default=list, blank=True)
+    raw_text = models.TextField(
+        blank=True,
+        default='',
+        help_text="Text exactly as the engine returned it (Tesseract items are words, not lines)"
+    )
+    average_confidence = models.FloatField(default=0.0)
+    parsed = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="CouponParser output for the recognised text"
+    )
+    parser_version = models.CharField(max_length=50, blank=True, default='')
+    size_bytes = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'ocr_results'
+        verbose_name = "OCR Result"
+        verbose_name_plural = "OCR Results"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["image_hash", "backend", "engine_version"],
+                name="uniq_ocr_result_image_backend_version",
+            )
+        ]
+
+    def __str__(self):
+        return f"OCRResult<{self.image_hash[:12]}> • {self.backend} {self.engine_version}"
+
+    @property
+    def text(self) -> str:
+        if self.raw_text:
+            return self.raw_text
+        return '\n'.join(self.rec_texts or [])
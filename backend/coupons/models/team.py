@@ -0,0 +1,61 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Team(models.Model):
+    """Canonical team; events point at it through their home/away team names."""
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name=_("Team name"),
+    )
+    normalized_name = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name=_("Normalized name"),
+        help_text=_("Case-folded, accent-stripped name (see EventParserService.normalize_team_name)"),
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'teams'
+        verbose_name = _("Team")
+        verbose_name_plural = _("Teams")
+        ordering = ('name',)
+
+    def __str__(self):
+        return self.name
+
+
+class TeamAlias(models.Model):
+    """Spelling of a team name seen on events; every team has at least its own
+    normalized name as an alias."""
+
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        related_name='aliases',
+        verbose_name=_("Team"),
+    )
+    alias = models.CharField(
+        max_length=200,
+        verbose_name=_("Alias"),
+    )
+    normalized_alias = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name=_("Normalized alias"),
+    )
+
+    class Meta:
+        db_table = 'team_aliases'
+        verbose_name = _("Team alias")
+        verbose_name_plural = _("Team aliases")
+        indexes = [
+            GinIndex(OpClass('normalized_alias', name='gin_trgm_ops'), name='team_alias_trgm_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.alias} → {self.team_id}"
@@ -0,0 +1,41 @@
+"""Entry points executed inside OCR batch worker processes.
+
+Worker processes are started with the ``spawn`` method, so this module must be
+importable before Django is configured: everything Django-related is imported
+lazily inside the functions. Each process builds its OCR engine once in the
+pool initializer and reuses it for every image it is handed.
+"""
+import time
+from typing import Any, Dict, Optional
+
+_engine = None
+
+
+def init_ocr_process(backend: str) -> None:
+    global _engine
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from coupons.services.ocr_service import OCRService
+    _engine = OCRService(backend=backend)
+
+
+def run_ocr_and_parse(image_path: str, bookmaker_account: Optional[int], engine: Optional[Any] = None) -> Dict[str, Any]:
+    from coupons.services.coupon_layouts import parse_coupon_text
+
+    engine = engine or _engine
+    if engine is None:
+        raise RuntimeError("OCR process was not initialised")
+
+    started = time.perf_counter()
+    ocr = engine.extract(image_path)
+    ocr_ms = (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    parsed = parse_coupon_text(ocr.get('text', ''), bookmaker_account=bookmaker_account)
+    parse_ms = (time.perf_counter() - started) * 1000.0
+
+    return {'ocr': ocr, 'parsed': parsed, 'ocr_ms': ocr_ms, 'parse_ms': parse_ms}
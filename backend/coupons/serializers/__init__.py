@@ -1,2 +1,2 @@
-from .event_serializer import EventSerializer, EventCreateSerializer, EventUpdateSerializer
+from .event_serializer import EventSerializer, EventCreateSerializer, EventUpdateSerializer, EventResultSerializer
 
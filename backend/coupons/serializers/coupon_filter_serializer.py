@@ -76,6 +76,10 @@ class QueryBuilderRequestSerializer(serializers.Serializer):
     conditions = serializers.JSONField(
         help_text="Warunki filtrowania w formacie JSON"
     )
+    save = serializers.BooleanField(
+        default=False,
+        help_text="Zapisz zapytanie jako AnalyticsQuery (domyślnie wykonywane bez zapisu)"
+    )
     # Example:
     # {
     #   "conditions": [
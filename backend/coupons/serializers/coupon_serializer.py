@@ -1,9 +1,10 @@
+from collections import Counter
 from decimal import Decimal
 from typing import Dict, Any
 
 from rest_framework import serializers
 from common.choices import CouponType
-from ..models import Coupon
+from ..models import Bet, Coupon
 from .bet_serializer import BetSerializer, BetCreateSerializer
 from common.serializers.fields import UserAwareDateTimeField
 from finances.models.bookmaker_account import BookmakerAccountModel
@@ -168,6 +169,33 @@ class CouponCopySerializer(serializers.Serializer):
             'bets',
         ]
 
+class BetSettleResultSerializer(serializers.Serializer):
+    bet_id = serializers.IntegerField()
+    result = serializers.ChoiceField(choices=Bet.BetResult.choices)
+
+
+class CouponSettleItemSerializer(serializers.Serializer):
+    coupon_id = serializers.IntegerField()
+    set_all_result = serializers.ChoiceField(choices=Bet.BetResult.choices, required=False)
+    bets = BetSettleResultSerializer(many=True, required=False)
+
+
+class CouponBulkSettleSerializer(serializers.Serializer):
+    coupons = CouponSettleItemSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_coupons(self, items):
+        counts = Counter(item['coupon_id'] for item in items)
+        duplicates = sorted(coupon_id for coupon_id, count in counts.items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Duplicate coupon_id: {', '.join(map(str, duplicates))}.")
+        return items
+
+
+class CouponBulkSettleResponseSerializer(serializers.Serializer):
+    coupons = CouponSerializer(many=True)
+    missing = serializers.ListField(child=serializers.IntegerField())
+
+
 class BalanceTrendPointSerializer(serializers.Serializer):
     date = serializers.DateField()
     balance = serializers.DecimalField(max_digits=12, decimal_places=2)
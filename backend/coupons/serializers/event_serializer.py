@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from ..models import Event, Discipline
+from ..models import Bet, BetTypeDict, Event, Discipline
 from common.serializers.fields import UserAwareDateTimeField
 
 
@@ -17,6 +17,8 @@ class EventSerializer(serializers.ModelSerializer):
             "name",
             "discipline",
             "start_time",
+            "home_score",
+            "away_score",
             "created_at",
             "updated_at",
         )
@@ -48,3 +50,23 @@ class EventUpdateSerializer(serializers.ModelSerializer):
             "start_time",
         )
 
+
+class EventMarketResultSerializer(serializers.Serializer):
+    bet_type = serializers.SlugRelatedField(slug_field="code", queryset=BetTypeDict.objects.all())
+    line = serializers.CharField(max_length=50)
+    result = serializers.ChoiceField(choices=Bet.BetResult.choices)
+
+
+class EventResultSerializer(serializers.Serializer):
+    home_score = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+    away_score = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+    markets = EventMarketResultSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        has_home = attrs.get("home_score") is not None
+        has_away = attrs.get("away_score") is not None
+        if has_home != has_away:
+            raise serializers.ValidationError("home_score and away_score must be given together.")
+        if not has_home and not attrs.get("markets"):
+            raise serializers.ValidationError("Provide a final score or at least one market result.")
+        return attrs
@@ -33,6 +33,9 @@ class BetService:
                 defaults={"start_time": start_time or timezone.now()},
             )
             bet_data['event'] = event_obj
+            if event_obj.home_team_ref_id is None and event_obj.away_team_ref_id is None:
+                from .team_service import link_event_teams
+                link_event_teams([event_obj])
 
         bet = Bet.objects.create(coupon=coupon, **bet_data)
         recalc_coupon_odds(coupon)
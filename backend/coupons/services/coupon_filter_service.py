@@ -1,7 +1,9 @@
-from django.db.models import QuerySet, Prefetch
+from django.db.models import QuerySet, Prefetch, Sum
 from typing import Optional, List, Dict, Any
 from ..models import Coupon, Bet, BetTypeDict
-from coupon_analytics.models.queries import AnalyticsQuery, AnalyticsQueryGroup, AnalyticsQueryCondition
+from .payout_service import total_payout as get_total_payout
+from .team_service import team_q
+from coupon_analytics.services.filter_spec import FilterGroup, FilterSpec
 from coupon_analytics.services.query_builder import AnalyticsQueryBuilder
 
 
@@ -80,8 +82,8 @@ class CouponFilterService:
         lost_count = coupons.filter(status=Coupon.CouponStatus.LOST).count()
         in_progress_count = coupons.filter(status=Coupon.CouponStatus.IN_PROGRESS).count()
 
-        total_stake = sum(float(c.bet_stake) for c in coupons)
-        total_payout = sum(c.potential_payout for c in coupons)
+        total_stake = float(coupons.order_by().aggregate(total=Sum('bet_stake'))['total'] or 0)
+        total_payout = float(get_total_payout(coupons))
 
         yield_percentage = 0
         if total_payout > 0:
@@ -114,77 +116,30 @@ class CouponFilterService:
 
 
 class UniversalCouponFilterService:
+    """Builds filters as in-memory ``FilterSpec``s. Nothing is written to the
+    database unless the caller saves the spec."""
 
     @staticmethod
-    def build_team_position_query(
-        user,
-        query: AnalyticsQuery,
-        parent_group: AnalyticsQueryGroup,
+    def build_team_position_group(
+        group: FilterGroup,
         team_name: str,
         position: str,
-        order_idx: int
-    ) -> int:
+    ) -> None:
         if position == 'home':
-            AnalyticsQueryCondition.objects.create(
-                group=parent_group,
-                field='bets__event__home_team',
-                operator='contains',
-                value=team_name,
-                order=order_idx
-            )
-            order_idx += 1
-            AnalyticsQueryCondition.objects.create(
-                group=parent_group,
-                field='bets__line',
-                operator='equals',
-                value='1',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__event__home_team', 'contains', team_name)
+            group.add('bets__line', 'equals', '1')
         elif position == 'away':
-            AnalyticsQueryCondition.objects.create(
-                group=parent_group,
-                field='bets__event__away_team',
-                operator='contains',
-                value=team_name,
-                order=order_idx
-            )
-            order_idx += 1
-            AnalyticsQueryCondition.objects.create(
-                group=parent_group,
-                field='bets__line',
-                operator='equals',
-                value='2',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__event__away_team', 'contains', team_name)
+            group.add('bets__line', 'equals', '2')
         else:
-            home_group = AnalyticsQueryGroup.objects.create(
-                analytics_query=query,
-                operator='OR',
-                parent=parent_group,
-                order=0
+            group.subgroups.append(
+                FilterGroup(operator='OR')
+                .add('bets__event__home_team', 'contains', team_name)
+                .add('bets__event__away_team', 'contains', team_name)
             )
-            AnalyticsQueryCondition.objects.create(
-                group=home_group,
-                field='bets__event__home_team',
-                operator='contains',
-                value=team_name,
-                order=0
-            )
-            AnalyticsQueryCondition.objects.create(
-                group=home_group,
-                field='bets__event__away_team',
-                operator='contains',
-                value=team_name,
-                order=1
-            )
-            order_idx = 1
-
-        return order_idx
 
     @staticmethod
-    def build_universal_filter_query(
+    def build_universal_filter_spec(
         user,
         team_name: Optional[str] = None,
         position: str = 'any',
@@ -192,112 +147,41 @@ class UniversalCouponFilterService:
         filter_mode: str = 'all',
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-    ) -> AnalyticsQuery:
+    ) -> FilterSpec:
         filter_name = []
         if team_name:
             filter_name.append(f'{team_name} ({position})')
         if bet_type_code:
             filter_name.append(bet_type_code)
 
-        query = AnalyticsQuery.objects.create(
-            user=user,
-            name=f'Filter: {" + ".join(filter_name)}' if filter_name else 'Universal Filter',
-            start_date=start_date,
-            end_date=end_date,
-        )
-
-        group = AnalyticsQueryGroup.objects.create(
-            analytics_query=query,
-            operator='AND',
-            parent=None,
-            order=0
-        )
-
-        order_idx = 0
+        group = FilterGroup(operator='AND')
 
         if team_name:
-            order_idx = UniversalCouponFilterService.build_team_position_query(
-                user=user,
-                query=query,
-                parent_group=group,
-                team_name=team_name,
-                position=position,
-                order_idx=order_idx
-            )
+            UniversalCouponFilterService.build_team_position_group(group, team_name, position)
 
         if bet_type_code:
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='bets__bet_type__code',
-                operator='equals',
-                value=bet_type_code,
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__bet_type__code', 'equals', bet_type_code)
 
         if filter_mode == 'won_coupons':
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='status',
-                operator='equals',
-                value='won',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('status', 'equals', 'won')
         elif filter_mode == 'won_bets':
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='bets__result',
-                operator='equals',
-                value='win',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__result', 'equals', 'win')
         elif filter_mode == 'won_bets_lost_coupons':
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='bets__result',
-                operator='equals',
-                value='win',
-                order=order_idx
-            )
-            order_idx += 1
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='status',
-                operator='equals',
-                value='lost',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__result', 'equals', 'win')
+            group.add('status', 'equals', 'lost')
         elif filter_mode == 'lost_bets':
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='bets__result',
-                operator='equals',
-                value='lost',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__result', 'equals', 'lost')
         elif filter_mode == 'lost_bets_won_coupons':
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='bets__result',
-                operator='equals',
-                value='lost',
-                order=order_idx
-            )
-            order_idx += 1
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field='status',
-                operator='equals',
-                value='won',
-                order=order_idx
-            )
-            order_idx += 1
+            group.add('bets__result', 'equals', 'lost')
+            group.add('status', 'equals', 'won')
 
-        return query
+        return FilterSpec(
+            user_id=user.id,
+            name=f'Filter: {" + ".join(filter_name)}' if filter_name else 'Universal Filter',
+            start_date=start_date,
+            end_date=end_date,
+            groups=[group],
+        )
 
     @staticmethod
     def apply_universal_filter(
@@ -308,10 +192,10 @@ class UniversalCouponFilterService:
         filter_mode: str = 'all',
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-    ) -> tuple[AnalyticsQuery, QuerySet]:
+    ) -> tuple[FilterSpec, QuerySet]:
         from django.db.models import Exists, OuterRef, Q
 
-        query = UniversalCouponFilterService.build_universal_filter_query(
+        spec = UniversalCouponFilterService.build_universal_filter_spec(
             user=user,
             team_name=team_name,
             position=position,
@@ -331,12 +215,7 @@ class UniversalCouponFilterService:
         bet_filter = Q()
 
         if team_name:
-            if position == 'home':
-                bet_filter &= Q(event__home_team__icontains=team_name)
-            elif position == 'away':
-                bet_filter &= Q(event__away_team__icontains=team_name)
-            else:
-                bet_filter &= (Q(event__home_team__icontains=team_name) | Q(event__away_team__icontains=team_name))
+            bet_filter &= team_q(team_name, position, prefix='event__')
 
         if bet_type_code:
             bet_filter &= Q(bet_type__code=bet_type_code)
@@ -362,7 +241,7 @@ class UniversalCouponFilterService:
 
         coupons = coupons.distinct()
 
-        return query, coupons
+        return spec, coupons
 
     @staticmethod
     def build_custom_query(
@@ -371,34 +250,23 @@ class UniversalCouponFilterService:
         conditions: List[Dict[str, Any]],
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-    ) -> tuple[AnalyticsQuery, QuerySet]:
-        query = AnalyticsQuery.objects.create(
-            user=user,
+    ) -> tuple[FilterSpec, QuerySet]:
+        group = FilterGroup(operator='AND')
+        for cond in conditions:
+            group.add(
+                cond.get('field'),
+                cond.get('operator', 'equals'),
+                cond.get('value'),
+                cond.get('negate', False),
+            )
+
+        spec = FilterSpec(
+            user_id=user.id,
             name=name,
             start_date=start_date,
             end_date=end_date,
+            groups=[group],
         )
+        coupons = AnalyticsQueryBuilder(spec).apply()
 
-        group = AnalyticsQueryGroup.objects.create(
-            analytics_query=query,
-            operator='AND',
-            parent=None,
-            order=0
-        )
-
-        for idx, cond in enumerate(conditions):
-            AnalyticsQueryCondition.objects.create(
-                group=group,
-                field=cond.get('field'),
-                operator=cond.get('operator', 'equals'),
-                value=cond.get('value'),
-                negate=cond.get('negate', False),
-                order=idx
-            )
-
-        builder = AnalyticsQueryBuilder(query)
-        coupons = builder.apply()
-
-        return query, coupons
-
-
+        return spec, coupons
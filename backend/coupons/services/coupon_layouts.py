@@ -0,0 +1,183 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .coupon_parser_v2 import (
+    GENERIC_GRAMMAR,
+    GRAMMARS,
+    NOISE_WORDS,
+    BookmakerGrammar,
+    PARSER_VERSION,
+    CouponParserV2,
+)
+
+# Weights of the words that tell one layout from the others
+MARKER_WEIGHT = 5
+STAKE_LABEL_WEIGHT = 2
+MULTI_MARKER_WEIGHT = 2
+NOISE_WEIGHT = 1
+SEPARATOR_WEIGHT = 1
+MIN_LAYOUT_SCORE = 3
+
+LAYOUT_CACHE_VERSION = 1
+
+
+def _own_words(words: Iterable[str], common: Iterable[str]) -> List[str]:
+    shared = {word.casefold() for word in common}
+    return [word for word in words if word.casefold() not in shared]
+
+
+class LayoutClassifier:
+    """Fingerprints OCR text against the registered layouts.
+
+    Every distinctive word of a grammar (bookmaker name, its own stake labels,
+    multi-bet markers, noise words and separators) is casefolded once, and the
+    text once per call, so each word is a plain substring test; bookmaker
+    names are then checked for word boundaries. The best layout wins if it
+    reaches ``MIN_LAYOUT_SCORE``; otherwise the text is generic.
+    """
+
+    def __init__(self, grammars: Iterable[BookmakerGrammar]):
+        self.grammars = {grammar.name: grammar for grammar in grammars}
+        features: Dict[Tuple[str, bool], List[Tuple[str, int]]] = defaultdict(list)
+        for grammar in self.grammars.values():
+            for words, weight, whole_word in (
+                (grammar.markers, MARKER_WEIGHT, True),
+                (_own_words(grammar.stake_labels, GENERIC_GRAMMAR.stake_labels), STAKE_LABEL_WEIGHT, False),
+                (grammar.multi_markers, MULTI_MARKER_WEIGHT, False),
+                (_own_words(grammar.noise, NOISE_WORDS), NOISE_WEIGHT, False),
+                (_own_words(grammar.separators, GENERIC_GRAMMAR.separators), SEPARATOR_WEIGHT, False),
+            ):
+                for word in dict.fromkeys(word.casefold() for word in words):
+                    features[(word, whole_word)].append((grammar.name, weight))
+
+        # Longer words first; a found word that contains shorter ones is blanked
+        # out of the text, so 'Zakład łączony' is not also read as 'Zakład'
+        ordered = sorted(features.items(), key=lambda item: -len(item[0][0]))
+        words = [word for (word, _), _ in ordered]
+        self.features = [
+            (
+                word,
+                re.compile(rf'\b{re.escape(word)}\b') if whole_word else None,
+                any(other in word for other in words[index + 1:]),
+                layouts,
+            )
+            for index, ((word, whole_word), layouts) in enumerate(ordered)
+        ]
+
+    def scores(self, text: str) -> Dict[str, int]:
+        folded = text.casefold()
+        scores: Dict[str, int] = {}
+        for word, boundary, shadows, layouts in self.features:
+            if word not in folded or (boundary is not None and boundary.search(folded) is None):
+                continue
+            if shadows:
+                folded = folded.replace(word, '\0') if boundary is None else boundary.sub('\0', folded)
+            for layout, weight in layouts:
+                scores[layout] = scores.get(layout, 0) + weight
+        return scores
+
+    def classify(self, text: str) -> BookmakerGrammar:
+        scores = self.scores(text)
+        best, best_score = GENERIC_GRAMMAR, MIN_LAYOUT_SCORE - 1
+        # Strictly greater: ties go to the earlier registered layout
+        for name, grammar in self.grammars.items():
+            score = scores.get(name, 0)
+            if score > best_score:
+                best, best_score = grammar, score
+        return best
+
+
+class LayoutRouter:
+    """Sends OCR text to the parse plugin of its layout.
+
+    The layout of a bookmaker account follows from its bookmaker and is kept
+    in the cache, so coupons of a known account go straight to their plugin
+    and parse in one pass. Text of unknown accounts (or none) is classified
+    every time. Callers only pass accounts of the requesting user.
+    """
+
+    def __init__(self):
+        self.parsers: Dict[str, CouponParserV2] = {GENERIC_GRAMMAR.name: CouponParserV2(GENERIC_GRAMMAR)}
+        self.classifier = LayoutClassifier([])
+
+    def register(self, grammar: BookmakerGrammar, parser_class: Type[CouponParserV2] = CouponParserV2) -> None:
+        GRAMMARS[grammar.name] = grammar
+        self.parsers[grammar.name] = parser_class(grammar)
+        self.classifier = LayoutClassifier(GRAMMARS.values())
+
+    @staticmethod
+    def _cache_key(bookmaker_account: int) -> str:
+        return f"ocr_layout:v{LAYOUT_CACHE_VERSION}:{bookmaker_account}"
+
+    def _account_layout(self, bookmaker_account: int) -> Optional[str]:
+        from finances.models import BookmakerAccountModel
+
+        name = (
+            BookmakerAccountModel.objects.filter(pk=bookmaker_account)
+            .values_list('bookmaker__name', flat=True)
+            .first()
+        )
+        if name is None:
+            return None
+        key = name.casefold()
+        for grammar in GRAMMARS.values():
+            if key == grammar.name or key in (marker.casefold() for marker in grammar.markers):
+                return grammar.name
+        return GENERIC_GRAMMAR.name
+
+    def layout_for_account(self, bookmaker_account: Optional[int]) -> Optional[str]:
+        if not bookmaker_account:
+            return None
+        key = self._cache_key(bookmaker_account)
+        layout = cache.get(key)
+        if layout is None:
+            layout = self._account_layout(bookmaker_account)
+            if layout is None:
+                return None
+            cache.set(key, layout, getattr(settings, 'OCR_LAYOUT_CACHE_TIMEOUT', 86400))
+        return layout if layout in self.parsers else None
+
+    def layout(self, text: str, bookmaker_account: Optional[int] = None) -> str:
+        layout = self.layout_for_account(bookmaker_account)
+        return layout if layout is not None else self.classifier.classify(text).name
+
+    def route(self, text: str, bookmaker_account: Optional[int] = None) -> CouponParserV2:
+        return self.parsers[self.layout(text, bookmaker_account)]
+
+    def forget(self, bookmaker_account: int) -> None:
+        cache.delete(self._cache_key(bookmaker_account))
+
+
+_router = LayoutRouter()
+for _grammar in list(GRAMMARS.values()):
+    _router.register(_grammar)
+
+
+def register_layout(grammar: BookmakerGrammar, parser_class: Type[CouponParserV2] = CouponParserV2) -> None:
+    _router.register(grammar, parser_class)
+
+
+def detect_grammar(text: str) -> BookmakerGrammar:
+    return _router.classifier.classify(text)
+
+
+def resolve_layout(text: str, bookmaker_account: Optional[int] = None) -> str:
+    return _router.layout(text, bookmaker_account)
+
+
+def parsed_cache_version(layout: str) -> str:
+    """Version stamped on cached parses: the same image parses differently per layout."""
+    return f"{PARSER_VERSION}:{layout}"
+
+
+def parse_coupon_text(text: str, bookmaker_account: Optional[int] = None, layout: Optional[str] = None) -> Dict:
+    parser = _router.parsers[layout] if layout in _router.parsers else _router.route(text, bookmaker_account)
+    return parser.parse(text, bookmaker_account=bookmaker_account).to_dict()
+
+
+def forget_account_layout(bookmaker_account: int) -> None:
+    _router.forget(bookmaker_account)
@@ -1,7 +1,34 @@
 import re
 from datetime import datetime
-from typing import List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
+
+PARSER_VERSION = '2.2'
+
+DATE_RE = re.compile(r'(\d{1,2}[./]\d{1,2}[./]\d{4})')
+TIME_RE = re.compile(r'(\d{1,2}:\d{2})')
+NUMBER_LINE_RE = re.compile(r'^\d+[.,]?\d*$')
+DASH_PREFIX_RE = re.compile(r'^\s*-\s*')
+WHITESPACE_RE = re.compile(r'\s+')
+ODDS_RE = re.compile(r'^\d+\.\d{2}$')
+AMOUNT_LINE_RE = re.compile(r'^\d+[.,]\d+$')
+INLINE_STAKE_RE = re.compile(r'(\d+[.,]?\d+)')
+AMOUNT_RE = re.compile(r'(\d+[.,]\d+)')
+
+NOISE_WORDS = (
+    'Stawka', 'Vynik', 'Wygrana', 'Informacje', 'Bonusy', 'Wskaznik', 'Pitka',
+    'Udostepnij', 'Kopiuj', 'Zglos', 'Zmien', 'Calkowity', 'Kurs',
+)
+MULTI_MARKERS = ('AKO', '2UP', '3UP', '4UP', 'MULTIPLE')
+
+ODDS_LOOKAHEAD = 8
+STAKE_LOOKAHEAD = 4
+MIN_ODDS, MAX_ODDS = 1.01, 100.0
+MIN_STAKE, MAX_STAKE = 0.5, 100000
+
+
+def _alternation(words) -> str:
+    return '|'.join(re.escape(word) for word in words)
 
 
 @dataclass
@@ -15,16 +42,16 @@ class Bet:
 
 @dataclass
 class CouponInput:
-    bookmaker_account: int
+    bookmaker_account: Optional[int]
     coupon_type: str = "SOLO"
     bet_stake: str = "0.00"
     placed_at: Optional[str] = None
     bets: List[Bet] = None
-    
+
     def __post_init__(self):
         if self.bets is None:
             self.bets = []
-    
+
     def to_dict(self):
         return {
             "bookmaker_account": self.bookmaker_account,
@@ -35,145 +62,197 @@ class CouponInput:
         }
 
 
+@dataclass
+class BookmakerGrammar:
+    """Layout words of one bookmaker's coupon screenshots.
+
+    ``markers`` identify the bookmaker in the OCR text; the remaining words
+    extend the generic layout, which is what every coupon falls back to.
+    """
+    name: str
+    markers: Tuple[str, ...] = ()
+    stake_labels: Tuple[str, ...] = ('Stawka',)
+    noise: Tuple[str, ...] = ()
+    multi_markers: Tuple[str, ...] = ()
+    separators: Tuple[str, ...] = (' - ',)
+
+    stake_re: re.Pattern = field(init=False, repr=False)
+    noise_re: re.Pattern = field(init=False, repr=False)
+    multi_re: re.Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.stake_re = re.compile(_alternation(self.stake_labels))
+        self.noise_re = re.compile(_alternation(NOISE_WORDS + self.noise), re.IGNORECASE)
+        self.multi_re = re.compile(_alternation(MULTI_MARKERS + self.multi_markers), re.IGNORECASE)
+
+    def has_separator(self, line: str) -> bool:
+        for separator in self.separators:
+            if separator in line:
+                return True
+        return False
+
+    def is_event_line(self, line: str) -> bool:
+        for separator in self.separators:
+            if separator in line:
+                return all(part.strip() for part in line.split(separator))
+        return False
+
+
+GENERIC_GRAMMAR = BookmakerGrammar(name='generic')
+
+GRAMMARS: Dict[str, BookmakerGrammar] = {
+    grammar.name: grammar
+    for grammar in (
+        BookmakerGrammar(
+            name='sts',
+            markers=('STS',),
+            stake_labels=('Stawka', 'STAWKA'),
+            noise=('Zakład', 'Potencjalna', 'Podatek'),
+            multi_markers=('Kupon łączony',),
+        ),
+        BookmakerGrammar(
+            name='fortuna',
+            markers=('Fortuna', 'eFortuna'),
+            stake_labels=('Stawka', 'Wkład'),
+            noise=('Wkład', 'Podatek', 'Do wygrania'),
+            multi_markers=('KOMBI',),
+        ),
+        BookmakerGrammar(
+            name='betclic',
+            markers=('Betclic',),
+            stake_labels=('Stawka', 'Kwota zakładu'),
+            noise=('Kwota', 'Potencjalna', 'Cash out'),
+            multi_markers=('Zakład łączony', 'Kombinacja'),
+            separators=(' - ', ' vs '),
+        ),
+        BookmakerGrammar(
+            name='superbet',
+            markers=('Superbet',),
+            stake_labels=('Stawka', 'STAWKA'),
+            noise=('Superkurs', 'Potencjalna', 'Podatek'),
+            multi_markers=('Złożony',),
+        ),
+    )
+}
+
+
 class CouponParserV2:
+    """Single-pass coupon parser with precompiled patterns.
+
+    Date, time and coupon type come from one search over the whole text.
+    Stake and bets each walk the lines once: OCR-split ``Home`` / ``- Away``
+    lines are glued back, then every line is classified (event, odds, noise)
+    as it is reached instead of being re-scanned from each event. Layout
+    words come from the bookmaker grammar found in the text, or the generic
+    one. A parser built for one grammar is the parse plugin of that layout
+    (see ``coupon_layouts``) and skips detection.
+    """
+
+    def __init__(self, grammar: Optional[BookmakerGrammar] = None):
+        self.grammar = grammar
+
+    def parse(self, ocr_text: str, bookmaker_account: int = 1, bookmaker: Optional[str] = None) -> CouponInput:
+        grammar = self.grammar or GRAMMARS.get((bookmaker or '').lower())
+        if grammar is None:
+            from .coupon_layouts import detect_grammar
+            grammar = detect_grammar(ocr_text)
+        lines = [line for line in map(str.strip, ocr_text.split('\n')) if line]
+        date_match = DATE_RE.search(ocr_text)
+        time_match = TIME_RE.search(ocr_text)
 
-    def __init__(self):
-        self.text_lines = []
-        self.parsed_data = {}
-    
-    def parse(self, ocr_text: str, bookmaker_account: int = 1) -> CouponInput:
-        self.text_lines = [line.strip() for line in ocr_text.split('\n') if line.strip()]
-        self.parsed_data = {}
-        
-        self._extract_dates_and_times()
-        self._extract_bets_and_odds()
-        self._extract_stake()
-        self._extract_coupon_type()
-        
-        coupon = CouponInput(
+        return CouponInput(
             bookmaker_account=bookmaker_account,
-            coupon_type=self.parsed_data.get('coupon_type', 'SOLO'),
-            bet_stake=self.parsed_data.get('bet_stake', '0.00'),
-            placed_at=self.parsed_data.get('placed_at'),
-            bets=self.parsed_data.get('bets', [])
+            coupon_type='AKO' if grammar.multi_re.search(ocr_text) else 'SOLO',
+            bet_stake=self._extract_stake(lines, grammar),
+            placed_at=self._format_datetime(date_match.group(1), time_match.group(1)) if date_match and time_match else None,
+            bets=self._extract_bets(self.merge_split_events(lines, grammar), grammar),
         )
-        
-        return coupon
-    
-    def _extract_dates_and_times(self):
-        dates: List[str] = []
-        times: List[str] = []
-
-        for line in self.text_lines:
-            date_match = re.search(r'(\d{1,2}[./]\d{1,2}[./]\d{4})', line)
-            if date_match:
-                dates.append(date_match.group(1))
-            
-            time_match = re.search(r'(\d{1,2}:\d{2})', line)
-            if time_match:
-                times.append(time_match.group(1))
-        
-        self.parsed_data['dates'] = dates
-        self.parsed_data['times'] = times
-        
-        if dates and times:
-            date_str = dates[0]
-            time_str = times[0]
-            self.parsed_data['placed_at'] = self._format_datetime(date_str, time_str)
-    
-    def _extract_bets_and_odds(self):
-        normalized: List[str] = []
-        skip_next = False
-        for i, line in enumerate(self.text_lines):
-            if skip_next:
-                skip_next = False
-                continue
-            if i + 1 < len(self.text_lines):
-                nxt = self.text_lines[i + 1]
-
-                if ' - ' not in line and (nxt.startswith('-') or nxt.startswith(' - ')):
-                    if not re.match(r'^\d+[.,]?\d*$', line):
-                        right = re.sub(r'^\s*-\s*', '', nxt)
-                        merged = (line + ' - ' + right).replace('  ', ' ').strip()
-                        normalized.append(merged)
-                        skip_next = True
-                        continue
-            normalized.append(line)
 
+    @staticmethod
+    def merge_split_events(lines: List[str], grammar: BookmakerGrammar = GENERIC_GRAMMAR) -> List[str]:
+        merged: List[str] = []
+        mergeable = False
+        for line in lines:
+            if mergeable and line[0] == '-':
+                previous = merged[-1]
+                if not grammar.has_separator(previous) and not NUMBER_LINE_RE.match(previous):
+                    merged[-1] = (previous + ' - ' + DASH_PREFIX_RE.sub('', line)).replace('  ', ' ').strip()
+                    mergeable = False
+                    continue
+            merged.append(line)
+            mergeable = True
+        return merged
+
+    @staticmethod
+    def _extract_bets(lines: List[str], grammar: BookmakerGrammar) -> List[Bet]:
+        """An event takes the first odds line within ``ODDS_LOOKAHEAD`` lines
+        that comes before the next event."""
+        is_event_line = grammar.is_event_line
+        is_noise = grammar.noise_re.search
         bets: List[Bet] = []
-        used_indices = set()
+        open_bet: Optional[Bet] = None
+        remaining = 0
 
-        def is_event_line(l: str) -> bool:
-            return ' - ' in l and len(l.split(' - ')) >= 2 and all(part.strip() for part in l.split(' - '))
+        for line in lines:
+            if is_event_line(line):
+                open_bet = Bet(event_name=WHITESPACE_RE.sub(' ', line), odds='1.00', bet_type='1X2')
+                bets.append(open_bet)
+                remaining = ODDS_LOOKAHEAD
+            elif open_bet is not None:
+                remaining -= 1
+                if ODDS_RE.match(line) and not is_noise(line) and MIN_ODDS <= float(line) <= MAX_ODDS:
+                    open_bet.odds = line
+                    open_bet = None
+                elif not remaining:
+                    open_bet = None
+        return bets
 
-        for i, line in enumerate(normalized):
-            if i in used_indices:
-                continue
-            if not is_event_line(line):
-                continue
-            event_name = re.sub(r'\s+', ' ', line.strip())
-            odds = "1.00"
-            for j in range(i + 1, min(i + 9, len(normalized))):
-                if is_event_line(normalized[j]):
+    @staticmethod
+    def _extract_stake(lines: List[str], grammar: BookmakerGrammar) -> str:
+        """The amount next to (or up to ``STAKE_LOOKAHEAD`` lines below) the
+        first stake label that has one; otherwise the first plausible amount."""
+        is_label = grammar.stake_re.search
+        labelled: Optional[Tuple[int, str]] = None
+        waiting: List[int] = []
+        fallback: Optional[str] = None
+
+        for index, line in enumerate(lines):
+            if waiting:
+                waiting = [label for label in waiting if index - label <= STAKE_LOOKAHEAD]
+                if waiting and AMOUNT_LINE_RE.match(line):
+                    if labelled is None or waiting[0] < labelled[0]:
+                        labelled = (waiting[0], line)
+                    waiting = []
+            if labelled is not None:
+                if not waiting:
                     break
-                candidate = normalized[j].strip()
-                if re.search(r'(Stawka|Vynik|Wygrana|Informacje|Bonusy|Wskaznik|Pitka|Udostepnij|Kopiuj|Zglos|Zmien|Calkowity|Kurs)', candidate, re.IGNORECASE):
-                    continue
-                if re.match(r'^\d+\.\d{2}$', candidate):
-                    val = float(candidate)
-                    if 1.01 <= val <= 100.0:
-                        odds = candidate
-                        used_indices.add(j)
-                        break
-            bets.append(Bet(event_name=event_name, odds=odds, bet_type="1X2"))
-            used_indices.add(i)
-
-        self.parsed_data['bets'] = bets
-    
-    def _extract_stake(self):
-        for i, line in enumerate(self.text_lines):
-            if 'Stawka' in line:
-                match = re.search(r'(\d+[.,]?\d+)', line)
+                continue
+            if is_label(line):
+                match = INLINE_STAKE_RE.search(line)
                 if match:
-                    amount = match.group(1).replace(',', '.')
-                    self.parsed_data['bet_stake'] = f"{float(amount):.2f}"
-                    return
-                
-                for j in range(i+1, min(i+5, len(self.text_lines))):
-                    next_line = self.text_lines[j].strip()
-                    if re.match(r'^\d+[.,]\d+$', next_line):
-                        amount = next_line.replace(',', '.')
-                        self.parsed_data['bet_stake'] = f"{float(amount):.2f}"
-                        return
-        
-        for line in self.text_lines:
-            match = re.search(r'(\d+[.,]\d+)', line)
-            if match:
-                amount = float(match.group(1).replace(',', '.'))
-                if 0.5 <= amount <= 100000:
-                    self.parsed_data['bet_stake'] = f"{amount:.2f}"
-                    return
-        
-        self.parsed_data['bet_stake'] = "0.00"
-    
-    def _extract_coupon_type(self):
-        text_combined = ' '.join(self.text_lines).upper()
-
-        if any(kw in text_combined for kw in ['AKO', '2UP', '3UP', '4UP', 'MULTIPLE']):
-            self.parsed_data['coupon_type'] = 'AKO'
-        else:
-            self.parsed_data['coupon_type'] = 'SOLO'
-    
+                    labelled = (index, match.group(1))
+                else:
+                    waiting.append(index)
+            if fallback is None:
+                match = AMOUNT_RE.search(line)
+                if match and MIN_STAKE <= float(match.group(1).replace(',', '.')) <= MAX_STAKE:
+                    fallback = match.group(1)
+
+        amount = labelled[1] if labelled is not None else fallback
+        if amount is None:
+            return '0.00'
+        return f"{float(amount.replace(',', '.')):.2f}"
+
     def _format_datetime(self, date_str: str, time_str: str) -> Optional[str]:
         try:
             parts = date_str.replace('/', '.').split('.')
             day, month, year = int(parts[0]), int(parts[1]), int(parts[2])
-            
+
             time_parts = time_str.split(':')
             hour, minute = int(time_parts[0]), int(time_parts[1])
-            
+
             dt = datetime(year, month, day, hour, minute, 0)
-            
+
             return dt.isoformat() + '+01:00'
         except Exception:
             return None
@@ -1,12 +1,33 @@
 from typing import List, Dict, Optional, Any
 from django.db import transaction
-from django.db.models import QuerySet, F, Sum
-from django.db.models.functions import TruncDate, TruncMonth
+from django.db.models import Count, QuerySet, F, Prefetch, Q
 from django.utils import timezone
+from dataclasses import dataclass
 from datetime import timedelta
 from ..models import Coupon, Bet, Event, Discipline
 from decimal import Decimal, ROUND_HALF_UP
 from common.choices import CouponType
+from .payout_service import payout_for_coupon
+
+
+@dataclass(frozen=True)
+class BetTally:
+    total: int = 0
+    won: int = 0
+    lost: int = 0
+    canceled: int = 0
+    unresolved: int = 0
+
+    @classmethod
+    def from_bets(cls, bets) -> 'BetTally':
+        results = [bet.result for bet in bets]
+        return cls(
+            total=len(results),
+            won=results.count(Bet.BetResult.WIN),
+            lost=results.count(Bet.BetResult.LOST),
+            canceled=results.count(Bet.BetResult.CANCELED),
+            unresolved=results.count(None),
+        )
 
 
 class CouponService:
@@ -19,124 +40,239 @@ class CouponService:
     def quantize2_odds(self, odds: Decimal) -> Decimal:
         return odds.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-    def recalc_coupon_odds(self, coupon: Coupon) -> Coupon:
-        bets = Bet.objects.filter(coupon=coupon).only('id', 'odds', 'result')
+    def _apply_odds(self, coupon: Coupon, bets: List[Bet]) -> List[str]:
         total_odds = Decimal('1.00')
         for bet in bets:
             total_odds *= self.bet_returned_odds(bet)
         coupon.multiplier = self.quantize2_odds(total_odds)
-        bets_count = Bet.objects.filter(coupon=coupon).count()
-        new_type = CouponType.SOLO if bets_count <= 1 else CouponType.AKO
+        new_type = CouponType.SOLO if len(bets) <= 1 else CouponType.AKO
         update_fields = ['multiplier']
 
         if coupon.coupon_type != new_type:
             coupon.coupon_type = new_type
             update_fields.append('coupon_type')
-        coupon.save(update_fields=update_fields)
+        return update_fields
+
+    def _fetch_bets(self, coupon: Coupon) -> List[Bet]:
+        return list(Bet.objects.filter(coupon=coupon).only('id', 'odds', 'result'))
+
+    def recalc_coupon_odds(self, coupon: Coupon, bets: Optional[List[Bet]] = None) -> Coupon:
+        if bets is None:
+            bets = self._fetch_bets(coupon)
+        coupon.save(update_fields=self._apply_odds(coupon, bets))
         return coupon
 
     @transaction.atomic
     def settle_coupon(self, coupon: Coupon, data: Dict[str, Any]) -> Coupon:
+        from coupon_analytics.services.rollup_service import track_coupon_stats
+        prev_status = coupon.status
+        with track_coupon_stats(coupon):
+            self._settle_coupon(coupon, data)
+        self._notify_settled(coupon, prev_status)
+        return coupon
+
+    def _apply_results(self, bets: List[Bet], data: Dict[str, Any]) -> List[Bet]:
+        """Sets results from settle data on the given bets in memory; returns the changed ones."""
+        results: Dict[int, str] = {}
         set_all = data.get('set_all_result')
         if set_all in [Bet.BetResult.WIN, Bet.BetResult.LOST, Bet.BetResult.CANCELED]:
-            Bet.objects.filter(coupon=coupon).update(result=set_all)
-
-        bets_data = data.get('bets', [])
+            results = {bet.id: set_all for bet in bets}
 
-        for bet_data in bets_data:
+        for bet_data in data.get('bets', []):
             bet_id = bet_data.get('bet_id')
             result = bet_data.get('result')
-
             if bet_id and result:
                 try:
-                    bet = Bet.objects.get(id=bet_id, coupon=coupon)
-                    bet.result = result
-                    bet.save(update_fields=['result'])
-                except Bet.DoesNotExist:
-                    pass
-
-        self.recalc_coupon_odds(coupon)
-        return self._evaluate_and_finalize(coupon)
-
-    def _evaluate_and_finalize(self, coupon: Coupon) -> Coupon:
-        all_bets = Bet.objects.filter(coupon=coupon)
-        bets_count = all_bets.count()
-        prev_status = coupon.status
+                    results[int(bet_id)] = result
+                except (TypeError, ValueError):
+                    continue
 
-        if bets_count == 0:
-            new_status = Coupon.CouponStatus.CANCELED
-            new_balance = Decimal('0.00')
-        else:
-            lost_bets = all_bets.filter(result=Bet.BetResult.LOST).count()
-            unresolved_bets = all_bets.filter(result__isnull=True).count()
-            canceled_bets = all_bets.filter(result=Bet.BetResult.CANCELED).count()
-            won_bets = all_bets.filter(result=Bet.BetResult.WIN).count()
-
-            if lost_bets > 0:
-                new_status = Coupon.CouponStatus.LOST
-                new_balance = -coupon.bet_stake
-            elif unresolved_bets > 0:
-                new_status = Coupon.CouponStatus.IN_PROGRESS
-                new_balance = coupon.balance
-            else:
-                if canceled_bets == bets_count:
-                    new_status = Coupon.CouponStatus.CANCELED
-                    new_balance = Decimal('0.00')
-                elif won_bets == bets_count:
-                    new_status = Coupon.CouponStatus.WON
-                    try:
-                        tax_mult = Decimal(str(coupon.bookmaker_account.bookmaker.tax_multiplier))
-                    except Exception:
-                        tax_mult = Decimal('1.00')
-                    gross_payout = coupon.bet_stake * coupon.multiplier * tax_mult
-                    try:
-                        currency_code = coupon.bookmaker_account.currency.code
-                        if currency_code == 'PLN' and gross_payout > Decimal('2280.00'):
-                            gross_payout *= (Decimal('1.00') - Decimal('0.10'))
-                    except Exception:
-                        pass
-                    new_balance = (gross_payout - coupon.bet_stake).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                else:
-                    new_status = Coupon.CouponStatus.WON
-                    try:
-                        tax_mult = Decimal(str(coupon.bookmaker_account.bookmaker.tax_multiplier))
-                    except Exception:
-                        tax_mult = Decimal('1.00')
-                    gross_payout = coupon.bet_stake * coupon.multiplier * tax_mult
-                    try:
-                        currency_code = coupon.bookmaker_account.currency.code
-                        if currency_code == 'PLN' and gross_payout > Decimal('2280.00'):
-                            gross_payout *= (Decimal('1.00') - Decimal('0.10'))
-                    except Exception:
-                        pass
-                    new_balance = (gross_payout - coupon.bet_stake).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        changed = []
+        for bet in bets:
+            result = results.get(bet.id)
+            if result is not None and bet.result != result:
+                bet.result = result
+                changed.append(bet)
+        return changed
+
+    def _settle_coupon(self, coupon: Coupon, data: Dict[str, Any]) -> Coupon:
+        # Jeden odczyt zakładów: z tych samych wierszy liczymy kurs i wynik kuponu
+        bets = self._fetch_bets(coupon)
+        changed = self._apply_results(bets, data)
+        if changed:
+            Bet.objects.bulk_update(changed, ['result'])
+
+        return self._evaluate_and_finalize(
+            coupon,
+            tally=BetTally.from_bets(bets),
+            update_fields=self._apply_odds(coupon, bets),
+        )
+
+    def _tally_bets(self, coupon: Coupon) -> 'BetTally':
+        counts = Bet.objects.filter(coupon=coupon).aggregate(
+            total=Count('id'),
+            won=Count('id', filter=Q(result=Bet.BetResult.WIN)),
+            lost=Count('id', filter=Q(result=Bet.BetResult.LOST)),
+            canceled=Count('id', filter=Q(result=Bet.BetResult.CANCELED)),
+            unresolved=Count('id', filter=Q(result__isnull=True)),
+        )
+        return BetTally(**counts)
+
+    def _resolve_status(self, coupon: Coupon, tally: 'BetTally'):
+        if tally.total == 0:
+            return Coupon.CouponStatus.CANCELED, Decimal('0.00')
+        if tally.lost > 0:
+            return Coupon.CouponStatus.LOST, -coupon.bet_stake
+        if tally.unresolved > 0:
+            return Coupon.CouponStatus.IN_PROGRESS, coupon.balance
+        if tally.canceled == tally.total:
+            return Coupon.CouponStatus.CANCELED, Decimal('0.00')
+        # Wygrane z ewentualnymi zwrotami (kurs zwrotu 1.00 jest już w mnożniku)
+        return Coupon.CouponStatus.WON, payout_for_coupon(coupon).balance
+
+    def _evaluate_and_finalize(
+        self,
+        coupon: Coupon,
+        tally: Optional['BetTally'] = None,
+        update_fields: Optional[List[str]] = None,
+    ) -> Coupon:
+        if tally is None:
+            tally = self._tally_bets(coupon)
+        prev_status = coupon.status
+        new_status, new_balance = self._resolve_status(coupon, tally)
 
         coupon.status = new_status
         coupon.balance = new_balance
-        coupon.save(update_fields=['status', 'balance'])
+        coupon.save(update_fields=[*(update_fields or []), 'status', 'balance'])
 
         final_statuses = {Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST}
 
-        if coupon.bookmaker_account and new_status in final_statuses and prev_status not in final_statuses:
+        if coupon.bookmaker_account_id and new_status in final_statuses and prev_status not in final_statuses:
             from finances.models import BookmakerAccountModel
-            BookmakerAccountModel.objects.filter(id=coupon.bookmaker_account.id).update(
+            BookmakerAccountModel.objects.filter(id=coupon.bookmaker_account_id).update(
                 balance=F('balance') + Decimal(str(new_balance))
             )
-        if new_status in final_statuses and prev_status not in final_statuses:
-            from coupon_analytics.services.streak_alert_service import check_and_send_streak_loss_alert, cleanup_streak_alerts_on_win
-            from coupon_analytics.services.alert_service import notify_yield_alerts_on_coupon_settle
+        return coupon
 
-            if new_status == Coupon.CouponStatus.WON:
-                cleanup_streak_alerts_on_win(coupon.user)
-            elif new_status == Coupon.CouponStatus.LOST:
-                check_and_send_streak_loss_alert(coupon.user)
+    def _notify_settled(self, coupon: Coupon, prev_status: str) -> None:
+        # Po zapisaniu rollupu i stanu serii, żeby alerty widziały aktualne wartości
+        final_statuses = {Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST}
+        if coupon.status not in final_statuses or prev_status in final_statuses:
+            return
+        from coupon_analytics.services.streak_alert_service import check_and_send_streak_loss_alert, cleanup_streak_alerts_on_win
+        from coupon_analytics.services.alert_service import notify_yield_alerts_on_coupon_settle
 
-            notify_yield_alerts_on_coupon_settle(coupon.user)
-        return coupon
+        if coupon.status == Coupon.CouponStatus.WON:
+            cleanup_streak_alerts_on_win(coupon.user)
+        elif coupon.status == Coupon.CouponStatus.LOST:
+            check_and_send_streak_loss_alert(coupon.user)
+
+        notify_yield_alerts_on_coupon_settle(coupon.user)
+
+    @transaction.atomic
+    def bulk_settle_coupons(self, *, user, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Settle many of the user's coupons at once.
+
+        Each item is settle data (``set_all_result`` / ``bets``) plus ``coupon_id``.
+        Coupons are locked with one select_for_update, bets are read and written
+        in bulk, account balances get one update per account and alerts run once.
+        Returns the settled coupons and the ids that were not found.
+        """
+        data_by_id: Dict[int, Dict[str, Any]] = {}
+        for item in items:
+            data_by_id[int(item['coupon_id'])] = item
+
+        coupons = list(
+            Coupon.objects.select_for_update(of=('self',))
+            .select_related('bookmaker_account__bookmaker', 'bookmaker_account__currency')
+            .filter(user=user, id__in=list(data_by_id))
+            .order_by('id')
+        )
+        missing = sorted(set(data_by_id) - {coupon.id for coupon in coupons})
+        if not coupons:
+            return {'coupons': [], 'missing': missing}
+
+        self.settle_locked_coupons(coupons, data_by_id, users={user.id: user})
+        return {'coupons': coupons, 'missing': missing}
+
+    def settle_locked_coupons(
+        self,
+        coupons: List[Coupon],
+        data_by_id: Dict[int, Dict[str, Any]],
+        users: Optional[Dict[int, Any]] = None,
+    ) -> None:
+        """Settle coupons already locked by the caller (with account, bookmaker
+        and currency select_related). ``data_by_id`` maps coupon id to settle
+        data; alerts run once per user at the end."""
+        from finances.models import BookmakerAccountModel
+        from coupon_analytics.services.rollup_service import CouponSnapshot, apply_coupon_stats_changes
+
+        bets_by_coupon: Dict[int, List[Bet]] = {coupon.id: [] for coupon in coupons}
+        for bet in Bet.objects.filter(coupon_id__in=list(bets_by_coupon)).only('id', 'coupon_id', 'odds', 'result'):
+            bets_by_coupon[bet.coupon_id].append(bet)
+
+        final_statuses = {Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST}
+        changes = []
+        changed_bets: List[Bet] = []
+        account_deltas: Dict[int, Decimal] = {}
+        newly_settled: Dict[int, set] = {}
+        for coupon in coupons:
+            bets = bets_by_coupon[coupon.id]
+            snapshot = CouponSnapshot.of(coupon)
+            prev_status = coupon.status
+
+            changed_bets.extend(self._apply_results(bets, data_by_id.get(coupon.id, {})))
+            self._apply_odds(coupon, bets)
+            coupon.status, coupon.balance = self._resolve_status(coupon, BetTally.from_bets(bets))
+
+            if coupon.status in final_statuses and prev_status not in final_statuses:
+                newly_settled.setdefault(coupon.user_id, set()).add(coupon.status)
+                if coupon.bookmaker_account_id:
+                    account_deltas[coupon.bookmaker_account_id] = (
+                        account_deltas.get(coupon.bookmaker_account_id, Decimal('0.00')) + Decimal(str(coupon.balance))
+                    )
+            changes.append((snapshot, CouponSnapshot.of(coupon)))
+
+        if changed_bets:
+            Bet.objects.bulk_update(changed_bets, ['result'])
+        Coupon.objects.bulk_update(coupons, ['multiplier', 'coupon_type', 'status', 'balance'])
+        for account_id, delta in sorted(account_deltas.items()):
+            BookmakerAccountModel.objects.filter(id=account_id).update(balance=F('balance') + delta)
+        apply_coupon_stats_changes(changes)
+
+        if newly_settled:
+            users = dict(users or {})
+            unknown = set(newly_settled) - set(users)
+            if unknown:
+                from django.contrib.auth import get_user_model
+                users.update(get_user_model().objects.in_bulk(list(unknown)))
+            for user_id, statuses in sorted(newly_settled.items()):
+                self._notify_bulk_settled(users[user_id], statuses)
+
+    def _notify_bulk_settled(self, user, statuses) -> None:
+        # Raz na użytkownika: stan serii jest już po wszystkich kuponach z paczki
+        from coupon_analytics.services.streak_alert_service import check_and_send_streak_loss_alert, cleanup_streak_alerts_on_win
+        from coupon_analytics.services.alert_service import notify_yield_alerts_on_coupon_settle
 
+        if Coupon.CouponStatus.WON in statuses:
+            cleanup_streak_alerts_on_win(user)
+        if Coupon.CouponStatus.LOST in statuses:
+            check_and_send_streak_loss_alert(user)
+        notify_yield_alerts_on_coupon_settle(user)
+
+    @transaction.atomic
     def recalc_and_evaluate_coupon(self, coupon: Coupon) -> Coupon:
-        self.recalc_coupon_odds(coupon)
-        return self._evaluate_and_finalize(coupon)
+        from coupon_analytics.services.rollup_service import track_coupon_stats
+        prev_status = coupon.status
+        with track_coupon_stats(coupon):
+            bets = self._fetch_bets(coupon)
+            self._evaluate_and_finalize(
+                coupon,
+                tally=BetTally.from_bets(bets),
+                update_fields=self._apply_odds(coupon, bets),
+            )
+        self._notify_settled(coupon, prev_status)
+        return coupon
 
     @transaction.atomic
     def create_coupon(self, *, user, data: Dict[str, Any]) -> Coupon:
@@ -157,6 +293,7 @@ class CouponService:
         default_discipline = Discipline.objects.filter(code='SOCCER').first()
 
         prepared_bets: List[Bet] = []
+        unlinked_events: List[Event] = []
         for bet_data in bets_data:
             start_time = bet_data.pop('start_time', None)
 
@@ -178,6 +315,8 @@ class CouponService:
                             discipline=discipline,
                         )
                         bet_data['event'] = event
+                        if event.home_team_ref_id is None and event.away_team_ref_id is None:
+                            unlinked_events.append(event)
 
             event = bet_data.get('event')
             if event is not None and bet_data.get('discipline') is None:
@@ -185,6 +324,10 @@ class CouponService:
 
             prepared_bets.append(Bet(coupon=coupon, **bet_data))
 
+        if unlinked_events:
+            from .team_service import link_event_teams
+            link_event_teams(list({event.pk: event for event in unlinked_events}.values()))
+
         if prepared_bets:
             Bet.objects.bulk_create(prepared_bets)
             self.recalc_coupon_odds(coupon)
@@ -199,14 +342,119 @@ class CouponService:
                 balance=F('balance') - coupon.bet_stake
             )
 
+        from coupon_analytics.services.rollup_service import CouponSnapshot, apply_coupon_stats_changes
+        apply_coupon_stats_changes([(None, CouponSnapshot.of(coupon))])
+
         return coupon
 
+    @transaction.atomic
+    def bulk_create_coupons(self, *, user, coupons_data: List[Dict[str, Any]]) -> List[Coupon]:
+        """Create many coupons with their bets using a fixed number of queries.
+
+        Same semantics as create_coupon (multiplier from bet odds, SOLO/AKO from
+        bet count, stake debited from the bookmaker account), but events, coupons
+        and bets are inserted in bulk and balances are debited once per account.
+        """
+        if not coupons_data:
+            return []
+
+        # Bets get normalised below (default discipline); leave the caller's dicts alone
+        coupons_data = [{**data, 'bets': [dict(bet) for bet in data.get('bets', [])]} for data in coupons_data]
+        default_discipline = Discipline.objects.filter(code='SOCCER').first()
+
+        event_keys = set()
+        for data in coupons_data:
+            for bet_data in data.get('bets', []):
+                if bet_data.get('discipline') is None:
+                    bet_data['discipline'] = default_discipline
+                discipline = bet_data.get('discipline')
+                if (
+                    bet_data.get('event') is None
+                    and bet_data.get('event_name')
+                    and bet_data.get('start_time') is not None
+                    and discipline is not None
+                ):
+                    event_keys.add((bet_data['event_name'], bet_data['start_time'], discipline.pk))
+
+        events: Dict[Any, Event] = {}
+        if event_keys:
+            lookup = Q()
+            for name, start_time, discipline_id in event_keys:
+                lookup |= Q(name=name, start_time=start_time, discipline_id=discipline_id)
+            for event in Event.objects.filter(lookup):
+                events.setdefault((event.name, event.start_time, event.discipline_id), event)
+            missing = [
+                Event(name=name, start_time=start_time, discipline_id=discipline_id)
+                for name, start_time, discipline_id in event_keys
+                if (name, start_time, discipline_id) not in events
+            ]
+            for event in Event.objects.bulk_create(missing):
+                events[(event.name, event.start_time, event.discipline_id)] = event
+            if missing:
+                from .team_service import link_event_teams
+                link_event_teams(missing)
+
+        coupons: List[Coupon] = []
+        for data in coupons_data:
+            data = dict(data)
+            bets_data = data.pop('bets', [])
+            placed_at = data.pop('placed_at', None)
+            if placed_at is not None:
+                data['created_at'] = placed_at
+
+            if data.get('multiplier') is None:
+                total_odds = Decimal('1.00')
+                for b in bets_data:
+                    total_odds *= Decimal(b['odds'])
+                data['multiplier'] = self.quantize2_odds(total_odds)
+            data['coupon_type'] = CouponType.SOLO if len(bets_data) <= 1 else CouponType.AKO
+
+            coupon = Coupon(user=user, **data)
+            coupon._pending_bets = bets_data
+            coupons.append(coupon)
+
+        Coupon.objects.bulk_create(coupons)
+
+        bets: List[Bet] = []
+        for coupon in coupons:
+            for bet_data in coupon._pending_bets:
+                bet_data = dict(bet_data)
+                start_time = bet_data.pop('start_time', None)
+                discipline = bet_data.get('discipline')
+                if bet_data.get('event') is None and discipline is not None:
+                    bet_data['event'] = events.get((bet_data.get('event_name'), start_time, discipline.pk))
+                bets.append(Bet(coupon=coupon, **bet_data))
+            del coupon._pending_bets
+
+        if bets:
+            Bet.objects.bulk_create(bets)
+
+        stakes_by_account: Dict[int, Decimal] = {}
+        for coupon in coupons:
+            if coupon.bookmaker_account_id:
+                stakes_by_account[coupon.bookmaker_account_id] = (
+                    stakes_by_account.get(coupon.bookmaker_account_id, Decimal('0.00')) + Decimal(coupon.bet_stake)
+                )
+        if stakes_by_account:
+            from finances.models import BookmakerAccountModel
+            for account_id, total_stake in stakes_by_account.items():
+                BookmakerAccountModel.objects.filter(id=account_id).update(
+                    balance=F('balance') - total_stake
+                )
+
+        from coupon_analytics.services.rollup_service import CouponSnapshot, apply_coupon_stats_changes
+        apply_coupon_stats_changes([(None, CouponSnapshot.of(coupon)) for coupon in coupons])
+
+        return coupons
+
     @transaction.atomic
     def update_coupon(self, *, coupon: Coupon, data: Dict[str, Any]) -> Coupon:
-        for field, value in data.items():
-            setattr(coupon, field, value)
-        coupon.save()
-        self.recalc_coupon_odds(coupon)
+        from coupon_analytics.services.rollup_service import track_coupon_stats
+        with track_coupon_stats(coupon):
+            for field, value in data.items():
+                setattr(coupon, field, value)
+            coupon.save()
+            self.recalc_coupon_odds(coupon)
         return coupon
 
     @transaction.atomic
@@ -219,37 +467,39 @@ class CouponService:
                 balance=F('balance') + coupon.bet_stake
             )
 
+        from coupon_analytics.services.rollup_service import CouponSnapshot, apply_coupon_stats_changes
+        snapshot = CouponSnapshot.of(locked_coupon)
         locked_coupon.delete()
+        apply_coupon_stats_changes([(snapshot, None)])
 
     def get_coupon(self, coupon_id: int, user) -> Coupon:
         return Coupon.objects.get(id=coupon_id, user=user)
 
     def list_coupons(self, user) -> QuerySet[Coupon]:
-        return Coupon.objects.filter(user=user).all()
+        # Wszystko czego potrzebuje CouponSerializer: 1 zapytanie na kupony + 1 na zakłady, niezależnie od liczby wierszy
+        return (
+            Coupon.objects.filter(user=user)
+            .select_related('bookmaker_account__bookmaker', 'bookmaker_account__currency', 'strategy')
+            .prefetch_related(
+                Prefetch('bets', queryset=Bet.objects.select_related('bet_type', 'discipline').order_by('id'))
+            )
+            .order_by('-created_at', '-id')
+        )
 
     @transaction.atomic
     def force_settle_coupon_won(self, coupon: Coupon) -> Coupon:
+        from coupon_analytics.services.rollup_service import CouponSnapshot, apply_coupon_stats_changes
         locked_coupon = Coupon.objects.select_for_update().get(id=coupon.id)
-        bets = list(Bet.objects.filter(coupon=locked_coupon))
-        for b in bets:
-            if b.result != Bet.BetResult.WIN:
-                b.result = Bet.BetResult.WIN
-        Bet.objects.bulk_update(bets, ["result"]) if bets else None
-
-        self.recalc_coupon_odds(locked_coupon)
-
-        try:
-            tax_mult = Decimal(str(locked_coupon.bookmaker_account.bookmaker.tax_multiplier))
-        except Exception:
-            tax_mult = Decimal('1.00')
-        gross_payout = locked_coupon.bet_stake * locked_coupon.multiplier * tax_mult
-        try:
-            currency_code = locked_coupon.bookmaker_account.currency.code
-            if currency_code == 'PLN' and gross_payout > Decimal('2280.00'):
-                gross_payout *= (Decimal('1.00') - Decimal('0.10'))
-        except Exception:
-            pass
-        new_balance = (gross_payout - locked_coupon.bet_stake).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        snapshot = CouponSnapshot.of(locked_coupon)
+        bets = self._fetch_bets(locked_coupon)
+        changed = [b for b in bets if b.result != Bet.BetResult.WIN]
+        for b in changed:
+            b.result = Bet.BetResult.WIN
+        if changed:
+            Bet.objects.bulk_update(changed, ["result"])
+        update_fields = self._apply_odds(locked_coupon, bets)
+
+        new_balance = payout_for_coupon(locked_coupon).balance
 
         prev_status = locked_coupon.status
         prev_change = Decimal('0.00')
@@ -263,11 +513,12 @@ class CouponService:
 
         locked_coupon.status = Coupon.CouponStatus.WON
         locked_coupon.balance = new_balance
-        locked_coupon.save(update_fields=["status", "balance"])
+        locked_coupon.save(update_fields=[*update_fields, "status", "balance"])
+        apply_coupon_stats_changes([(snapshot, CouponSnapshot.of(locked_coupon))])
 
-        if locked_coupon.bookmaker_account and delta != 0:
+        if locked_coupon.bookmaker_account_id and delta != 0:
             from finances.models import BookmakerAccountModel
-            BookmakerAccountModel.objects.filter(id=locked_coupon.bookmaker_account.id).update(
+            BookmakerAccountModel.objects.filter(id=locked_coupon.bookmaker_account_id).update(
                 balance=F('balance') + Decimal(str(delta))
             )
 
@@ -276,92 +527,53 @@ class CouponService:
         return locked_coupon
 
     def get_balance_trend(self, *, user, days: int = 7) -> List[Dict[str, Decimal]]:
+        from coupon_analytics.services.pnl_series import get_pnl_series
         days = max(1, days)
         today = timezone.localdate()
         start_date = today - timedelta(days=days - 1)
-        final_statuses = [Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST]
-        coupons_qs = Coupon.objects.filter(user=user, status__in=final_statuses)
-
-        base_balance = coupons_qs.filter(created_at__date__lt=start_date).aggregate(total=Sum('balance'))
-        running_balance = Decimal(base_balance.get('total') or Decimal('0.00'))
-
-        daily_deltas = (
-            coupons_qs
-            .filter(created_at__date__gte=start_date)
-            .annotate(day=TruncDate('created_at'))
-            .values('day')
-            .annotate(delta=Sum('balance'))
-        )
-        delta_map = {
-            entry['day']: Decimal(entry['delta'] or Decimal('0.00'))
-            for entry in daily_deltas
-        }
-
-        points: List[Dict[str, Decimal]] = []
-        quant = Decimal('0.01')
-        for offset in range(days):
-            current_day = start_date + timedelta(days=offset)
-            running_balance = (running_balance + delta_map.get(current_day, Decimal('0.00'))).quantize(quant)
-            points.append({'date': current_day.isoformat(), 'balance': running_balance})
 
-        return points
+        series = get_pnl_series(user, date_from=start_date, date_to=today, period='day')
+        return [{'date': point['date'], 'balance': point['balance']} for point in series]
 
     def get_monthly_balance_trend(self, *, user, months: int = 12) -> List[Dict[str, Any]]:
+        from coupon_analytics.services.pnl_series import get_pnl_series, next_period
         months = max(1, min(months, 120))
         today = timezone.localdate()
         start_date = today.replace(day=1) - timedelta(days=(months - 1) * 30)
         start_date = start_date.replace(day=1)
 
-        final_statuses = [Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST]
-        coupons_qs = Coupon.objects.filter(user=user, status__in=final_statuses)
-
-        base_balance = coupons_qs.filter(created_at__date__lt=start_date).aggregate(total=Sum('balance'))
-        running_balance = Decimal(base_balance.get('total') or Decimal('0.00'))
-
-        monthly_deltas = (
-            coupons_qs
-            .filter(created_at__date__gte=start_date)
-            .annotate(month=TruncMonth('created_at'))
-            .values('month')
-            .annotate(delta=Sum('balance'), count=Sum(1))
-        )
-        delta_map = {
-            entry['month'].date(): {
-                'delta': Decimal(entry['delta'] or Decimal('0.00')),
-                'count': entry['count']
+        end_date = start_date
+        for _ in range(months - 1):
+            end_date = next_period(end_date, 'month')
+
+        series = get_pnl_series(user, date_from=start_date, date_to=end_date, period='month')
+        return [
+            {
+                'date': point['date'],
+                'balance': point['balance'],
+                'monthly_profit': point['profit'],
+                'coupon_count': point['coupon_count'],
             }
-            for entry in monthly_deltas
-        }
-
-        points: List[Dict[str, Any]] = []
-        quant = Decimal('0.01')
-        current_month = start_date.replace(day=1)
-        for offset in range(months):
-            month_key = current_month
-            month_delta = delta_map.get(month_key, {'delta': Decimal('0.00'), 'count': 0})
-            running_balance = (running_balance + month_delta['delta']).quantize(quant)
-            points.append({
-                'date': current_month.isoformat(),
-                'balance': running_balance,
-                'monthly_profit': month_delta['delta'],
-                'coupon_count': month_delta['count'],
-            })
-            current_month = current_month.replace(day=1) + timedelta(days=32)
-            current_month = current_month.replace(day=1)
-
-        return points
+            for point in series
+        ]
 
 _service = CouponService()
 
 
 def recalc_coupon_odds(coupon: Coupon) -> Coupon:
-    return _service.recalc_coupon_odds(coupon)
+    from coupon_analytics.services.rollup_service import track_coupon_stats
+    with transaction.atomic(), track_coupon_stats(coupon):
+        return _service.recalc_coupon_odds(coupon)
 
 
 def create_coupon(user, data: Dict[str, Any]) -> Coupon:
     return _service.create_coupon(user=user, data=data)
 
 
+def bulk_create_coupons(user, coupons_data: List[Dict[str, Any]]) -> List[Coupon]:
+    return _service.bulk_create_coupons(user=user, coupons_data=coupons_data)
+
+
 def update_coupon(coupon: Coupon, data: Dict[str, Any]) -> Coupon:
     return _service.update_coupon(coupon=coupon, data=data)
 
@@ -382,6 +594,10 @@ def settle_coupon(coupon: Coupon, data: Dict[str, Any]) -> Coupon:
     return _service.settle_coupon(coupon=coupon, data=data)
 
 
+def bulk_settle_coupons(user, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return _service.bulk_settle_coupons(user=user, items=items)
+
+
 def recalc_and_evaluate_coupon(coupon: Coupon) -> Coupon:
     return _service.recalc_and_evaluate_coupon(coupon)
 
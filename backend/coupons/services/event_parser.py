@@ -1,8 +1,15 @@
 
+import re
+import unicodedata
+
 from coupons.models import Event, Discipline
 from django.utils import timezone
 from datetime import timedelta
 
+# Litery bez rozkładu NFKD (ł, ø, ß ...)
+_TRANSLITERATE = str.maketrans({'ł': 'l', 'Ł': 'L', 'ø': 'o', 'Ø': 'O', 'đ': 'd', 'Đ': 'D', 'ß': 'ss'})
+_NON_WORD = re.compile(r'[\W_]+')
+
 
 class EventParserService:
 
@@ -22,6 +29,16 @@ class EventParserService:
                     return (home_team, away_team)
         return (None, None)
     
+    @staticmethod
+    def normalize_team_name(team_name: str) -> str:
+        """Case-folded, accent-stripped team name with punctuation (including
+        the team separators above) collapsed to single spaces."""
+        if not team_name:
+            return ''
+        text = unicodedata.normalize('NFKD', team_name.translate(_TRANSLITERATE))
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+        return ' '.join(_NON_WORD.sub(' ', text).split())
+
     @staticmethod
     def get_or_create_event(
         event_name: str,
@@ -47,6 +64,10 @@ class EventParserService:
             event.home_team = home_team
             event.away_team = away_team
             event.save()
-        
+
+        if event.home_team_ref_id is None and event.away_team_ref_id is None:
+            from .team_service import link_event_teams
+            link_event_teams([event])
+
         return event, created
 
@@ -0,0 +1,307 @@
+import logging
+import re
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Bet, Coupon, Event, EventMarketResult, EventSettlementJob
+from .coupon_service import CouponService
+
+logger = logging.getLogger(__name__)
+
+WIN, LOST, CANCELED = Bet.BetResult.WIN, Bet.BetResult.LOST, Bet.BetResult.CANCELED
+
+_NUMBER = re.compile(r'(\d+(?:\.\d+)?)')
+_CORRECT_SCORE = re.compile(r'^(\d+)\s*[:\-]\s*(\d+)$')
+# Goal lines of the football over/under codes (OU_2.5, HOME_OU_1.5); OU_180 (darts) is not one
+_GOAL_LINE = re.compile(r'\d{1,2}\.5')
+
+
+def normalize_line(line: str) -> str:
+    return ' '.join((line or '').replace(',', '.').upper().split())
+
+
+def _won(condition: bool) -> str:
+    return WIN if condition else LOST
+
+
+def _over_under(line: str, goals: int, default_threshold: Optional[str]) -> Optional[str]:
+    match = _NUMBER.search(line)
+    threshold = match.group(1) if match else default_threshold
+    if threshold is None:
+        return None
+    threshold = float(threshold)
+    if goals == threshold:
+        return CANCELED
+    if line.startswith(('OVER', 'O ', 'POWYŻEJ')) or line in ('O', '+'):
+        return _won(goals > threshold)
+    if line.startswith(('UNDER', 'U ', 'PONIŻEJ')) or line in ('U', '-'):
+        return _won(goals < threshold)
+    return None
+
+
+def score_outcome(code: str, line: str, home: int, away: int) -> Optional[str]:
+    """Result of a full-time selection given the final score, or None when the
+    market cannot be decided from the score alone (halves, handicaps, ...)."""
+    code = (code or '').upper()
+    line = normalize_line(line)
+
+    if code == '1X2':
+        return {'1': _won(home > away), 'X': _won(home == away), '2': _won(away > home)}.get(line)
+    if code == 'DC':
+        options = {'1X': home >= away, 'X1': home >= away, '12': home != away, '21': home != away,
+                   'X2': away >= home, '2X': away >= home}
+        return _won(options[line]) if line in options else None
+    if code == 'DNB':
+        if line not in ('1', '2'):
+            return None
+        if home == away:
+            return CANCELED
+        return _won(home > away if line == '1' else away > home)
+    if code == 'BTTS':
+        if line in ('YES', 'TAK'):
+            return _won(home > 0 and away > 0)
+        if line in ('NO', 'NIE'):
+            return _won(home == 0 or away == 0)
+        return None
+    if code == 'CS':
+        match = _CORRECT_SCORE.match(line)
+        return _won((int(match.group(1)), int(match.group(2))) == (home, away)) if match else None
+
+    for prefix, goals in (('HOME_OU', home), ('AWAY_OU', away), ('OU', home + away)):
+        if code.startswith(prefix + '_'):
+            suffix = code[len(prefix) + 1:]
+            if not _GOAL_LINE.fullmatch(suffix):
+                return None  # OU_H1_*, OU_180 itp.: nie da się rozstrzygnąć z wyniku meczu
+            return _over_under(line, goals, suffix)
+    return None
+
+
+class EventResultService:
+    """Settles bets from event results.
+
+    Recording a final score and/or per-market results queues an
+    ``EventSettlementJob``; workers claim jobs with ``SKIP LOCKED`` and walk
+    the event's unresolved bets in id chunks, each chunk in its own short
+    transaction (bet results, coupon finalisation, balances and rollup).
+    """
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        stale_after: Optional[float] = None,
+    ):
+        self.chunk_size = chunk_size or getattr(settings, 'EVENT_SETTLEMENT_CHUNK_SIZE', 500)
+        self.max_attempts = max_attempts or getattr(settings, 'EVENT_SETTLEMENT_MAX_ATTEMPTS', 3)
+        self.stale_after = stale_after or getattr(settings, 'EVENT_SETTLEMENT_STALE_AFTER', 600)
+        self.coupons = CouponService()
+
+    @transaction.atomic
+    def record(
+        self,
+        event: Event,
+        *,
+        home_score: Optional[int] = None,
+        away_score: Optional[int] = None,
+        markets: Iterable[Dict[str, Any]] = (),
+    ) -> EventSettlementJob:
+        if home_score is not None and away_score is not None:
+            event.home_score = home_score
+            event.away_score = away_score
+            event.save(update_fields=['home_score', 'away_score', 'updated_at'])
+
+        rows = {
+            (market['bet_type'].pk, normalize_line(market['line'])): market['result']
+            for market in markets
+        }
+        if rows:
+            EventMarketResult.objects.bulk_create(
+                [
+                    EventMarketResult(event=event, bet_type_id=bet_type_id, line=line, result=result)
+                    for (bet_type_id, line), result in rows.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['event', 'bet_type', 'line'],
+                update_fields=['result'],
+            )
+
+        # Nowe wyniki: skan od początku; kolejkowany job po prostu zaczyna od nowa
+        job = (
+            EventSettlementJob.objects.select_for_update()
+            .filter(event=event, status=EventSettlementJob.JobStatus.QUEUED)
+            .first()
+        )
+        if job is None:
+            job = EventSettlementJob.objects.create(event=event)
+        elif job.last_bet_id:
+            job.last_bet_id = 0
+            job.save(update_fields=['last_bet_id'])
+        logger.info(f"[EVENT_SETTLE] Queued job {job.pk} for event {event.pk}")
+        return job
+
+    def _resolver(self, event: Event):
+        explicit: Dict[Tuple[int, str], str] = {
+            (bet_type_id, normalize_line(line)): result
+            for bet_type_id, line, result in EventMarketResult.objects.filter(event=event).values_list(
+                'bet_type_id', 'line', 'result'
+            )
+        }
+        has_score = event.home_score is not None and event.away_score is not None
+
+        def resolve(bet_type_id, code, line) -> Optional[str]:
+            result = explicit.get((bet_type_id, normalize_line(line)))
+            if result is None and has_score:
+                result = score_outcome(code, line, event.home_score, event.away_score)
+            return result
+
+        return resolve
+
+    def run_chunk(self, job: EventSettlementJob, resolve=None) -> bool:
+        """Resolve the next chunk of bets; returns True while more may remain."""
+        resolve = resolve or self._resolver(job.event)
+        final_statuses = {Coupon.CouponStatus.WON, Coupon.CouponStatus.LOST, Coupon.CouponStatus.CANCELED}
+        with transaction.atomic():
+            rows = list(
+                Bet.objects.filter(event_id=job.event_id, result__isnull=True, id__gt=job.last_bet_id)
+                .order_by('id')
+                .values_list('id', 'coupon_id', 'bet_type_id', 'bet_type__code', 'line')[:self.chunk_size]
+            )
+            if not rows:
+                return False
+
+            outcomes: Dict[int, Tuple[int, str]] = {}
+            for bet_id, coupon_id, bet_type_id, code, line in rows:
+                result = resolve(bet_type_id, code, line)
+                if result is not None:
+                    outcomes[bet_id] = (coupon_id, result)
+
+            resolved = 0
+            if outcomes:
+                # Lock the coupons first, then re-read which bets are still open:
+                # a manual settlement that got there first must not be overwritten
+                coupons = list(
+                    Coupon.objects.select_for_update(of=('self',))
+                    .select_related('bookmaker_account__bookmaker', 'bookmaker_account__currency')
+                    .filter(id__in={coupon_id for coupon_id, _ in outcomes.values()})
+                    .order_by('id')
+                )
+                still_open = set(
+                    Bet.objects.filter(id__in=list(outcomes), result__isnull=True).values_list('id', flat=True)
+                )
+                data_by_coupon: Dict[int, Dict[str, Any]] = {}
+                for bet_id, (coupon_id, result) in outcomes.items():
+                    if bet_id in still_open:
+                        data_by_coupon.setdefault(coupon_id, {'bets': []})['bets'].append({'bet_id': bet_id, 'result': result})
+                        resolved += 1
+
+                coupons = [coupon for coupon in coupons if coupon.id in data_by_coupon]
+                if coupons:
+                    before = {coupon.id: coupon.status for coupon in coupons}
+                    self.coupons.settle_locked_coupons(coupons, data_by_coupon)
+                    job.coupons_settled += sum(
+                        1 for coupon in coupons
+                        if coupon.status in final_statuses and before[coupon.id] not in final_statuses
+                    )
+
+            job.last_bet_id = rows[-1][0]
+            job.bets_resolved += resolved
+            job.save(update_fields=['last_bet_id', 'bets_resolved', 'coupons_settled'])
+        return len(rows) == self.chunk_size
+
+    def claim_next(self, worker: str = '') -> Optional[EventSettlementJob]:
+        with transaction.atomic():
+            job = (
+                EventSettlementJob.objects.select_for_update(skip_locked=True)
+                .filter(status=EventSettlementJob.JobStatus.QUEUED)
+                .order_by('created_at', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = EventSettlementJob.JobStatus.RUNNING
+            job.started_at = timezone.now()
+            job.attempts += 1
+            job.worker = worker[:100]
+            job.save(update_fields=['status', 'started_at', 'attempts', 'worker'])
+        return job
+
+    def run(self, job: EventSettlementJob) -> EventSettlementJob:
+        try:
+            resolve = self._resolver(job.event)
+            while self.run_chunk(job, resolve):
+                pass
+        except Exception as e:
+            logger.error(f"[EVENT_SETTLE] Job {job.pk} failed (attempt {job.attempts}): {e}", exc_info=True)
+            job.error = str(e)
+            if job.attempts < self.max_attempts:
+                job.status = EventSettlementJob.JobStatus.QUEUED
+                job.save(update_fields=['status', 'error'])
+            else:
+                job.status = EventSettlementJob.JobStatus.FAILED
+                job.finished_at = timezone.now()
+                job.save(update_fields=['status', 'error', 'finished_at'])
+            return job
+
+        job.status = EventSettlementJob.JobStatus.DONE
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        logger.info(
+            f"[EVENT_SETTLE] Job {job.pk} done: {job.bets_resolved} bet(s), {job.coupons_settled} coupon(s) settled"
+        )
+        return job
+
+    def process_next(self, worker: str = '') -> Optional[EventSettlementJob]:
+        job = self.claim_next(worker)
+        if job is None:
+            return None
+        return self.run(job)
+
+    def requeue_stale(self) -> int:
+        """Return jobs left RUNNING by a crashed worker to the queue (they resume from the cursor)."""
+        cutoff = timezone.now() - timedelta(seconds=self.stale_after)
+        requeued = EventSettlementJob.objects.filter(
+            status=EventSettlementJob.JobStatus.RUNNING,
+            started_at__lt=cutoff,
+        ).update(status=EventSettlementJob.JobStatus.QUEUED, worker='')
+        if requeued:
+            logger.warning(f"[EVENT_SETTLE] Requeued {requeued} stale job(s)")
+        return requeued
+
+    @staticmethod
+    def to_status(job: EventSettlementJob) -> Dict[str, Any]:
+        return {
+            'job_id': job.pk,
+            'event_id': job.event_id,
+            'status': job.status,
+            'bets_resolved': job.bets_resolved,
+            'coupons_settled': job.coupons_settled,
+            'attempts': job.attempts,
+            'error': job.error or None,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+        }
+
+
+_service = EventResultService()
+
+
+def record_event_result(event: Event, **kwargs) -> EventSettlementJob:
+    return _service.record(event, **kwargs)
+
+
+def process_next_event_settlement(worker: str = '') -> Optional[EventSettlementJob]:
+    return _service.process_next(worker)
+
+
+def requeue_stale_event_settlements() -> int:
+    return _service.requeue_stale()
+
+
+def event_settlement_status(job: EventSettlementJob) -> Dict[str, Any]:
+    return EventResultService.to_status(job)
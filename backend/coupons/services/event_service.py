@@ -3,18 +3,23 @@ from django.db import transaction
 from django.db.models import QuerySet
 
 from ..models import Event
+from .team_service import link_event_teams
 
 
 class EventService:
     @transaction.atomic
     def create_event(self, *, data: Dict[str, Any]) -> Event:
-        return Event.objects.create(**data)
+        event = Event.objects.create(**data)
+        link_event_teams([event])
+        return event
 
     @transaction.atomic
     def update_event(self, *, event: Event, data: Dict[str, Any]) -> Event:
         for field, value in data.items():
             setattr(event, field, value)
         event.save()
+        if {'name', 'home_team', 'away_team'} & data.keys():
+            link_event_teams([event])
         return event
 
     @transaction.atomic
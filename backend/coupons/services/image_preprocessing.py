@@ -0,0 +1,222 @@
+import io
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from django.conf import settings
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the steps change: OCR cache entries carry it in their engine version
+PREPROCESS_VERSION = 1
+
+CROP_THRESHOLD = 24
+CROP_PADDING = 12
+MIN_CROP_AREA = 0.05
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 1.0
+DESKEW_FINE_STEP = 0.5
+DESKEW_SAMPLE_WIDTH = 400
+ANALYSIS_SIDE = 600
+
+ImageSource = Union[str, Path, bytes, Image.Image]
+
+
+@dataclass
+class PreprocessedImage:
+    image: Image.Image
+    original_size: Tuple[int, int]
+    crop_box: Optional[Tuple[int, int, int, int]] = None
+    scale: float = 1.0
+    angle: float = 0.0
+    inverted: bool = False
+    steps: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'original_size': list(self.original_size),
+            'size': list(self.image.size),
+            'crop_box': list(self.crop_box) if self.crop_box else None,
+            'scale': round(self.scale, 4),
+            'angle': self.angle,
+            'inverted': self.inverted,
+            'steps': self.steps,
+        }
+
+
+def decode_image(source: ImageSource) -> Image.Image:
+    """Decode a path, raw bytes or an already open image once, upright and in memory."""
+    if isinstance(source, Image.Image):
+        image = source
+    else:
+        data = source if isinstance(source, bytes) else Path(source).read_bytes()
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    return ImageOps.exif_transpose(image)
+
+
+def _background_level(gray: Image.Image) -> int:
+    """Most common grey level along the border (status bars and app chrome
+    around the slip)."""
+    width, height = gray.size
+    border = Image.new('L', (width * 2 + height * 2, 1))
+    border.paste(gray.crop((0, 0, width, 1)), (0, 0))
+    border.paste(gray.crop((0, height - 1, width, height)), (width, 0))
+    border.paste(gray.crop((0, 0, 1, height)).rotate(90, expand=True), (width * 2, 0))
+    border.paste(gray.crop((width - 1, 0, width, height)).rotate(90, expand=True), (width * 2 + height, 0))
+    histogram = border.histogram()
+    return max(range(256), key=histogram.__getitem__)
+
+
+def find_slip_box(gray: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """Bounding box of everything that differs from the border background,
+    or None when it is (almost) the whole frame or too small to trust.
+
+    Measured on a copy reduced to about ``ANALYSIS_SIDE`` pixels.
+    """
+    factor = max(1, max(gray.size) // ANALYSIS_SIDE)
+    small = gray.reduce(factor) if factor > 1 else gray
+    background = Image.new('L', small.size, _background_level(small))
+    mask = ImageChops.difference(small, background).point(lambda v: 255 if v > CROP_THRESHOLD else 0)
+    box = mask.filter(ImageFilter.MinFilter(3)).getbbox()
+    if box is None:
+        return None
+
+    width, height = gray.size
+    left, top, right, bottom = (edge * factor for edge in box)
+    box = (
+        max(0, left - CROP_PADDING), max(0, top - CROP_PADDING),
+        min(width, right + CROP_PADDING), min(height, bottom + CROP_PADDING),
+    )
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    if area < MIN_CROP_AREA * width * height or box == (0, 0, width, height):
+        return None
+    return box
+
+
+def target_scale(size: Tuple[int, int], dpi: Optional[Tuple[float, float]], max_side: int, target_dpi: int) -> float:
+    """Downscale factor (never upscale): down to ``target_dpi`` when the image
+    records its DPI, and the longer side capped at ``max_side``."""
+    scale = 1.0
+    if dpi and target_dpi and dpi[0] and float(dpi[0]) > target_dpi:
+        scale = target_dpi / float(dpi[0])
+    if max_side and max(size) * scale > max_side:
+        scale = max_side / max(size)
+    return min(scale, 1.0)
+
+
+def otsu_threshold(gray: Image.Image) -> int:
+    histogram = gray.histogram()
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    best_level, best_variance = 127, -1.0
+    weight = weighted = 0
+    for level, count in enumerate(histogram):
+        weight += count
+        if weight == 0:
+            continue
+        rest = total - weight
+        if rest == 0:
+            break
+        weighted += level * count
+        mean_low = weighted / weight
+        mean_high = (weighted_total - weighted) / rest
+        variance = weight * rest * (mean_low - mean_high) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def binarize(gray: Image.Image) -> Tuple[Image.Image, bool]:
+    """Black text on white; dark-mode screenshots are inverted first."""
+    gray = ImageOps.autocontrast(gray)
+    level = otsu_threshold(gray)
+    histogram = gray.histogram()
+    inverted = sum(histogram[level + 1:]) < sum(histogram[:level + 1])
+    if inverted:
+        gray = ImageOps.invert(gray)
+        level = 255 - level
+    return gray.point(lambda v: 255 if v > level else 0), inverted
+
+
+def _row_profile_score(image: Image.Image) -> float:
+    # Resizing to one column averages every row; aligned text lines give
+    # sharp alternation between ink and blank rows
+    rows = image.resize((1, image.height), Image.BOX).tobytes()
+    return sum((a - b) ** 2 for a, b in zip(rows, rows[1:]))
+
+
+def estimate_skew(binary: Image.Image) -> float:
+    """Rotation (degrees, counter-clockwise) that best aligns text rows."""
+    sample = binary
+    if binary.width > DESKEW_SAMPLE_WIDTH:
+        ratio = DESKEW_SAMPLE_WIDTH / binary.width
+        sample = binary.resize((DESKEW_SAMPLE_WIDTH, max(1, int(binary.height * ratio))), Image.BILINEAR)
+    sample = ImageOps.invert(sample.convert('L'))
+    scores: Dict[float, float] = {}
+
+    def search(angles) -> float:
+        for angle in angles:
+            if angle not in scores:
+                scores[angle] = _row_profile_score(sample.rotate(angle, resample=Image.NEAREST, fillcolor=0))
+        return max(angles, key=lambda angle: (scores[angle], -abs(angle)))
+
+    # Whole degrees first, then half a degree either side of the best one
+    steps = int(DESKEW_MAX_ANGLE / DESKEW_STEP)
+    coarse = search([step * DESKEW_STEP for step in range(-steps, steps + 1)])
+    best = search([coarse - DESKEW_FINE_STEP, coarse, coarse + DESKEW_FINE_STEP])
+    return best if scores[best] > scores[0.0] * 1.02 else 0.0
+
+
+def preprocess_image(
+    source: ImageSource,
+    *,
+    crop: bool = True,
+    max_side: Optional[int] = None,
+    target_dpi: Optional[int] = None,
+    binarize_image: Optional[bool] = None,
+    deskew: Optional[bool] = None,
+) -> PreprocessedImage:
+    """Decode once, crop to the slip, downscale, binarise and deskew.
+
+    Unset options come from the ``OCR_PREPROCESS_*`` settings.
+    """
+    max_side = getattr(settings, 'OCR_PREPROCESS_MAX_SIDE', 1600) if max_side is None else max_side
+    target_dpi = getattr(settings, 'OCR_PREPROCESS_TARGET_DPI', 300) if target_dpi is None else target_dpi
+    binarize_image = getattr(settings, 'OCR_PREPROCESS_BINARIZE', True) if binarize_image is None else binarize_image
+    deskew = getattr(settings, 'OCR_PREPROCESS_DESKEW', True) if deskew is None else deskew
+
+    decoded = decode_image(source)
+    result = PreprocessedImage(image=decoded, original_size=decoded.size)
+    gray = decoded.convert('L')
+
+    if crop:
+        box = find_slip_box(gray)
+        if box is not None:
+            gray = gray.crop(box)
+            result.crop_box = box
+            result.steps.append('crop')
+
+    scale = target_scale(gray.size, decoded.info.get('dpi'), max_side, target_dpi)
+    if scale < 1.0:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS)
+        result.scale = scale
+        result.steps.append('downscale')
+
+    if binarize_image:
+        gray, result.inverted = binarize(gray)
+        result.steps.append('binarize')
+
+    if deskew:
+        angle = estimate_skew(gray if binarize_image else binarize(gray)[0])
+        if angle:
+            gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+            result.angle = angle
+            result.steps.append('deskew')
+
+    result.image = gray
+    logger.debug(f"[OCR_PREPROCESS] {result.summary()}")
+    return result
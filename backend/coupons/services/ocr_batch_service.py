@@ -0,0 +1,311 @@
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from ..models import BetTypeDict
+from ..ocr_process import init_ocr_process, run_ocr_and_parse
+from .coupon_layouts import parse_coupon_text, parsed_cache_version, resolve_layout
+from .coupon_service import bulk_create_coupons
+from .ocr_cache import OCRResultCache
+from .ocr_pool import OCREnginePool, get_ocr_pool
+from .ocr_service import get_backend_version
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp'}
+
+
+class OCRBatchError(Exception):
+    pass
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_ocr_process_pool() -> ProcessPoolExecutor:
+    """Long-lived process pool; each process loads its OCR engine once."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=getattr(settings, 'OCR_BATCH_PROCESSES', 2),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_ocr_process,
+                    initargs=(getattr(settings, 'OCR_BACKEND', 'paddle'),),
+                )
+    return _process_pool
+
+
+def reset_ocr_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+class OCRBatchService:
+    """OCR + parse many betslip images and create the coupons in one transaction.
+
+    Images already in the OCR result cache skip inference; their cached text
+    is only re-parsed when the cached parse is for another layout or parser
+    version. The rest are fanned out to the OCR process pool (or the
+    in-process engine pool when OCR_BATCH_PROCESSES is 0) and parsed inside
+    the worker.
+    """
+
+    def __init__(
+        self,
+        max_images: Optional[int] = None,
+        max_image_bytes: Optional[int] = None,
+        max_total_bytes: Optional[int] = None,
+    ):
+        self.max_images = max_images or getattr(settings, 'OCR_BATCH_MAX_IMAGES', 50)
+        self.max_image_bytes = max_image_bytes or getattr(settings, 'OCR_BATCH_MAX_IMAGE_BYTES', 10 * 1024 * 1024)
+        self.max_total_bytes = max_total_bytes or getattr(settings, 'OCR_BATCH_MAX_TOTAL_BYTES', 100 * 1024 * 1024)
+
+    def collect_images(self, uploads, target_dir: Path) -> List[Dict[str, Any]]:
+        """Write every image to ``target_dir``. Sizes are checked before
+        anything is read or unpacked, so a small zip cannot expand past the
+        per-image and per-batch byte limits."""
+        images: List[Dict[str, Any]] = []
+        total = 0
+
+        def add(name: str, size: int, read: Callable[[], bytes]):
+            nonlocal total
+            if len(images) >= self.max_images:
+                raise OCRBatchError(f"Too many images in batch (limit {self.max_images})")
+            if size > self.max_image_bytes:
+                raise OCRBatchError(f"Image too large: {name} (limit {self.max_image_bytes} bytes)")
+            total += size
+            if total > self.max_total_bytes:
+                raise OCRBatchError(f"Batch too large (limit {self.max_total_bytes} bytes)")
+            path = target_dir / f"{len(images):04d}{Path(name).suffix.lower()}"
+            path.write_bytes(read())
+            images.append({'name': name, 'path': path})
+
+        for upload in uploads:
+            name = upload.name or 'upload'
+            if Path(name).suffix.lower() == '.zip' or zipfile.is_zipfile(upload):
+                upload.seek(0)
+                try:
+                    with zipfile.ZipFile(upload) as archive:
+                        for member in archive.infolist():
+                            member_name = Path(member.filename)
+                            if member.is_dir() or member_name.name.startswith('.') or '__MACOSX' in member_name.parts:
+                                continue
+                            if member_name.suffix.lower() not in IMAGE_EXTENSIONS:
+                                continue
+                            # ZipFile never inflates a member past its declared file_size
+                            add(member_name.name, member.file_size, lambda member=member: archive.read(member))
+                except zipfile.BadZipFile:
+                    raise OCRBatchError(f"Invalid zip archive: {name}")
+                continue
+
+            upload.seek(0)
+            if Path(name).suffix.lower() not in IMAGE_EXTENSIONS:
+                raise OCRBatchError(f"Unsupported file type: {name}")
+            add(name, upload.size, upload.read)
+
+        if not images:
+            raise OCRBatchError("No images found in upload")
+        return images
+
+    def _executor(self) -> Executor:
+        if getattr(settings, 'OCR_BATCH_PROCESSES', 2) > 0:
+            return get_ocr_process_pool()
+        return ThreadPoolExecutor(max_workers=get_ocr_pool().size, thread_name_prefix='ocr-batch')
+
+    @staticmethod
+    def _run_inline(image_path: str, bookmaker_account: int) -> Dict[str, Any]:
+        with get_ocr_pool().engine() as engine:
+            return run_ocr_and_parse(image_path, bookmaker_account, engine=engine)
+
+    def recognize(self, images: List[Dict[str, Any]], bookmaker_account: int) -> None:
+        """Fill each image dict with ocr/parsed/cached/timings."""
+        backend = getattr(settings, 'OCR_BACKEND', 'paddle')
+        use_cache = getattr(settings, 'OCR_CACHE_ENABLED', True)
+        cache = OCRResultCache() if use_cache else None
+        engine_version = get_backend_version(backend) if use_cache else None
+
+        pending = []
+        for image in images:
+            started = time.perf_counter()
+            image['image_hash'] = OCREnginePool.image_key(image['path'].read_bytes())
+            image['timings'] = {'ocr_ms': 0.0, 'parse_ms': 0.0}
+            image['cached'] = False
+
+            entry = None
+            if cache is not None:
+                entry = cache.lookup(image_hash=image['image_hash'], backend=backend, engine_version=engine_version)
+            image['timings']['lookup_ms'] = (time.perf_counter() - started) * 1000.0
+            if entry is None:
+                pending.append(image)
+                continue
+
+            # The cached text serves every layout; only a stale or missing parse is redone
+            image['ocr'] = cache.to_ocr_payload(entry)
+            image['cached'] = True
+            layout = resolve_layout(image['ocr']['text'], bookmaker_account)
+            parser_version = parsed_cache_version(layout)
+            if entry.parsed is not None and entry.parser_version == parser_version:
+                image['parsed'] = {**entry.parsed, 'bookmaker_account': bookmaker_account}
+                continue
+            started = time.perf_counter()
+            image['parsed'] = parse_coupon_text(image['ocr']['text'], bookmaker_account=bookmaker_account, layout=layout)
+            image['timings']['parse_ms'] = (time.perf_counter() - started) * 1000.0
+            cache.store_parsed(entry, parsed=image['parsed'], parser_version=parser_version)
+
+        if not pending:
+            return
+
+        executor = self._executor()
+        inline = not isinstance(executor, ProcessPoolExecutor)
+        task = self._run_inline if inline else run_ocr_and_parse
+        try:
+            futures = [(image, executor.submit(task, str(image['path']), bookmaker_account)) for image in pending]
+            for image, future in futures:
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool as e:
+                    reset_ocr_process_pool()
+                    image['error'] = f"OCR worker process died: {e}"
+                    continue
+                except Exception as e:
+                    logger.error(f"[OCR_BATCH] OCR failed for {image['name']}: {e}")
+                    image['error'] = str(e)
+                    continue
+
+                image['ocr'] = outcome['ocr']
+                image['parsed'] = outcome['parsed']
+                image['timings']['ocr_ms'] = outcome['ocr_ms']
+                image['timings']['parse_ms'] = outcome['parse_ms']
+
+                if cache is not None and outcome['ocr'].get('success'):
+                    entry = cache.store(
+                        image_hash=image['image_hash'],
+                        backend=backend,
+                        engine_version=engine_version,
+                        ocr_result=outcome['ocr'],
+                    )
+                    layout = resolve_layout(outcome['ocr'].get('text', ''), bookmaker_account)
+                    cache.store_parsed(entry, parsed=outcome['parsed'], parser_version=parsed_cache_version(layout))
+        finally:
+            if inline:
+                executor.shutdown(wait=True)
+
+    @staticmethod
+    def to_coupon_data(parsed: Dict[str, Any], *, account, strategy, bet_types: Dict[str, BetTypeDict]) -> Dict[str, Any]:
+        try:
+            bet_stake = Decimal(str(parsed.get('bet_stake') or '0'))
+        except InvalidOperation:
+            bet_stake = Decimal('0')
+        if bet_stake <= 0:
+            raise OCRBatchError("Stake not recognised")
+
+        bets = []
+        for bet in parsed.get('bets') or []:
+            try:
+                odds = Decimal(str(bet.get('odds')))
+            except InvalidOperation:
+                odds = Decimal('0')
+            if odds < Decimal('1.01'):
+                raise OCRBatchError(f"Odds not recognised for '{bet.get('event_name', '')}'")
+            bets.append({
+                'event_name': bet.get('event_name', ''),
+                'start_time': parse_datetime(bet['start_time']) if bet.get('start_time') else None,
+                'bet_type': bet_types.get(str(bet.get('bet_type') or '').upper()),
+                'line': bet.get('line', ''),
+                'odds': odds,
+            })
+        if not bets:
+            raise OCRBatchError("No bets recognised")
+
+        return {
+            'bookmaker_account': account,
+            'strategy': strategy,
+            'bet_stake': bet_stake,
+            'placed_at': parse_datetime(parsed['placed_at']) if parsed.get('placed_at') else None,
+            'bets': bets,
+        }
+
+    def process(self, *, user, uploads, account, strategy=None, create: bool = True) -> Dict[str, Any]:
+        batch_started = time.perf_counter()
+
+        with tempfile.TemporaryDirectory(prefix='ocr-batch-') as tmp:
+            images = self.collect_images(uploads, Path(tmp))
+            ocr_started = time.perf_counter()
+            self.recognize(images, bookmaker_account=account.pk)
+            ocr_wall_ms = (time.perf_counter() - ocr_started) * 1000.0
+
+        bet_types = BetTypeDict.objects.in_bulk(field_name='code')
+        to_create = []
+        for image in images:
+            if image.get('error'):
+                image['status'] = 'failed'
+                continue
+            try:
+                image['coupon_data'] = self.to_coupon_data(
+                    image['parsed'], account=account, strategy=strategy, bet_types=bet_types
+                )
+                image['status'] = 'parsed'
+                to_create.append(image)
+            except OCRBatchError as e:
+                image['status'] = 'skipped'
+                image['error'] = str(e)
+
+        db_ms = 0.0
+        if create and to_create:
+            db_started = time.perf_counter()
+            coupons = bulk_create_coupons(user, [image['coupon_data'] for image in to_create])
+            db_ms = (time.perf_counter() - db_started) * 1000.0
+            for image, coupon in zip(to_create, coupons):
+                image['status'] = 'created'
+                image['coupon_id'] = coupon.pk
+
+        results = []
+        for image in images:
+            timings = {k: round(v, 2) for k, v in image['timings'].items()}
+            timings['total_ms'] = round(sum(image['timings'].values()), 2)
+            results.append({
+                'image_name': image['name'],
+                'status': image['status'],
+                'coupon_id': image.get('coupon_id'),
+                'cached': image['cached'],
+                'error': image.get('error'),
+                'parsed_coupon': image.get('parsed'),
+                'timings': timings,
+            })
+
+        return {
+            'total': len(images),
+            'created': sum(1 for r in results if r['status'] == 'created'),
+            'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+            'failed': sum(1 for r in results if r['status'] == 'failed'),
+            'timings': {
+                'ocr_wall_ms': round(ocr_wall_ms, 2),
+                'db_ms': round(db_ms, 2),
+                'total_ms': round((time.perf_counter() - batch_started) * 1000.0, 2),
+            },
+            'results': results,
+        }
+
+
+_service = OCRBatchService()
+
+
+def process_ocr_batch(*, user, uploads, account, strategy=None, create: bool = True) -> Dict[str, Any]:
+    return _service.process(user=user, uploads=uploads, account=account, strategy=strategy, create=create)
@@ -0,0 +1,115 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from ..models import OCRResult
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """Persistent OCR result store keyed by image hash, backend and engine version.
+
+    Entries are evicted least-recently-used first once either the entry count
+    or the accumulated payload size exceeds its limit.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else getattr(settings, 'OCR_CACHE_MAX_ENTRIES', 5000)
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(settings, 'OCR_CACHE_MAX_BYTES', 0)
+
+    def lookup(self, *, image_hash: str, backend: str, engine_version: str) -> Optional[OCRResult]:
+        entry = OCRResult.objects.filter(
+            image_hash=image_hash,
+            backend=backend,
+            engine_version=engine_version,
+        ).first()
+        if entry is None:
+            return None
+
+        now = timezone.now()
+        OCRResult.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_accessed_at=now)
+        entry.hits += 1
+        entry.last_accessed_at = now
+        return entry
+
+    def store(self, *, image_hash: str, backend: str, engine_version: str, ocr_result: Dict[str, Any]) -> OCRResult:
+        items = ocr_result.get('raw_result') or []
+        rec_texts = [item.get('text', '') for item in items]
+        rec_scores = [float(item.get('confidence', 1.0)) for item in items]
+        raw_text = ocr_result.get('text') or ''
+
+        entry, _created = OCRResult.objects.update_or_create(
+            image_hash=image_hash,
+            backend=backend,
+            engine_version=engine_version,
+            defaults={
+                'rec_texts': rec_texts,
+                'rec_scores': rec_scores,
+                'raw_text': raw_text,
+                'average_confidence': float(ocr_result.get('average_confidence') or 0.0),
+                'parsed': None,
+                'parser_version': '',
+                'size_bytes': self._payload_size(rec_texts, rec_scores, None, raw_text),
+                'last_accessed_at': timezone.now(),
+            },
+        )
+        self.evict()
+        return entry
+
+    def store_parsed(self, entry: OCRResult, *, parsed: Dict[str, Any], parser_version: str) -> OCRResult:
+        entry.parsed = parsed
+        entry.parser_version = parser_version
+        entry.size_bytes = self._payload_size(entry.rec_texts, entry.rec_scores, parsed, entry.raw_text)
+        entry.save(update_fields=['parsed', 'parser_version', 'size_bytes'])
+        return entry
+
+    def evict(self) -> int:
+        evicted = 0
+
+        if self.max_entries:
+            overflow = OCRResult.objects.count() - self.max_entries
+            if overflow > 0:
+                stale_ids = list(
+                    OCRResult.objects.order_by('last_accessed_at', 'id').values_list('id', flat=True)[:overflow]
+                )
+                evicted += OCRResult.objects.filter(id__in=stale_ids).delete()[0]
+
+        if self.max_bytes:
+            total = OCRResult.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+            if total > self.max_bytes:
+                stale_ids = []
+                for entry_id, size in OCRResult.objects.order_by('last_accessed_at', 'id').values_list('id', 'size_bytes').iterator():
+                    if total <= self.max_bytes:
+                        break
+                    stale_ids.append(entry_id)
+                    total -= size
+                evicted += OCRResult.objects.filter(id__in=stale_ids).delete()[0]
+
+        if evicted:
+            logger.info(f"[OCR_CACHE] Evicted {evicted} entries")
+        return evicted
+
+    @staticmethod
+    def to_ocr_payload(entry: OCRResult) -> Dict[str, Any]:
+        scores = entry.rec_scores or []
+        items = [
+            {'text': text, 'confidence': scores[idx] if idx < len(scores) else 1.0}
+            for idx, text in enumerate(entry.rec_texts or [])
+        ]
+        return {
+            "text": entry.text,
+            "raw_result": items,
+            "average_confidence": round(entry.average_confidence, 4),
+            "total_items": len(items),
+            "success": True,
+            "backend": entry.backend,
+        }
+
+    @staticmethod
+    def _payload_size(rec_texts, rec_scores, parsed, raw_text: str = '') -> int:
+        return len(json.dumps([rec_texts, rec_scores, parsed, raw_text], ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,169 @@
+import logging
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import OCRJob
+from .ocr_pipeline import recognize_image
+
+logger = logging.getLogger(__name__)
+
+
+class OCRJobService:
+    """DB-backed OCR job queue.
+
+    The ``ocr_jobs`` table acts as the broker: the API inserts queued rows and
+    workers claim them with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    threads or processes can drain the queue without double-processing a job.
+    """
+
+    def __init__(self, max_attempts: Optional[int] = None, stale_after: Optional[float] = None):
+        self.max_attempts = max_attempts or getattr(settings, 'OCR_JOB_MAX_ATTEMPTS', 2)
+        self.stale_after = stale_after or getattr(settings, 'OCR_JOB_STALE_AFTER', 600)
+
+    @staticmethod
+    def upload_dir() -> Path:
+        return Path(getattr(settings, 'OCR_UPLOAD_DIR', Path(settings.BASE_DIR) / 'media' / 'ocr_uploads'))
+
+    def save_upload(self, uploaded_file) -> Path:
+        target_dir = self.upload_dir()
+        target_dir.mkdir(parents=True, exist_ok=True)
+        suffix = Path(uploaded_file.name or '').suffix.lower() or '.png'
+        target = target_dir / f"{uuid.uuid4().hex}{suffix}"
+        with open(target, 'wb') as fh:
+            for chunk in uploaded_file.chunks():
+                fh.write(chunk)
+        return target
+
+    def discard_upload(self, job: OCRJob) -> None:
+        """Delete the job's image once it is finished, if it was an API upload
+        (images referenced by name from coupons_images are kept)."""
+        path = Path(job.image_path)
+        try:
+            if path.resolve().parent == self.upload_dir().resolve():
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"[OCR_JOBS] Could not delete upload {path} of job {job.pk}: {e}")
+
+    def submit(
+        self,
+        *,
+        image_path: Path,
+        image_name: str,
+        user=None,
+        parse: bool = True,
+        bookmaker_account: Optional[int] = None,
+    ) -> OCRJob:
+        job = OCRJob.objects.create(
+            user=user if getattr(user, 'is_authenticated', False) else None,
+            image_name=image_name,
+            image_path=str(image_path),
+            parse=parse,
+            bookmaker_account=bookmaker_account,
+        )
+        logger.info(f"[OCR_JOBS] Queued job {job.pk} for {image_name}")
+        return job
+
+    def claim_next(self, worker: str = '') -> Optional[OCRJob]:
+        with transaction.atomic():
+            job = (
+                OCRJob.objects.select_for_update(skip_locked=True)
+                .filter(status=OCRJob.JobStatus.QUEUED)
+                .order_by('created_at', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = OCRJob.JobStatus.RUNNING
+            job.started_at = timezone.now()
+            job.attempts += 1
+            job.worker = worker[:100]
+            job.save(update_fields=['status', 'started_at', 'attempts', 'worker'])
+        return job
+
+    def run(self, job: OCRJob) -> OCRJob:
+        try:
+            recognized = recognize_image(
+                job.image_path,
+                parse=job.parse,
+                bookmaker_account=job.bookmaker_account,
+            )
+        except Exception as e:
+            logger.error(f"[OCR_JOBS] Job {job.pk} failed (attempt {job.attempts}): {e}", exc_info=True)
+            job.error = str(e)
+            if job.attempts < self.max_attempts:
+                job.status = OCRJob.JobStatus.QUEUED
+                job.save(update_fields=['status', 'error'])
+            else:
+                job.status = OCRJob.JobStatus.FAILED
+                job.finished_at = timezone.now()
+                job.save(update_fields=['status', 'error', 'finished_at'])
+                self.discard_upload(job)
+            return job
+
+        job.status = OCRJob.JobStatus.DONE
+        job.result = recognized
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+        self.discard_upload(job)
+        logger.info(f"[OCR_JOBS] Job {job.pk} done (cached={recognized.get('cached')})")
+        return job
+
+    def process_next(self, worker: str = '') -> Optional[OCRJob]:
+        job = self.claim_next(worker)
+        if job is None:
+            return None
+        return self.run(job)
+
+    def requeue_stale(self) -> int:
+        """Return jobs left RUNNING by a crashed worker to the queue."""
+        cutoff = timezone.now() - timedelta(seconds=self.stale_after)
+        requeued = OCRJob.objects.filter(
+            status=OCRJob.JobStatus.RUNNING,
+            started_at__lt=cutoff,
+        ).update(status=OCRJob.JobStatus.QUEUED, worker='')
+        if requeued:
+            logger.warning(f"[OCR_JOBS] Requeued {requeued} stale job(s)")
+        return requeued
+
+    @staticmethod
+    def to_status(job: OCRJob) -> Dict[str, Any]:
+        return {
+            'job_id': job.pk,
+            'status': job.status,
+            'image_name': job.image_name,
+            'attempts': job.attempts,
+            'error': job.error or None,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+        }
+
+
+_service = OCRJobService()
+
+
+def submit_ocr_job(**kwargs) -> OCRJob:
+    return _service.submit(**kwargs)
+
+
+def save_ocr_upload(uploaded_file) -> Path:
+    return _service.save_upload(uploaded_file)
+
+
+def process_next_ocr_job(worker: str = '') -> Optional[OCRJob]:
+    return _service.process_next(worker)
+
+
+def requeue_stale_ocr_jobs() -> int:
+    return _service.requeue_stale()
+
+
+def ocr_job_status(job: OCRJob) -> Dict[str, Any]:
+    return OCRJobService.to_status(job)
@@ -0,0 +1,68 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from django.conf import settings
+
+from .coupon_layouts import parse_coupon_text, parsed_cache_version, resolve_layout
+from .ocr_cache import OCRResultCache
+from .ocr_pool import OCREnginePool, get_ocr_pool
+from .ocr_service import get_backend_version
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_text(text: str, bookmaker_account: Optional[int], layout: Optional[str] = None) -> Dict[str, Any]:
+    return parse_coupon_text(text, bookmaker_account=bookmaker_account, layout=layout)
+
+
+def recognize_image(
+    image_path: Union[str, Path],
+    *,
+    parse: bool = False,
+    bookmaker_account: Optional[int] = None,
+    pool: Optional[OCREnginePool] = None,
+) -> Dict[str, Any]:
+    """Run OCR (and optionally the coupon parser) for one image, serving repeats from the cache."""
+    image_path = Path(image_path)
+    pool = pool or get_ocr_pool()
+    image_bytes = image_path.read_bytes()
+    image_hash = OCREnginePool.image_key(image_bytes)
+
+    if not getattr(settings, 'OCR_CACHE_ENABLED', True):
+        ocr = pool.extract(image_path, image_key=image_hash, image_bytes=image_bytes)
+        parsed = _parse_text(ocr.get('text', ''), bookmaker_account) if parse else None
+        return {'image_hash': image_hash, 'cached': False, 'ocr': ocr, 'parsed': parsed}
+
+    cache = OCRResultCache()
+    engine_version = get_backend_version(pool.backend)
+    entry = cache.lookup(image_hash=image_hash, backend=pool.backend, engine_version=engine_version)
+    cached = entry is not None
+
+    if cached:
+        logger.info(f"[OCR_CACHE] Hit for {image_path.name} ({image_hash[:12]})")
+        ocr = cache.to_ocr_payload(entry)
+    else:
+        ocr = pool.extract(image_path, image_key=image_hash, image_bytes=image_bytes)
+        if ocr.get('success'):
+            entry = cache.store(
+                image_hash=image_hash,
+                backend=pool.backend,
+                engine_version=engine_version,
+                ocr_result=ocr,
+            )
+
+    parsed = None
+    if parse:
+        # The parse depends on the account's layout, so it is only reused for the same layout
+        text = ocr.get('text', '')
+        layout = resolve_layout(text, bookmaker_account)
+        parser_version = parsed_cache_version(layout)
+        if entry is not None and entry.parsed is not None and entry.parser_version == parser_version:
+            parsed = {**entry.parsed, 'bookmaker_account': bookmaker_account}
+        else:
+            parsed = _parse_text(text, bookmaker_account, layout)
+            if entry is not None:
+                cache.store_parsed(entry, parsed=parsed, parser_version=parser_version)
+
+    return {'image_hash': image_hash, 'cached': cached, 'ocr': ocr, 'parsed': parsed}
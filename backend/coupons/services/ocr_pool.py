@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from django.conf import settings
+
+from .ocr_service import OCRService
+
+logger = logging.getLogger(__name__)
+
+
+class OCREnginePool:
+    """Process-wide pool of initialised OCR engines.
+
+    Engines are expensive to build (model load), so they are created once and
+    handed out exclusively to one request at a time. Concurrent requests for
+    the same image bytes share a single inference call.
+    """
+
+    LATENCY_WINDOW = 200
+
+    def __init__(self, size: int = 2, backend: str = 'paddle', acquire_timeout: Optional[float] = None):
+        self.size = max(1, int(size))
+        self.backend = backend
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: "queue.LifoQueue[OCRService]" = queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._waiting = 0
+
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        self._requests_total = 0
+        self._inferences_total = 0
+        self._shared_total = 0
+        self._errors_total = 0
+        self._latencies_ms: deque = deque(maxlen=self.LATENCY_WINDOW)
+        self._waits_ms: deque = deque(maxlen=self.LATENCY_WINDOW)
+
+    def _create_engine(self) -> OCRService:
+        logger.info(f"[OCR_POOL] Initializing {self.backend} engine ({self._created + 1}/{self.size})")
+        return OCRService(backend=self.backend)
+
+    def preload(self) -> int:
+        created = 0
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            try:
+                engine = self._create_engine()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            self._idle.put(engine)
+            created += 1
+        logger.info(f"[OCR_POOL] Preloaded {created} engine(s), pool size {self.size}")
+        return created
+
+    def _acquire(self) -> OCRService:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._create_engine()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No OCR engine available within {self.acquire_timeout}s")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    @contextmanager
+    def engine(self):
+        started = time.perf_counter()
+        engine = self._acquire()
+        with self._lock:
+            self._in_use += 1
+            self._waits_ms.append((time.perf_counter() - started) * 1000.0)
+        try:
+            yield engine
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(engine)
+
+    @staticmethod
+    def image_key(image_bytes: bytes) -> str:
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def _infer(self, source: Union[Path, bytes]) -> Dict[str, Any]:
+        with self.engine() as engine:
+            with self._lock:
+                self._inferences_total += 1
+            return engine.extract(source)
+
+    def extract(
+        self,
+        image_path: Union[str, Path],
+        image_key: Optional[str] = None,
+        image_bytes: Optional[bytes] = None,
+    ) -> Dict[str, Any]:
+        """OCR one image; pass ``image_bytes`` when they are already read so
+        the engine decodes them from memory instead of the file."""
+        image_path = Path(image_path)
+        started = time.perf_counter()
+        with self._lock:
+            self._requests_total += 1
+
+        if image_key is None:
+            image_key = self.image_key(image_bytes if image_bytes is not None else image_path.read_bytes())
+        key = f"{self.backend}:{image_key}"
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            with self._lock:
+                self._shared_total += 1
+            return future.result()
+
+        try:
+            result = self._infer(image_bytes if image_bytes is not None else image_path)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            with self._lock:
+                self._errors_total += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            with self._lock:
+                self._latencies_ms.append((time.perf_counter() - started) * 1000.0)
+
+    @staticmethod
+    def _percentile(values, pct: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return round(ordered[idx], 2)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self._latencies_ms)
+            waits = list(self._waits_ms)
+            return {
+                'backend': self.backend,
+                'size': self.size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'waiting': self._waiting,
+                'occupancy_percent': round(self._in_use / self.size * 100, 2),
+                'requests_total': self._requests_total,
+                'inferences_total': self._inferences_total,
+                'shared_total': self._shared_total,
+                'errors_total': self._errors_total,
+                'latency_ms': {
+                    'avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                    'p50': self._percentile(latencies, 50),
+                    'p95': self._percentile(latencies, 95),
+                    'max': round(max(latencies), 2) if latencies else None,
+                },
+                'wait_ms': {
+                    'avg': round(sum(waits) / len(waits), 2) if waits else None,
+                    'p95': self._percentile(waits, 95),
+                },
+            }
+
+
+_pool: Optional[OCREnginePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OCREnginePool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OCREnginePool(
+                    size=getattr(settings, 'OCR_POOL_SIZE', 2),
+                    backend=getattr(settings, 'OCR_BACKEND', 'paddle'),
+                    acquire_timeout=getattr(settings, 'OCR_POOL_ACQUIRE_TIMEOUT', None),
+                )
+    return _pool
+
+
+def preload_ocr_pool() -> None:
+    try:
+        get_ocr_pool().preload()
+    except Exception as e:
+        logger.error(f"[OCR_POOL] Preload failed: {e}", exc_info=True)
+
+
+def get_ocr_pool_metrics() -> Dict[str, Any]:
+    if _pool is None:
+        return {'initialized': False}
+    return {'initialized': True, **_pool.metrics()}
@@ -1,8 +1,12 @@
 import logging
 from pathlib import Path
-from typing import Union, Dict, Any
+from typing import Optional, Dict, Any
+
+from django.conf import settings
 from PIL import Image
 
+from .image_preprocessing import PREPROCESS_VERSION, ImageSource, decode_image, preprocess_image
+
 logger = logging.getLogger(__name__)
 
 PADDLE_AVAILABLE = False
@@ -23,12 +27,41 @@ except ImportError:
     logger.warning("Tesseract not available")
 
 
+_BACKEND_VERSIONS: Dict[str, str] = {}
+
+
+def preprocessing_enabled() -> bool:
+    return getattr(settings, 'OCR_PREPROCESS_ENABLED', True)
+
+
+def get_backend_version(backend: str) -> str:
+    """Engine version for OCR cache entries; preprocessing changes what the
+    engine sees, so its version is part of it."""
+    suffix = f"+pre{PREPROCESS_VERSION}" if preprocessing_enabled() else ''
+    if backend in _BACKEND_VERSIONS:
+        return _BACKEND_VERSIONS[backend] + suffix
+
+    version = 'unknown'
+    try:
+        if backend == 'paddle' and PADDLE_AVAILABLE:
+            import paddleocr
+            version = str(getattr(paddleocr, '__version__', 'unknown'))
+        elif backend == 'tesseract' and TESSERACT_AVAILABLE:
+            version = str(pytesseract.get_tesseract_version())
+    except Exception as e:
+        logger.warning(f"Could not determine {backend} version: {e}")
+
+    _BACKEND_VERSIONS[backend] = version
+    return version + suffix
+
+
 class OCRService:
 
-    def __init__(self, use_gpu: bool = False, backend: str = 'auto'):
+    def __init__(self, use_gpu: bool = False, backend: str = 'auto', preprocess: Optional[bool] = None):
         self.backend = None
         self.ocr = None
         self.use_gpu = use_gpu
+        self.preprocess = preprocessing_enabled() if preprocess is None else preprocess
 
         if backend == 'auto':
             if PADDLE_AVAILABLE:
@@ -71,40 +104,52 @@ class OCRService:
             logger.error("Zainstaluj tesseract-ocr: sudo apt install tesseract-ocr")
             raise
     
-    def extract_text_from_image(self, image_path: Union[str, Path]) -> str:
+    def prepare_image(self, source: ImageSource) -> Image.Image:
+        """Decode the image once and, unless disabled, crop/downscale/binarise/deskew it."""
+        if self.preprocess:
+            return preprocess_image(source).image
+        return decode_image(source)
+
+    @staticmethod
+    def _missing(source: ImageSource) -> bool:
+        return isinstance(source, (str, Path)) and not Path(source).exists()
+
+    def extract_text_from_image(self, image_path: ImageSource) -> str:
         try:
-            image_path = Path(image_path)
-            
-            if not image_path.exists():
+            if self._missing(image_path):
                 logger.error(f"Image file not found: {image_path}")
                 return ""
-            
-            with Image.open(image_path) as img:
-                logger.info(f"Processing image: {image_path} ({self.backend})")
+
+            image = self.prepare_image(image_path)
+            logger.info(f"Processing image {image.size[0]}x{image.size[1]} ({self.backend})")
 
             if self.backend == 'paddle':
-                extracted_text = self._extract_paddle(str(image_path))
+                extracted_text = self._extract_paddle(image)
             elif self.backend == 'tesseract':
-                extracted_text = self._extract_tesseract(str(image_path))
+                extracted_text = self._extract_tesseract(image)
             else:
                 raise Exception(f"Unknown backend: {self.backend}")
 
-            logger.info(f"Text extracted from {image_path}: {len(extracted_text)} characters")
+            logger.info(f"Text extracted: {len(extracted_text)} characters")
             return extracted_text
-            
+
         except Exception as e:
-            logger.error(f"Error extracting text from image {image_path}: {str(e)}")
+            logger.error(f"Error extracting text from image: {str(e)}")
             raise
-    
-    def _extract_paddle(self, image_path: str) -> str:
-        result = self.ocr.predict(image_path)
+
+    @staticmethod
+    def _paddle_input(image: Image.Image):
+        # PaddleOCR takes in-memory images as BGR arrays
+        import numpy as np
+        return np.ascontiguousarray(np.asarray(image.convert('RGB'))[:, :, ::-1])
+
+    def _extract_paddle(self, image: Image.Image) -> str:
+        result = self.ocr.predict(self._paddle_input(image))
         return self._parse_paddle_result(result)
 
-    def _extract_tesseract(self, image_path: str) -> str:
+    def _extract_tesseract(self, image: Image.Image) -> str:
         import pytesseract
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img)
-        return text
+        return pytesseract.image_to_string(image)
 
     def _parse_paddle_result(self, ocr_result) -> str:
         text_lines = []
@@ -132,27 +177,30 @@ class OCRService:
 
         return '\n'.join(text_lines)
     
-    def extract_text_with_confidence(self, image_path: Union[str, Path]) -> Dict[str, Any]:
-        try:
-            image_path = Path(image_path)
-            
-            if not image_path.exists():
-                logger.error(f"Image file not found: {image_path}")
-                return {"text": "", "raw_result": [], "success": False}
-            
-            if self.backend == 'paddle':
-                return self._extract_paddle_with_confidence(str(image_path))
-            elif self.backend == 'tesseract':
-                return self._extract_tesseract_with_confidence(str(image_path))
-            else:
-                raise Exception(f"Unknown backend: {self.backend}")
+    def extract(self, image_path: ImageSource) -> Dict[str, Any]:
+        """OCR a path, raw image bytes or a decoded image; the engine gets the
+        prepared image in memory."""
+        if self._missing(image_path):
+            logger.error(f"Image file not found: {image_path}")
+            return {"text": "", "raw_result": [], "success": False}
 
+        if self.backend not in ('paddle', 'tesseract'):
+            raise Exception(f"Unknown backend: {self.backend}")
+
+        image = self.prepare_image(image_path)
+        if self.backend == 'paddle':
+            return self._extract_paddle_with_confidence(image)
+        return self._extract_tesseract_with_confidence(image)
+
+    def extract_text_with_confidence(self, image_path: ImageSource) -> Dict[str, Any]:
+        try:
+            return self.extract(image_path)
         except Exception as e:
             logger.error(f"Error extracting text with confidence: {str(e)}")
             return {"text": "", "raw_result": [], "success": False, "error": str(e)}
 
-    def _extract_paddle_with_confidence(self, image_path: str) -> Dict[str, Any]:
-        result = self.ocr.predict(image_path)
+    def _extract_paddle_with_confidence(self, image: Image.Image) -> Dict[str, Any]:
+        result = self.ocr.predict(self._paddle_input(image))
 
         text_items = []
         total_confidence = 0
@@ -199,10 +247,9 @@ class OCRService:
             "backend": "paddle"
         }
 
-    def _extract_tesseract_with_confidence(self, image_path: str) -> Dict[str, Any]:
+    def _extract_tesseract_with_confidence(self, image: Image.Image) -> Dict[str, Any]:
         import pytesseract
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img)
+        text = pytesseract.image_to_string(image)
 
         text_items = []
         if text.strip():
@@ -0,0 +1,71 @@
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent / 'parser_corpus'
+
+FIELDS = ('coupon_type', 'bet_stake', 'placed_at')
+BET_FIELDS = ('event_name', 'odds')
+
+
+class CorpusCase(NamedTuple):
+    name: str
+    text: str
+    expected: Dict[str, Any]
+
+
+def load_corpus(directory: Path = CORPUS_DIR) -> List[CorpusCase]:
+    """OCR outputs (``<case>.txt``) paired with the expected parse (``<case>.json``)."""
+    cases = []
+    for text_path in sorted(Path(directory).glob('*.txt')):
+        expected_path = text_path.with_suffix('.json')
+        if not expected_path.exists():
+            continue
+        cases.append(CorpusCase(
+            name=text_path.stem,
+            text=text_path.read_text(encoding='utf-8'),
+            expected=json.loads(expected_path.read_text(encoding='utf-8')),
+        ))
+    return cases
+
+
+def field_accuracy(expected: Dict[str, Any], parsed: Dict[str, Any]) -> Tuple[int, int]:
+    """(matched, total) over the coupon fields, the bet count and each expected
+    bet's event name and odds, compared by position."""
+    matched = sum(expected.get(name) == parsed.get(name) for name in FIELDS)
+    total = len(FIELDS) + 1
+
+    expected_bets, parsed_bets = expected.get('bets', []), parsed.get('bets', [])
+    matched += len(expected_bets) == len(parsed_bets)
+    for index, bet in enumerate(expected_bets):
+        other = parsed_bets[index] if index < len(parsed_bets) else {}
+        matched += sum(bet.get(name) == other.get(name) for name in BET_FIELDS)
+        total += len(BET_FIELDS)
+    return matched, total
+
+
+def run_benchmark(parse: Callable[[str], Dict[str, Any]], cases: List[CorpusCase], iterations: int = 200) -> Dict[str, Any]:
+    """Parses per second over the corpus and field accuracy against the golden files."""
+    matched = total = 0
+    failures = []
+    for case in cases:
+        case_matched, case_total = field_accuracy(case.expected, parse(case.text))
+        matched += case_matched
+        total += case_total
+        if case_matched != case_total:
+            failures.append(case.name)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for case in cases:
+            parse(case.text)
+    elapsed = time.perf_counter() - started
+
+    parses = iterations * len(cases)
+    return {
+        'cases': len(cases),
+        'parses_per_second': parses / elapsed if elapsed else 0.0,
+        'accuracy': matched / total if total else 1.0,
+        'failures': failures,
+    }
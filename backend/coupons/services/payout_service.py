@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Optional, Union
+
+from django.db.models import (
+    Case,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    QuerySet,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Round
+
+from ..models import Coupon
+
+# Podatek od wygranej w PLN: 10% gdy wypłata przekracza 2280 zł.
+PLN_TAX_THRESHOLD = Decimal('2280.00')
+PLN_WINNINGS_TAX = Decimal('0.10')
+
+_QUANT = Decimal('0.01')
+_MONEY = DecimalField(max_digits=20, decimal_places=6)
+
+_RELATED = ('bookmaker_account__bookmaker', 'bookmaker_account__currency')
+
+
+@dataclass(frozen=True)
+class Payout:
+    """``gross`` is stake * odds after the bookmaker turnover tax, ``net`` also
+    has the PLN winnings tax applied. Both are unrounded; ``balance`` and
+    ``rounded`` are what gets stored and shown."""
+
+    gross: Decimal
+    net: Decimal
+    bet_stake: Decimal
+
+    @property
+    def rounded(self) -> Decimal:
+        return self.net.quantize(_QUANT, rounding=ROUND_HALF_UP)
+
+    @property
+    def balance(self) -> Decimal:
+        return (self.net - self.bet_stake).quantize(_QUANT, rounding=ROUND_HALF_UP)
+
+
+def compute_payout(bet_stake, multiplier, tax_multiplier=None, currency_code: Optional[str] = None) -> Payout:
+    bet_stake = Decimal(str(bet_stake))
+    tax_mult = Decimal(str(tax_multiplier)) if tax_multiplier is not None else Decimal('1.00')
+    gross = bet_stake * Decimal(str(multiplier)) * tax_mult
+    net = gross
+    if currency_code == 'PLN' and gross > PLN_TAX_THRESHOLD:
+        net = gross * (Decimal('1.00') - PLN_WINNINGS_TAX)
+    return Payout(gross=gross, net=net, bet_stake=bet_stake)
+
+
+def _payout_terms(coupon: Coupon):
+    """(tax_multiplier, currency_code) of the coupon's account. Uses the loaded
+    relations when they are select_related, otherwise reads both in one query
+    instead of walking account -> bookmaker -> currency."""
+    if not coupon.bookmaker_account_id:
+        return None, None
+    if Coupon.bookmaker_account.is_cached(coupon):
+        account = coupon.bookmaker_account
+        account_model = type(account)
+        if account_model.bookmaker.is_cached(account) and account_model.currency.is_cached(account):
+            return (
+                getattr(account.bookmaker, 'tax_multiplier', None),
+                getattr(account.currency, 'code', None),
+            )
+    from finances.models import BookmakerAccountModel
+    row = BookmakerAccountModel.objects.filter(id=coupon.bookmaker_account_id).values_list(
+        'bookmaker__tax_multiplier', 'currency__code'
+    ).first()
+    return row or (None, None)
+
+
+def payout_for_coupon(coupon: Coupon) -> Payout:
+    tax_multiplier, currency_code = _payout_terms(coupon)
+    return compute_payout(coupon.bet_stake, coupon.multiplier, tax_multiplier, currency_code)
+
+
+def gross_payout_expression():
+    return ExpressionWrapper(
+        F('bet_stake') * F('multiplier')
+        * Coalesce(F('bookmaker_account__bookmaker__tax_multiplier'), Value(Decimal('1.00'))),
+        output_field=_MONEY,
+    )
+
+
+def net_payout_expression():
+    gross = gross_payout_expression()
+    return Case(
+        When(
+            Q(bookmaker_account__currency__code='PLN') & Q(gross_payout__gt=PLN_TAX_THRESHOLD),
+            then=ExpressionWrapper(
+                gross * Value(Decimal('1.00') - PLN_WINNINGS_TAX), output_field=_MONEY
+            ),
+        ),
+        default=gross,
+        output_field=_MONEY,
+    )
+
+
+def annotate_payouts(queryset: QuerySet) -> QuerySet:
+    """Adds ``gross_payout`` and ``net_payout`` (rounded to 0.01) columns.
+    ``Coupon.potential_payout`` picks up ``net_payout`` when it is present."""
+    return queryset.annotate(
+        gross_payout=gross_payout_expression(),
+    ).annotate(
+        net_payout=Round(net_payout_expression(), 2, output_field=_MONEY),
+    )
+
+
+def total_payout(queryset: QuerySet) -> Decimal:
+    """Sum of potential payouts over a coupon queryset in a single query."""
+    queryset = annotate_payouts(queryset.order_by())
+    total = queryset.aggregate(total=Sum('net_payout'))['total']
+    return Decimal(total or 0).quantize(_QUANT, rounding=ROUND_HALF_UP)
+
+
+def get_payouts(coupons: Union[QuerySet, Iterable[int]]) -> Dict[int, Payout]:
+    """Payouts for a queryset or a list of coupon ids, read with one query."""
+    queryset = coupons if isinstance(coupons, QuerySet) else Coupon.objects.filter(id__in=list(coupons))
+    rows = queryset.order_by().values_list(
+        'id',
+        'bet_stake',
+        'multiplier',
+        'bookmaker_account__bookmaker__tax_multiplier',
+        'bookmaker_account__currency__code',
+    )
+    return {
+        coupon_id: compute_payout(bet_stake, multiplier, tax_mult, currency_code)
+        for coupon_id, bet_stake, multiplier, tax_mult, currency_code in rows
+    }
@@ -1,5 +1,6 @@
 
 from coupons.models import Coupon, Event
+from coupons.services.team_service import team_q
 from django.db.models import Q, F
 
 
@@ -9,8 +10,8 @@ class TeamFilterService:
     @staticmethod
     def get_coupons_by_home_team(user, team_name: str, only_won=False):
         queryset = Coupon.objects.filter(
+            team_q(team_name, 'home', prefix='bets__event__', exact=True),
             user=user,
-            bets__event__home_team=team_name
         ).select_related('bookmaker_account', 'user').prefetch_related('bets__event', 'bets__bet_type').distinct()
         
         if only_won:
@@ -21,8 +22,8 @@ class TeamFilterService:
     @staticmethod
     def get_coupons_by_away_team(user, team_name: str, only_won=False):
         queryset = Coupon.objects.filter(
+            team_q(team_name, 'away', prefix='bets__event__', exact=True),
             user=user,
-            bets__event__away_team=team_name
         ).select_related('bookmaker_account', 'user').prefetch_related('bets__event', 'bets__bet_type').distinct()
         
         if only_won:
@@ -34,14 +35,14 @@ class TeamFilterService:
     def get_coupons_by_team_and_result(user, team_name: str, as_home=True, won=True):
         if as_home:
             queryset = Coupon.objects.filter(
+                team_q(team_name, 'home', prefix='bets__event__', exact=True),
                 user=user,
-                bets__event__home_team=team_name,
                 status='won' if won else 'lost'
             )
         else:
             queryset = Coupon.objects.filter(
+                team_q(team_name, 'away', prefix='bets__event__', exact=True),
                 user=user,
-                bets__event__away_team=team_name,
                 status='won' if won else 'lost'
             )
         
@@ -51,15 +52,15 @@ class TeamFilterService:
     def get_coupons_by_team_and_bet_type(user, team_name: str, bet_type_code: str, as_home=True, won=True):
         if as_home:
             queryset = Coupon.objects.filter(
+                team_q(team_name, 'home', prefix='bets__event__', exact=True),
                 user=user,
-                bets__event__home_team=team_name,
                 bets__bet_type__code=bet_type_code,
                 status='won' if won else 'lost'
             )
         else:
             queryset = Coupon.objects.filter(
+                team_q(team_name, 'away', prefix='bets__event__', exact=True),
                 user=user,
-                bets__event__away_team=team_name,
                 bets__bet_type__code=bet_type_code,
                 status='won' if won else 'lost'
             )
@@ -69,8 +70,8 @@ class TeamFilterService:
     @staticmethod
     def get_coupons_home_team_won(user, team_name: str):
         queryset = Coupon.objects.filter(
+            team_q(team_name, 'home', prefix='bets__event__', exact=True),
             user=user,
-            bets__event__home_team=team_name,
             bets__bet_type__code='1',
             status='won'
         ).select_related('bookmaker_account', 'user').prefetch_related('bets__event', 'bets__bet_type').distinct()
@@ -80,8 +81,8 @@ class TeamFilterService:
     @staticmethod
     def get_coupons_away_team_won(user, team_name: str):
         queryset = Coupon.objects.filter(
+            team_q(team_name, 'away', prefix='bets__event__', exact=True),
             user=user,
-            bets__event__away_team=team_name,
             bets__bet_type__code='2',
             status='won'
         ).select_related('bookmaker_account', 'user').prefetch_related('bets__event', 'bets__bet_type').distinct()
@@ -90,25 +91,14 @@ class TeamFilterService:
 
     @staticmethod
     def get_team_statistics(user, team_name: str, as_home=True):
-        if as_home:
-            coupons_queryset = Coupon.objects.filter(
-                user=user,
-                bets__event__home_team=team_name
-            ).distinct()
-        else:
-            coupons_queryset = Coupon.objects.filter(
-                user=user,
-                bets__event__away_team=team_name
-            ).distinct()
-        
-        won_coupons_queryset = coupons_queryset.filter(status='won')
-        lost_coupons_queryset = coupons_queryset.filter(status='lost')
+        from coupon_analytics.services.team_analytics import TeamAnalyticsService
+        agg = TeamAnalyticsService().position_aggregates(user, team_name, exact=True)['home' if as_home else 'away']
 
-        total_payout = sum(c.balance for c in won_coupons_queryset)
-        total_stake = sum(c.bet_stake for c in coupons_queryset)
+        total_payout = agg.won_balance if agg.won_count else 0
+        total_stake = agg.total_stake if agg.total_count else 0
 
         profit = total_payout - total_stake
-        win_rate = (won_coupons_queryset.count() / coupons_queryset.count() * 100) if coupons_queryset.count() > 0 else 0
+        win_rate = (agg.won_count / agg.total_count * 100) if agg.total_count > 0 else 0
 
         yield_percentage = 0
         if total_payout > 0:
@@ -117,13 +107,12 @@ class TeamFilterService:
         return {
             'team_name': team_name,
             'position': 'Home' if as_home else 'Away',
-            'total_coupons': coupons_queryset.count(),
-            'won': won_coupons_queryset.count(),
-            'lost': lost_coupons_queryset.count(),
+            'total_coupons': agg.total_count,
+            'won': agg.won_count,
+            'lost': agg.lost_count,
             'win_rate': win_rate,
             'total_stake': total_stake,
             'total_payout': total_payout,
             'profit': profit,
             'yield_percentage': yield_percentage,
         }
-
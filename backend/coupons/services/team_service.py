@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, List
+
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Length
+
+from ..models import Event, Team, TeamAlias
+from .event_parser import EventParserService
+
+normalize_team_name = EventParserService.normalize_team_name
+
+
+class TeamService:
+    """Canonical teams behind the free-text team names on events.
+
+    Team filters resolve the searched name against ``TeamAlias`` (unique
+    normalized alias + trigram GIN index for substring search) and then
+    match events by their ``home_team_ref``/``away_team_ref`` foreign keys,
+    instead of ``icontains`` scans over ``events``.
+    """
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, int]:
+        """Map normalized names to team ids, creating teams for unknown names."""
+        spelled: Dict[str, str] = {}
+        for name in names:
+            key = normalize_team_name(name)[:200]
+            if key:
+                spelled.setdefault(key, name.strip()[:200])
+        if not spelled:
+            return {}
+
+        found = dict(
+            TeamAlias.objects.filter(normalized_alias__in=list(spelled)).values_list('normalized_alias', 'team_id')
+        )
+        missing = [key for key in spelled if key not in found]
+        if missing:
+            Team.objects.bulk_create(
+                [Team(name=spelled[key], normalized_name=key) for key in missing],
+                ignore_conflicts=True,
+            )
+            team_ids = dict(Team.objects.filter(normalized_name__in=missing).values_list('normalized_name', 'id'))
+            TeamAlias.objects.bulk_create(
+                [
+                    TeamAlias(team_id=team_ids[key], alias=spelled[key], normalized_alias=key)
+                    for key in missing if key in team_ids
+                ],
+                ignore_conflicts=True,
+            )
+            found.update(
+                TeamAlias.objects.filter(normalized_alias__in=missing).values_list('normalized_alias', 'team_id')
+            )
+        return found
+
+    def link_events(self, events: List[Event]) -> int:
+        """Point events at their canonical teams (filling home/away names from
+        the event name when they are missing); one bulk update."""
+        if not events:
+            return 0
+        fields = ['home_team_ref', 'away_team_ref']
+        for event in events:
+            if not event.home_team and not event.away_team and event.name:
+                event.home_team, event.away_team = EventParserService.parse_teams(event.name)
+                if 'home_team' not in fields:
+                    fields += ['home_team', 'away_team']
+
+        team_ids = self.resolve(
+            name for event in events for name in (event.home_team, event.away_team) if name
+        )
+        for event in events:
+            event.home_team_ref_id = team_ids.get(normalize_team_name(event.home_team)[:200])
+            event.away_team_ref_id = team_ids.get(normalize_team_name(event.away_team)[:200])
+        Event.objects.bulk_update(events, fields)
+        return len(events)
+
+    def team_ids(self, team_name: str, exact: bool = False) -> QuerySet:
+        """Subquery of team ids whose alias equals (``exact``) or contains the name."""
+        key = normalize_team_name(team_name)
+        if not key:
+            return TeamAlias.objects.none().values('team_id')
+        lookup = 'normalized_alias' if exact else 'normalized_alias__contains'
+        return TeamAlias.objects.filter(**{lookup: key}).values('team_id')
+
+    def team_q(self, team_name: str, position: str = 'any', prefix: str = '', exact: bool = False) -> Q:
+        """Q on events (``prefix`` e.g. ``'bets__event__'``) played by the team at
+        ``position`` ('home', 'away' or 'any')."""
+        team_ids = self.team_ids(team_name, exact=exact)
+        home = Q(**{f'{prefix}home_team_ref__in': team_ids})
+        away = Q(**{f'{prefix}away_team_ref__in': team_ids})
+        if position == 'home':
+            return home
+        if position == 'away':
+            return away
+        return home | away
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, object]]:
+        """Teams whose alias contains the query, prefix matches and shorter
+        names first."""
+        key = normalize_team_name(query)
+        if not key:
+            return []
+        rows = (
+            TeamAlias.objects.filter(normalized_alias__contains=key)
+            .annotate(
+                prefix_rank=Case(
+                    When(normalized_alias__startswith=key, then=Value(0)),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                ),
+                alias_length=Length('normalized_alias'),
+            )
+            .order_by('prefix_rank', 'alias_length', 'team_id')
+            .values_list('team_id', 'team__name')[:limit * 3]
+        )
+        suggestions: Dict[int, Dict[str, object]] = {}
+        for team_id, name in rows:
+            if team_id not in suggestions:
+                suggestions[team_id] = {'id': team_id, 'name': name}
+            if len(suggestions) >= limit:
+                break
+        return list(suggestions.values())
+
+
+_service = TeamService()
+
+
+def resolve_teams(names: Iterable[str]) -> Dict[str, int]:
+    return _service.resolve(names)
+
+
+def link_event_teams(events: List[Event]) -> int:
+    return _service.link_events(events)
+
+
+def team_q(team_name: str, position: str = 'any', prefix: str = '', exact: bool = False) -> Q:
+    return _service.team_q(team_name, position=position, prefix=prefix, exact=exact)
+
+
+def suggest_teams(query: str, limit: int = 10) -> List[Dict[str, object]]:
+    return _service.suggest(query, limit=limit)
@@ -7,6 +7,7 @@ from .views.coupon_view import (
     CouponDetailsView,
     CouponRecalcView,
     CouponSettleView,
+    CouponBulkSettleView,
     CouponForceWinView,
     CouponCopyView,
     CouponSummaryView,
@@ -15,7 +16,15 @@ from .views.coupon_view import (
 )
 from .views.bet_view import BetListCreateView, BetDetailsView
 from .views.event_view import EventViewSet
-from .views.ocr_view import OCRTestView, OCRParseView
+from .views.team_view import TeamAutocompleteView
+from .views.ocr_view import (
+    OCRTestView,
+    OCRParseView,
+    OCRJobSubmitView,
+    OCRJobStatusView,
+    OCRJobResultView,
+    OCRBatchView,
+)
 from .views.coupon_filter_view import (
     CouponFilterByTeamView,
     CouponFilterByQueryBuilderView,
@@ -31,11 +40,16 @@ urlpatterns = [
     path('ocr/', OCRTestView.as_view(), name='ocr-test'),
     path('ocr/extract/', OCRTestView.as_view(), name='ocr-extract'),
     path('ocr/parse/', OCRParseView.as_view(), name='ocr-parse'),
+    path('ocr/batch/', OCRBatchView.as_view(), name='ocr-batch'),
+    path('ocr/jobs/', OCRJobSubmitView.as_view(), name='ocr-job-submit'),
+    path('ocr/jobs/<int:job_id>/', OCRJobStatusView.as_view(), name='ocr-job-status'),
+    path('ocr/jobs/<int:job_id>/result/', OCRJobResultView.as_view(), name='ocr-job-result'),
     path('coupons/ocr/', OCRTestView.as_view(), name='ocr-test-legacy'),
     path('coupons/ocr/extract/', OCRTestView.as_view(), name='ocr-extract-legacy'),
     path('coupons/ocr/parse/', OCRParseView.as_view(), name='ocr-parse-legacy'),
     path('', include(router.urls)),
     path('coupons/', CouponListCreateView.as_view(), name='coupon-list-create'),
+    path('coupons/settle/', CouponBulkSettleView.as_view(), name='coupon-bulk-settle'),
     path('coupons/<int:pk>/', CouponDetailsView.as_view(), name='coupon-detail'),
     path('coupons/<int:pk>/recalc/', CouponRecalcView.as_view(), name='coupon-recalc'),
     path('coupons/<int:pk>/settle/', CouponSettleView.as_view(), name='coupon-settle'),
@@ -49,6 +63,7 @@ urlpatterns = [
     path('filter/team/', CouponFilterByTeamView.as_view(), name='coupon-filter-team'),
     path('filter/query-builder/', CouponFilterByQueryBuilderView.as_view(), name='coupon-filter-query-builder'),
     path('filter/universal/', CouponFilterUniversalView.as_view(), name='coupon-filter-universal'),
+    path('teams/autocomplete/', TeamAutocompleteView.as_view(), name='team-autocomplete'),
     path('<int:pk>/', CouponDetailsView.as_view(), name='coupon-detail-short'),
     path('<int:pk>/settle/', CouponSettleView.as_view(), name='coupon-settle-short'),
     path('<int:pk>/force-win/', CouponForceWinView.as_view(), name='coupon-force-win-short'),
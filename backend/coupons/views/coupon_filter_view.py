@@ -7,6 +7,7 @@ from drf_yasg import openapi
 
 from coupons.services.team_filter import TeamFilterService
 from coupons.services.coupon_filter_service import UniversalCouponFilterService
+from coupon_analytics.services.aggregate_engine import aggregate_coupons
 from coupons.serializers.coupon_filter_serializer import (
     CouponFilterResponseSerializer,
     SimpleFilterRequestSerializer,
@@ -18,18 +19,18 @@ class CouponStatsMixin:
 
     @staticmethod
     def calculate_coupon_stats(coupons, use_decimal=False):
-        if use_decimal:
-            total_stake = sum(Decimal(str(c.bet_stake)) for c in coupons) if coupons else Decimal('0.00')
-            profit = sum(Decimal(str(c.balance)) for c in coupons) if coupons else Decimal('0.00')
-            total_won = total_stake + profit if profit > 0 else Decimal('0.00')
+        agg = aggregate_coupons(coupons)
+        total_count = agg.total_count
+        win_count = agg.won_count
+        loss_count = agg.lost_count
+
+        if use_decimal or total_count:
+            total_stake = agg.total_stake
+            profit = agg.total_balance
         else:
-            total_stake = sum(c.bet_stake for c in coupons) if coupons else 0
-            profit = sum(c.balance for c in coupons) if coupons else 0
-            total_won = total_stake + profit if profit > 0 else 0
-
-        win_count = coupons.filter(status='won').count()
-        loss_count = coupons.filter(status='lost').count()
-        total_count = coupons.count()
+            total_stake = 0
+            profit = 0
+        total_won = total_stake + profit if profit > 0 else (Decimal('0.00') if use_decimal else 0)
 
         win_rate = (win_count / total_count * 100) if total_count > 0 else 0
         roi = (profit / total_stake * 100) if total_stake > 0 else 0
@@ -186,16 +187,16 @@ class CouponFilterByQueryBuilderView(APIView, CouponStatsMixin):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            query, coupons = UniversalCouponFilterService.build_custom_query(
+            spec, coupons = UniversalCouponFilterService.build_custom_query(
                 user=request.user,
                 name=serializer.validated_data.get('name', 'API Query'),
                 conditions=serializer.validated_data.get('conditions', []),
                 start_date=serializer.validated_data.get('start_date'),
                 end_date=serializer.validated_data.get('end_date'),
             )
+            query = spec.save() if serializer.validated_data.get('save') else None
 
-
-            extra_data = {'query_id': query.id}
+            extra_data = {'query_id': query.id if query else None}
             response_data = self.build_response_with_stats(coupons, extra_data=extra_data)
             return Response(response_data)
 
@@ -220,6 +221,7 @@ class CouponFilterUniversalView(APIView, CouponStatsMixin):
             openapi.Parameter('bet_type_code', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Bet type code'),
             openapi.Parameter('filter_mode', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['all', 'won_coupons', 'won_bets', 'won_bets_lost_coupons', 'lost_bets', 'lost_bets_won_coupons'], default='all', description='Filter mode: all=wszystkie, won_coupons=wygrane kupony, won_bets=wygrane zakłady, won_bets_lost_coupons=wygrane zakłady na przegranych kuponach, lost_bets=przegrane zakłady, lost_bets_won_coupons=przegrane zakłady na wygranych kuponach'),
             openapi.Parameter('only_won', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, default=False, description='Backward compatibility - maps to won_bets'),
+            openapi.Parameter('save', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, default=False, description='Save the filter as an AnalyticsQuery (query_id in response)'),
         ],
         responses={
             200: openapi.Response('Filtered coupons with statistics'),
@@ -233,6 +235,7 @@ class CouponFilterUniversalView(APIView, CouponStatsMixin):
         bet_type_code = request.query_params.get('bet_type_code')
         only_won_str = request.query_params.get('only_won', 'false').lower()
         only_won = only_won_str in ('true', '1', 'yes')
+        save = request.query_params.get('save', 'false').lower() in ('true', '1', 'yes')
 
         filter_mode = request.query_params.get('filter_mode', 'all')
 
@@ -246,16 +249,17 @@ class CouponFilterUniversalView(APIView, CouponStatsMixin):
             if only_won:
                 filter_mode = 'won_bets'
 
-            query, coupons = UniversalCouponFilterService.apply_universal_filter(
+            spec, coupons = UniversalCouponFilterService.apply_universal_filter(
                 user=request.user,
                 team_name=team_name,
                 position=position,
                 bet_type_code=bet_type_code,
                 filter_mode=filter_mode,
             )
+            query = spec.save() if save else None
 
             extra_data = {
-                'query_id': query.id,
+                'query_id': query.id if query else None,
                 'filters': {
                     'team_name': team_name,
                     'position': position if team_name else None,
@@ -7,11 +7,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 from ..models import Coupon
+from ..pagination import CouponKeysetPagination
 from ..serializers.coupon_serializer import (
     CouponSerializer,
     CouponCreateSerializer,
     CouponUpdateSerializer,
     BalanceTrendPointSerializer,
+    CouponBulkSettleResponseSerializer,
+    CouponBulkSettleSerializer,
 )
 from ..services.coupon_service import (
     list_coupons,
@@ -19,6 +22,7 @@ from ..services.coupon_service import (
     update_coupon,
     delete_coupon,
     settle_coupon,
+    bulk_settle_coupons,
     recalc_and_evaluate_coupon,
     force_settle_coupon_won,
     get_balance_trend,
@@ -27,13 +31,17 @@ from ..services.coupon_service import (
 from .coupon_filter_view import CouponStatsMixin
 from rest_framework.views import APIView
 from datetime import datetime, timedelta
-from django.db.models import Avg
 from finances.models import BookmakerAccountModel
 from common.choices import CouponType
+from decimal import Decimal
+from django.conf import settings
+from coupon_analytics.services.aggregate_engine import aggregate_coupons
+from coupon_analytics.services.rollup_service import get_rollup_summary
 
 
 class CouponListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CouponKeysetPagination
 
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
@@ -169,6 +177,38 @@ class CouponSettleView(_CouponRetrieveMixin, generics.GenericAPIView):
         return Response(out_serializer.data, status=status.HTTP_200_OK)
 
 
+class CouponBulkSettleView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CouponBulkSettleSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Settle many coupons',
+        operation_description=(
+            'Settle up to 200 of the current user\'s coupons in one transaction. '
+            'Each item takes the same data as the single settle endpoint plus coupon_id. '
+            'Ids that do not belong to the user are returned in "missing"; '
+            'each coupon_id may appear only once.'
+        ),
+        request_body=CouponBulkSettleSerializer,
+        responses={
+            200: openapi.Response('Settled coupons and ids not found', CouponBulkSettleResponseSerializer),
+            400: openapi.Response('Validation error'),
+            401: openapi.Response('Unauthorized'),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_settle_coupons(request.user, serializer.validated_data['coupons'])
+
+        settled_ids = [coupon.id for coupon in result['coupons']]
+        coupons = list_coupons(request.user).filter(id__in=settled_ids)
+        return Response({
+            'coupons': CouponSerializer(coupons, many=True, context={'request': request}).data,
+            'missing': result['missing'],
+        }, status=status.HTTP_200_OK)
+
+
 class CouponForceWinView(_CouponRetrieveMixin, generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CouponSerializer
@@ -281,33 +321,37 @@ class CouponSummaryView(APIView, CouponStatsMixin):
                 return Response({'error': 'coupon_type must be one of: %s.' % ', '.join(CouponType.values)}, status=status.HTTP_400_BAD_REQUEST)
             coupon_type = normalized_coupon_type
 
-        coupons_qs = Coupon.objects.filter(user=request.user)
-        if date_from:
-            coupons_qs = coupons_qs.filter(created_at__gte=date_from)
-        if date_to:
-            coupons_qs = coupons_qs.filter(created_at__lte=date_to)
-        if bookmaker_account_id:
-            coupons_qs = coupons_qs.filter(bookmaker_account_id=bookmaker_account_id)
-        if coupon_type:
-            coupons_qs = coupons_qs.filter(coupon_type=coupon_type)
+        if not (date_from or date_to or coupon_type) and getattr(settings, 'ANALYTICS_ROLLUP_ENABLED', True):
+            # Bez filtrów po dacie/typie wystarczą zmaterializowane sumy
+            agg = get_rollup_summary(request.user, bookmaker_account_id=bookmaker_account_id)
+        else:
+            coupons_qs = Coupon.objects.filter(user=request.user)
+            if date_from:
+                coupons_qs = coupons_qs.filter(created_at__gte=date_from)
+            if date_to:
+                coupons_qs = coupons_qs.filter(created_at__lte=date_to)
+            if bookmaker_account_id:
+                coupons_qs = coupons_qs.filter(bookmaker_account_id=bookmaker_account_id)
+            if coupon_type:
+                coupons_qs = coupons_qs.filter(coupon_type=coupon_type)
+            agg = aggregate_coupons(coupons_qs)
 
         # Statystyki podstawowe
-        total_count = coupons_qs.count()
-        won_count = coupons_qs.filter(status=Coupon.CouponStatus.WON).count()
-        lost_count = coupons_qs.filter(status=Coupon.CouponStatus.LOST).count()
-        in_progress_count = coupons_qs.filter(status=Coupon.CouponStatus.IN_PROGRESS).count()
-        canceled_count = coupons_qs.filter(status=Coupon.CouponStatus.CANCELED).count()
-
-        from decimal import Decimal
-        total_stake = sum((c.bet_stake for c in coupons_qs)) if total_count else Decimal('0.00')
+        total_count = agg.total_count
+        won_count = agg.won_count
+        lost_count = agg.lost_count
+        in_progress_count = agg.in_progress_count
+        canceled_count = agg.canceled_count
+
         # balance = (wygrana - stawka) dla wygranych lub (-stawka) dla przegranych
         # profit to suma wszystkich balance'y
-        profit = sum((c.balance for c in coupons_qs)) if total_count else Decimal('0.00')
+        total_stake = agg.total_stake
+        profit = agg.total_balance
         win_rate = round((won_count / total_count * 100), 2) if total_count > 0 else 0.0
         roi = round((profit / total_stake * 100), 2) if total_stake > 0 else 0.0
 
         # Średni kurs kuponu (średnia z multiplier)
-        avg_mult = coupons_qs.aggregate(avg=Avg('multiplier')).get('avg')
+        avg_mult = agg.avg_multiplier
         if avg_mult is None:
             avg_coupon_odds = 0.0
         else:
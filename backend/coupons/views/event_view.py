@@ -1,11 +1,13 @@
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from ..models import Event
-from ..serializers import EventSerializer, EventCreateSerializer, EventUpdateSerializer
+from ..serializers import EventSerializer, EventCreateSerializer, EventUpdateSerializer, EventResultSerializer
 from ..services.event_service import create_event, update_event, delete_event
+from ..services.event_result_service import record_event_result, event_settlement_status
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -17,6 +19,8 @@ class EventViewSet(viewsets.ModelViewSet):
             return EventCreateSerializer
         if self.action in ("update", "partial_update"):
             return EventUpdateSerializer
+        if self.action == "result":
+            return EventResultSerializer
         return EventSerializer
 
     def get_queryset(self):
@@ -118,3 +122,42 @@ class EventViewSet(viewsets.ModelViewSet):
         event = self.get_object()
         delete_event(event)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary='Record event result',
+        operation_description=(
+            'Record the final score and/or market outcomes (bet type code + line) of an event. '
+            'Bets on the event are settled in the background; the response is the settlement job.'
+        ),
+        request_body=EventResultSerializer,
+        responses={
+            202: openapi.Response('Settlement job queued'),
+            400: openapi.Response('Invalid data'),
+            403: openapi.Response('Staff only'),
+            404: openapi.Response('Event not found'),
+        }
+    )
+    @swagger_auto_schema(
+        method='get',
+        operation_summary='Event settlement status',
+        operation_description='Status of the latest settlement job for the event',
+        responses={
+            200: openapi.Response('Settlement job'),
+            403: openapi.Response('Staff only'),
+            404: openapi.Response('Event or job not found'),
+        }
+    )
+    @action(detail=True, methods=['get', 'post'], permission_classes=[permissions.IsAdminUser])
+    def result(self, request, *args, **kwargs):
+        event = self.get_object()
+        if request.method == 'GET':
+            job = event.settlement_jobs.order_by('-created_at', '-id').first()
+            if job is None:
+                return Response({"detail": "No settlement job for this event."}, status=status.HTTP_404_NOT_FOUND)
+            return Response(event_settlement_status(job))
+
+        in_ser = self.get_serializer(data=request.data)
+        in_ser.is_valid(raise_exception=True)
+        job = record_event_result(event, **in_ser.validated_data)
+        return Response(event_settlement_status(job), status=status.HTTP_202_ACCEPTED)
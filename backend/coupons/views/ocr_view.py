@@ -1,16 +1,43 @@
 import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import status, permissions
+from rest_framework.parsers import MultiPartParser, FormParser
 from pathlib import Path
+from django.urls import reverse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from coupons.services.ocr_service import OCRService
-from coupons.services.coupon_parser_v2 import CouponParser
+from coupons.models import OCRJob
+from coupons.services.ocr_pipeline import recognize_image
+from coupons.services.ocr_job_service import submit_ocr_job, save_ocr_upload, ocr_job_status
+from coupons.services.ocr_batch_service import OCRBatchError, process_ocr_batch
+from coupon_analytics.models import UserStrategy
+from finances.models import BookmakerAccountModel
 
 logger = logging.getLogger(__name__)
 
 
+def _own_account_id(request):
+    """(account id, error response) for the optional ``bookmaker_account`` field.
+
+    The account picks the parse layout, so only accounts of the current user
+    are accepted; without one the layout is detected from the text.
+    """
+    raw = request.data.get('bookmaker_account')
+    if raw in (None, ''):
+        return None, None
+    try:
+        account_id = int(raw)
+    except (TypeError, ValueError):
+        return None, Response({'error': 'bookmaker_account must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not request.user.is_authenticated or not BookmakerAccountModel.objects.filter(pk=account_id, user=request.user).exists():
+        return None, Response(
+            {'bookmaker_account': 'Account does not belong to the current user.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return account_id, None
+
+
 class OCRTestView(APIView):
 
     @swagger_auto_schema(
@@ -64,7 +91,7 @@ class OCRTestView(APIView):
             properties={
                 'image_name': openapi.Schema(type=openapi.TYPE_STRING, description='Image filename'),
                 'parse': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=False, description='Parse extracted text'),
-                'bookmaker_account': openapi.Schema(type=openapi.TYPE_INTEGER, default=1, description='Bookmaker account ID'),
+                'bookmaker_account': openapi.Schema(type=openapi.TYPE_INTEGER, description='Bookmaker account ID (own accounts only)'),
             },
             required=['image_name']
         ),
@@ -79,7 +106,9 @@ class OCRTestView(APIView):
         try:
             image_name = request.data.get('image_name')
             should_parse = request.data.get('parse', False)
-            bookmaker_account = request.data.get('bookmaker_account', 1)
+            bookmaker_account, error = _own_account_id(request)
+            if error is not None:
+                return error
 
             if not image_name:
                 return Response(
@@ -100,12 +129,14 @@ class OCRTestView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            logger.info(f"Initializing PaddleOCR for image: {image_name}")
-            ocr_service = OCRService(backend='paddle')
-
             logger.info(f"Extracting text from: {image_path}")
-            extracted_text = ocr_service.extract_text_from_image(image_path)
-            result_with_confidence = ocr_service.extract_text_with_confidence(image_path)
+            recognized = recognize_image(
+                image_path,
+                parse=bool(should_parse),
+                bookmaker_account=bookmaker_account,
+            )
+            result_with_confidence = recognized['ocr']
+            extracted_text = result_with_confidence.get('text', '')
             
             if not should_parse:
                 return Response({
@@ -113,20 +144,18 @@ class OCRTestView(APIView):
                     'image_name': image_name,
                     'image_path': str(image_path),
                     'raw_text': extracted_text,
-                    'detailed_result': result_with_confidence
+                    'detailed_result': result_with_confidence,
+                    'cached': recognized['cached'],
                 })
 
-            logger.info(f"Parsing coupon from extracted text")
-            parser = CouponParser()
-            coupon = parser.parse(extracted_text, bookmaker_account=int(bookmaker_account))
-
             return Response({
                 'success': True,
                 'image_name': image_name,
                 'image_path': str(image_path),
                 'raw_text': extracted_text,
                 'ocr_details': result_with_confidence,
-                'parsed_coupon': coupon.to_dict()
+                'parsed_coupon': recognized['parsed'],
+                'cached': recognized['cached'],
             })
 
         except Exception as e:
@@ -146,7 +175,7 @@ class OCRParseView(APIView):
             type=openapi.TYPE_OBJECT,
             properties={
                 'image_name': openapi.Schema(type=openapi.TYPE_STRING, description='Image filename'),
-                'bookmaker_account': openapi.Schema(type=openapi.TYPE_INTEGER, default=1, description='Bookmaker account ID'),
+                'bookmaker_account': openapi.Schema(type=openapi.TYPE_INTEGER, description='Bookmaker account ID (own accounts only)'),
             },
             required=['image_name']
         ),
@@ -160,7 +189,9 @@ class OCRParseView(APIView):
     def post(self, request, *args, **kwargs):
         try:
             image_name = request.data.get('image_name')
-            bookmaker_account = request.data.get('bookmaker_account', 1)
+            bookmaker_account, error = _own_account_id(request)
+            if error is not None:
+                return error
 
             if not image_name:
                 return Response({'error': 'image_name is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -174,12 +205,189 @@ class OCRParseView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            ocr_service = OCRService(backend='paddle')
-            extracted_text = ocr_service.extract_text_from_image(image_path)
-            parser = CouponParser()
-            coupon = parser.parse(extracted_text, bookmaker_account=int(bookmaker_account))
+            recognized = recognize_image(image_path, parse=True, bookmaker_account=bookmaker_account)
 
-            return Response(coupon.to_dict(), status=status.HTTP_200_OK)
+            return Response(recognized['parsed'], status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error processing image: {str(e)}", exc_info=True)
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _get_job_for_request(request, job_id):
+    # Jobs are only visible to the user who submitted them
+    return OCRJob.objects.filter(pk=job_id, user=request.user).first()
+
+
+class OCRJobSubmitView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Submit OCR job',
+        operation_description='Queue a coupon image for background OCR. Send either image_name '
+                              '(file from coupons_images) or a multipart "image" upload. '
+                              'Returns immediately with the job id to poll.',
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'image_name': openapi.Schema(type=openapi.TYPE_STRING, description='Image filename'),
+                'parse': openapi.Schema(type=openapi.TYPE_BOOLEAN, default=True, description='Parse extracted text'),
+                'bookmaker_account': openapi.Schema(type=openapi.TYPE_INTEGER, description='Bookmaker account ID (own accounts only)'),
+            },
+        ),
+        responses={
+            202: openapi.Response('Job queued'),
+            400: openapi.Response('Bad request'),
+            401: openapi.Response('Unauthorized'),
+            404: openapi.Response('Image not found'),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('image')
+        image_name = request.data.get('image_name')
+        should_parse = str(request.data.get('parse', True)).lower() not in {'0', 'false', 'no', 'off'}
+
+        bookmaker_account, error = _own_account_id(request)
+        if error is not None:
+            return error
+
+        if upload is not None:
+            image_path = save_ocr_upload(upload)
+            image_name = upload.name
+        elif image_name:
+            images_dir = Path(__file__).parent.parent.parent / 'coupons_images'
+            image_path = images_dir / Path(image_name).name
+            if not image_path.exists():
+                return Response(
+                    {'error': f'Image not found: {image_name}', 'expected_path': str(image_path)},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        else:
+            return Response({'error': 'image_name or image upload is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = submit_ocr_job(
+            image_path=image_path,
+            image_name=image_name,
+            user=request.user,
+            parse=should_parse,
+            bookmaker_account=bookmaker_account,
+        )
+        return Response(
+            {
+                **ocr_job_status(job),
+                'status_url': request.build_absolute_uri(reverse('ocr-job-status', args=[job.pk])),
+                'result_url': request.build_absolute_uri(reverse('ocr-job-result', args=[job.pk])),
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class OCRJobStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='OCR job status',
+        responses={
+            200: openapi.Response('Job status'),
+            404: openapi.Response('Job not found'),
+        }
+    )
+    def get(self, request, job_id, *args, **kwargs):
+        job = _get_job_for_request(request, job_id)
+        if job is None:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ocr_job_status(job))
+
+
+class OCRJobResultView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='OCR job result',
+        operation_description='Returns the OCR/parse result once the job is done. '
+                              'While the job is queued or running, responds with 202 and the current status.',
+        responses={
+            200: openapi.Response('Job result'),
+            202: openapi.Response('Job not finished yet'),
+            404: openapi.Response('Job not found'),
+            422: openapi.Response('Job failed'),
+        }
+    )
+    def get(self, request, job_id, *args, **kwargs):
+        job = _get_job_for_request(request, job_id)
+        if job is None:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if job.status == OCRJob.JobStatus.FAILED:
+            return Response(ocr_job_status(job), status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if job.status != OCRJob.JobStatus.DONE:
+            return Response(ocr_job_status(job), status=status.HTTP_202_ACCEPTED)
+
+        result = job.result or {}
+        ocr = result.get('ocr') or {}
+        return Response({
+            **ocr_job_status(job),
+            'raw_text': ocr.get('text', ''),
+            'ocr_details': ocr,
+            'parsed_coupon': result.get('parsed'),
+            'cached': result.get('cached', False),
+        })
+
+
+class OCRBatchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @swagger_auto_schema(
+        operation_summary='Batch OCR import',
+        operation_description='Upload many betslip images (field "images", repeatable) and/or zip archives '
+                              '(field "archive"). Every image is OCR-ed and parsed, and all recognised coupons '
+                              'are created in a single transaction. Returns per-image results with timings.',
+        manual_parameters=[
+            openapi.Parameter('images', openapi.IN_FORM, type=openapi.TYPE_FILE, description='Betslip image'),
+            openapi.Parameter('archive', openapi.IN_FORM, type=openapi.TYPE_FILE, description='Zip archive of images'),
+            openapi.Parameter('bookmaker_account', openapi.IN_FORM, type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('strategy_id', openapi.IN_FORM, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('create', openapi.IN_FORM, type=openapi.TYPE_BOOLEAN, default=True,
+                              description='Set to false to only OCR and parse'),
+        ],
+        responses={
+            201: openapi.Response('Coupons created'),
+            200: openapi.Response('Batch processed, nothing created'),
+            400: openapi.Response('Bad request'),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        uploads = request.FILES.getlist('images') + request.FILES.getlist('archive')
+        if not uploads:
+            return Response({'error': 'images or archive is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        account = BookmakerAccountModel.objects.filter(
+            pk=request.data.get('bookmaker_account') or None, user=request.user
+        ).first()
+        if account is None:
+            return Response(
+                {'bookmaker_account': 'Account does not belong to the current user.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        strategy = None
+        strategy_id = request.data.get('strategy_id')
+        if strategy_id:
+            strategy = UserStrategy.objects.filter(pk=strategy_id, user=request.user).first()
+            if strategy is None:
+                return Response({'strategy_id': 'Strategy not found.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        create = str(request.data.get('create', True)).lower() not in {'0', 'false', 'no', 'off'}
+
+        try:
+            result = process_ocr_batch(
+                user=request.user,
+                uploads=uploads,
+                account=account,
+                strategy=strategy,
+                create=create,
+            )
+        except OCRBatchError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
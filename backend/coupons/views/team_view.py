@@ -0,0 +1,35 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+from ..serializers.team_serializer import TeamSerializer
+from ..services.team_service import suggest_teams
+
+
+class TeamAutocompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_LIMIT = 50
+
+    @swagger_auto_schema(
+        operation_summary='Team autocomplete',
+        operation_description='Suggest teams whose name contains the query (case and accents ignored)',
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True, description='Part of the team name'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=10, description='Max suggestions (up to 50)'),
+        ],
+        responses={
+            200: openapi.Response('Suggested teams', TeamSerializer(many=True)),
+            401: openapi.Response('Unauthorized'),
+        }
+    )
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except (TypeError, ValueError):
+            return Response({'error': 'limit musi być liczbą'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.MAX_LIMIT))
+
+        return Response(TeamSerializer(suggest_teams(query, limit=limit), many=True).data)
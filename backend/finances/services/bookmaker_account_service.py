@@ -32,8 +32,12 @@ def update_bookmaker_account(bookmaker_account, data, request=None):
     serializer = BookmakerAccountSerializer(bookmaker_account, data=data, partial=True, context={"request": request} if request else None)
     serializer.is_valid(raise_exception=True)
     bookmaker_account = serializer.save()
+    from coupons.services.coupon_layouts import forget_account_layout
+    forget_account_layout(bookmaker_account.id)
     return bookmaker_account
 
 
 def delete_bookmaker_account(bookmaker_account):
+    from coupons.services.coupon_layouts import forget_account_layout
+    forget_account_layout(bookmaker_account.id)
     bookmaker_account.delete()
\ No newline at end of file
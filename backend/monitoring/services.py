@@ -62,6 +62,14 @@ def get_system_metrics() -> Dict[str, Any]:
     }
 
 
+def get_ocr_metrics() -> Dict[str, Any]:
+    """Zwraca metryki puli silnikow OCR (zajetosc, opoznienia, liczniki)."""
+
+    from coupons.services.ocr_pool import get_ocr_pool_metrics
+
+    return get_ocr_pool_metrics()
+
+
 def get_logged_in_users() -> List[Dict[str, Any]]:
     """Zwraca liste aktualnie zalogowanych uzytkownikow na podstawie sesji.
 
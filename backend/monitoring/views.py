@@ -8,7 +8,7 @@ from rest_framework.permissions import BasePermission
 from rest_framework import status
 from django.conf import settings
 
-from .services import get_system_metrics, get_logged_in_users
+from .services import get_system_metrics, get_logged_in_users, get_ocr_metrics
 
 
 class IsAdminOrSuperuser(BasePermission):
@@ -38,6 +38,13 @@ class LoggedInUsersView(APIView):
         return Response(users)
 
 
+class OCRPoolMetricsView(APIView):
+    permission_classes = [IsAdminOrSuperuser]
+
+    def get(self, request, *args, **kwargs):  # type: ignore[override]
+        return Response(get_ocr_metrics())
+
+
 class DatabaseBackupView(APIView):
     permission_classes = [IsAdminOrSuperuser]
 
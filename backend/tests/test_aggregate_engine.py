@@ -0,0 +1,30 @@
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from coupon_analytics.services.aggregate_engine import (
+    COUPON_AGGREGATES,
+    CouponAggregate,
+    aggregate_coupons,
+)
+
+
+class TestCouponAggregate:
+
+    def test_from_row_defaults_missing_and_null_values(self):
+        agg = CouponAggregate.from_row({'total_count': 4, 'won_balance': None, 'avg_stake': None})
+
+        assert agg.total_count == 4
+        assert agg.won_count == 0
+        assert agg.won_balance == Decimal('0.00')
+        assert agg.avg_stake is None
+
+    def test_aggregate_coupons_requests_every_metric_at_once(self):
+        qs = MagicMock()
+        qs.aggregate.return_value = {'total_count': 2, 'total_stake': Decimal('15.00')}
+
+        agg = aggregate_coupons(qs)
+
+        qs.aggregate.assert_called_once()
+        assert set(qs.aggregate.call_args.kwargs) == set(COUPON_AGGREGATES)
+        assert agg.total_stake == Decimal('15.00')
+
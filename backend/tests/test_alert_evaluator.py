@@ -0,0 +1,151 @@
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from coupon_analytics.services.alert_evaluator import AlertEvaluator
+from coupon_analytics.services.alert_service import evaluate_alert_rules_for_user
+
+
+def _rule(metric, comparator='lt', threshold='0', window_days=30):
+    return MagicMock(metric=metric, comparator=comparator, threshold_value=Decimal(threshold), window_days=window_days, message='')
+
+
+class TestAlertEvaluator:
+
+    def test_mark_upserts_single_row_per_user(self):
+        with patch('coupon_analytics.services.alert_evaluator.AlertDirtyUser') as model, \
+                patch('coupon_analytics.services.alert_evaluator.evaluate_alert_rules_for_user') as evaluate:
+            AlertEvaluator(debounce=10).mark(MagicMock(pk=3))
+
+        evaluate.assert_not_called()
+        kwargs = model.objects.bulk_create.call_args.kwargs
+        assert kwargs['update_conflicts'] is True
+        assert kwargs['update_fields'] == ['marked_at']
+
+    def test_zero_debounce_evaluates_synchronously(self):
+        user = MagicMock(pk=3)
+        with patch('coupon_analytics.services.alert_evaluator.AlertDirtyUser') as model, \
+                patch('coupon_analytics.services.alert_evaluator.evaluate_alert_rules_for_user') as evaluate:
+            AlertEvaluator(debounce=0).mark(user)
+
+        evaluate.assert_called_once_with(user)
+        model.objects.bulk_create.assert_not_called()
+
+    def test_marker_is_deleted_with_the_evaluation(self):
+        user = MagicMock(id=3, pk=3)
+        with patch('coupon_analytics.services.alert_evaluator.AlertDirtyUser') as model, \
+                patch('coupon_analytics.services.alert_evaluator.evaluate_alert_rules_for_user') as evaluate, \
+                patch('coupon_analytics.services.alert_evaluator.transaction'):
+            marker = model.objects.select_for_update.return_value.filter.return_value.first.return_value
+            marker.delete.side_effect = lambda: evaluate.assert_called_once_with(user)
+
+            assert AlertEvaluator(debounce=10).evaluate(user) is evaluate.return_value
+
+        model.objects.select_for_update.assert_called_once_with(skip_locked=True)
+        marker.delete.assert_called_once()
+
+    def test_marker_taken_by_another_worker_is_skipped(self):
+        with patch('coupon_analytics.services.alert_evaluator.AlertDirtyUser') as model, \
+                patch('coupon_analytics.services.alert_evaluator.evaluate_alert_rules_for_user') as evaluate, \
+                patch('coupon_analytics.services.alert_evaluator.transaction'):
+            model.objects.select_for_update.return_value.filter.return_value.first.return_value = None
+
+            assert AlertEvaluator(debounce=10).evaluate(MagicMock(id=3, pk=3)) is None
+
+        evaluate.assert_not_called()
+
+    def test_failed_evaluation_keeps_marker_for_a_later_retry(self):
+        with patch('coupon_analytics.services.alert_evaluator.AlertDirtyUser') as model, \
+                patch('coupon_analytics.services.alert_evaluator.evaluate_alert_rules_for_user', side_effect=RuntimeError), \
+                patch('coupon_analytics.services.alert_evaluator.transaction'):
+            marker = model.objects.select_for_update.return_value.filter.return_value.first.return_value
+
+            assert AlertEvaluator(debounce=10).evaluate(MagicMock(id=3, pk=3)) is None
+
+        marker.delete.assert_not_called()
+        model.objects.filter.assert_called_once_with(user_id=3)
+        assert set(model.objects.filter.return_value.update.call_args.kwargs) == {'dirty_since', 'marked_at'}
+
+    def test_run_once_counts_evaluated_users(self):
+        evaluator = AlertEvaluator(debounce=10)
+        users = [MagicMock(id=3), MagicMock(id=4)]
+        with patch.object(evaluator, 'due', return_value=[3, 4]), \
+                patch.object(evaluator, 'evaluate', side_effect=[MagicMock(queries=5), None]), \
+                patch('coupon_analytics.services.alert_evaluator.User') as user_model:
+            user_model.objects.filter.return_value = users
+            assert evaluator.run_once() == 1
+
+
+class TestSharedSummary:
+
+    def test_rules_with_same_window_share_one_summary(self):
+        rules = [_rule('yield'), _rule('roi'), _rule('loss', 'gt', '5'), _rule('yield', window_days=7)]
+        summary = {'yield': '-12.00', 'roi': '-0.1200', 'realized_profit': '-30.00'}
+
+        with patch('coupon_analytics.services.alert_service.AlertRule') as rule_model, \
+                patch('coupon_analytics.services.alert_service.AlertEvent') as event_model, \
+                patch('coupon_analytics.services.alert_service.get_coupon_analytics_summary', return_value=summary) as get_summary:
+            rule_model.objects.filter.return_value.exclude.return_value = rules
+            event_model.objects.filter.return_value = []
+            report = evaluate_alert_rules_for_user(MagicMock())
+
+        assert get_summary.call_count == 2
+        assert (report.rules, report.windows, report.created) == (4, 2, 4)
+        event_model.objects.filter.assert_called_once()
+        event_model.objects.bulk_create.assert_called_once()
+        values = sorted(call.kwargs['metric_value'] for call in event_model.call_args_list)
+        assert values == sorted([Decimal('-12.00'), Decimal('-0.1200'), Decimal('30.00'), Decimal('-12.00')])
+
+    def test_existing_event_with_same_value_is_kept(self):
+        rule = _rule('yield')
+        rule.id = 9
+        summary = {'yield': '-12.00'}
+
+        with patch('coupon_analytics.services.alert_service.AlertRule') as rule_model, \
+                patch('coupon_analytics.services.alert_service.AlertEvent') as event_model, \
+                patch('coupon_analytics.services.alert_service.get_coupon_analytics_summary', return_value=summary), \
+                patch('coupon_analytics.services.alert_service._get_calendar_period', return_value=('s', 'e')):
+            rule_model.objects.filter.return_value.exclude.return_value = [rule]
+            event_model.objects.filter.return_value = [
+                MagicMock(rule_id=9, window_start='s', window_end='e', metric_value=Decimal('-12.00'))
+            ]
+            report = evaluate_alert_rules_for_user(MagicMock())
+
+        assert (report.created, report.deleted) == (0, 0)
+        event_model.objects.bulk_create.assert_not_called()
+
+    def _evaluate_with_existing(self, summary, existing):
+        rule = _rule('yield')
+        rule.id = 9
+        with patch('coupon_analytics.services.alert_service.AlertRule') as rule_model, \
+                patch('coupon_analytics.services.alert_service.AlertEvent') as event_model, \
+                patch('coupon_analytics.services.alert_service.get_coupon_analytics_summary', return_value=summary), \
+                patch('coupon_analytics.services.alert_service._get_calendar_period', return_value=('s', 'e')):
+            rule_model.objects.filter.return_value.exclude.return_value = [rule]
+            deleted = MagicMock()
+            event_model.objects.filter.side_effect = [existing, deleted]
+            report = evaluate_alert_rules_for_user(MagicMock())
+        return report, event_model, deleted
+
+    def test_duplicate_events_of_a_window_are_collapsed(self):
+        existing = [
+            MagicMock(pk=1, rule_id=9, window_start='s', window_end='e', metric_value=Decimal('-3.00')),
+            MagicMock(pk=2, rule_id=9, window_start='s', window_end='e', metric_value=Decimal('-12.00')),
+            MagicMock(pk=3, rule_id=9, window_start='s', window_end='e', metric_value=Decimal('-12.00')),
+        ]
+
+        report, event_model, deleted = self._evaluate_with_existing({'yield': '-12.00'}, existing)
+
+        assert (report.created, report.deleted) == (0, 2)
+        deleted.delete.assert_called_once()
+        assert event_model.objects.filter.call_args.kwargs == {'pk__in': [1, 3]}
+
+    def test_every_duplicate_is_deleted_when_the_condition_clears(self):
+        existing = [
+            MagicMock(pk=pk, rule_id=9, window_start='s', window_end='e', metric_value=Decimal('-12.00'))
+            for pk in (1, 2)
+        ]
+
+        report, event_model, _ = self._evaluate_with_existing({'yield': '5.00'}, existing)
+
+        assert (report.created, report.deleted) == (0, 2)
+        assert event_model.objects.filter.call_args.kwargs == {'pk__in': [1, 2]}
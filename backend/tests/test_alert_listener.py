@@ -0,0 +1,158 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+from django.utils import timezone
+
+from bot.notifications import alerts
+from bot.notifications.dispatcher import DispatchResult
+from bot.notifications.listener import AlertEventListener
+
+
+def _connection(notifies=()):
+    conn = Mock()
+    conn.fileno.return_value = 42
+    conn.notifies = list(notifies)
+    return conn
+
+
+class TestAlertEventListener:
+
+    @patch('bot.notifications.listener._connect')
+    def test_start_listens_and_sweeps_once(self, mock_connect):
+        conn = _connection()
+        mock_connect.return_value = conn
+        on_notify = Mock()
+
+        async def run():
+            listener = AlertEventListener(on_notify)
+            loop = asyncio.get_running_loop()
+            with patch.object(loop, 'add_reader') as add_reader:
+                await listener.start()
+            return listener, add_reader
+
+        listener, add_reader = asyncio.run(run())
+
+        mock_connect.assert_called_once_with('alert_events')
+        add_reader.assert_called_once_with(42, listener._on_readable)
+        # Events inserted before the LISTEN are picked up right away
+        on_notify.assert_called_once()
+        assert listener.connected
+
+    def test_notification_burst_wakes_sender_once(self):
+        on_notify = Mock()
+        listener = AlertEventListener(on_notify)
+        listener.conn = _connection(notifies=[Mock(), Mock(), Mock()])
+
+        listener._on_readable()
+
+        listener.conn.poll.assert_called_once()
+        on_notify.assert_called_once()
+        assert listener.conn.notifies == []
+        assert listener.notifications == 3
+
+    def test_poll_without_notifications_does_nothing(self):
+        on_notify = Mock()
+        listener = AlertEventListener(on_notify)
+        listener.conn = _connection()
+
+        listener._on_readable()
+
+        on_notify.assert_not_called()
+
+    @patch('bot.notifications.listener._connect')
+    def test_lost_connection_is_reopened(self, mock_connect):
+        broken = _connection()
+        broken.poll.side_effect = OSError('server closed the connection')
+        mock_connect.return_value = _connection()
+        on_notify = Mock()
+
+        async def run():
+            listener = AlertEventListener(on_notify, reconnect_delay=0.01)
+            listener.loop = asyncio.get_running_loop()
+            listener.conn = broken
+            with patch.object(listener.loop, 'add_reader'), patch.object(listener.loop, 'remove_reader'):
+                listener._on_readable()
+                assert not listener.connected
+                await asyncio.wait_for(listener._reconnect, 1)
+            return listener
+
+        listener = asyncio.run(run())
+
+        broken.close.assert_called_once()
+        assert listener.conn is mock_connect.return_value
+        on_notify.assert_called_once()
+
+    @patch('bot.notifications.listener._connect', side_effect=OSError('connection refused'))
+    def test_stop_cancels_pending_reconnect(self, mock_connect):
+        async def run():
+            listener = AlertEventListener(Mock(), reconnect_delay=10)
+            await listener.start()
+            reconnect = listener._reconnect
+            await listener.stop()
+            await asyncio.sleep(0)
+            return listener, reconnect
+
+        listener, reconnect = asyncio.run(run())
+
+        assert reconnect.cancelled()
+        assert not listener.connected
+
+
+class TestSendPendingAlertEventsScheduling:
+
+    @patch('bot.notifications.alerts._send_pending_batch', new_callable=AsyncMock)
+    def test_calls_during_a_pass_coalesce_into_one_more_pass(self, mock_batch):
+        async def run():
+            release = asyncio.Event()
+
+            async def batch(context):
+                await release.wait()
+                return 0
+
+            mock_batch.side_effect = batch
+            first = asyncio.create_task(alerts.send_pending_alert_events(Mock()))
+            await asyncio.sleep(0)
+            for _ in range(5):
+                await alerts.send_pending_alert_events(Mock())
+            release.set()
+            await first
+
+        asyncio.run(run())
+
+        assert mock_batch.await_count == 2
+
+    @patch('bot.notifications.alerts._send_pending_batch', new_callable=AsyncMock)
+    def test_full_batch_runs_again(self, mock_batch):
+        mock_batch.side_effect = [alerts.ALERT_DISPATCH_BATCH, 3]
+
+        asyncio.run(alerts.send_pending_alert_events(Mock()))
+
+        assert mock_batch.await_count == 2
+
+    @patch('bot.notifications.alerts._record_alert_delivery')
+    @patch('bot.notifications.alerts.get_dispatcher')
+    @patch('bot.notifications.alerts.format_alert_event', return_value='alert')
+    @patch('bot.notifications.alerts._pending_alert_events')
+    def test_retries_are_scheduled_for_the_first_due_event(self, mock_pending, mock_format, mock_dispatcher, mock_record):
+        events = [
+            SimpleNamespace(id=event_id, user=SimpleNamespace(telegram_profile=SimpleNamespace(telegram_id=event_id)))
+            for event_id in (1, 2, 3)
+        ]
+        mock_pending.return_value = events
+        mock_dispatcher.return_value.dispatch = AsyncMock(return_value=DispatchResult(sent=[1], retry=[2, 3]))
+
+        def record(pending, result):
+            events[1].next_send_at = timezone.now() + timedelta(seconds=120)
+            events[2].next_send_at = timezone.now() + timedelta(seconds=60)
+
+        mock_record.side_effect = record
+        context = Mock()
+
+        assert asyncio.run(alerts._send_pending_batch(context)) == 3
+
+        callback = context.job_queue.run_once.call_args.args[0]
+        delay = context.job_queue.run_once.call_args.kwargs['when']
+        assert callback is alerts.send_pending_alert_events
+        assert 58 <= delay <= 60
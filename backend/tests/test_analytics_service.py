@@ -110,11 +110,10 @@ class TestAnalyticsService:
     
     def test_summary_from_empty_queryset(self, analytics_service):
         mock_qs = MagicMock()
-        mock_qs.count.return_value = 0
-        mock_qs.filter.return_value = mock_qs
         mock_qs.aggregate.return_value = {
-            'total_stake': None, 
-            'realized_profit': None,
+            'total_count': 0,
+            'settled_stake': None,
+            'settled_balance': None,
             'avg_stake': None,
             'avg_multiplier': None,
         }
@@ -127,26 +126,15 @@ class TestAnalyticsService:
     
     def test_summary_calculates_win_rate(self, analytics_service):
         mock_qs = MagicMock()
-        mock_qs.count.return_value = 10
-        
-        def filter_side_effect(*args, **kwargs):
-            filtered_qs = MagicMock()
-            if 'status' in str(kwargs) or args:
-                if hasattr(args[0], 'children') if args else False:
-                    filtered_qs.count.return_value = 8
-                else:
-                    filtered_qs.count.return_value = 5
-                filtered_qs.aggregate.return_value = {
-                    'total_stake': Decimal('100'),
-                    'realized_profit': Decimal('50'),
-                }
-            else:
-                filtered_qs.count.return_value = 0
-            filtered_qs.filter.return_value = filtered_qs
-            return filtered_qs
-        
-        mock_qs.filter.side_effect = filter_side_effect
         mock_qs.aggregate.return_value = {
+            'total_count': 10,
+            'finished_count': 8,
+            'in_progress_count': 2,
+            'won_count': 5,
+            'lost_count': 3,
+            'canceled_count': 0,
+            'settled_stake': Decimal('100'),
+            'settled_balance': Decimal('50'),
             'avg_stake': Decimal('10'),
             'avg_multiplier': Decimal('2.0'),
         }
@@ -154,6 +142,19 @@ class TestAnalyticsService:
         result = analytics_service._summary_from_queryset(mock_qs)
         
         assert result.total_coupons == 10
+        assert result.win_rate == Decimal('0.6250')
+        assert result.roi == Decimal('0.5')
+        assert result.yield_ == Decimal('50.0')
+
+    def test_summary_uses_single_aggregate_query(self, analytics_service):
+        mock_qs = MagicMock()
+        mock_qs.aggregate.return_value = {'total_count': 3}
+
+        analytics_service._summary_from_queryset(mock_qs)
+
+        mock_qs.aggregate.assert_called_once()
+        mock_qs.count.assert_not_called()
+        mock_qs.filter.assert_not_called()
 
 
 class TestAnalyticsResultEdgeCases:
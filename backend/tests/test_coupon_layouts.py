@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from coupons.services.coupon_layouts import LayoutRouter, _router, detect_grammar, parse_coupon_text
+from coupons.services.coupon_parser_v2 import GENERIC_GRAMMAR, BookmakerGrammar, CouponParserV2, GRAMMARS
+
+BETCLIC_TEXT = 'PSG vs Marseille\n1.55\nKwota zakładu 40,00'
+
+
+@pytest.fixture
+def router():
+    cache.clear()
+    router = LayoutRouter()
+    for grammar in list(GRAMMARS.values()):
+        router.register(grammar)
+    return router
+
+
+class TestLayoutClassifier:
+
+    def test_fingerprint_without_bookmaker_name(self):
+        assert detect_grammar(BETCLIC_TEXT).name == 'betclic'
+
+    def test_generic_words_alone_stay_generic(self):
+        assert detect_grammar('Legia - Lech\n2.10\nStawka 10,00\nPotencjalna wygrana 21.00') is GENERIC_GRAMMAR
+
+    def test_bookmaker_names_match_whole_words(self):
+        assert detect_grammar('COSTS 12,00') is GENERIC_GRAMMAR
+
+    def test_longer_word_hides_the_words_inside_it(self):
+        # 'Zakład' alone is an STS noise word
+        assert _router.classifier.scores('ZAKŁAD ŁĄCZONY') == {'betclic': 2}
+
+
+class TestLayoutRouter:
+
+    @patch.object(LayoutRouter, '_account_layout', return_value='betclic')
+    def test_account_layout_is_cached(self, account_layout, router):
+        first = router.route('Legia - Lech', bookmaker_account=7)
+        second = router.route('Legia - Lech', bookmaker_account=7)
+
+        assert first is second is router.parsers['betclic']
+        account_layout.assert_called_once_with(7)
+
+    @patch.object(LayoutRouter, '_account_layout', return_value=None)
+    def test_unknown_account_is_classified_and_not_cached(self, account_layout, router):
+        assert router.route(BETCLIC_TEXT, bookmaker_account=99) is router.parsers['betclic']
+        assert router.route('Legia - Lech', bookmaker_account=99) is router.parsers['generic']
+        assert account_layout.call_count == 2
+
+    @patch.object(LayoutRouter, '_account_layout', side_effect=['sts', 'fortuna'])
+    def test_forget_reloads_account_layout(self, account_layout, router):
+        router.route('', bookmaker_account=3)
+        router.forget(3)
+
+        assert router.route('', bookmaker_account=3) is router.parsers['fortuna']
+
+    @patch.object(LayoutRouter, '_account_layout', return_value=None)
+    def test_registered_plugin_receives_its_layout(self, account_layout, router):
+        class TotalbetParser(CouponParserV2):
+            pass
+
+        grammar = BookmakerGrammar(name='totalbet', markers=('TOTALbet',))
+        try:
+            router.register(grammar, TotalbetParser)
+            parser = router.route('TOTALbet\nLegia - Lech\n2.10', bookmaker_account=5)
+        finally:
+            GRAMMARS.pop('totalbet')
+
+        assert isinstance(parser, TotalbetParser) and parser.grammar is grammar
+
+    @patch.object(LayoutRouter, '_account_layout')
+    def test_parse_without_account_is_classified(self, account_layout):
+        parsed = parse_coupon_text(BETCLIC_TEXT)
+
+        account_layout.assert_not_called()
+        assert parsed['bookmaker_account'] is None
+        assert parsed['bets'][0]['event_name'] == 'PSG vs Marseille'
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from rest_framework.exceptions import NotFound
+
+from coupons.models import Bet, BetTypeDict, Bookmaker, Coupon, Currency
+from coupons.pagination import CouponKeysetPagination
+from coupons.serializers.coupon_serializer import CouponSerializer
+from coupons.services.coupon_service import CouponService
+from finances.models import BookmakerAccountModel
+
+T0 = datetime(2025, 8, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def _coupon(pk, account, bet_type):
+    coupon = Coupon(
+        id=pk, user_id=1, bookmaker_account=account, strategy=None, bet_stake=Decimal('10.00'),
+        multiplier=Decimal('2.25'), status='in_progress', coupon_type='ako',
+        created_at=T0 - timedelta(minutes=pk), updated_at=T0,
+    )
+    coupon._prefetched_objects_cache = {
+        'bets': [
+            Bet(id=pk * 10 + i, coupon_id=pk, event_id=None, event_name='A - B', bet_type=bet_type,
+                discipline=None, line='1', odds=Decimal('1.50'), result=None)
+            for i in range(2)
+        ]
+    }
+    return coupon
+
+
+def _page(size):
+    account = BookmakerAccountModel(
+        id=5, user_id=1, bookmaker=Bookmaker(id=1, name='STS', tax_multiplier=Decimal('0.88')),
+        currency=Currency(id=1, code='PLN', name='Złoty'),
+    )
+    bet_type = BetTypeDict(id=1, code='1X2')
+    return [_coupon(pk, account, bet_type) for pk in range(1, size + 1)]
+
+
+class _NoQueries:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        raise AssertionError(f"Unexpected query while serializing: {sql}")
+
+
+class TestCouponListPlan:
+
+    def test_list_queryset_eager_loads_serializer_relations(self):
+        qs = CouponService().list_coupons(user=1)
+
+        assert qs.query.select_related == {
+            'bookmaker_account': {'bookmaker': {}, 'currency': {}},
+            'strategy': {},
+        }
+        assert [lookup.prefetch_through for lookup in qs._prefetch_related_lookups] == ['bets']
+        assert qs.query.order_by == ('-created_at', '-id')
+
+    @pytest.mark.parametrize('size', [1, 50])
+    def test_serializing_prefetched_page_issues_no_queries(self, size):
+        page = _page(size)
+        guard = _NoQueries()
+
+        with connection.execute_wrapper(guard):
+            data = CouponSerializer(page, many=True).data
+
+        assert guard.count == 0
+        assert len(data) == size
+        assert data[0]['bookmaker'] == 'STS'
+        assert data[0]['currency'] == 'PLN'
+        assert [bet['bet_type'] for bet in data[0]['bets']] == ['1X2', '1X2']
+
+
+class TestCouponKeysetPagination:
+
+    def _request(self, **params):
+        return SimpleNamespace(query_params=params)
+
+    def test_pagination_is_opt_in(self):
+        assert CouponKeysetPagination().paginate_queryset(Coupon.objects.none(), self._request()) is None
+
+    def test_cursor_round_trip(self):
+        cursor = CouponKeysetPagination.encode_cursor(T0, 42)
+
+        assert CouponKeysetPagination()._decode_cursor(cursor) == (T0, 42)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(NotFound):
+            CouponKeysetPagination()._decode_cursor('not-a-cursor')
+
+    def test_page_size_is_capped(self):
+        paginator = CouponKeysetPagination()
+
+        assert paginator._get_page_size(self._request(page_size='1000')) == paginator.max_page_size
+        assert paginator._get_page_size(self._request(page_size='abc')) == 50
@@ -0,0 +1,62 @@
+import pytest
+
+from coupons.services.coupon_layouts import detect_grammar
+from coupons.services.coupon_parser_v2 import CouponParser
+from coupons.services.parser_benchmark import field_accuracy, load_corpus, run_benchmark
+
+CORPUS = load_corpus()
+
+
+def _parse(text, **kwargs):
+    return CouponParser().parse(text, **kwargs).to_dict()
+
+
+class TestGoldenCorpus:
+
+    def test_corpus_covers_every_grammar(self):
+        assert {detect_grammar(case.text).name for case in CORPUS} == {'generic', 'sts', 'fortuna', 'betclic', 'superbet'}
+
+    @pytest.mark.parametrize('case', CORPUS, ids=[case.name for case in CORPUS])
+    def test_matches_golden_file(self, case):
+        assert _parse(case.text) == case.expected
+
+    def test_benchmark_reports_full_accuracy(self):
+        result = run_benchmark(_parse, CORPUS, iterations=1)
+
+        assert result['accuracy'] == 1.0 and result['failures'] == []
+        assert result['parses_per_second'] > 0
+
+
+class TestCouponParser:
+
+    def test_split_event_lines_are_merged(self):
+        lines = CouponParser.merge_split_events(['Real Madryt', '- FC Barcelona', '- Arsenal', '2.40'])
+
+        assert lines == ['Real Madryt - FC Barcelona', '- Arsenal', '2.40']
+
+    def test_odds_not_searched_past_next_event(self):
+        parsed = _parse('Legia - Lech\nWisla - Cracovia\n1.90')
+
+        assert [bet['odds'] for bet in parsed['bets']] == ['1.00', '1.90']
+
+    def test_earliest_stake_label_wins(self):
+        assert _parse('Stawka\nStawka 5,00\n10,00')['bet_stake'] == '10.00'
+        assert _parse('Stawka\nx\nx\nx\nx\nStawka 5,00')['bet_stake'] == '5.00'
+
+    def test_explicit_bookmaker_overrides_detection(self):
+        text = 'PSG vs Marseille\n1.55\nStawka 40,00'
+
+        assert _parse(text)['bets'] == []
+        parsed = _parse(text, bookmaker='Betclic')
+        assert [(bet['event_name'], bet['odds']) for bet in parsed['bets']] == [('PSG vs Marseille', '1.55')]
+
+
+class TestFieldAccuracy:
+
+    def test_counts_fields_and_bets_by_position(self):
+        expected = {'coupon_type': 'AKO', 'bet_stake': '10.00', 'placed_at': None,
+                    'bets': [{'event_name': 'A - B', 'odds': '1.50'}, {'event_name': 'C - D', 'odds': '2.00'}]}
+        parsed = {'coupon_type': 'SOLO', 'bet_stake': '10.00', 'placed_at': None,
+                  'bets': [{'event_name': 'A - B', 'odds': '1.00'}]}
+
+        assert field_accuracy(expected, parsed) == (3, 8)
@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from coupons.serializers.event_serializer import EventResultSerializer
+from coupons.services.event_result_service import EventResultService, normalize_line, score_outcome
+
+
+class TestScoreOutcome:
+
+    @pytest.mark.parametrize('code,line,expected', [
+        ('1X2', '1', 'win'),
+        ('1X2', 'x', 'lost'),
+        ('DC', 'X2', 'lost'),
+        ('DC', '1X', 'win'),
+        ('DNB', '2', 'lost'),
+        ('OU_2.5', 'Over 2.5', 'win'),
+        ('OU_2.5', 'under 2,5', 'lost'),
+        ('OU_3.5', 'Under', 'win'),
+        ('HOME_OU_1.5', 'Over 1.5', 'win'),
+        ('AWAY_OU_1.5', 'Over 1.5', 'lost'),
+        ('BTTS', 'Yes', 'win'),
+        ('BTTS', 'Nie', 'lost'),
+        ('CS', '2:1', 'win'),
+        ('CS', '1-1', 'lost'),
+    ])
+    def test_full_time_markets(self, code, line, expected):
+        assert score_outcome(code, line, 2, 1) == expected
+
+    def test_draw_no_bet_refunds_on_draw(self):
+        assert score_outcome('DNB', '1', 1, 1) == 'canceled'
+
+    def test_whole_number_line_push_is_refunded(self):
+        assert score_outcome('OU_2.5', 'Over 3', 2, 1) == 'canceled'
+
+    @pytest.mark.parametrize('code,line', [
+        ('OU_H1_1.5', 'Over 1.5'),
+        ('OU_180', 'Over 4.5'),
+        ('OU', 'Over 2.5'),
+        ('HOME_OU_180', 'Under'),
+        ('1X2_H1', '1'),
+        ('AH', '-1.5'),
+        ('1X2', 'Barcelona'),
+    ])
+    def test_markets_not_decidable_from_score(self, code, line):
+        assert score_outcome(code, line, 2, 1) is None
+
+    def test_normalize_line(self):
+        assert normalize_line('  over   2,5 ') == 'OVER 2.5'
+
+
+class TestResolver:
+
+    @patch('coupons.services.event_result_service.EventMarketResult.objects.filter')
+    def test_market_result_takes_precedence_over_score(self, mock_filter):
+        mock_filter.return_value.values_list.return_value = [(3, 'Over 2.5', 'canceled')]
+        event = SimpleNamespace(home_score=2, away_score=1)
+
+        resolve = EventResultService()._resolver(event)
+
+        assert resolve(3, 'OU_2.5', 'over 2.5') == 'canceled'
+        assert resolve(4, '1X2', '1') == 'win'
+
+    @patch('coupons.services.event_result_service.EventMarketResult.objects.filter')
+    def test_without_score_only_market_results_resolve(self, mock_filter):
+        mock_filter.return_value.values_list.return_value = []
+        event = SimpleNamespace(home_score=None, away_score=None)
+
+        assert EventResultService()._resolver(event)(4, '1X2', '1') is None
+
+
+class TestRunChunk:
+
+    @patch('coupons.services.event_result_service.Coupon.objects')
+    @patch('coupons.services.event_result_service.Bet.objects')
+    def test_cursor_advances_past_unresolved_bets(self, bet_objects, coupon_objects):
+        rows = [(10, 1, 3, '1X2', '1'), (11, 2, 5, 'AH', '-1.5')]
+        bet_objects.filter.return_value.order_by.return_value.values_list.return_value = MagicMock(
+            __getitem__=lambda self, key: rows
+        )
+        bet_objects.filter.return_value.values_list.return_value = [10]
+        coupon = SimpleNamespace(id=1, status='in_progress')
+        coupon_objects.select_for_update.return_value.select_related.return_value \
+            .filter.return_value.order_by.return_value = [coupon]
+        job = MagicMock(event_id=7, last_bet_id=0, bets_resolved=0, coupons_settled=0)
+        service = EventResultService(chunk_size=2)
+        service.coupons = MagicMock()
+        service.coupons.settle_locked_coupons.side_effect = lambda coupons, data: setattr(coupon, 'status', 'won')
+
+        with patch('coupons.services.event_result_service.transaction.atomic'):
+            more = service.run_chunk(job, resolve=lambda bet_type_id, code, line: score_outcome(code, line, 2, 0))
+
+        assert more is True
+        data = service.coupons.settle_locked_coupons.call_args.args[1]
+        assert data == {1: {'bets': [{'bet_id': 10, 'result': 'win'}]}}
+        assert job.last_bet_id == 11
+        assert job.bets_resolved == 1
+        assert job.coupons_settled == 1
+
+    @patch('coupons.services.event_result_service.Coupon.objects')
+    @patch('coupons.services.event_result_service.Bet.objects')
+    def test_bets_settled_before_the_lock_are_left_alone(self, bet_objects, coupon_objects):
+        rows = [(10, 1, 3, '1X2', '1'), (12, 2, 3, '1X2', '1')]
+        bet_objects.filter.return_value.order_by.return_value.values_list.return_value = MagicMock(
+            __getitem__=lambda self, key: rows
+        )
+        # Bet 10 was settled by hand between the read and the coupon lock
+        bet_objects.filter.return_value.values_list.return_value = [12]
+        coupons = [SimpleNamespace(id=1, status='in_progress'), SimpleNamespace(id=2, status='in_progress')]
+        coupon_objects.select_for_update.return_value.select_related.return_value \
+            .filter.return_value.order_by.return_value = coupons
+        job = MagicMock(event_id=7, last_bet_id=0, bets_resolved=0, coupons_settled=0)
+        service = EventResultService(chunk_size=5)
+        service.coupons = MagicMock()
+
+        with patch('coupons.services.event_result_service.transaction.atomic'):
+            more = service.run_chunk(job, resolve=lambda bet_type_id, code, line: score_outcome(code, line, 2, 0))
+
+        assert more is False
+        locked, data = service.coupons.settle_locked_coupons.call_args.args
+        assert [coupon.id for coupon in locked] == [2]
+        assert data == {2: {'bets': [{'bet_id': 12, 'result': 'win'}]}}
+        assert job.bets_resolved == 1
+        assert job.last_bet_id == 12
+
+
+class TestEventResultSerializer:
+
+    def test_requires_both_scores(self):
+        assert not EventResultSerializer(data={'home_score': 1}).is_valid()
+
+    def test_requires_score_or_markets(self):
+        assert not EventResultSerializer(data={}).is_valid()
+
+    def test_accepts_final_score(self):
+        assert EventResultSerializer(data={'home_score': 0, 'away_score': 0}).is_valid()
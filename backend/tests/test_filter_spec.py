@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.db.models import Q
+
+from coupon_analytics.models.queries import AnalyticsQuery, AnalyticsQueryGroup
+from coupon_analytics.services.filter_spec import FilterGroup, FilterSpec, purge_auto_generated_queries
+from coupon_analytics.services.query_builder import AnalyticsQueryBuilder
+from coupon_analytics.services.query_compiler import to_q
+from coupons.services.coupon_filter_service import UniversalCouponFilterService
+
+
+class TestFilterSpec:
+
+    def test_compiles_without_database(self):
+        spec = FilterSpec(user_id=1, groups=[
+            FilterGroup('AND').add('status', 'equals', 'won').add('bets__line', 'not_in', ['2']),
+        ])
+
+        compiled = AnalyticsQueryBuilder(spec).compiled()
+
+        assert to_q(compiled['where']) == Q(status__exact='won') & ~Q(bets__line__in=['2'])
+        assert compiled['filters']['user_id'] == 1
+
+    @patch('coupon_analytics.services.filter_spec.AnalyticsQueryCondition.objects')
+    @patch('coupon_analytics.services.filter_spec.AnalyticsQueryGroup.objects')
+    @patch('coupon_analytics.services.filter_spec.AnalyticsQuery.objects')
+    def test_save_inserts_one_batch_per_level(self, query_objects, group_objects, condition_objects):
+        query_objects.create.return_value = AnalyticsQuery(id=9, user_id=1)
+        group_objects.bulk_create.side_effect = lambda rows: [
+            AnalyticsQueryGroup(id=idx, analytics_query_id=9, operator=row.operator) for idx, row in enumerate(rows, 1)
+        ]
+        spec = FilterSpec(user_id=1, groups=[
+            FilterGroup('AND', subgroups=[
+                FilterGroup('OR').add('bets__event__home_team', 'contains', 'Legia'),
+                FilterGroup('OR').add('bet_stake', 'gte', 10),
+            ]).add('status', 'equals', 'won'),
+        ])
+
+        spec.save.__wrapped__(spec)
+
+        assert [len(call.args[0]) for call in group_objects.bulk_create.call_args_list] == [1, 2]
+        condition_objects.bulk_create.assert_called_once()
+        assert len(condition_objects.bulk_create.call_args.args[0]) == 3
+
+
+class TestUniversalFilterSpec:
+
+    @patch('coupon_analytics.services.filter_spec.AnalyticsQuery.objects')
+    def test_building_a_filter_writes_nothing(self, query_objects):
+        spec = UniversalCouponFilterService.build_universal_filter_spec(
+            Mock(id=1), team_name='Legia', position='any', filter_mode='won_bets_lost_coupons',
+        )
+
+        query_objects.create.assert_not_called()
+        assert spec.name == 'Filter: Legia (any)'
+        group = spec.groups[0]
+        assert [c.field for c in group.conditions] == ['bets__result', 'status']
+        assert [c.field for c in group.subgroups[0].conditions] == ['bets__event__home_team', 'bets__event__away_team']
+
+
+class TestPurgeAutoGeneratedQueries:
+
+    @patch('coupon_analytics.services.filter_spec.AnalyticsQuery.objects')
+    @patch('coupon_analytics.services.filter_spec.orphaned_auto_generated_queries')
+    def test_deletes_in_batches_until_empty(self, orphaned, query_objects):
+        orphaned.return_value.order_by.return_value.values_list.return_value.__getitem__.side_effect = [
+            [1, 2], [3], [],
+        ]
+
+        assert purge_auto_generated_queries(timedelta(days=1), batch_size=2) == 3
+        assert query_objects.filter.return_value.delete.call_count == 2
@@ -0,0 +1,85 @@
+import io
+from unittest.mock import Mock, patch
+
+import pytest
+from PIL import Image, ImageDraw
+
+from coupons.services.image_preprocessing import find_slip_box, preprocess_image, target_scale
+from coupons.services.ocr_service import OCRService, get_backend_version
+
+
+def _screenshot(background=(30, 30, 30), paper=(250, 250, 250), ink=(0, 0, 0), angle=0):
+    image = Image.new('RGB', (1080, 2340), background)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((100, 500, 980, 1500), fill=paper)
+    for y in range(540, 1460, 40):
+        draw.rectangle((140, y, 900, y + 14), fill=ink)
+    return image.rotate(angle, fillcolor=background) if angle else image
+
+
+class TestPreprocessImage:
+
+    def test_crops_to_slip(self):
+        box = find_slip_box(_screenshot().convert('L'))
+
+        assert box is not None
+        left, top, right, bottom = box
+        assert left <= 100 and top <= 500 and right >= 980 and bottom >= 1500
+        assert (right - left) * (bottom - top) < 0.5 * 1080 * 2340
+
+    def test_uniform_image_is_not_cropped(self):
+        assert find_slip_box(Image.new('L', (400, 800), 255)) is None
+
+    def test_downscale_never_upscales(self):
+        assert target_scale((800, 1200), None, max_side=1600, target_dpi=300) == 1.0
+        assert target_scale((2000, 4000), None, max_side=1600, target_dpi=300) == pytest.approx(0.4)
+        assert target_scale((1000, 1000), (600, 600), max_side=1600, target_dpi=300) == pytest.approx(0.5)
+
+    def test_binarised_output_is_black_on_white(self):
+        result = preprocess_image(_screenshot(paper=(20, 20, 20), ink=(230, 230, 230)), max_side=800)
+
+        histogram = result.image.histogram()
+        assert sum(histogram[1:255]) == 0
+        assert histogram[255] > histogram[0]
+        assert result.inverted is True
+        assert max(result.image.size) <= 800
+
+    @pytest.mark.parametrize('angle', [3, -2])
+    def test_deskew_undoes_rotation(self, angle):
+        result = preprocess_image(_screenshot(angle=angle))
+
+        assert result.angle == -angle
+        assert 'deskew' in result.steps
+
+    def test_decodes_bytes_once(self):
+        buffer = io.BytesIO()
+        _screenshot().save(buffer, format='PNG')
+
+        result = preprocess_image(buffer.getvalue(), binarize_image=False, deskew=False)
+
+        assert result.original_size == (1080, 2340)
+        assert result.steps == ['crop']
+
+
+class TestOCRServiceInput:
+
+    def _service(self, preprocess):
+        service = OCRService.__new__(OCRService)
+        service.backend, service.preprocess = 'tesseract', preprocess
+        return service
+
+    def test_engine_receives_prepared_image_in_memory(self, tmp_path):
+        path = tmp_path / 'slip.png'
+        _screenshot().save(path)
+
+        pytesseract = Mock(**{'image_to_string.return_value': 'Legia - Lech'})
+        with patch.dict('sys.modules', {'pytesseract': pytesseract}):
+            result = self._service(preprocess=True).extract(path)
+
+        image, = pytesseract.image_to_string.call_args.args
+        assert isinstance(image, Image.Image) and image.size[1] < 2340
+        assert result['text'] == 'Legia - Lech'
+
+    @patch('coupons.services.ocr_service.preprocessing_enabled', return_value=True)
+    def test_cache_version_tracks_preprocessing(self, _enabled):
+        assert get_backend_version('tesseract').endswith('+pre1')
@@ -0,0 +1,159 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from telegram import Bot
+
+from bot.fake_bot_api import FakeBotAPI
+from bot.notifications import alerts
+from bot.notifications.dispatcher import (
+    DispatchResult,
+    NotificationDispatcher,
+    OutgoingMessage,
+    TokenBucket,
+    get_dispatcher,
+)
+
+
+def _dispatch(api, messages, **options):
+    async def run():
+        async with Bot('123:fake', base_url=api.base_url) as bot:
+            return await NotificationDispatcher(bot, **options).dispatch(messages)
+    return asyncio.run(run())
+
+
+def _messages(chats, per_chat=1):
+    return [
+        OutgoingMessage(key=(chat, index), chat_id=chat, text=f'{chat}-{index}')
+        for chat in chats for index in range(per_chat)
+    ]
+
+
+class TestTokenBucket:
+
+    def test_burst_then_rate(self):
+        async def run():
+            bucket = TokenBucket(rate=50, capacity=5)
+            started = time.perf_counter()
+            for _ in range(10):
+                await bucket.acquire()
+            return time.perf_counter() - started
+
+        # 5 from the burst, 5 more at 50/s
+        assert 0.08 <= asyncio.run(run()) < 0.5
+
+    def test_pause_blocks_acquire(self):
+        async def run():
+            bucket = TokenBucket(rate=100, capacity=100)
+            bucket.pause(0.2)
+            started = time.perf_counter()
+            await bucket.acquire()
+            return time.perf_counter() - started
+
+        assert asyncio.run(run()) >= 0.19
+
+
+class TestNotificationDispatcher:
+
+    @pytest.fixture
+    def api(self):
+        with FakeBotAPI() as api:
+            yield api
+
+    def test_sends_every_message_in_chat_order(self, api):
+        result = _dispatch(api, _messages(range(1, 6), per_chat=3), global_rate=1000, per_chat_interval=0)
+
+        assert len(result.sent) == 15
+        assert not result.retry and not result.failed
+        assert [m['text'] for m in api.sent_to(3)] == ['3-0', '3-1', '3-2']
+
+    def test_global_rate_limits_throughput(self, api):
+        started = time.perf_counter()
+        _dispatch(api, _messages(range(1, 21)), global_rate=10, per_chat_interval=0)
+
+        # 10 tokens of burst, the other 10 at 10/s
+        assert time.perf_counter() - started >= 0.9
+
+    def test_per_chat_interval_spaces_messages(self, api):
+        _dispatch(api, _messages([7], per_chat=3), global_rate=1000, per_chat_interval=0.1)
+
+        times = [m['at'] for m in api.sent_to(7)]
+        assert all(later - earlier >= 0.09 for earlier, later in zip(times, times[1:]))
+
+    def test_retry_after_waits_and_resends(self, api):
+        api.fail(1, 429, retry_after=1)
+        started = time.perf_counter()
+        result = _dispatch(api, _messages([1, 2]), global_rate=1000, per_chat_interval=0)
+
+        assert sorted(result.sent) == [(1, 0), (2, 0)]
+        assert time.perf_counter() - started >= 0.9
+
+    def test_blocked_chat_fails_all_its_messages(self, api):
+        api.fail(4, 403)
+        result = _dispatch(api, _messages([4, 5], per_chat=2), global_rate=1000, per_chat_interval=0)
+
+        assert result.failed == [(4, 0), (4, 1)]
+        assert sorted(result.sent) == [(5, 0), (5, 1)]
+        assert api.sent_to(4) == []
+
+    def test_server_errors_are_retried_with_backoff(self, api):
+        api.fail(6, 500, times=2)
+        api.fail(8, 500, times=5)
+        result = _dispatch(api, _messages([6, 8]), global_rate=1000, per_chat_interval=0, retries=2, backoff=0.01)
+
+        assert result.sent == [(6, 0)]
+        assert result.retry == [(8, 0)]
+
+    def test_get_dispatcher_is_shared_through_bot_data(self):
+        context = SimpleNamespace(bot=Mock(), bot_data={})
+
+        assert get_dispatcher(context) is get_dispatcher(context)
+
+
+class TestSendPendingAlertEvents:
+
+    @staticmethod
+    def _event(event_id, telegram_id):
+        profile = SimpleNamespace(telegram_id=telegram_id)
+        return SimpleNamespace(id=event_id, user=SimpleNamespace(telegram_profile=profile), send_attempts=0, next_send_at=None)
+
+    @patch('bot.notifications.alerts.format_alert_event', side_effect=lambda ev, lang: f'alert {ev.id}')
+    @patch('bot.notifications.alerts._record_alert_delivery')
+    @patch('bot.notifications.alerts._pending_alert_events')
+    def test_dispatches_and_records_in_bulk(self, mock_pending, mock_record, mock_format):
+        events = [self._event(1, 100), self._event(2, 100), self._event(3, 200)]
+        mock_pending.return_value = events
+
+        async def run(api):
+            async with Bot('123:fake', base_url=api.base_url) as bot:
+                context = SimpleNamespace(bot=bot, bot_data={
+                    'notification_dispatcher': NotificationDispatcher(bot, global_rate=1000, per_chat_interval=0),
+                })
+                await alerts.send_pending_alert_events(context)
+
+        with FakeBotAPI() as api:
+            api.fail(200, 403)
+            asyncio.run(run(api))
+            assert [m['text'] for m in api.sent_to(100)] == ['alert 1', 'alert 2']
+
+        recorded_events, result = mock_record.call_args.args
+        assert recorded_events is events
+        assert result.sent == [1, 2]
+        assert result.failed == [3]
+
+    @patch('bot.notifications.alerts.AlertEvent')
+    def test_record_delivery_marks_sent_and_schedules_retries(self, mock_model):
+        events = [self._event(1, 100), self._event(2, 100), self._event(3, 200)]
+        events[1].send_attempts = 1
+
+        alerts._record_alert_delivery(events, DispatchResult(sent=[1], retry=[2], failed=[3]))
+
+        mock_model.objects.filter.assert_called_once_with(id__in=[1])
+        mock_model.objects.filter.return_value.update.assert_called_once()
+        updated, fields = mock_model.objects.bulk_update.call_args.args
+        assert updated == [events[1], events[2]]
+        assert fields == ['send_attempts', 'next_send_at']
+        assert events[1].send_attempts == 2 and events[1].next_send_at is not None
+        assert events[2].send_attempts == alerts.ALERT_SEND_MAX_ATTEMPTS and events[2].next_send_at is None
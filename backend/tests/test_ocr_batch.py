@@ -0,0 +1,118 @@
+import io
+import zipfile
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from coupons.models import OCRResult
+from coupons.services.coupon_layouts import parsed_cache_version
+from coupons.services.ocr_batch_service import OCRBatchError, OCRBatchService
+from coupons.services.ocr_cache import OCRResultCache
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return SimpleUploadedFile('slips.zip', buf.getvalue())
+
+
+class TestCollectImages:
+
+    def test_zip_members_and_plain_images_are_collected(self, tmp_path):
+        archive = _zip({
+            'slips/a.png': b'a',
+            'slips/b.jpg': b'b',
+            'slips/notes.txt': b'skip',
+            '__MACOSX/slips/._a.png': b'skip',
+        })
+        single = SimpleUploadedFile('c.png', b'c')
+
+        images = OCRBatchService(max_images=10).collect_images([archive, single], tmp_path)
+
+        assert [img['name'] for img in images] == ['a.png', 'b.jpg', 'c.png']
+        assert all(img['path'].parent == tmp_path for img in images)
+
+    def test_limit_is_enforced(self, tmp_path):
+        archive = _zip({f'{i}.png': b'x' for i in range(3)})
+
+        with pytest.raises(OCRBatchError):
+            OCRBatchService(max_images=2).collect_images([archive], tmp_path)
+
+    def test_oversized_zip_member_is_rejected_before_it_is_unpacked(self, tmp_path):
+        # Zeros compress to a few hundred bytes, the way a zip bomb does
+        archive = _zip({'bomb.png': b'\0' * 100_000})
+
+        with pytest.raises(OCRBatchError, match='too large'):
+            OCRBatchService(max_image_bytes=50_000).collect_images([archive], tmp_path)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_oversized_plain_upload_is_rejected(self, tmp_path):
+        with pytest.raises(OCRBatchError, match='too large'):
+            OCRBatchService(max_image_bytes=10).collect_images([SimpleUploadedFile('a.png', b'x' * 11)], tmp_path)
+
+    def test_batch_byte_limit_counts_every_image(self, tmp_path):
+        archive = _zip({f'{i}.png': b'x' * 40 for i in range(3)})
+
+        with pytest.raises(OCRBatchError, match='Batch too large'):
+            OCRBatchService(max_total_bytes=100).collect_images([archive], tmp_path)
+
+
+class TestToCouponData:
+
+    def test_builds_coupon_payload(self):
+        parsed = {
+            'bet_stake': '10.00',
+            'placed_at': '2026-10-20T20:45:00+01:00',
+            'bets': [{'event_name': 'Barcelona - Real', 'start_time': None, 'bet_type': '1x2', 'line': '1', 'odds': '2.10'}],
+        }
+        bet_type = object()
+
+        data = OCRBatchService.to_coupon_data(parsed, account='acc', strategy=None, bet_types={'1X2': bet_type})
+
+        assert data['bet_stake'] == Decimal('10.00')
+        assert data['placed_at'].isoformat() == '2026-10-20T20:45:00+01:00'
+        assert data['bets'][0]['bet_type'] is bet_type
+        assert data['bets'][0]['odds'] == Decimal('2.10')
+
+    @pytest.mark.parametrize('parsed', [
+        {'bet_stake': '0.00', 'bets': [{'event_name': 'A - B', 'odds': '2.00'}]},
+        {'bet_stake': '5.00', 'bets': []},
+        {'bet_stake': '5.00', 'bets': [{'event_name': 'A - B', 'odds': '1.00'}]},
+    ])
+    def test_unrecognised_slips_are_rejected(self, parsed):
+        with pytest.raises(OCRBatchError):
+            OCRBatchService.to_coupon_data(parsed, account='acc', strategy=None, bet_types={})
+
+
+class TestRecognize:
+
+    @patch('coupons.services.coupon_layouts.LayoutRouter.layout_for_account', return_value='betclic')
+    @patch('coupons.services.ocr_batch_service.get_backend_version', return_value='3.0')
+    @patch('coupons.services.ocr_batch_service.OCRResultCache')
+    @patch.object(OCRBatchService, '_executor')
+    def test_cached_text_is_reparsed_without_inference(self, mock_executor, mock_cache_cls, _version, _layout, tmp_path):
+        path = tmp_path / '0000.png'
+        path.write_bytes(b'img')
+        entry = OCRResult(
+            image_hash='a' * 64,
+            backend='paddle',
+            rec_texts=['PSG vs Marseille', '1.95'],
+            rec_scores=[0.9, 0.9],
+            parsed={'bookmaker_account': 7, 'bets': []},
+            parser_version=parsed_cache_version('generic'),
+        )
+        mock_cache = mock_cache_cls.return_value
+        mock_cache.lookup.return_value = entry
+        mock_cache.to_ocr_payload.side_effect = OCRResultCache.to_ocr_payload
+        images = [{'name': 'slip.png', 'path': path}]
+
+        OCRBatchService().recognize(images, bookmaker_account=7)
+
+        mock_executor.assert_not_called()
+        assert images[0]['cached'] is True
+        assert images[0]['parsed']['bets'][0]['event_name'] == 'PSG vs Marseille'
+        assert mock_cache.store_parsed.call_args.kwargs['parser_version'] == parsed_cache_version('betclic')
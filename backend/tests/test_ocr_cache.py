@@ -0,0 +1,126 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from coupons.models import OCRResult
+from coupons.services.ocr_cache import OCRResultCache
+from coupons.services import ocr_pipeline
+from coupons.services.coupon_layouts import parsed_cache_version
+
+
+class TestOCRResultCachePayload:
+
+    def test_to_ocr_payload_returns_engine_text_unchanged(self):
+        # Tesseract items are single words; the text must keep its lines
+        entry = OCRResult(
+            image_hash='b' * 64,
+            backend='tesseract',
+            rec_texts=['Legia', '-', 'Lech', '1.85'],
+            rec_scores=[0.9, 0.9, 0.9, 0.9],
+            raw_text='Legia - Lech\n1.85',
+        )
+
+        assert OCRResultCache.to_ocr_payload(entry)['text'] == 'Legia - Lech\n1.85'
+
+    @patch('coupons.services.ocr_cache.OCRResultCache.evict')
+    @patch('coupons.services.ocr_cache.OCRResult.objects.update_or_create')
+    def test_store_keeps_engine_text(self, mock_upsert, mock_evict):
+        mock_upsert.return_value = (Mock(), True)
+
+        OCRResultCache().store(
+            image_hash='c' * 64, backend='tesseract', engine_version='5',
+            ocr_result={'text': 'Legia - Lech', 'raw_result': [{'text': 'Legia'}, {'text': '-'}, {'text': 'Lech'}]},
+        )
+
+        assert mock_upsert.call_args.kwargs['defaults']['raw_text'] == 'Legia - Lech'
+
+    def test_to_ocr_payload_rebuilds_extract_shape(self):
+        entry = OCRResult(
+            image_hash='a' * 64,
+            backend='paddle',
+            rec_texts=['Barcelona - Real', '2.10'],
+            rec_scores=[0.91, 0.88],
+            average_confidence=0.895,
+        )
+
+        payload = OCRResultCache.to_ocr_payload(entry)
+
+        assert payload['text'] == 'Barcelona - Real\n2.10'
+        assert payload['raw_result'] == [
+            {'text': 'Barcelona - Real', 'confidence': 0.91},
+            {'text': '2.10', 'confidence': 0.88},
+        ]
+        assert payload['total_items'] == 2
+        assert payload['success'] is True
+
+
+class TestRecognizeImage:
+
+    @pytest.fixture
+    def image(self, tmp_path):
+        path = tmp_path / 'slip.png'
+        path.write_bytes(b'fake-image-bytes')
+        return path
+
+    @patch('coupons.services.coupon_layouts.LayoutRouter.layout_for_account', return_value='generic')
+    @patch('coupons.services.ocr_pipeline.get_backend_version', return_value='3.0')
+    @patch('coupons.services.ocr_pipeline.OCRResultCache')
+    def test_cache_hit_skips_inference_and_parser(self, mock_cache_cls, _version, _layout, image):
+        entry = OCRResult(
+            image_hash='a' * 64,
+            backend='paddle',
+            rec_texts=['Barcelona - Real'],
+            rec_scores=[0.9],
+            parsed={'bookmaker_account': 1, 'bets': []},
+            parser_version=parsed_cache_version('generic'),
+        )
+        mock_cache = mock_cache_cls.return_value
+        mock_cache.lookup.return_value = entry
+        mock_cache.to_ocr_payload.side_effect = OCRResultCache.to_ocr_payload
+        pool = Mock(backend='paddle')
+
+        result = ocr_pipeline.recognize_image(image, parse=True, bookmaker_account=7, pool=pool)
+
+        pool.extract.assert_not_called()
+        mock_cache.store_parsed.assert_not_called()
+        assert result['cached'] is True
+        assert result['parsed']['bookmaker_account'] == 7
+
+    @patch('coupons.services.coupon_layouts.LayoutRouter.layout_for_account', return_value='betclic')
+    @patch('coupons.services.ocr_pipeline.get_backend_version', return_value='3.0')
+    @patch('coupons.services.ocr_pipeline.OCRResultCache')
+    def test_parse_cached_for_another_layout_is_redone(self, mock_cache_cls, _version, _layout, image):
+        entry = OCRResult(
+            image_hash='a' * 64,
+            backend='paddle',
+            rec_texts=['PSG vs Marseille', '1.95'],
+            rec_scores=[0.9, 0.9],
+            parsed={'bookmaker_account': 1, 'bets': []},
+            parser_version=parsed_cache_version('generic'),
+        )
+        mock_cache = mock_cache_cls.return_value
+        mock_cache.lookup.return_value = entry
+        mock_cache.to_ocr_payload.side_effect = OCRResultCache.to_ocr_payload
+        pool = Mock(backend='paddle')
+
+        result = ocr_pipeline.recognize_image(image, parse=True, bookmaker_account=7, pool=pool)
+
+        pool.extract.assert_not_called()
+        assert result['parsed']['bets'][0]['event_name'] == 'PSG vs Marseille'
+        assert mock_cache.store_parsed.call_args.kwargs['parser_version'] == parsed_cache_version('betclic')
+
+    @patch('coupons.services.coupon_layouts.LayoutRouter.layout_for_account', return_value=None)
+    @patch('coupons.services.ocr_pipeline.get_backend_version', return_value='3.0')
+    @patch('coupons.services.ocr_pipeline.OCRResultCache')
+    def test_cache_miss_runs_inference_and_stores(self, mock_cache_cls, _version, _layout, image):
+        mock_cache = mock_cache_cls.return_value
+        mock_cache.lookup.return_value = None
+        pool = Mock(backend='paddle')
+        pool.extract.return_value = {'text': 'Barcelona - Real\n2.10', 'raw_result': [], 'success': True}
+
+        result = ocr_pipeline.recognize_image(image, parse=True, pool=pool)
+
+        pool.extract.assert_called_once()
+        mock_cache.store.assert_called_once()
+        mock_cache.store_parsed.assert_called_once()
+        assert result['cached'] is False
+        assert result['parsed']['bets'][0]['event_name'] == 'Barcelona - Real'
@@ -0,0 +1,161 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from coupons.models import OCRJob
+from coupons.services.ocr_job_service import OCRJobService
+
+
+class TestOCRJobRun:
+
+    @pytest.fixture
+    def job(self):
+        job = OCRJob(
+            pk=1,
+            image_name='slip.png',
+            image_path='/tmp/slip.png',
+            parse=True,
+            bookmaker_account=3,
+            status=OCRJob.JobStatus.RUNNING,
+            attempts=1,
+        )
+        with patch.object(OCRJob, 'save') as mock_save:
+            job.mock_save = mock_save
+            yield job
+
+    @patch('coupons.services.ocr_job_service.recognize_image')
+    def test_success_marks_done_and_stores_result(self, mock_recognize, job):
+        mock_recognize.return_value = {'image_hash': 'abc', 'cached': False, 'ocr': {'text': 'x'}, 'parsed': {}}
+
+        OCRJobService(max_attempts=2).run(job)
+
+        mock_recognize.assert_called_once_with('/tmp/slip.png', parse=True, bookmaker_account=3)
+        assert job.status == OCRJob.JobStatus.DONE
+        assert job.result['image_hash'] == 'abc'
+        assert job.finished_at is not None
+
+    @patch('coupons.services.ocr_job_service.recognize_image', side_effect=RuntimeError('engine crashed'))
+    def test_failure_is_requeued_until_attempts_exhausted(self, _recognize, job):
+        service = OCRJobService(max_attempts=2)
+
+        service.run(job)
+        assert job.status == OCRJob.JobStatus.QUEUED
+        assert job.error == 'engine crashed'
+
+        job.attempts = 2
+        service.run(job)
+        assert job.status == OCRJob.JobStatus.FAILED
+        assert job.finished_at is not None
+
+
+class TestOCRJobUploads:
+
+    def _job(self, path):
+        return OCRJob(pk=2, image_name='slip.png', image_path=str(path), status=OCRJob.JobStatus.RUNNING, attempts=1)
+
+    @patch.object(OCRJob, 'save')
+    @patch('coupons.services.ocr_job_service.recognize_image', return_value={'cached': False})
+    def test_upload_is_deleted_when_job_is_done(self, _recognize, _save, tmp_path):
+        upload = tmp_path / 'abc.png'
+        upload.write_bytes(b'img')
+
+        with override_settings(OCR_UPLOAD_DIR=str(tmp_path)):
+            OCRJobService().run(self._job(upload))
+
+        assert not upload.exists()
+
+    @patch.object(OCRJob, 'save')
+    @patch('coupons.services.ocr_job_service.recognize_image', side_effect=RuntimeError('boom'))
+    def test_upload_is_kept_for_retry_and_deleted_after_final_failure(self, _recognize, _save, tmp_path):
+        upload = tmp_path / 'abc.png'
+        upload.write_bytes(b'img')
+        job = self._job(upload)
+        service = OCRJobService(max_attempts=2)
+
+        with override_settings(OCR_UPLOAD_DIR=str(tmp_path)):
+            service.run(job)
+            assert upload.exists()
+
+            job.attempts = 2
+            service.run(job)
+            assert not upload.exists()
+
+    def test_images_outside_the_upload_dir_are_kept(self, tmp_path):
+        image = tmp_path / 'coupons_images' / 'slip.png'
+        image.parent.mkdir()
+        image.write_bytes(b'img')
+
+        with override_settings(OCR_UPLOAD_DIR=str(tmp_path / 'uploads')):
+            OCRJobService().discard_upload(self._job(image))
+
+        assert image.exists()
+
+
+class TestOCRJobAccess:
+
+    @patch('coupons.views.ocr_view.OCRJob.objects.filter')
+    def test_job_lookup_is_scoped_to_the_requesting_user(self, mock_filter):
+        from coupons.views.ocr_view import _get_job_for_request
+
+        user = SimpleNamespace(pk=5, is_authenticated=True)
+        _get_job_for_request(SimpleNamespace(user=user), 9)
+
+        mock_filter.assert_called_once_with(pk=9, user=user)
+
+    def test_job_views_require_authentication(self):
+        from rest_framework.permissions import IsAuthenticated
+        from coupons.views.ocr_view import OCRJobResultView, OCRJobStatusView, OCRJobSubmitView
+
+        for view in (OCRJobSubmitView, OCRJobStatusView, OCRJobResultView):
+            assert IsAuthenticated in view.permission_classes
+
+    @patch('coupons.views.ocr_view.submit_ocr_job')
+    @patch('coupons.views.ocr_view.BookmakerAccountModel.objects.filter')
+    def test_job_with_foreign_account_is_rejected(self, mock_filter, mock_submit):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from coupons.views.ocr_view import OCRJobSubmitView
+
+        mock_filter.return_value.exists.return_value = False
+        request = APIRequestFactory().post('/ocr/jobs/', {'image_name': 'slip.png', 'bookmaker_account': 1}, format='json')
+        force_authenticate(request, user=SimpleNamespace(pk=5, is_authenticated=True))
+
+        response = OCRJobSubmitView.as_view()(request)
+
+        assert response.status_code == 400
+        mock_submit.assert_not_called()
+
+
+class TestOCRAccountOwnership:
+
+    @staticmethod
+    def _request(account, authenticated=True):
+        data = {} if account is None else {'bookmaker_account': account}
+        return SimpleNamespace(data=data, user=SimpleNamespace(pk=5, is_authenticated=authenticated))
+
+    def test_missing_account_detects_the_layout(self):
+        from coupons.views.ocr_view import _own_account_id
+
+        assert _own_account_id(self._request(None)) == (None, None)
+
+    @patch('coupons.views.ocr_view.BookmakerAccountModel.objects.filter')
+    def test_own_account_is_accepted(self, mock_filter):
+        from coupons.views.ocr_view import _own_account_id
+
+        mock_filter.return_value.exists.return_value = True
+        request = self._request('7')
+
+        assert _own_account_id(request) == (7, None)
+        mock_filter.assert_called_once_with(pk=7, user=request.user)
+
+    @patch('coupons.views.ocr_view.BookmakerAccountModel.objects.filter')
+    def test_foreign_or_unknown_account_is_rejected(self, mock_filter):
+        from coupons.views.ocr_view import _own_account_id
+
+        mock_filter.return_value.exists.return_value = False
+
+        account_id, error = _own_account_id(self._request(1))
+        assert account_id is None and error.status_code == 400
+        assert _own_account_id(self._request(1, authenticated=False))[1].status_code == 400
+        assert _own_account_id(self._request('abc'))[1].status_code == 400
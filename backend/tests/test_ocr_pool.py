@@ -0,0 +1,79 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from coupons.services.ocr_pool import OCREnginePool
+
+
+def _fake_engine(delay=0.0):
+    engine = Mock()
+
+    def _extract(path):
+        time.sleep(delay)
+        return {'text': f'text:{path.name}', 'raw_result': [], 'success': True}
+
+    engine.extract.side_effect = _extract
+    return engine
+
+
+class TestOCREnginePool:
+
+    @pytest.fixture
+    def image(self, tmp_path):
+        path = tmp_path / 'slip.png'
+        path.write_bytes(b'fake-image-bytes')
+        return path
+
+    @patch('coupons.services.ocr_pool.OCRService')
+    def test_preload_creates_all_engines(self, mock_service):
+        mock_service.side_effect = lambda backend: _fake_engine()
+        pool = OCREnginePool(size=3)
+
+        assert pool.preload() == 3
+        assert mock_service.call_count == 3
+        assert pool.metrics()['idle'] == 3
+
+    @patch('coupons.services.ocr_pool.OCRService')
+    def test_engines_are_reused_between_requests(self, mock_service, image):
+        mock_service.side_effect = lambda backend: _fake_engine()
+        pool = OCREnginePool(size=2)
+
+        pool.extract(image)
+        pool.extract(image)
+
+        assert mock_service.call_count == 1
+        metrics = pool.metrics()
+        assert metrics['requests_total'] == 2
+        assert metrics['inferences_total'] == 2
+        assert metrics['in_use'] == 0
+
+    @patch('coupons.services.ocr_pool.OCRService')
+    def test_concurrent_requests_for_same_image_share_inference(self, mock_service, image):
+        mock_service.side_effect = lambda backend: _fake_engine(delay=0.2)
+        pool = OCREnginePool(size=2)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(pool.extract(image))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(results) == 4
+        assert all(r['text'] == 'text:slip.png' for r in results)
+        metrics = pool.metrics()
+        assert metrics['inferences_total'] == 1
+        assert metrics['shared_total'] == 3
+
+    @patch('coupons.services.ocr_pool.OCRService')
+    def test_acquire_times_out_when_pool_exhausted(self, mock_service):
+        mock_service.side_effect = lambda backend: _fake_engine()
+        pool = OCREnginePool(size=1, acquire_timeout=0.05)
+
+        with pool.engine():
+            with pytest.raises(TimeoutError):
+                with pool.engine():
+                    pass
+
+        assert pool.metrics()['in_use'] == 0
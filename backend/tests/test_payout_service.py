@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from coupons.models import Bookmaker, Coupon, Currency
+from coupons.services.payout_service import (
+    annotate_payouts,
+    compute_payout,
+    get_payouts,
+    payout_for_coupon,
+)
+from finances.models import BookmakerAccountModel
+
+
+def _coupon(stake, multiplier, tax='0.88', currency='PLN'):
+    account = BookmakerAccountModel(
+        id=5, user_id=1, bookmaker=Bookmaker(id=1, name='STS', tax_multiplier=Decimal(tax)),
+        currency=Currency(id=1, code=currency, name=currency),
+    )
+    return Coupon(id=1, user_id=1, bookmaker_account=account, bet_stake=Decimal(stake), multiplier=Decimal(multiplier))
+
+
+class TestComputePayout:
+
+    def test_applies_bookmaker_tax(self):
+        payout = compute_payout(Decimal('10.00'), Decimal('2.50'), Decimal('0.88'), 'PLN')
+
+        assert payout.gross == Decimal('22.0000')
+        assert payout.net == payout.gross
+        assert payout.balance == Decimal('12.00')
+
+    def test_pln_winnings_tax_above_threshold(self):
+        payout = compute_payout(Decimal('1000.00'), Decimal('3.00'), Decimal('0.88'), 'PLN')
+
+        assert payout.gross == Decimal('2640.0000')
+        assert payout.rounded == Decimal('2376.00')
+        assert payout.balance == Decimal('1376.00')
+
+    def test_no_winnings_tax_for_other_currencies(self):
+        payout = compute_payout(Decimal('1000.00'), Decimal('3.00'), Decimal('1.00'), 'EUR')
+
+        assert payout.rounded == Decimal('3000.00')
+
+    def test_missing_bookmaker_defaults_to_no_tax(self):
+        assert compute_payout(Decimal('10.00'), Decimal('2.00')).rounded == Decimal('20.00')
+
+    def test_balance_rounds_after_subtracting_stake(self):
+        payout = compute_payout(Decimal('10.00'), Decimal('1.01'), Decimal('0.5125'), None)
+
+        assert payout.rounded == Decimal('5.18')
+        assert payout.balance == Decimal('-4.82')
+
+
+class TestCouponPayout:
+
+    def test_potential_payout_uses_loaded_relations(self):
+        coupon = _coupon('1000.00', '3.00')
+
+        assert payout_for_coupon(coupon).rounded == Decimal('2376.00')
+        assert coupon.potential_payout == 2376.00
+
+    def test_potential_payout_prefers_annotation(self):
+        coupon = Coupon(id=1, bet_stake=Decimal('10.00'), multiplier=Decimal('2.00'))
+        coupon.net_payout = Decimal('17.60')
+
+        assert coupon.potential_payout == 17.60
+
+    def test_annotation_adds_payout_columns(self):
+        qs = annotate_payouts(Coupon.objects.filter(user_id=1))
+
+        assert {'gross_payout', 'net_payout'} <= set(qs.query.annotations)
+        sql = str(qs.query)
+        assert 'tax_multiplier' in sql
+        assert '2280' in sql
+
+    def test_get_payouts_from_ids_is_one_lookup(self, monkeypatch):
+        rows = [
+            (1, Decimal('10.00'), Decimal('2.50'), Decimal('0.88'), 'PLN'),
+            (2, Decimal('1000.00'), Decimal('3.00'), None, 'PLN'),
+        ]
+
+        class _Rows:
+            def __init__(self):
+                self.calls = []
+
+            def filter(self, **kwargs):
+                self.calls.append(kwargs)
+                return self
+
+            def order_by(self):
+                return self
+
+            def values_list(self, *fields):
+                return rows
+
+        fake = _Rows()
+        monkeypatch.setattr(Coupon, 'objects', fake)
+
+        payouts = get_payouts([1, 2])
+
+        assert fake.calls == [{'id__in': [1, 2]}]
+        assert payouts[1].rounded == Decimal('22.00')
+        assert payouts[2].rounded == Decimal('2700.00')
@@ -0,0 +1,60 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from coupon_analytics.services.pnl_series import PnLSeriesError, PnLSeriesService, next_period, period_start
+
+
+class TestPeriods:
+
+    @pytest.mark.parametrize('period,expected', [
+        ('day', date(2025, 8, 14)),
+        ('week', date(2025, 8, 11)),
+        ('month', date(2025, 8, 1)),
+        ('quarter', date(2025, 7, 1)),
+        ('year', date(2025, 1, 1)),
+    ])
+    def test_period_start(self, period, expected):
+        assert period_start(date(2025, 8, 14), period) == expected
+
+    def test_next_period_rolls_over_year(self):
+        assert next_period(date(2025, 11, 1), 'quarter') == date(2026, 2, 1)
+        assert next_period(date(2025, 12, 1), 'month') == date(2026, 1, 1)
+
+    def test_unknown_period(self):
+        with pytest.raises(PnLSeriesError):
+            period_start(date(2025, 8, 14), 'decade')
+
+
+class TestPnLSeries:
+
+    def _run(self, settled_total, rows, **kwargs):
+        with patch('coupon_analytics.services.pnl_series.CouponStatsRollup') as rollup, \
+                patch('coupon_analytics.services.pnl_series.CouponDailyPnL') as daily:
+            rollup.objects.filter.return_value.aggregate.return_value = {'total': settled_total}
+            daily.objects.filter.return_value.values_list.return_value = rows
+            return PnLSeriesService().series(user=MagicMock(), **kwargs)
+
+    def test_opening_balance_excludes_range_and_later_days(self):
+        rows = [
+            (date(2025, 8, 2), Decimal('10.00'), 1),
+            (date(2025, 8, 3), Decimal('-4.00'), 2),
+            (date(2025, 8, 20), Decimal('50.00'), 1),
+        ]
+
+        points = self._run(Decimal('100.00'), rows, date_from=date(2025, 8, 1), date_to=date(2025, 8, 3))
+
+        assert [p['balance'] for p in points] == [Decimal('44.00'), Decimal('54.00'), Decimal('50.00')]
+        assert points[2]['coupon_count'] == 2
+
+    def test_weekly_buckets_fill_gaps(self):
+        rows = [(date(2025, 8, 5), Decimal('3.00'), 1), (date(2025, 8, 7), Decimal('2.00'), 1)]
+
+        points = self._run(Decimal('5.00'), rows, date_from=date(2025, 8, 6), date_to=date(2025, 8, 20), period='week')
+
+        assert [p['date'] for p in points] == ['2025-08-04', '2025-08-11', '2025-08-18']
+        assert points[0]['profit'] == Decimal('5.00')
+        assert points[0]['coupon_count'] == 2
+        assert points[2]['balance'] == Decimal('5.00')
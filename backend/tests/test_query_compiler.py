@@ -0,0 +1,109 @@
+import json
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+
+from django.db.models import Q
+
+from coupon_analytics.models.queries import AnalyticsQuery, AnalyticsQueryCondition
+from coupon_analytics.services.query_compiler import (
+    combine_nodes,
+    compile_analytics_query,
+    condition_node,
+    get_compiled_query,
+    to_q,
+)
+
+
+def _query(**kwargs):
+    defaults = dict(
+        id=3, user_id=1, name='q', statuses=[], sort_by=[],
+        updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    defaults.update(kwargs)
+    return AnalyticsQuery(**defaults)
+
+
+class TestConditionNode:
+
+    def test_not_operator_is_negated(self):
+        node = condition_node('bets.line', 'not_equals', '1')
+
+        assert node == {'field': 'bets__line', 'lookup': 'exact', 'value': '1', 'negate': True}
+
+    def test_negate_flag_cancels_not_operator(self):
+        assert condition_node('status', 'not_in', ['won'], negate=True)['negate'] is False
+
+    def test_coupon_type_values_are_mapped(self):
+        node = condition_node('coupon_type', 'in', ['1x', '2'])
+
+        assert sorted(node['value']) == ['away_win', 'draw', 'home_win']
+
+
+class TestToQ:
+
+    def test_single_child_is_not_wrapped(self):
+        leaf = condition_node('status', 'equals', 'won')
+
+        assert combine_nodes('AND', [None, leaf]) is leaf
+        assert combine_nodes('OR', [None]) is None
+
+    def test_nested_tree(self):
+        tree = combine_nodes('AND', [
+            condition_node('status', 'equals', 'won'),
+            combine_nodes('OR', [
+                condition_node('bet_stake', 'gte', 10),
+                condition_node('bets.line', 'not_equals', 'X'),
+            ]),
+        ])
+
+        assert to_q(tree) == Q(status__exact='won') & (Q(bet_stake__gte=10) | ~Q(bets__line__exact='X'))
+        assert to_q(None) == Q()
+
+
+class TestCompile:
+
+    @patch('coupon_analytics.services.query_compiler.AnalyticsQueryCondition.objects')
+    @patch('coupon_analytics.services.query_compiler.AnalyticsQueryGroup.objects')
+    def test_tree_is_read_in_two_queries(self, group_objects, condition_objects):
+        group_objects.filter.return_value.order_by.return_value.values.return_value = [
+            {'id': 1, 'parent_id': None, 'operator': 'AND'},
+            {'id': 2, 'parent_id': 1, 'operator': 'OR'},
+        ]
+        condition_objects.filter.return_value.order_by.return_value = [
+            AnalyticsQueryCondition(group_id=1, field='status', operator='equals', value='won'),
+            AnalyticsQueryCondition(group_id=2, field='bet_stake', operator='gte', value=10),
+            AnalyticsQueryCondition(group_id=2, field='bet_stake', operator='lt', value=2),
+        ]
+
+        compiled = compile_analytics_query(_query(start_date=date(2026, 1, 1), coupon_type='1x'))
+
+        assert json.loads(json.dumps(compiled)) == compiled
+        assert to_q(compiled['where']) == Q(status__exact='won') & (Q(bet_stake__gte=10) | Q(bet_stake__lt=2))
+        assert compiled['filters']['user_id'] == 1
+        assert compiled['filters']['start_date'] == '2026-01-01'
+        assert sorted(compiled['filters']['coupon_types']) == ['draw', 'home_win']
+        group_objects.filter.assert_called_once()
+        condition_objects.filter.assert_called_once()
+
+
+class TestCompiledCache:
+
+    @patch('coupon_analytics.services.query_compiler.compile_analytics_query')
+    @patch('coupon_analytics.services.query_compiler.cache')
+    def test_cache_hit_skips_compilation(self, mock_cache, mock_compile):
+        mock_cache.get.return_value = {'where': None}
+
+        assert get_compiled_query(_query()) == {'where': None}
+        mock_compile.assert_not_called()
+
+    @patch('coupon_analytics.services.query_compiler.compile_analytics_query')
+    @patch('coupon_analytics.services.query_compiler.cache')
+    def test_key_changes_with_updated_at(self, mock_cache, mock_compile):
+        mock_cache.get.return_value = None
+
+        get_compiled_query(_query())
+        get_compiled_query(_query(updated_at=datetime(2026, 1, 2, tzinfo=timezone.utc)))
+
+        first, second = [call.args[0] for call in mock_cache.set.call_args_list]
+        assert first != second
+        assert mock_compile.call_count == 2
@@ -0,0 +1,108 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from coupon_analytics.services.rollup_service import CouponSnapshot, RollupService
+
+
+def _snapshot(**overrides):
+    values = dict(
+        user_id=1,
+        bookmaker_account_id=10,
+        strategy_id=None,
+        status='in_progress',
+        bet_stake=Decimal('20.00'),
+        balance=Decimal('0.00'),
+        multiplier=Decimal('2.50'),
+    )
+    values.update(overrides)
+    return CouponSnapshot(**values)
+
+
+class TestCouponSnapshot:
+
+    def test_contribution_of_won_coupon(self):
+        contribution = _snapshot(status='won', balance=Decimal('30.00')).contribution()
+
+        assert contribution['coupons_count'] == 1
+        assert contribution['won_count'] == 1
+        assert contribution['settled_stake'] == Decimal('20.00')
+        assert contribution['settled_balance'] == Decimal('30.00')
+        assert contribution['won_balance'] == Decimal('30.00')
+        assert 'lost_count' not in contribution
+
+    def test_in_progress_coupon_is_not_settled(self):
+        contribution = _snapshot().contribution()
+
+        assert contribution['in_progress_count'] == 1
+        assert contribution['settled_stake'] == Decimal('0')
+        assert contribution['total_stake'] == Decimal('20.00')
+
+
+class TestRollupDiff:
+
+    def test_settling_only_touches_changed_counters(self):
+        before = _snapshot()
+        after = _snapshot(status='lost', balance=Decimal('-20.00'))
+
+        deltas = RollupService._diff([(before, after)])
+
+        assert deltas == {
+            (1, 10, None): {
+                'in_progress_count': -1,
+                'lost_count': 1,
+                'settled_stake': Decimal('20.00'),
+                'total_balance': Decimal('-20.00'),
+                'settled_balance': Decimal('-20.00'),
+            }
+        }
+
+    def test_moving_coupon_between_accounts_moves_whole_contribution(self):
+        before = _snapshot()
+        after = _snapshot(bookmaker_account_id=11)
+
+        deltas = RollupService._diff([(before, after)])
+
+        assert deltas[(1, 10, None)]['coupons_count'] == -1
+        assert deltas[(1, 11, None)]['coupons_count'] == 1
+        assert deltas[(1, 11, None)]['multiplier_sum'] == Decimal('2.50')
+
+    def test_unchanged_coupon_produces_no_delta(self):
+        assert RollupService._diff([(_snapshot(), _snapshot())]) == {}
+
+    def test_track_treats_deleted_coupon_as_removed(self):
+        service = RollupService()
+        coupon = MagicMock(
+            pk=5, user_id=1, bookmaker_account_id=10, strategy_id=None, status='won',
+            bet_stake=Decimal('10.00'), balance=Decimal('5.00'), multiplier=Decimal('1.50'),
+        )
+
+        with patch.object(service, '_apply_bucket') as apply_bucket, \
+                patch('coupon_analytics.services.rollup_service.apply_streak_changes'):
+            with service.track(coupon):
+                coupon.pk = None
+
+        apply_bucket.assert_called_once()
+        bucket, delta = apply_bucket.call_args.args
+        assert bucket == (1, 10, None)
+        assert delta['coupons_count'] == -1
+        assert delta['won_balance'] == Decimal('-5.00')
+
+    def test_daily_diff_only_counts_settled_coupons(self):
+        day = date(2025, 8, 14)
+        before = _snapshot(day=day)
+        after = _snapshot(day=day, status='won', balance=Decimal('12.00'))
+
+        assert RollupService._diff_daily([(before, after)]) == {
+            (1, day): {'profit': Decimal('12.00'), 'settled_count': 1}
+        }
+
+    def test_daily_diff_moves_profit_when_date_changes(self):
+        old_day, new_day = date(2025, 8, 14), date(2025, 8, 10)
+        before = _snapshot(day=old_day, status='lost', balance=Decimal('-20.00'))
+        after = _snapshot(day=new_day, status='lost', balance=Decimal('-20.00'))
+
+        deltas = RollupService._diff_daily([(before, after)])
+
+        assert deltas[(1, old_day)] == {'profit': Decimal('20.00'), 'settled_count': -1}
+        assert deltas[(1, new_day)] == {'profit': Decimal('-20.00'), 'settled_count': 1}
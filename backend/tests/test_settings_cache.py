@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from users.services.settings_cache import get_request_user_settings, remember_user_settings
+
+
+def _request(user_id=41):
+    user = MagicMock(pk=user_id, is_authenticated=True)
+    raw = SimpleNamespace()
+    return SimpleNamespace(user=user, _request=raw)
+
+
+class TestRequestUserSettings:
+
+    def test_loaded_once_per_request(self):
+        request = _request()
+        with patch('users.services.settings_cache.UserSettings') as model:
+            first = get_request_user_settings(request)
+            second = get_request_user_settings(request)
+
+        assert first is second
+        model.objects.filter.assert_called_once_with(user_id=41)
+
+    def test_saved_settings_replace_the_cached_ones(self):
+        request = _request(user_id=42)
+        saved = MagicMock(user_id=42)
+        with patch('users.services.settings_cache.UserSettings') as model:
+            get_request_user_settings(request)
+            remember_user_settings(request, saved)
+
+            assert get_request_user_settings(request) is saved
+
+        model.objects.filter.assert_called_once()
+
+    def test_cache_lives_on_the_request(self):
+        first, second = _request(user_id=43), _request(user_id=43)
+        with patch('users.services.settings_cache.UserSettings') as model:
+            get_request_user_settings(first)
+            get_request_user_settings(second)
+
+        assert model.objects.filter.call_count == 2
+
+    def test_anonymous_user_skips_lookup(self):
+        request = SimpleNamespace(user=MagicMock(is_authenticated=False))
+        with patch('users.services.settings_cache.UserSettings') as model:
+            assert get_request_user_settings(request) is None
+
+        model.objects.filter.assert_not_called()
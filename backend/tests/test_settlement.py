@@ -0,0 +1,180 @@
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import pytest
+
+from common.choices import CouponType
+from coupons.models import Bet, Coupon
+from coupons.services.coupon_service import BetTally, CouponService
+
+
+def _bet(pk, odds, result=None):
+    return Bet(id=pk, odds=Decimal(odds), result=result)
+
+
+def _coupon(status=Coupon.CouponStatus.IN_PROGRESS):
+    coupon = Mock(spec=Coupon)
+    coupon.status = status
+    coupon.coupon_type = CouponType.AKO
+    coupon.bet_stake = Decimal('10.00')
+    coupon.balance = Decimal('0.00')
+    coupon.bookmaker_account_id = None
+    return coupon
+
+
+@pytest.fixture
+def service():
+    return CouponService()
+
+
+class TestBetTally:
+
+    def test_counts_results_from_fetched_rows(self):
+        tally = BetTally.from_bets([
+            _bet(1, '1.50', 'win'), _bet(2, '2.00', 'canceled'), _bet(3, '1.80'), _bet(4, '1.20', 'lost'),
+        ])
+
+        assert tally == BetTally(total=4, won=1, lost=1, canceled=1, unresolved=1)
+
+    @patch('coupons.services.coupon_service.Bet.objects.filter')
+    def test_aggregate_tally_is_single_query(self, mock_filter, service):
+        mock_filter.return_value.aggregate.return_value = {
+            'total': 2, 'won': 2, 'lost': 0, 'canceled': 0, 'unresolved': 0,
+        }
+
+        tally = service._tally_bets(_coupon())
+
+        assert tally.won == 2
+        mock_filter.return_value.aggregate.assert_called_once()
+
+
+class TestSettleCoupon:
+
+    @patch('coupons.services.coupon_service.payout_for_coupon')
+    @patch('coupons.services.coupon_service.Bet.objects')
+    def test_results_are_written_with_one_bulk_update(self, mock_objects, mock_payout, service):
+        bets = [_bet(1, '1.50'), _bet(2, '2.00', 'win'), _bet(3, '1.10')]
+        mock_objects.filter.return_value.only.return_value = bets
+        mock_payout.return_value.balance = Decimal('23.00')
+        coupon = _coupon()
+
+        service._settle_coupon(coupon, {'bets': [
+            {'bet_id': 1, 'result': 'win'},
+            {'bet_id': '3', 'result': 'canceled'},
+            {'bet_id': 99, 'result': 'lost'},
+        ]})
+
+        changed, fields = mock_objects.bulk_update.call_args.args
+        assert [b.id for b in changed] == [1, 3]
+        assert fields == ['result']
+        assert coupon.multiplier == Decimal('3.00')
+        assert coupon.status == Coupon.CouponStatus.WON
+        assert coupon.balance == Decimal('23.00')
+        coupon.save.assert_called_once_with(update_fields=['multiplier', 'status', 'balance'])
+
+    @patch('coupons.services.coupon_service.Bet.objects')
+    def test_set_all_result_is_overridden_per_bet(self, mock_objects, service):
+        bets = [_bet(1, '1.50'), _bet(2, '2.00')]
+        mock_objects.filter.return_value.only.return_value = bets
+        coupon = _coupon()
+
+        service._settle_coupon(coupon, {
+            'set_all_result': 'lost',
+            'bets': [{'bet_id': 2, 'result': 'win'}],
+        })
+
+        assert [b.result for b in bets] == ['lost', 'win']
+        mock_objects.bulk_update.assert_called_once()
+        assert coupon.status == Coupon.CouponStatus.LOST
+        assert coupon.balance == Decimal('-10.00')
+
+    @patch('coupons.services.coupon_service.Bet.objects')
+    def test_unchanged_results_skip_the_write(self, mock_objects, service):
+        mock_objects.filter.return_value.only.return_value = [_bet(1, '1.50'), _bet(2, '2.00')]
+        coupon = _coupon()
+
+        service._settle_coupon(coupon, {'bets': []})
+
+        mock_objects.bulk_update.assert_not_called()
+        assert coupon.status == Coupon.CouponStatus.IN_PROGRESS
+
+    def test_all_canceled_coupon_is_canceled(self, service):
+        coupon = _coupon()
+
+        service._evaluate_and_finalize(coupon, tally=BetTally(total=2, canceled=2))
+
+        assert coupon.status == Coupon.CouponStatus.CANCELED
+        assert coupon.balance == Decimal('0.00')
+        coupon.save.assert_called_once_with(update_fields=['status', 'balance'])
+
+
+class TestBulkSettle:
+
+    def _coupon(self, pk, account_id, stake='10.00'):
+        return Coupon(
+            id=pk, user_id=1, bookmaker_account_id=account_id, strategy_id=None, status='in_progress',
+            bet_stake=Decimal(stake), balance=Decimal('0.00'), multiplier=Decimal('1.00'), coupon_type='ako',
+        )
+
+    @patch('coupons.services.coupon_service.CouponService._notify_bulk_settled')
+    @patch('coupon_analytics.services.rollup_service.apply_coupon_stats_changes')
+    @patch('finances.models.BookmakerAccountModel.objects')
+    @patch('coupons.services.coupon_service.payout_for_coupon')
+    @patch('coupons.services.coupon_service.Bet.objects')
+    @patch('coupons.services.coupon_service.Coupon.objects')
+    def test_balances_are_updated_once_per_account(
+        self, coupon_objects, bet_objects, mock_payout, account_objects, apply_changes, notify, service,
+    ):
+        coupons = [self._coupon(1, 7), self._coupon(2, 7), self._coupon(3, 8, stake='5.00')]
+        coupon_objects.select_for_update.return_value.select_related.return_value \
+            .filter.return_value.order_by.return_value = coupons
+        bet_objects.filter.return_value.only.return_value = [
+            Bet(id=11, coupon_id=1, odds=Decimal('2.00')),
+            Bet(id=21, coupon_id=2, odds=Decimal('1.50')),
+            Bet(id=31, coupon_id=3, odds=Decimal('3.00')),
+        ]
+        mock_payout.return_value.balance = Decimal('10.00')
+
+        result = service.bulk_settle_coupons.__wrapped__(service, user=Mock(id=1), items=[
+            {'coupon_id': 1, 'set_all_result': 'win'},
+            {'coupon_id': 2, 'set_all_result': 'lost'},
+            {'coupon_id': 3, 'bets': [{'bet_id': 31, 'result': 'lost'}]},
+            {'coupon_id': 4, 'set_all_result': 'win'},
+        ])
+
+        assert result['missing'] == [4]
+        assert [c.status for c in result['coupons']] == ['won', 'lost', 'lost']
+        bet_objects.bulk_update.assert_called_once()
+        coupon_objects.bulk_update.assert_called_once()
+        updated_accounts = [call.kwargs['id'] for call in account_objects.filter.call_args_list]
+        assert updated_accounts == [7, 8]
+        assert len(apply_changes.call_args.args[0]) == 3
+        notify.assert_called_once()
+        assert notify.call_args.args[1] == {'won', 'lost'}
+
+
+class TestBulkSettleSerializer:
+
+    def test_rejects_unknown_result(self):
+        from coupons.serializers.coupon_serializer import CouponBulkSettleSerializer
+
+        serializer = CouponBulkSettleSerializer(data={'coupons': [{'coupon_id': 1, 'set_all_result': 'maybe'}]})
+
+        assert not serializer.is_valid()
+
+    def test_rejects_empty_list(self):
+        from coupons.serializers.coupon_serializer import CouponBulkSettleSerializer
+
+        assert not CouponBulkSettleSerializer(data={'coupons': []}).is_valid()
+
+    def test_rejects_duplicate_coupon_ids(self):
+        from coupons.serializers.coupon_serializer import CouponBulkSettleSerializer
+
+        serializer = CouponBulkSettleSerializer(data={'coupons': [
+            {'coupon_id': 4, 'set_all_result': 'win'},
+            {'coupon_id': 5, 'set_all_result': 'win'},
+            {'coupon_id': 4, 'set_all_result': 'lost'},
+        ]})
+
+        assert not serializer.is_valid()
+        assert '4' in str(serializer.errors['coupons'])
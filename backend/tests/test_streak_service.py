@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from coupon_analytics.services.rollup_service import CouponSnapshot
+from coupon_analytics.services.streak_service import StreakService, _streaks_from_statuses
+
+T0 = datetime(2025, 8, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def _snapshot(status, *, minutes=0, coupon_id=1):
+    return CouponSnapshot(
+        user_id=1,
+        bookmaker_account_id=None,
+        strategy_id=None,
+        status=status,
+        bet_stake=Decimal('10.00'),
+        balance=Decimal('0.00'),
+        multiplier=Decimal('2.00'),
+        created_at=T0 + timedelta(minutes=minutes),
+        coupon_id=coupon_id,
+    )
+
+
+def _state(**values):
+    state = MagicMock(
+        current_loss_streak=0, current_win_streak=0, longest_loss_streak=0, longest_win_streak=0,
+        last_created_at=T0, last_coupon_id=1,
+    )
+    for field, value in values.items():
+        setattr(state, field, value)
+    return state
+
+
+class TestStreaksFromStatuses:
+
+    def test_tracks_current_and_longest(self):
+        result = _streaks_from_statuses(['lost', 'lost', 'lost', 'won', 'lost', 'won', 'won'])
+
+        assert result == {
+            'current_loss_streak': 0,
+            'current_win_streak': 2,
+            'longest_loss_streak': 3,
+            'longest_win_streak': 2,
+        }
+
+
+class TestStreakApply:
+
+    def test_ignores_changes_that_never_settle(self):
+        assert not StreakService._affects_streak(_snapshot('in_progress'), _snapshot('canceled'))
+        assert not StreakService._affects_streak(None, _snapshot('in_progress'))
+
+    def test_newer_settlement_updates_in_place(self):
+        service = StreakService()
+        state = _state(current_loss_streak=2, longest_loss_streak=2)
+
+        with patch('coupon_analytics.services.streak_service.UserStreakState') as model, \
+                patch.object(service, 'recompute') as recompute:
+            model.objects.select_for_update.return_value.filter.return_value.first.return_value = state
+            service.apply([(_snapshot('in_progress', minutes=5, coupon_id=2), _snapshot('lost', minutes=5, coupon_id=2))])
+
+        recompute.assert_not_called()
+        state.save.assert_called_once()
+        assert state.current_loss_streak == 3
+        assert state.longest_loss_streak == 3
+        assert state.last_coupon_id == 2
+
+    def test_backdated_settlement_recomputes(self):
+        service = StreakService()
+        state = _state(current_loss_streak=2)
+
+        with patch('coupon_analytics.services.streak_service.UserStreakState') as model, \
+                patch.object(service, 'recompute') as recompute:
+            model.objects.select_for_update.return_value.filter.return_value.first.return_value = state
+            service.apply([(_snapshot('in_progress', minutes=-60, coupon_id=7), _snapshot('won', minutes=-60, coupon_id=7))])
+
+        recompute.assert_called_once_with(1)
+        state.save.assert_not_called()
+
+    def test_deleting_settled_coupon_recomputes(self):
+        service = StreakService()
+
+        with patch('coupon_analytics.services.streak_service.UserStreakState') as model, \
+                patch.object(service, 'recompute') as recompute:
+            model.objects.select_for_update.return_value.filter.return_value.first.return_value = _state()
+            service.apply([(_snapshot('lost'), None)])
+
+        recompute.assert_called_once_with(1)
@@ -0,0 +1,83 @@
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+from django.db.models import Q
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from coupon_analytics.services.aggregate_engine import COUPON_AGGREGATES, CouponAggregate, scoped_aggregates
+from coupon_analytics.services.team_analytics import TeamAnalyticsService
+
+
+class TestScopedAggregates:
+
+    def test_condition_is_combined_with_metric_filter(self):
+        scoped = scoped_aggregates('home__', Q(on_home=True))
+
+        assert set(scoped) == {f'home__{name}' for name in COUPON_AGGREGATES}
+        assert scoped['home__total_count'].filter == Q(on_home=True)
+        assert scoped['home__won_count'].filter == Q(on_home=True) & COUPON_AGGREGATES['won_count'].filter
+        assert COUPON_AGGREGATES['total_count'].filter is None
+
+    def test_from_row_reads_prefixed_keys(self):
+        agg = CouponAggregate.from_row({'home__won_count': 3, 'away__won_count': 1}, prefix='home__')
+
+        assert agg.won_count == 3
+
+
+class TestPositionAggregates:
+
+    @patch('coupon_analytics.services.team_analytics.Coupon.objects')
+    def test_all_positions_in_one_aggregate(self, coupon_objects):
+        aggregate = coupon_objects.filter.return_value.annotate.return_value.filter.return_value.aggregate
+        aggregate.return_value = {
+            'home__total_count': 2, 'away__total_count': 1, 'any__total_count': 3, 'any__total_stake': Decimal('30.00'),
+        }
+
+        result = TeamAnalyticsService().position_aggregates(Mock(id=1), 'Legia')
+
+        aggregate.assert_called_once()
+        assert [result[p].total_count for p in ('home', 'away', 'any')] == [2, 1, 3]
+        assert result['any'].total_stake == Decimal('30.00')
+
+
+class TestBetTypeSplit:
+
+    @patch.object(TeamAnalyticsService, '_team_bets')
+    def test_yield_from_single_coupons(self, team_bets):
+        team_bets.return_value.filter.return_value.values.return_value.annotate.return_value.order_by.return_value = [
+            {
+                'bet_type__code': '1X2', 'bets': 4, 'won': 2, 'lost': 1, 'canceled': 1, 'coupons': 3,
+                'avg_odds': Decimal('1.85'), 'single_stake': Decimal('20.00'), 'single_profit': Decimal('5.00'),
+            },
+            {
+                'bet_type__code': 'BTTS', 'bets': 1, 'won': 0, 'lost': 0, 'canceled': 0, 'coupons': 1,
+                'avg_odds': Decimal('2.10'), 'single_stake': None, 'single_profit': None,
+            },
+        ]
+
+        first, second = TeamAnalyticsService().bet_type_split(Mock(id=1), 'Legia')
+
+        assert first['hit_rate'] == '0.6667'
+        assert first['single_yield'] == '25.00'
+        assert second['hit_rate'] is None and second['single_yield'] is None
+
+
+class TestTeamLeaderboardView:
+
+    def _get(self, **params):
+        from coupon_analytics.views.analytics_views import TeamLeaderboardView
+
+        request = APIRequestFactory().get('/analytics/teams/leaderboard/', params)
+        force_authenticate(request, user=Mock(id=1, is_authenticated=True))
+        return TeamLeaderboardView.as_view()(request)
+
+    def test_rejects_unknown_ordering(self):
+        assert self._get(order_by='luck').status_code == 400
+
+    @patch('coupon_analytics.views.analytics_views.get_team_leaderboard', return_value=[])
+    def test_limit_is_capped(self, leaderboard):
+        response = self._get(limit=5000, order_by='yield')
+
+        assert response.status_code == 200
+        assert leaderboard.call_args.kwargs['limit'] == 100
+        assert leaderboard.call_args.kwargs['order_by'] == 'yield'
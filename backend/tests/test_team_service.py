@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+
+from coupons.models import Event
+from coupons.services.event_parser import EventParserService
+from coupons.services.team_service import TeamService
+
+
+@pytest.fixture
+def service():
+    return TeamService()
+
+
+class TestNormalizeTeamName:
+
+    @pytest.mark.parametrize('raw, expected', [
+        ('Śląsk Wrocław', 'slask wroclaw'),
+        ('  ŁÓDZKI   KS ', 'lodzki ks'),
+        ('Bayern München', 'bayern munchen'),
+        ('St. Pauli', 'st pauli'),
+        ('Paris Saint-Germain', 'paris saint germain'),
+        ('', ''),
+        (None, ''),
+    ])
+    def test_normalizes(self, raw, expected):
+        assert EventParserService.normalize_team_name(raw) == expected
+
+
+class TestTeamQ:
+
+    def test_any_position_matches_home_or_away(self, service):
+        q = service.team_q('Legia', 'any', prefix='bets__event__')
+
+        assert q.connector == 'OR'
+        assert [child[0] for child in q.children] == ['bets__event__home_team_ref__in', 'bets__event__away_team_ref__in']
+
+    def test_home_position_uses_exact_alias(self, service):
+        q = service.team_q('LEGIA', 'home', exact=True)
+
+        (lookup, subquery), = q.children
+        assert lookup == 'home_team_ref__in'
+        sql = str(subquery.query)
+        assert 'legia' in sql and 'LIKE' not in sql
+
+    def test_blank_query_suggests_nothing(self, service):
+        assert service.suggest('  --  ') == []
+
+
+class TestResolve:
+
+    @patch('coupons.services.team_service.Team.objects')
+    @patch('coupons.services.team_service.TeamAlias.objects')
+    def test_known_aliases_need_no_insert(self, alias_objects, team_objects, service):
+        alias_objects.filter.return_value.values_list.return_value = [('legia warszawa', 7)]
+
+        assert service.resolve(['Legia Warszawa', 'LEGIA  warszawa']) == {'legia warszawa': 7}
+        team_objects.bulk_create.assert_not_called()
+
+    @patch('coupons.services.team_service.Team.objects')
+    @patch('coupons.services.team_service.TeamAlias.objects')
+    def test_unknown_names_create_team_and_alias(self, alias_objects, team_objects, service):
+        alias_objects.filter.return_value.values_list.side_effect = [[], [('lech poznan', 3)]]
+        team_objects.filter.return_value.values_list.return_value = [('lech poznan', 3)]
+
+        assert service.resolve(['Lech Poznań']) == {'lech poznan': 3}
+        created, = team_objects.bulk_create.call_args.args
+        assert [(t.name, t.normalized_name) for t in created] == [('Lech Poznań', 'lech poznan')]
+        aliases, = alias_objects.bulk_create.call_args.args
+        assert aliases[0].team_id == 3
+
+
+class TestLinkEvents:
+
+    @patch('coupons.services.team_service.Event.objects')
+    @patch.object(TeamService, 'resolve')
+    def test_parses_names_and_links_in_one_update(self, resolve, event_objects, service):
+        resolve.return_value = {'legia': 1, 'lech': 2}
+        event = Event(id=5, name='Legia - Lech')
+
+        service.link_events([event])
+
+        assert (event.home_team, event.away_team) == ('Legia', 'Lech')
+        assert (event.home_team_ref_id, event.away_team_ref_id) == (1, 2)
+        event_objects.bulk_update.assert_called_once_with(
+            [event], ['home_team_ref', 'away_team_ref', 'home_team', 'away_team']
+        )
@@ -0,0 +1,37 @@
+from typing import Dict, Optional
+
+from ..models import UserSettings
+
+_CACHE_ATTR = '_user_settings_cache'
+
+
+def _raw_request(request):
+    # DRF Request -> HttpRequest, so the view and every serializer share one cache
+    return getattr(request, '_request', request)
+
+
+def _request_cache(request) -> Dict[int, Optional[UserSettings]]:
+    raw = _raw_request(request)
+    cache = getattr(raw, _CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(raw, _CACHE_ATTR, cache)
+    return cache
+
+
+def get_request_user_settings(request) -> Optional[UserSettings]:
+    """UserSettings of the request's user, loaded at most once per request."""
+    user = getattr(request, 'user', None)
+    if request is None or not user or not getattr(user, 'is_authenticated', False):
+        return None
+
+    cache = _request_cache(request)
+    if user.pk not in cache:
+        cache[user.pk] = UserSettings.objects.filter(user_id=user.pk).first()
+    return cache[user.pk]
+
+
+def remember_user_settings(request, settings: UserSettings) -> None:
+    """Replace the request's cached settings after they were saved in that same request."""
+    if request is not None:
+        _request_cache(request)[settings.user_id] = settings
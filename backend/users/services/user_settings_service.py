@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from ..models import UserSettings, NotificationGate
+from .settings_cache import remember_user_settings
 from django_otp.plugins.otp_totp.models import TOTPDevice
 
 User = get_user_model()
@@ -9,7 +10,7 @@ class UserSettingsService:
         settings, created = UserSettings.objects.get_or_create(user=user)
         return settings
 
-    def update_user_settings(self, user: User, data: dict) -> UserSettings:
+    def update_user_settings(self, user: User, data: dict, request=None) -> UserSettings:
         settings = self.get_user_settings(user)
 
         if 'predefined_bet_values' in data and data['predefined_bet_values'] is not None:
@@ -43,6 +44,8 @@ class UserSettingsService:
 
 
         settings.save()
+        # Fields rendered later in this request must see the new settings
+        remember_user_settings(request, settings)
 
         if favourite_disciplines is not None:
             settings.favourite_disciplines.set(favourite_disciplines)
@@ -58,5 +61,5 @@ def get_user_settings(user: User) -> UserSettings:
     return _service.get_user_settings(user)
 
 
-def update_user_settings(user: User, data: dict) -> UserSettings:
-    return _service.update_user_settings(user, data)
+def update_user_settings(user: User, data: dict, request=None) -> UserSettings:
+    return _service.update_user_settings(user, data, request=request)
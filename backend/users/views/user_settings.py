@@ -39,7 +39,7 @@ class UserSettingsView(APIView):
         serializer = UserSettingsSerializer(settings, data=request.data, partial=True)
 
         if serializer.is_valid():
-            updated_settings = update_user_settings(request.user, serializer.validated_data)
+            updated_settings = update_user_settings(request.user, serializer.validated_data, request=request)
             response_serializer = UserSettingsSerializer(updated_settings)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
 